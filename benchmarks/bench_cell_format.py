@@ -0,0 +1,199 @@
+# benchmarks/bench_cell_format.py
+"""
+单元格值转换(data_access/cell_format)的耗时: 原实现(每个值新建 Decimal 和精度,
+每个单元格判断格式) vs 按列转换一批随机值, 以及读取一个合成工作簿.
+
+与原实现的一致性由 tests/test_cell_format.py 检查: 边界值语料(inf/nan/-0.0、
+超大/超小值、.xx5 类的进位、负数、百分比、年份 < 1000 的日期、整数、字符串、布尔值)
+逐个比较, 原实现抛出异常的值要求抛出同类异常; 混用格式的工作簿在流式与整本载入两种模式下
+逐单元格比较(含列的顺序). 本模块提供原实现和这些输入.
+
+用法(在仓库根目录):
+    python -m benchmarks.bench_cell_format
+    python -m benchmarks.bench_cell_format --values 1000000 --rows 20000
+"""
+
+import argparse
+import math
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, time as dt_time
+from decimal import Decimal, ROUND_HALF_UP
+
+from openpyxl import Workbook, load_workbook
+
+from benchmarks.fixtures import column_key, write_workbook
+from data_access.cell_format import format_column, get_formatter
+from data_access.excel_reader import ExcelDataProvider
+
+NUMBER_FORMATS = ("General", "0.00", "0.00%", "0%", "#,##0.00", "yyyy-mm-dd")
+
+#: 写入工作簿的格式: 日期格式会让 openpyxl 把小数读成日期, 不用于随机格式的列
+WORKBOOK_FORMATS = NUMBER_FORMATS[:-1]
+
+
+# ---- 原实现(逐单元格) ----
+def legacy_round_half_up(value, ndigits):
+    dec = Decimal(str(value))
+    quant = Decimal('1.' + '0' * ndigits)
+    return float(dec.quantize(quant, rounding=ROUND_HALF_UP))
+
+
+def legacy_convert(cell_value, number_format):
+    if cell_value is None:
+        return ""
+    if isinstance(cell_value, float):
+        if '%' in number_format:
+            return f"{legacy_round_half_up(cell_value * 100, 2)}%"
+        return legacy_round_half_up(cell_value, 2)
+    if isinstance(cell_value, datetime):
+        return cell_value.strftime('%Y-%m-%d')
+    return cell_value
+
+
+def edge_values() -> list:
+    values = [
+        None, "", "文本", "12.345", True, False, 0, 1, -7, 10 ** 20, dt_time(12, 30),
+        0.0, -0.0, 1.0, -1.0, 3.0, 1e15 - 1, 1e15, 1e16, 1e20, 1e30, -1e30, 1e300,
+        float("inf"), float("-inf"), float("nan"),
+        0.005, 0.015, 0.025, 1.005, 2.675, 1.115, -0.005, -2.675, -1.005,
+        0.1, 0.12, 0.125, 0.1 + 0.2, 1 / 3, -1 / 3, 2 / 3, 12.5, 99.995, 99.994999,
+        1e-5, 1e-7, 5e-3, 4.9999e-3, 123456789.125, 1234567890123.456,
+        0.123456, 0.99995, 0.00005, 0.0005, -0.00005,
+        datetime(2024, 1, 31), datetime(2024, 12, 31, 23, 59, 59), datetime(1900, 1, 1),
+        datetime(999, 5, 6), datetime(1, 1, 1), datetime(9999, 12, 31),
+    ]
+    rng = random.Random(7)
+    for _ in range(2000):
+        values.append(round(rng.uniform(-1e6, 1e6), rng.randint(0, 6)))
+        values.append(rng.uniform(-1, 1))
+        values.append(rng.randint(-10 ** 6, 10 ** 6) / 1000 + 0.0005)
+        values.append(float(rng.randint(-10 ** 12, 10 ** 12)))
+    return values
+
+
+def outcome(func, *args):
+    try:
+        result = func(*args)
+    except Exception as e:
+        return ("raise", type(e))
+    if isinstance(result, float) and math.isnan(result):
+        return ("nan",)
+    # 区分 0.0 / -0.0 以及 1 / 1.0 / True
+    return ("ok", type(result), repr(result))
+
+
+def storable_values() -> list:
+    """
+    语料中能写入 xlsx 并原样读回的值(有限的小数、1900年以后的日期等), 且原实现不抛异常.
+    """
+    values = []
+    for value in edge_values()[:60]:
+        if isinstance(value, float) and not math.isfinite(value):
+            continue
+        if isinstance(value, datetime) and value.year < 1900:
+            continue
+        if value is None or isinstance(value, dt_time):
+            continue
+        if any(outcome(legacy_convert, value, fmt)[0] == "raise" for fmt in NUMBER_FORMATS):
+            continue
+        values.append(value)
+    return values
+
+
+def write_mixed_workbook(path: str, n_rows: int = 300):
+    """
+    每列一种情况: 混用格式的小数列、整列百分比、日期、整数值小数、含空单元格的列、
+    语料中的值(格式随机).
+    """
+    rng = random.Random(11)
+    corpus = storable_values()
+    wb = Workbook()
+    for sheet_idx in range(2):
+        ws = wb.active if sheet_idx == 0 else wb.create_sheet()
+        ws.title = f"Sheet{sheet_idx + 1}"
+        ws.append([f"列{c}" for c in range(7)])
+        for r in range(n_rows):
+            values = [
+                rng.uniform(-1000, 1000),
+                rng.uniform(0, 1),
+                datetime(2020, 1, 1 + r % 28),
+                float(rng.randint(-500, 500)),
+                None if r % 3 else rng.uniform(0, 10),
+                f"文本{r}" if r % 2 else rng.randint(0, 99),
+                rng.choice(corpus),
+            ]
+            ws.append(values)
+            row = ws.max_row
+            ws.cell(row=row, column=1).number_format = "0.00%" if r % 5 == 0 else "0.00"
+            ws.cell(row=row, column=2).number_format = "0.0%"
+            ws.cell(row=row, column=7).number_format = rng.choice(WORKBOOK_FORMATS)
+        ws.append([None] * 7)  # 空行不计入
+    wb.save(path)
+
+
+def legacy_read(path: str) -> dict:
+    wb = load_workbook(path, data_only=True)
+    result = {}
+    for sheet in wb.worksheets:
+        rows = []
+        for row in sheet.iter_rows(min_row=2):
+            if all(cell.value is None for cell in row):
+                continue
+            rows.append({column_key(i): legacy_convert(cell.value, cell.number_format)
+                         for i, cell in enumerate(row)})
+        result[sheet.title] = rows
+    return result
+
+
+def same_rows(a: dict, b: dict) -> bool:
+    def key(data):
+        return {name: [[(k, outcome(lambda v: v, v)) for k, v in row.items()] for row in rows]
+                for name, rows in data.items()}
+    return key(a) == key(b)
+
+
+def time_conversion(n_values: int):
+    rng = random.Random(3)
+    # 三种各占三分之一: 任意小数 / 两位小数(如金额) / 整数值小数
+    makers = (lambda: rng.uniform(-1e6, 1e6),
+              lambda: round(rng.uniform(-1e6, 1e6), 2),
+              lambda: float(rng.randint(0, 10 ** 6)))
+    values = [makers[i % 3]() for i in range(n_values)]
+    for number_format in ("0.00", "0.00%"):
+        start = time.perf_counter()
+        old = [legacy_convert(v, number_format) for v in values]
+        legacy_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        new = format_column(values, get_formatter(number_format))
+        new_seconds = time.perf_counter() - start
+        assert old == new
+        print(f"{n_values} 个小数 [{number_format}]: 原实现 {legacy_seconds * 1000:.0f}ms, "
+              f"按列 {new_seconds * 1000:.0f}ms ({legacy_seconds / new_seconds:.1f}x)")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="单元格值转换耗时")
+    parser.add_argument("--values", type=int, default=500000, help="计时用的小数个数")
+    parser.add_argument("--rows", type=int, default=5000, help="计时用工作簿的行数")
+    args = parser.parse_args(argv)
+
+    time_conversion(args.values)
+    work_dir = tempfile.mkdtemp(prefix="ppt_bench_cell_format_")
+    try:
+        book = os.path.join(work_dir, "book.xlsx")
+        write_workbook(book, n_sheets=1, n_rows=args.rows, n_cols=8)
+        start = time.perf_counter()
+        ExcelDataProvider(book).read_data()
+        print(f"读取 {args.rows} 行 x 8 列: {(time.perf_counter() - start) * 1000:.0f}ms")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+# benchmarks/bench_clone.py
+"""
+幻灯片批量复制基准:
+对同一模板分别复制 N 份, 输出总耗时和每份耗时,
+每份耗时应基本保持不变(即总耗时随 N 线性增长).
+计时前先检查带备注页和图片的幻灯片: 副本不带备注页, 图片关系的 rId 需重新编号,
+副本中的图片引用应指向同一图片部件, 保存后重新打开仍一致. 检查失败以非零状态退出.
+
+用法(在仓库根目录):
+    python -m benchmarks.bench_clone
+    python -m benchmarks.bench_clone --counts 100 200 400 800 1600
+"""
+
+import argparse
+import sys
+import time
+from io import BytesIO
+
+from pptx import Presentation
+from pptx.oxml.ns import qn
+from pptx.util import Inches
+
+from benchmarks.fixtures import build_png_bytes, build_template, build_template_bytes
+from ppt_engine.deck_manager import copy_slide_after
+
+
+def time_clone(template_bytes: bytes, count: int, base_index: int = 3) -> float:
+    prs = Presentation(BytesIO(template_bytes))
+    start = time.perf_counter()
+    copy_slide_after(prs, base_index=base_index, count=count)
+    return time.perf_counter() - start
+
+
+def picture_blobs(slide) -> list:
+    """
+    幻灯片上各图片 a:blip 引用的图片内容, 引用的关系不存在时为 None.
+    """
+    blobs = []
+    for blip in slide._element.iter(qn("a:blip")):
+        rel = slide.part.rels.get(blip.get(qn("r:embed")))
+        blobs.append(None if rel is None or rel.is_external else rel.target_part.blob)
+    return blobs
+
+
+def check_notes_and_image(problems: list, count: int = 3):
+    """
+    先建备注页再插图片: 原幻灯片上 版式 rId1 / 备注 rId2 / 图片 rId3,
+    副本不复制备注页, 图片关系变为 rId2, 需要改写 r:embed.
+    """
+    prs = build_template(n_slides=2)
+    src = prs.slides[1]
+    src.notes_slide.notes_text_frame.text = "备注"
+    src.shapes.add_picture(BytesIO(build_png_bytes(8, 8)), Inches(1), Inches(1))
+    image = picture_blobs(src)
+
+    copy_slide_after(prs, base_index=2, count=count)
+    buffer = BytesIO()
+    prs.save(buffer)
+    reopened = Presentation(BytesIO(buffer.getvalue()))
+    if len(reopened.slides) != 2 + count:
+        problems.append(f"[备注+图片] 应有 {2 + count} 页, 实际 {len(reopened.slides)}")
+        return
+    for i, slide in enumerate(list(reopened.slides)[2:], start=3):
+        if slide.has_notes_slide:
+            problems.append(f"[备注+图片] 第 {i} 页(副本)不应带备注页")
+        if picture_blobs(slide) != image:
+            problems.append(f"[备注+图片] 第 {i} 页(副本)的图片引用未指向原图片")
+    if not reopened.slides[1].has_notes_slide or picture_blobs(reopened.slides[1]) != image:
+        problems.append("[备注+图片] 原幻灯片的备注页或图片被改动")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="幻灯片批量复制基准")
+    parser.add_argument("--counts", type=int, nargs="+", default=[100, 200, 400, 800, 1600])
+    parser.add_argument("--repeat", type=int, default=3, help="每个 N 重复次数, 取最小值")
+    args = parser.parse_args(argv)
+
+    problems = []
+    check_notes_and_image(problems)
+    for problem in problems:
+        print(problem)
+    if problems:
+        return 1
+
+    template_bytes = build_template_bytes()
+    print(f"{'N':>8} {'总耗时(s)':>12} {'每份(ms)':>10}")
+    for count in args.counts:
+        best = min(time_clone(template_bytes, count) for _ in range(args.repeat))
+        print(f"{count:>8} {best:>12.4f} {best / count * 1000:>10.3f}")
+    print("检查通过")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
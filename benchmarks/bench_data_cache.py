@@ -0,0 +1,201 @@
+# benchmarks/bench_data_cache.py
+"""
+输入数据磁盘缓存(data_access.data_cache): 结果一致性、命中、淘汰与并发写入.
+
+1. 同一工作簿分别直接读取、首次经缓存读取(未命中)、再次读取(命中), 结果逐行比较,
+   覆盖部分列、部分sheet、全部sheet; 先后请求不同的列时条目扩大覆盖范围, 之后都能命中;
+2. 缓存上限小于全部条目时, 目录大小不超过上限且保留最近使用的条目;
+   未超过上限时, 多次写入只在首次写入时扫描一次缓存目录;
+3. 多个线程、多个进程同时读取同一批文件(同一缓存目录), 结果与直接读取一致;
+4. run_processing 先后运行两次(第二次模拟只改了模板), 第二次全部命中,
+   输出与不用缓存时逐部件一致, 并报告两次 read_data 阶段的耗时.
+任何检查失败都以非零状态退出.
+
+用法(在仓库根目录):
+    python -m benchmarks.bench_data_cache
+    python -m benchmarks.bench_data_cache --rows 50000 --files 4
+"""
+
+import argparse
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from benchmarks.bench_spool import read_members
+from benchmarks.fixtures import build_mappings, write_mappings, write_template, write_workbook
+from client_gui.controller.processing_controller import run_processing
+from data_access.data_cache import CachedDataProvider, DataCache
+from data_access.excel_reader import ExcelDataProvider
+
+
+def as_rows(data: dict) -> dict:
+    return {name: table.to_rows() for name, table in data.items()}
+
+
+def cached_read(path: str, cache_dir: str, sheets=None, columns=None):
+    """
+    经缓存读取一次, 返回 (行字典形式的结果, read_stats). 供进程池调用.
+    """
+    provider = CachedDataProvider(ExcelDataProvider(path), path, DataCache(cache_dir))
+    return as_rows(provider.read_data(sheets, columns)), provider.read_stats()
+
+
+def check_reads(path: str, cache_dir: str, problems: list):
+    requests = [
+        ("部分列", {"Sheet1"}, {"Sheet1": {"[A]", "[C]"}}),
+        ("其他列", {"Sheet1"}, {"Sheet1": {"[B]", "[E]"}}),
+        ("部分列(已覆盖)", {"Sheet1"}, {"Sheet1": {"[C]"}}),
+        ("不存在的sheet", {"Sheet1", "缺失"}, {"Sheet1": {"[A]"}}),
+        ("部分sheet", {"Sheet2"}, None),
+        ("全部", None, None),
+    ]
+    cache = DataCache(cache_dir)
+    for label, sheets, columns in requests:
+        expected = as_rows(ExcelDataProvider(path).read_data(sheets, columns))
+        provider = CachedDataProvider(ExcelDataProvider(path), path, cache)
+        first = as_rows(provider.read_data(sheets, columns))
+        first_hit = provider.read_stats()["data_cache_hits"]
+        second = as_rows(provider.read_data(sheets, columns))
+        second_hit = provider.read_stats()["data_cache_hits"]
+        if first != expected or second != expected:
+            problems.append(f"[{label}] 经缓存读取的结果与直接读取不一致")
+        if not second_hit:
+            problems.append(f"[{label}] 再次读取未命中")
+        print(f"  {label}: 首次{'命中' if first_hit else '未命中'}, 再次{'命中' if second_hit else '未命中'}")
+
+    # 条目已覆盖以上全部请求, 换一个 DataCache(相当于新进程)也都命中
+    fresh = DataCache(cache_dir)
+    for label, sheets, columns in requests:
+        provider = CachedDataProvider(ExcelDataProvider(path), path, fresh)
+        provider.read_data(sheets, columns)
+        if not provider.read_stats()["data_cache_hits"]:
+            problems.append(f"[{label}] 新进程中未命中")
+
+
+def check_eviction(paths: list, cache_dir: str, problems: list):
+    sizing = DataCache(os.path.join(cache_dir, "sizing"))
+    CachedDataProvider(ExcelDataProvider(paths[0]), paths[0], sizing).read_data()
+    entry_bytes = sizing.size_bytes()
+    # 上限约能放下两个条目
+    cache = DataCache(os.path.join(cache_dir, "small"), max_bytes=int(entry_bytes * 2.5))
+    for path in paths:
+        CachedDataProvider(ExcelDataProvider(path), path, cache).read_data()
+        time.sleep(0.01)
+    if cache.size_bytes() > cache.max_bytes:
+        problems.append(f"[淘汰] 缓存目录 {cache.size_bytes()} 字节超过上限 {cache.max_bytes}")
+    provider = CachedDataProvider(ExcelDataProvider(paths[-1]), paths[-1], cache)
+    provider.read_data()
+    if not provider.read_stats()["data_cache_hits"]:
+        problems.append("[淘汰] 最近写入的条目被淘汰")
+    print(f"  条目约 {entry_bytes / 1024:.0f}KB, 上限 {cache.max_bytes / 1024:.0f}KB, "
+          f"写入 {len(paths)} 个后目录 {cache.size_bytes() / 1024:.0f}KB, 扫描目录 {cache.scans} 次")
+
+    roomy = DataCache(os.path.join(cache_dir, "roomy"))
+    for path in paths:
+        for columns in ({"Sheet1": {"[A]"}}, None):  # 第二次扩大覆盖范围, 替换条目
+            CachedDataProvider(ExcelDataProvider(path), path, roomy).read_data(columns=columns)
+    if roomy.scans != 1:
+        problems.append(f"[淘汰] 未超过上限时写入 {len(paths) * 2} 次扫描了目录 {roomy.scans} 次, 应为 1 次")
+    if roomy._total_bytes != roomy.size_bytes():
+        problems.append(f"[淘汰] 累计大小 {roomy._total_bytes} 与目录实际大小 {roomy.size_bytes()} 不符")
+
+
+def check_concurrent(paths: list, cache_dir: str, problems: list):
+    expected = {path: as_rows(ExcelDataProvider(path).read_data()) for path in paths}
+    jobs = [path for path in paths for _ in range(3)]
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(lambda p: cached_read(p, os.path.join(cache_dir, "threads"))[0], jobs))
+    with ProcessPoolExecutor(max_workers=2, mp_context=multiprocessing.get_context("spawn")) as executor:
+        futures = [executor.submit(cached_read, path, os.path.join(cache_dir, "procs")) for path in jobs]
+        results += [future.result()[0] for future in futures]
+    bad = sum(1 for path, result in zip(jobs + jobs, results) if result != expected[path])
+    if bad:
+        problems.append(f"[并发] {bad} 次读取结果与直接读取不一致")
+    leftovers = [name for sub in ("threads", "procs")
+                 for name in os.listdir(os.path.join(cache_dir, sub)) if name.endswith(".tmp")]
+    if leftovers:
+        problems.append(f"[并发] 遗留临时文件: {leftovers}")
+    print(f"  4 线程 + 2 进程各读取 {len(jobs)} 次, 结果一致")
+
+
+def check_run(work_dir: str, paths: list, problems: list):
+    input_dir = os.path.join(work_dir, "in")
+    os.makedirs(input_dir)
+    for path in paths:
+        shutil.copy(path, input_dir)
+    template_path = os.path.join(work_dir, "template.pptx")
+    mappings_path = os.path.join(work_dir, "slide_mappings.json")
+    write_template(template_path, n_slides=6)
+    write_mappings(mappings_path, build_mappings(6, 1))
+    cache_dir = os.path.join(work_dir, "run_cache")
+
+    def run(name: str, **kwargs):
+        output_dir = os.path.join(work_dir, name)
+        stats = run_processing(template_path, input_dir, output_dir, mappings_path,
+                               max_workers=1, incremental=False, **kwargs)
+        if stats is None or stats.processed != len(paths):
+            problems.append(f"[run_processing {name}] 未全部生成")
+            return None, {}
+        outputs = {f: read_members(os.path.join(output_dir, f))
+                   for f in sorted(os.listdir(output_dir)) if f.endswith(".pptx")}
+        return stats, outputs
+
+    _, baseline = run("out_plain")
+    cold, cold_out = run("out_cold", data_cache_dir=cache_dir)
+    # 模拟修改模板: 输入不变, 重新生成
+    write_template(template_path, n_slides=6)
+    warm, warm_out = run("out_warm", data_cache_dir=cache_dir)
+    if cold_out != baseline or warm_out != baseline:
+        problems.append("[run_processing] 经缓存生成的PPT与不用缓存时不一致")
+    if cold is None or warm is None:
+        return
+    if warm.data_cache_hit_rate != 1.0:
+        problems.append(f"[run_processing] 第二次运行命中率 {warm.data_cache_hit_rate}")
+    cold_read = cold.stage_summary()["read_data"]["sum"]
+    warm_read = warm.stage_summary()["read_data"]["sum"]
+    print(f"  read_data 合计: 首次 {cold_read:.2f}s, 再次 {warm_read:.2f}s "
+          f"({cold_read / max(warm_read, 1e-9):.1f}x)")
+    print("  " + warm.format_summary().splitlines()[-1].strip())
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="输入数据磁盘缓存的一致性、淘汰与并发")
+    parser.add_argument("--rows", type=int, default=3000)
+    parser.add_argument("--files", type=int, default=4)
+    args = parser.parse_args(argv)
+
+    work_dir = tempfile.mkdtemp(prefix="ppt_bench_data_cache_")
+    problems = []
+    try:
+        paths = []
+        for i in range(args.files):
+            path = os.path.join(work_dir, f"book{i}.xlsx")
+            write_workbook(path, n_rows=args.rows, n_cols=6, n_sheets=2, seed=i)
+            paths.append(path)
+        cache_dir = os.path.join(work_dir, "cache")
+
+        print("读取一致性与命中:")
+        check_reads(paths[0], os.path.join(cache_dir, "reads"), problems)
+        print("淘汰:")
+        check_eviction(paths, cache_dir, problems)
+        print("并发:")
+        check_concurrent(paths, cache_dir, problems)
+        print("run_processing:")
+        check_run(work_dir, paths, problems)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    for problem in problems[:10]:
+        print(problem)
+    if problems:
+        return 1
+    print("检查通过")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+# benchmarks/bench_executor.py
+"""
+线程池 vs 进程池 吞吐量基准:
+生成一批合成工作簿, 分别用 executor_mode="thread" / "process"
+调用 run_processing, 输出每秒处理文件数.
+
+用法(在仓库根目录):
+    python -m benchmarks.bench_executor
+    python -m benchmarks.bench_executor --files 200 --workers 8 --rows 200
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from benchmarks.fixtures import build_mappings, write_mappings, write_template, write_workbook
+from client_gui.controller.processing_controller import run_processing
+
+
+def prepare_inputs(work_dir: str, n_files: int, n_rows: int, n_slides: int, n_sheets: int):
+    input_dir = os.path.join(work_dir, "input")
+    os.makedirs(input_dir)
+    template_path = os.path.join(work_dir, "template.pptx")
+    mappings_path = os.path.join(work_dir, "slide_mappings.json")
+    write_template(template_path, n_slides=n_slides)
+    write_mappings(mappings_path, build_mappings(n_slides, n_sheets))
+
+    # 先生成一份, 其余直接复制, 避免基准准备时间过长
+    first = os.path.join(input_dir, "book0000.xlsx")
+    write_workbook(first, n_rows=n_rows, n_sheets=n_sheets)
+    for i in range(1, n_files):
+        shutil.copyfile(first, os.path.join(input_dir, f"book{i:04d}.xlsx"))
+    return template_path, input_dir, mappings_path
+
+
+def run_mode(mode: str, template_path: str, input_dir: str, mappings_path: str,
+             output_dir: str, workers: int) -> float:
+    os.makedirs(output_dir, exist_ok=True)
+    start = time.perf_counter()
+    run_processing(
+        template_path=template_path,
+        excel_dir=input_dir,
+        output_dir=output_dir,
+        slide_mappings_file=mappings_path,
+        max_workers=workers,
+        executor_mode=mode
+    )
+    return time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="线程池 vs 进程池 吞吐量基准")
+    parser.add_argument("--files", type=int, default=64)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4)
+    parser.add_argument("--rows", type=int, default=50)
+    parser.add_argument("--slides", type=int, default=10)
+    parser.add_argument("--sheets", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    work_dir = tempfile.mkdtemp(prefix="ppt_bench_executor_")
+    try:
+        template_path, input_dir, mappings_path = prepare_inputs(
+            work_dir, args.files, args.rows, args.slides, args.sheets
+        )
+        print(f"文件数={args.files} 并行数={args.workers}")
+        print(f"{'模式':>8} {'耗时(s)':>10} {'文件/秒':>10}")
+        for mode in ("thread", "process"):
+            output_dir = os.path.join(work_dir, f"output_{mode}")
+            elapsed = run_mode(mode, template_path, input_dir, mappings_path,
+                               output_dir, args.workers)
+            print(f"{mode:>8} {elapsed:>10.2f} {args.files / elapsed:>10.1f}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+# benchmarks/bench_fill_engines.py
+"""
+占位符填充引擎对比: "pptx"(python-pptx 形状对象模型) 与 "lxml"(直接操作幻灯片 XML).
+
+对每个场景用两种引擎分别复制幻灯片+填充占位符, 比较 fill_placeholders 阶段的耗时.
+场景包括 suite.py 中的 baseline / table_heavy / wide, 以及一个文字密集、
+数据中含控制字符(需转义)的 text 场景.
+
+两种引擎的输出由 tests/test_fill_engines.py 检查: 固定的小模板和数据
+(表格/单行/复制页/行模板表格, 以及含控制字符需转义的文字页)的输出必须与
+benchmarks/golden/ 中签入的幻灯片 XML 逐字节相同, 各场景下两种引擎的输出逐页相同.
+有意修改输出时用 --update-golden 重新生成金样并一起提交;
+金样依赖 python-pptx 版本(模板由它生成), 见 requirements.txt.
+
+用法(在仓库根目录):
+    python -m benchmarks.bench_fill_engines
+    python -m benchmarks.bench_fill_engines --scenario table_heavy --repeat 10
+    python -m benchmarks.bench_fill_engines --update-golden
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from lxml import etree
+
+from benchmarks.fixtures import build_mappings, build_template, build_text_template, column_key
+from benchmarks.suite import SCENARIOS, generate_scenario
+from business_logic.processor import (
+    TABLE_ROW_TEMPLATE, collect_data_request, fill_placeholders, prepare_slides
+)
+from data_access.excel_reader import ExcelDataProvider
+from ppt_engine.template_cache import TemplateCache
+
+#: 参与对比的 suite 场景
+SUITE_SCENARIOS = ("baseline", "table_heavy", "wide")
+
+#: 签入的金样目录
+GOLDEN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "golden")
+
+
+def text_scenario(work_dir: str, n_slides: int = 60) -> dict:
+    """
+    文字密集模板 + 单行映射; 数据中含 ESC/制表符/换行, 检查两种引擎的转义一致.
+    """
+    template_path = os.path.join(work_dir, "text_template.pptx")
+    build_text_template(n_slides=n_slides).save(template_path)
+    mappings = {idx: {"sheet": "Sheet1", "type": "row", "copy": idx % 4 == 0}
+                for idx in range(1, n_slides + 1)}
+    rows = [{column_key(c): f"值{r}-{c}\x1b\t换行\n" for c in range(4)} for r in range(5)]
+    return {"template": template_path, "mappings": mappings, "data": {"Sheet1": rows}}
+
+
+def golden_scenarios(work_dir: str) -> dict:
+    """
+    金样用的固定输入, 数据直接给出(不经 Excel 读取), 内容只取决于本函数.
+    """
+    table_path = os.path.join(work_dir, "golden_table.pptx")
+    build_template(n_slides=6, table_rows=4, table_cols=3).save(table_path)
+    mappings = build_mappings(5, 2)
+    mappings[6] = {"sheet": "Sheet2", "type": TABLE_ROW_TEMPLATE, "max_rows": 4}
+    data = {
+        sheet: [{column_key(c): f"{sheet}-{r}-{c}" if c else f"{r * 1.5:.2f} & <{sheet}>"
+                 for c in range(3)} for r in range(s_idx * 3 + 3)]
+        for s_idx, sheet in enumerate(("Sheet1", "Sheet2"))
+    }
+    text = text_scenario(work_dir, n_slides=4)
+    return {
+        "table": {"template": table_path, "mappings": mappings, "data": data},
+        "text": text,
+    }
+
+
+def golden_path(name: str) -> str:
+    return os.path.join(GOLDEN_DIR, f"fill_{name}.xml")
+
+
+def golden_document(slides_xml) -> bytes:
+    return b"<slides>\n" + b"\n".join(slides_xml) + b"\n</slides>\n"
+
+
+def read_golden(name: str) -> list:
+    """
+    读取签入的金样, 返回各页 XML(与 render 的结果可直接比较).
+    """
+    with open(golden_path(name), "rb") as f:
+        return [etree.tostring(slide, with_tail=False) for slide in etree.fromstring(f.read())]
+
+
+def update_golden(work_dir: str, cache: TemplateCache):
+    """
+    按 "pptx" 引擎的当前输出重写金样.
+    """
+    os.makedirs(GOLDEN_DIR, exist_ok=True)
+    for name, scenario in golden_scenarios(work_dir).items():
+        path = golden_path(name)
+        with open(path, "wb") as f:
+            f.write(golden_document(render(scenario, cache, "pptx")[0]))
+        print(f"已更新金样: {os.path.relpath(path)}")
+
+
+def suite_scenario(work_dir: str, name: str) -> dict:
+    paths = generate_scenario(work_dir, name, SCENARIOS[name])
+    return {"template": paths["template"], "mappings": paths["mappings"],
+            "workbook": paths["workbook"]}
+
+
+def render(scenario: dict, cache: TemplateCache, engine: str):
+    """
+    复制+填充, 返回 (各页 XML, fill_placeholders 耗时, 替换数).
+    """
+    prs = cache.get(scenario["template"])
+    index = cache.get_placeholder_index(scenario["template"])
+    if "data" in scenario:
+        all_data = scenario["data"]
+    else:
+        sheets, columns = collect_data_request(prs, scenario["mappings"], index)
+        all_data = ExcelDataProvider(scenario["workbook"]).read_data(sheets=sheets, columns=columns)
+    fill_plan = prepare_slides(prs, scenario["mappings"], all_data)
+    start = time.perf_counter()
+    replaced = fill_placeholders(prs, fill_plan, all_data, index, engine)
+    seconds = time.perf_counter() - start
+    slides_xml = [etree.tostring(slide._element) for slide in prs.slides]
+    return slides_xml, seconds, replaced
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="占位符填充引擎对比")
+    parser.add_argument("--scenario", action="append",
+                        choices=SUITE_SCENARIOS + ("text",), help="只跑指定场景")
+    parser.add_argument("--repeat", type=int, default=5, help="每个引擎重复次数, 取最小值")
+    parser.add_argument("--update-golden", action="store_true", help="按当前输出重写金样")
+    args = parser.parse_args(argv)
+    names = tuple(args.scenario) if args.scenario else SUITE_SCENARIOS + ("text",)
+
+    work_dir = tempfile.mkdtemp(prefix="ppt_bench_engines_")
+    try:
+        cache = TemplateCache()
+        if args.update_golden:
+            update_golden(work_dir, cache)
+        print(f"{'场景':<14} {'页数':>6} {'替换数':>8} {'pptx(ms)':>10} {'lxml(ms)':>10} {'加速':>6}")
+        for name in names:
+            scenario = text_scenario(work_dir) if name == "text" else suite_scenario(work_dir, name)
+            best = {}
+            for engine in ("pptx", "lxml"):
+                runs = [render(scenario, cache, engine) for _ in range(args.repeat)]
+                best[engine] = min(seconds for _, seconds, _ in runs)
+            slides_xml, _, replaced = runs[0]
+            speedup = best["pptx"] / best["lxml"] if best["lxml"] else float("inf")
+            print(f"{name:<14} {len(slides_xml):>6} {replaced:>8} {best['pptx'] * 1000:>10.1f} "
+                  f"{best['lxml'] * 1000:>10.1f} {speedup:>5.1f}x")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
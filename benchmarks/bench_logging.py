@@ -0,0 +1,241 @@
+# benchmarks/bench_logging.py
+"""
+队列日志(client_gui.utils.logger)vs 原 configure_logging(basicConfig 直接写一个文件).
+
+1. 正确性: 多个线程同时写日志, 轮转后各文件不超过上限, 停止后队列中的记录全部写出;
+   逐文件 logger 的 DEBUG 日志按 --sample 抽样, 其他日志不受影响; 模块级别生效;
+2. 真实运行: 同一批文件分别在原配置、队列配置、队列 + 抽样下经 run_processing 生成,
+   统计各线程在日志调用(Logger._log)中消耗的 CPU 时间;
+   原配置下另按原实现记录一次完整的 slide_mapping(--mapping-slides 张映射);
+3. 争用: 多个线程按每个文件 4 条 DEBUG + 1 条 INFO 的模式写日志, 比较每个文件的日志耗时.
+任何检查失败都以非零状态退出.
+
+用法(在仓库根目录):
+    python -m benchmarks.bench_logging
+    python -m benchmarks.bench_logging --files 500 --threads 16
+"""
+
+import argparse
+import glob
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+from benchmarks.fixtures import build_mappings, write_mappings, write_template, write_workbook
+from client_gui.controller.processing_controller import run_processing
+from client_gui.utils.logger import configure_logging, per_file_logger, stop_logging
+
+
+def legacy_configure_logging(log_file: str):
+    """
+    原 configure_logging: 根 logger 为 DEBUG, 直接写一个不轮转的文件.
+    """
+    logging.basicConfig(
+        filename=log_file,
+        level=logging.DEBUG,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+
+
+def reset_logging():
+    stop_logging()
+    root_logger = logging.getLogger()
+    for handler in list(root_logger.handlers):
+        root_logger.removeHandler(handler)
+        handler.close()
+
+
+class LogTimer:
+    """
+    统计所有线程在 Logger._log 中消耗的 CPU 时间(time.thread_time, 含格式化、处理器加锁和写文件;
+    不含等待 GIL/锁的时间, 单核机器上墙钟时间主要反映线程切换).
+    """
+
+    def __init__(self):
+        self.seconds = 0.0
+        self.calls = 0
+        self._lock = threading.Lock()
+        self._original = logging.Logger._log
+
+    def __enter__(self):
+        original = self._original
+        timer = self
+
+        def timed_log(logger, *args, **kwargs):
+            start = time.thread_time()
+            try:
+                return original(logger, *args, **kwargs)
+            finally:
+                elapsed = time.thread_time() - start
+                with timer._lock:
+                    timer.seconds += elapsed
+                    timer.calls += 1
+
+        logging.Logger._log = timed_log
+        return self
+
+    def __exit__(self, *exc):
+        logging.Logger._log = self._original
+
+
+def read_lines(log_file: str) -> list:
+    lines = []
+    for path in sorted(glob.glob(log_file + "*")):
+        with open(path, encoding="utf-8") as f:
+            lines.extend(f.read().splitlines())
+    return lines
+
+
+def check_pipeline(work_dir: str, sample: int, problems: list):
+    log_file = os.path.join(work_dir, "check.log")
+    max_bytes = 16 * 1024
+    configure_logging(log_file, max_bytes=max_bytes, backup_count=200, per_file_sample=sample,
+                      module_levels={"bench.quiet": logging.WARNING})
+    n_threads, per_thread = 8, 2000
+
+    def emit(t):
+        log = logging.getLogger("bench.main")
+        for i in range(per_thread):
+            log.info("线程%d 第%d条", t, i)
+
+    threads = [threading.Thread(target=emit, args=(t,)) for t in range(n_threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    files = per_file_logger("bench")
+    for i in range(1000):
+        files.debug("逐文件 %d", i)
+    files.info("逐文件 INFO")
+    logging.getLogger("bench.quiet").debug("不应出现")
+    logging.getLogger("bench.quiet").warning("应出现")
+    stop_logging()
+
+    lines = read_lines(log_file)
+    main_lines = [line for line in lines if "第" in line and "条" in line]
+    if len(main_lines) != n_threads * per_thread:
+        problems.append(f"[队列] 应写出 {n_threads * per_thread} 条, 实际 {len(main_lines)}")
+    # RotatingFileHandler 按字符数预估本条的长度, 中文按 UTF-8 写出后可能略超上限
+    oversized = [p for p in glob.glob(log_file + "*") if os.path.getsize(p) > max_bytes + 256]
+    if oversized:
+        problems.append(f"[轮转] 超过上限的文件: {oversized}")
+    sampled = sum("逐文件 " in line and "INFO" not in line for line in lines)
+    expected = (1000 + sample - 1) // sample
+    if sampled != expected:
+        problems.append(f"[抽样] 每 {sample} 条保留一条, 应有 {expected} 条, 实际 {sampled}")
+    if not any("逐文件 INFO" in line for line in lines):
+        problems.append("[抽样] 逐文件 logger 的 INFO 日志不应被抽样")
+    if any("不应出现" in line for line in lines) or not any("应出现" in line for line in lines):
+        problems.append("[模块级别] bench.quiet=WARNING 未生效")
+    print(f"队列: {len(lines)} 行, 轮转为 {len(glob.glob(log_file + '*'))} 个文件; "
+          f"逐文件 DEBUG 1000 条抽样后 {sampled} 条")
+    reset_logging()
+
+
+def measure_run(work_dir: str, n_files: int, mapping_slides: int, sample: int):
+    input_dir = os.path.join(work_dir, "in")
+    os.makedirs(input_dir)
+    sample_book = os.path.join(work_dir, "sample.xlsx")
+    write_workbook(sample_book, n_rows=5, n_cols=3, n_sheets=2)
+    for i in range(n_files):
+        shutil.copyfile(sample_book, os.path.join(input_dir, f"book{i:05d}.xlsx"))
+    template_path = os.path.join(work_dir, "template.pptx")
+    write_template(template_path, n_slides=4)
+    mappings = build_mappings(4, 2)
+    mappings_path = os.path.join(work_dir, "mappings.json")
+    write_mappings(mappings_path, mappings)
+    big_mapping = build_mappings(mapping_slides, 2)
+
+    configs = (
+        ("原配置(直接写文件)", lambda path: legacy_configure_logging(path)),
+        ("队列", lambda path: configure_logging(path)),
+        (f"队列 + 抽样 1/{sample}", lambda path: configure_logging(path, per_file_sample=sample)),
+    )
+    print(f"真实运行 {n_files} 个文件(2 个线程):")
+    print(f"{'配置':<22} {'日志调用':>8} {'日志耗时ms':>10} {'每文件us':>9} {'运行s':>7}")
+    for i, (name, configure) in enumerate(configs):
+        log_file = os.path.join(work_dir, f"run{i}.log")
+        configure(log_file)
+        with LogTimer() as timer:
+            start = time.perf_counter()
+            if i == 0:
+                # 原实现每次运行都把整个映射写进日志
+                logging.getLogger("client_gui.controller.processing_controller").debug(
+                    f"加载的slide_mapping内容: {big_mapping}")
+            run_processing(template_path, input_dir, os.path.join(work_dir, f"out{i}"),
+                           mappings_path, max_workers=2, incremental=False)
+            run_seconds = time.perf_counter() - start
+        reset_logging()
+        print(f"{name:<22} {timer.calls:>8} {timer.seconds * 1000:>10.1f} "
+              f"{timer.seconds / n_files * 1e6:>9.1f} {run_seconds:>7.2f}")
+
+
+def measure_contention(work_dir: str, n_threads: int, files_per_thread: int, sample: int):
+    def worker(t):
+        log = logging.getLogger("bench.worker")
+        files = per_file_logger("bench.worker")
+        for i in range(files_per_thread):
+            files.debug("开始处理: book%05d.xlsx", i)
+            files.debug("读取数据: %d 行", i)
+            files.debug("复制幻灯片: %d 页", 3)
+            files.debug("成功处理文件: book%05d.xlsx (%d/%d)", i, i, files_per_thread)
+            log.info("已处理: book%05d.xlsx -> book%05d.pptx", i, i)
+
+    configs = (
+        ("原配置(直接写文件)", legacy_configure_logging),
+        ("队列", lambda path: configure_logging(path)),
+        (f"队列 + 抽样 1/{sample}", lambda path: configure_logging(path, per_file_sample=sample)),
+    )
+    n_files = n_threads * files_per_thread
+    print(f"争用: {n_threads} 个线程 x {files_per_thread} 个文件, 每个文件 5 条日志:")
+    for i, (name, configure) in enumerate(configs):
+        configure(os.path.join(work_dir, f"contention{i}.log"))
+        threads = [threading.Thread(target=worker, args=(t,)) for t in range(n_threads)]
+        with LogTimer() as timer:
+            start = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            wall = time.perf_counter() - start
+        start = time.perf_counter()
+        reset_logging()
+        drain = time.perf_counter() - start
+        print(f"  {name:<22} 工作线程日志耗时 {timer.seconds / n_files * 1e6:>6.1f}us/文件, "
+              f"墙钟 {wall:.2f}s, 停止时写完剩余记录 {drain:.2f}s")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="队列日志 vs 原 configure_logging")
+    parser.add_argument("--files", type=int, default=200, help="真实运行的文件数")
+    parser.add_argument("--mapping-slides", type=int, default=2000, help="原配置下记录的映射张数")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--files-per-thread", type=int, default=2000)
+    parser.add_argument("--sample", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    work_dir = tempfile.mkdtemp(prefix="ppt_bench_logging_")
+    problems = []
+    try:
+        reset_logging()
+        check_pipeline(work_dir, args.sample, problems)
+        measure_run(work_dir, args.files, args.mapping_slides, args.sample)
+        measure_contention(work_dir, args.threads, args.files_per_thread, args.sample)
+    finally:
+        reset_logging()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    for problem in problems[:10]:
+        print(problem)
+    if problems:
+        return 1
+    print("检查通过")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
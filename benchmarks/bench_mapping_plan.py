@@ -0,0 +1,241 @@
+# benchmarks/bench_mapping_plan.py
+"""
+编译后的映射计划(business_logic.mapping_plan) vs 原 prepare_slides.
+
+1. 随机生成映射(row / copy / row_for_table_row / table_row_template + max_rows)和各sheet行数,
+   比较原实现与 MappingPlan.prepare 得到的 fill_plan 及复制调用(位置、份数)逐项一致;
+2. 在真实模板上复制并填充, 两种实现生成的幻灯片 XML 逐页一致;
+3. 不合法的映射(未知 type、copy 非布尔、max_rows 不合法、缺 sheet、超出模板页数等)
+   被 compile_mappings / check_template 逐条报告;
+4. 计时: 映射数从几百到几千时, 只比较布局/偏移计算(复制换成空操作),
+   原实现每次复制后逐个调整后面映射的偏移(O(k²)), 计划用前缀和(O(k)).
+任何检查失败都以非零状态退出.
+
+用法(在仓库根目录):
+    python -m benchmarks.bench_mapping_plan
+    python -m benchmarks.bench_mapping_plan --trials 2000 --sizes 500 2000 8000
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+from lxml import etree
+
+import business_logic.mapping_plan as mapping_plan
+from benchmarks.fixtures import write_template
+from business_logic.mapping_plan import (
+    MAPPING_TYPES, ROW, ROW_FOR_TABLE_ROW, TABLE_ROW_TEMPLATE, MappingError, compile_mappings
+)
+from business_logic.processor import fill_placeholders
+from ppt_engine.deck_manager import copy_slide_after
+from ppt_engine.template_cache import TemplateCache
+
+
+def legacy_prepare_slides(prs, slide_mappings, all_data, copy=copy_slide_after):
+    """
+    原 processor.prepare_slides(含原 _split_table_pages), 复制函数可替换.
+    """
+    def split_table_pages(n_rows, max_rows):
+        if max_rows is None or n_rows <= max_rows:
+            return [(0, n_rows)]
+        return [(start, min(start + max_rows, n_rows)) for start in range(0, n_rows, max_rows)]
+
+    fill_plan = []
+    sorted_keys = sorted(slide_mappings.keys())
+    offset_map = {k: k for k in sorted_keys}
+    for k in sorted_keys:
+        cfg = slide_mappings[k]
+        sheet_name = cfg.get("sheet")
+        data_type = cfg.get("type")
+        do_copy = cfg.get("copy", False)
+        n_rows = len(all_data.get(sheet_name, []))
+        real_idx = offset_map[k]
+        if data_type == TABLE_ROW_TEMPLATE:
+            pages = split_table_pages(n_rows, cfg.get("max_rows"))
+            copies_needed = len(pages) - 1
+            if copies_needed:
+                copy(prs, base_index=real_idx, count=copies_needed)
+                for other_k in sorted_keys:
+                    if other_k > k:
+                        offset_map[other_k] += copies_needed
+            for i, (row_start, row_end) in enumerate(pages):
+                fill_plan.append({"slide_index": real_idx + i, "template_slide": k,
+                                  "sheet_name": sheet_name, "type": data_type,
+                                  "row_data_index": row_start, "row_end": row_end,
+                                  "copy_mode": copies_needed > 0})
+        elif not do_copy or n_rows <= 1:
+            fill_plan.append({"slide_index": real_idx, "template_slide": k,
+                              "sheet_name": sheet_name, "type": data_type,
+                              "row_data_index": 0, "copy_mode": False})
+        else:
+            copies_needed = n_rows - 1
+            copy(prs, base_index=real_idx, count=copies_needed)
+            for other_k in sorted_keys:
+                if other_k >= k and other_k != k:
+                    offset_map[other_k] += copies_needed
+            for i in range(n_rows):
+                fill_plan.append({"slide_index": real_idx + i, "template_slide": k,
+                                  "sheet_name": sheet_name, "type": data_type,
+                                  "row_data_index": i, "copy_mode": True})
+    return fill_plan
+
+
+def random_mappings(rng: random.Random, n_slides: int, n_sheets: int, density: float = 0.7) -> dict:
+    mappings = {}
+    for idx in range(1, n_slides + 1):
+        if rng.random() > density:
+            continue
+        cfg = {"sheet": f"Sheet{rng.randint(1, n_sheets)}", "type": rng.choice(MAPPING_TYPES)}
+        if cfg["type"] == ROW and rng.random() < 0.5:
+            cfg["copy"] = True
+        if cfg["type"] == TABLE_ROW_TEMPLATE and rng.random() < 0.6:
+            cfg["max_rows"] = rng.randint(1, 6)
+        mappings[idx] = cfg
+    return mappings
+
+
+def random_data(rng: random.Random, n_sheets: int) -> dict:
+    return {f"Sheet{s}": [{"[A]": f"s{s}r{r}"} for r in range(rng.choice((0, 1, 2, 3, 7, 13)))]
+            for s in range(1, n_sheets + 1)}
+
+
+class CopyRecorder:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, prs, base_index, count=1):
+        self.calls.append((base_index, count))
+
+
+def check_plans(trials: int, problems: list):
+    rng = random.Random(7)
+    original = mapping_plan.copy_slide_after
+    try:
+        for trial in range(trials):
+            mappings = random_mappings(rng, rng.randint(1, 30), 3)
+            data = random_data(rng, 3)
+            legacy_copies = CopyRecorder()
+            expected = legacy_prepare_slides(None, mappings, data, legacy_copies)
+            mapping_plan.copy_slide_after = plan_copies = CopyRecorder()
+            got = compile_mappings(mappings).prepare(None, data)
+            if got != expected or plan_copies.calls != legacy_copies.calls:
+                problems.append(f"[fill_plan] 第{trial}组不一致: {mappings}")
+    finally:
+        mapping_plan.copy_slide_after = original
+    print(f"fill_plan: {trials} 组随机映射与原实现一致" if not problems else "fill_plan: 有不一致")
+
+
+def slide_xml(prs) -> list:
+    return [etree.tostring(slide._element) for slide in prs.slides]
+
+
+def check_decks(work_dir: str, problems: list):
+    template_path = os.path.join(work_dir, "template.pptx")
+    write_template(template_path, n_slides=12)
+    cache = TemplateCache()
+    index = cache.get_placeholder_index(template_path)
+    rng = random.Random(11)
+    for trial in range(20):
+        mappings = random_mappings(rng, 12, 3)
+        data = random_data(rng, 3)
+        for engine in ("pptx", "lxml"):
+            legacy = cache.get(template_path)
+            fill_placeholders(legacy, legacy_prepare_slides(legacy, mappings, data), data, index, engine)
+            plan = compile_mappings(mappings)
+            plan.check_template(template_path, cache.get(template_path))
+            compiled = cache.get(template_path)
+            fill_placeholders(compiled, plan.prepare(compiled, data), data, index, engine)
+            if slide_xml(legacy) != slide_xml(compiled):
+                problems.append(f"[幻灯片] 第{trial}组({engine})生成结果不一致: {mappings}")
+    print("幻灯片: 20 组映射 x 两种引擎, 复制并填充后逐页一致")
+
+
+def check_validation(work_dir: str, problems: list):
+    bad = {
+        "x": {"sheet": "Sheet1"},
+        "0": {"sheet": "Sheet1"},
+        "1": {"type": "row"},
+        "2": {"sheet": "Sheet1", "type": "single"},
+        "3": {"sheet": "Sheet1", "copy": "yes"},
+        "4": {"sheet": "Sheet1", "type": ROW_FOR_TABLE_ROW, "copy": True},
+        "5": {"sheet": "Sheet1", "type": TABLE_ROW_TEMPLATE, "max_rows": 0},
+        "6": {"sheet": "Sheet1", "max_rows": 5},
+        "7": ["Sheet1"],
+        "8": {"sheet": "Sheet1", "type": TABLE_ROW_TEMPLATE, "max_rows": 20, "copy": False},
+    }
+    try:
+        compile_mappings(bad, "bad.json")
+        problems.append("[校验] 不合法的映射未报错")
+    except MappingError as e:
+        if len(e.problems) != 9:
+            problems.append(f"[校验] 应报告 9 个问题, 实际 {len(e.problems)}: {e.problems}")
+        print(f"校验: 报告 {len(e.problems)} 个问题, 例如 {e.problems[3]}")
+
+    template_path = os.path.join(work_dir, "small.pptx")
+    write_template(template_path, n_slides=3)
+    plan = compile_mappings({1: {"sheet": "Sheet1"}, 5: {"sheet": "Sheet1"}})
+    cache = TemplateCache()
+    try:
+        plan.check_template(template_path, cache.get(template_path))
+        problems.append("[校验] 超出模板页数未报错")
+    except MappingError as e:
+        print(f"校验模板: {e.problems}")
+
+
+def time_layout(sizes: list):
+    """
+    只比较布局/偏移计算: 复制换成空操作, 每个映射都是 copy=True 的两行数据.
+    """
+    original = mapping_plan.copy_slide_after
+    mapping_plan.copy_slide_after = lambda prs, base_index, count=1: None
+    try:
+        print(f"{'映射数':>8} {'原实现ms':>10} {'编译ms':>8} {'计划ms':>8} {'加速':>7}")
+        for k in sizes:
+            mappings = {i: {"sheet": "Sheet1", "type": ROW, "copy": True} for i in range(1, k + 1)}
+            data = {"Sheet1": [{"[A]": 1}, {"[A]": 2}]}
+            start = time.perf_counter()
+            legacy_prepare_slides(None, mappings, data, lambda prs, base_index, count=1: None)
+            legacy_ms = (time.perf_counter() - start) * 1000
+            start = time.perf_counter()
+            plan = compile_mappings(mappings)
+            compile_ms = (time.perf_counter() - start) * 1000
+            start = time.perf_counter()
+            plan.prepare(None, data)
+            plan_ms = (time.perf_counter() - start) * 1000
+            print(f"{k:>8} {legacy_ms:>10.1f} {compile_ms:>8.1f} {plan_ms:>8.1f} "
+                  f"{legacy_ms / max(plan_ms, 1e-6):>6.1f}x")
+    finally:
+        mapping_plan.copy_slide_after = original
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="编译后的映射计划 vs 原 prepare_slides")
+    parser.add_argument("--trials", type=int, default=500)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[200, 1000, 4000])
+    args = parser.parse_args(argv)
+
+    work_dir = tempfile.mkdtemp(prefix="ppt_bench_mapping_plan_")
+    problems = []
+    try:
+        check_plans(args.trials, problems)
+        check_decks(work_dir, problems)
+        check_validation(work_dir, problems)
+        time_layout(args.sizes)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    for problem in problems[:10]:
+        print(problem)
+    if problems:
+        return 1
+    print("检查通过")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
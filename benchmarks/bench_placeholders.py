@@ -0,0 +1,91 @@
+# benchmarks/bench_placeholders.py
+"""
+占位符替换微基准(文字密集的100页模板):
+- legacy: 原实现, 逐页逐形状逐 run 执行 findall + 多次 str.replace;
+- indexed: 模板占位符索引 + 每个 run 一次 re.sub, 无占位符的页整页跳过.
+
+用法(在仓库根目录):
+    python -m benchmarks.bench_placeholders
+    python -m benchmarks.bench_placeholders --slides 200 --repeat 10
+"""
+
+import argparse
+import copy
+import time
+
+from benchmarks.fixtures import build_text_template, column_key
+from ppt_engine.placeholders import BRACKET_PATTERN, build_placeholder_index
+from ppt_engine.slide_handler import fill_table_with_single_dict
+
+
+def legacy_replace_placeholders(tf, row_data: dict):
+    for paragraph in tf.paragraphs:
+        for run in paragraph.runs:
+            old_run_text = run.text
+            if not old_run_text:
+                continue
+            matches = BRACKET_PATTERN.findall(old_run_text)
+            if not matches:
+                continue
+            new_run_text = old_run_text
+            for ph in matches:
+                new_run_text = new_run_text.replace(ph, str(row_data.get(ph, "未知")))
+            if new_run_text != old_run_text:
+                run.text = new_run_text
+
+
+def legacy_fill(prs, row_data: dict):
+    for slide in prs.slides:
+        for shape in slide.shapes:
+            if shape.has_table:
+                table = shape.table
+                for r in range(len(table.rows)):
+                    for c in range(len(table.columns)):
+                        legacy_replace_placeholders(table.cell(r, c).text_frame, row_data)
+            elif shape.has_text_frame:
+                legacy_replace_placeholders(shape.text_frame, row_data)
+
+
+def indexed_fill(prs, row_data: dict, index):
+    for slide_no, slide in enumerate(prs.slides, start=1):
+        slide_entry = index.for_slide(slide_no)
+        if slide_entry is None:
+            continue
+        fill_table_with_single_dict(slide, row_data, slide_entry)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="占位符替换微基准")
+    parser.add_argument("--slides", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    master = build_text_template(n_slides=args.slides)
+    row_data = {column_key(c): f"值{c}" for c in range(5)}
+
+    start = time.perf_counter()
+    index = build_placeholder_index(copy.deepcopy(master))
+    index_time = time.perf_counter() - start
+
+    legacy_times = []
+    indexed_times = []
+    for _ in range(args.repeat):
+        prs = copy.deepcopy(master)
+        start = time.perf_counter()
+        legacy_fill(prs, row_data)
+        legacy_times.append(time.perf_counter() - start)
+
+        prs = copy.deepcopy(master)
+        start = time.perf_counter()
+        indexed_fill(prs, row_data, index)
+        indexed_times.append(time.perf_counter() - start)
+
+    legacy_best = min(legacy_times)
+    indexed_best = min(indexed_times)
+    print(f"幻灯片数={args.slides} 索引构建(一次)={index_time * 1000:.1f} ms")
+    print(f"legacy : {legacy_best * 1000:8.1f} ms/份")
+    print(f"indexed: {indexed_best * 1000:8.1f} ms/份  (加速 {legacy_best / indexed_best:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
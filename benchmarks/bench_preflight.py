@@ -0,0 +1,227 @@
+# benchmarks/bench_preflight.py
+"""
+生成前的批量预检(run_processing(preflight=True), 见 business_logic.preflight).
+
+1. 一批输入: 正常的 .xlsx / .sqlite, 以及缺少sheet、列数不足、没有数据行、无法读取、
+   没有 dimension 的工作簿和只有一个sheet的 .csv; 检查每个文件报告的错误/警告与预期一致,
+   且预检不创建输出目录、不写任何文件;
+2. 再正常生成, 每个生成的PPT的实际页数与预检给出的 expected_slides 一致;
+3. 映射超出模板页数、模板含非列引用的占位符时, 预检在报告中列出(不中止), 所有文件都标为有问题;
+4. 计时: --files 个工作簿的预检耗时(文件/秒), 与同一批文件实际生成的耗时对比.
+任何检查失败都以非零状态退出.
+
+用法(在仓库根目录):
+    python -m benchmarks.bench_preflight
+    python -m benchmarks.bench_preflight --files 2000 --rows 500
+"""
+
+import argparse
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+import zipfile
+
+from pptx import Presentation
+
+from benchmarks.bench_providers import export_csv, export_sqlite
+from benchmarks.fixtures import build_mappings, write_mappings, write_template, write_workbook
+from business_logic.mapping_plan import TABLE_ROW_TEMPLATE
+from client_gui.controller.processing_controller import run_processing
+
+#: 文件名 -> (预期错误中应出现的片段, 预期警告中应出现的片段); None 表示不应有错误/警告
+EXPECTED = {
+    "good.xlsx": (None, None),
+    "good_big.xlsx": (None, None),
+    "good.sqlite": (None, None),
+    "nodim.xlsx": (None, None),
+    "empty.xlsx": (None, "没有数据行"),
+    "missing_sheet.xlsx": ("缺少sheet 'Sheet2'", None),
+    "narrow.xlsx": ("占位符 [C], [D]", None),
+    "corrupt.xlsx": ("无法读取", None),
+    "one_sheet.csv": ("缺少sheet 'Sheet2'", None),
+}
+
+N_SLIDES = 6
+
+
+def strip_dimension(src: str, dst: str):
+    """
+    复制工作簿并删去各工作表的 <dimension>, 模拟不写 dimension 的导出工具.
+    """
+    with zipfile.ZipFile(src) as zin, zipfile.ZipFile(dst, "w", zipfile.ZIP_DEFLATED) as zout:
+        for item in zin.infolist():
+            data = zin.read(item.filename)
+            if item.filename.startswith("xl/worksheets/"):
+                data = re.sub(rb"<dimension [^>]*/>", b"", data)
+            zout.writestr(item, data)
+
+
+def build_inputs(input_dir: str):
+    os.makedirs(input_dir)
+    write_workbook(os.path.join(input_dir, "good.xlsx"), n_rows=7, n_cols=6, n_sheets=2, seed=1)
+    write_workbook(os.path.join(input_dir, "good_big.xlsx"), n_rows=40, n_cols=6, n_sheets=3, seed=2)
+    export_sqlite(os.path.join(input_dir, "good.xlsx"), os.path.join(input_dir, "good.sqlite"))
+    strip_dimension(os.path.join(input_dir, "good_big.xlsx"), os.path.join(input_dir, "nodim.xlsx"))
+    write_workbook(os.path.join(input_dir, "empty.xlsx"), n_rows=0, n_cols=6, n_sheets=2)
+    write_workbook(os.path.join(input_dir, "missing_sheet.xlsx"), n_rows=5, n_cols=6, n_sheets=1)
+    write_workbook(os.path.join(input_dir, "narrow.xlsx"), n_rows=5, n_cols=2, n_sheets=2)
+    with open(os.path.join(input_dir, "corrupt.xlsx"), "wb") as f:
+        f.write(b"not a zip file" * 100)
+    export_csv(os.path.join(input_dir, "good.xlsx"), os.path.join(input_dir, "one_sheet.csv"))
+
+
+def build_config(work_dir: str) -> tuple:
+    template_path = os.path.join(work_dir, "template.pptx")
+    write_template(template_path, n_slides=N_SLIDES, table_rows=4, table_cols=4)
+    mappings = build_mappings(N_SLIDES - 1, 2)
+    mappings[N_SLIDES] = {"sheet": "Sheet2", "type": TABLE_ROW_TEMPLATE, "max_rows": 3}
+    mappings_path = os.path.join(work_dir, "mappings.json")
+    write_mappings(mappings_path, mappings)
+    return template_path, mappings, mappings_path
+
+
+def check_batch(work_dir: str, problems: list):
+    input_dir = os.path.join(work_dir, "in")
+    output_dir = os.path.join(work_dir, "out")
+    build_inputs(input_dir)
+    template_path, _, mappings_path = build_config(work_dir)
+
+    report = run_processing(template_path, input_dir, output_dir, mappings_path,
+                            max_workers=4, incremental=False, preflight=True)
+    if report is None:
+        problems.append("[预检] run_processing(preflight=True) 返回 None")
+        return
+    if os.path.exists(output_dir):
+        problems.append("[预检] 预检创建了输出目录")
+    results = {r.file: r for r in report.files}
+    if set(results) != set(EXPECTED):
+        problems.append(f"[预检] 报告的文件 {sorted(results)} 与输入不符")
+        return
+    for name, (error, warning) in EXPECTED.items():
+        result = results[name]
+        for kind, expected, got in (("错误", error, result.errors), ("警告", warning, result.warnings)):
+            if expected is None and got:
+                problems.append(f"[预检] {name} 不应有{kind}: {got}")
+            elif expected is not None and not any(expected in item for item in got):
+                problems.append(f"[预检] {name} 应报告含 {expected!r} 的{kind}, 实际 {got}")
+    print(report.format_summary())
+
+    # 正常生成(有问题的文件照常生成或失败), 比较实际页数
+    stats = run_processing(template_path, input_dir, output_dir, mappings_path,
+                           max_workers=2, incremental=False)
+    if stats is None:
+        problems.append("[生成] run_processing 返回 None")
+        return
+    compared = 0
+    for name, result in results.items():
+        if not result.ok:
+            continue
+        deck_path = os.path.join(output_dir, os.path.splitext(name)[0] + ".pptx")
+        actual = len(Presentation(deck_path).slides)
+        compared += 1
+        if actual != result.expected_slides:
+            problems.append(f"[页数] {name}: 预检 {result.expected_slides} 页, 实际 {actual} 页")
+    print(f"页数: {compared} 个生成的PPT与预检的 expected_slides 一致" if not problems
+          else "页数: 有不一致")
+
+
+def check_template_problems(work_dir: str, problems: list):
+    input_dir = os.path.join(work_dir, "in")
+    template_path, mappings, _ = build_config(work_dir)
+    prs = Presentation(template_path)
+    prs.slides[0].shapes[0].text_frame.text = "[名称]"
+    named_template = os.path.join(work_dir, "named.pptx")
+    prs.save(named_template)
+    mappings = dict(mappings)
+    mappings[N_SLIDES + 3] = {"sheet": "Sheet1", "type": "row"}
+    mappings_path = os.path.join(work_dir, "too_many.json")
+    write_mappings(mappings_path, mappings)
+    output_dir = os.path.join(work_dir, "out_bad")
+
+    report = run_processing(named_template, input_dir, output_dir, mappings_path,
+                            max_workers=2, preflight=True)
+    if report is None:
+        problems.append("[模板] 映射超出模板页数时预检中止了")
+        return
+    template_problems = report.template_problems.get(named_template, [])
+    if not any("超出模板页数" in p for p in template_problems):
+        problems.append(f"[模板] 未报告超出模板页数: {template_problems}")
+    warnings = report.templates[named_template].warnings
+    if not any("[名称]" in w for w in warnings):
+        problems.append(f"[模板] 未报告非列引用的占位符: {warnings}")
+    if report.ok or len(report.problem_files) != len(report.files):
+        problems.append("[模板] 模板有问题时所有文件都应标为有问题")
+    if run_processing(named_template, input_dir, output_dir, mappings_path, max_workers=2) is not None:
+        problems.append("[模板] 正常生成时映射超出模板页数应中止")
+    if os.path.exists(output_dir):
+        problems.append("[模板] 预检或中止的生成创建了输出目录")
+    print(f"模板: {template_problems + warnings}")
+
+
+def time_preflight(work_dir: str, n_files: int, n_rows: int, workers: int):
+    input_dir = os.path.join(work_dir, "many")
+    os.makedirs(input_dir)
+    samples = []
+    for i in range(4):
+        path = os.path.join(work_dir, f"sample{i}.xlsx")
+        write_workbook(path, n_rows=n_rows * (i + 1) // 2, n_cols=6, n_sheets=3, seed=i)
+        samples.append(path)
+    for i in range(n_files):
+        shutil.copyfile(samples[i % len(samples)], os.path.join(input_dir, f"book{i:05d}.xlsx"))
+    template_path, _, mappings_path = build_config(work_dir)
+    output_dir = os.path.join(work_dir, "many_out")
+
+    start = time.perf_counter()
+    report = run_processing(template_path, input_dir, output_dir, mappings_path,
+                            max_workers=workers, preflight=True)
+    preflight_seconds = time.perf_counter() - start
+    print(f"预检 {n_files} 个文件: {preflight_seconds:.2f}s ({n_files / preflight_seconds:.0f} 文件/秒), "
+          f"预计 {report.expected_slides} 页, 估计生成 {report.estimated_seconds:.1f}s")
+
+    # 实际生成一部分文件, 与估计对比
+    subset_dir = os.path.join(work_dir, "subset")
+    os.makedirs(subset_dir)
+    n_subset = min(n_files, 40)
+    for i in range(n_subset):
+        shutil.copyfile(samples[i % len(samples)], os.path.join(subset_dir, f"book{i:05d}.xlsx"))
+    subset_out = os.path.join(work_dir, "subset_out")
+    start = time.perf_counter()
+    run_processing(template_path, subset_dir, subset_out, mappings_path,
+                   max_workers=workers, incremental=False)
+    render_seconds = (time.perf_counter() - start) * n_files / n_subset
+    print(f"实际生成(按 {n_subset} 个文件外推): {render_seconds:.1f}s, "
+          f"预检耗时为生成的 {preflight_seconds / render_seconds:.1%}")
+    calibrated = run_processing(template_path, input_dir, subset_out, mappings_path,
+                                max_workers=workers, preflight=True)
+    print(f"用上次运行的指标校准后估计: {calibrated.estimated_seconds:.1f}s ({calibrated.cost_model!r})")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="生成前的批量预检")
+    parser.add_argument("--files", type=int, default=1000, help="计时用的工作簿数")
+    parser.add_argument("--rows", type=int, default=200, help="计时用工作簿每个sheet的平均行数")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    work_dir = tempfile.mkdtemp(prefix="ppt_bench_preflight_")
+    problems = []
+    try:
+        check_batch(work_dir, problems)
+        check_template_problems(work_dir, problems)
+        time_preflight(work_dir, args.files, args.rows, args.workers or os.cpu_count() or 1)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    for problem in problems[:10]:
+        print(problem)
+    if problems:
+        return 1
+    print("检查通过")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,187 @@
+# benchmarks/bench_providers.py
+"""
+CSV / SQLite 数据提供者 vs Excel: 读取结果一致性与耗时.
+
+1. 生成工作簿(fixtures.write_workbook), 再导出为同样内容的 CSV(Sheet1)和 SQLite(每个sheet一张表):
+   小数写最短可还原的文本, 百分比列写成 "42.0571...%", 日期写 ISO 文本;
+2. 三种提供者的 read_data(含只读部分sheet/列)与 ExcelDataProvider 的结果逐行比较;
+3. 计时三者的 read_data, 并报告 SQLite 连接池的复用次数;
+4. 用 run_processing 分别处理 .xlsx / .csv / .sqlite 输入, 检查生成的PPT逐部件一致.
+任何检查失败都以非零状态退出.
+
+用法(在仓库根目录):
+    python -m benchmarks.bench_providers
+    python -m benchmarks.bench_providers --rows 50000
+"""
+
+import argparse
+import csv
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from openpyxl import load_workbook
+
+from benchmarks.bench_spool import read_members
+from benchmarks.fixtures import build_mappings, write_mappings, write_template, write_workbook
+from client_gui.controller.processing_controller import run_processing
+from data_access.csv_reader import CsvDataProvider
+from data_access.excel_reader import ExcelDataProvider
+from data_access.sqlite_reader import SqliteDataProvider, get_sqlite_pool, quote_identifier
+
+
+def export_value(value, number_format: str):
+    """
+    单元格值 -> 上游系统导出的文本.
+    """
+    if value is None:
+        return ""
+    if isinstance(value, float):
+        return f"{value * 100!r}%" if '%' in number_format else repr(value)
+    if isinstance(value, datetime):
+        return value.isoformat(sep=" ")
+    return str(value)
+
+
+def sheet_rows(ws):
+    for row in ws.iter_rows():
+        yield [export_value(cell.value, cell.number_format) for cell in row]
+
+
+def export_csv(xlsx_path: str, csv_path: str, sheet_name: str = "Sheet1"):
+    wb = load_workbook(xlsx_path, read_only=True)
+    try:
+        with open(csv_path, "w", newline="", encoding="utf-8-sig") as f:
+            csv.writer(f).writerows(sheet_rows(wb[sheet_name]))
+    finally:
+        wb.close()
+
+
+def export_sqlite(xlsx_path: str, db_path: str):
+    """
+    每个sheet一张表; 小数列存 REAL, 百分比和日期存文本, 其余保持原类型.
+    """
+    wb = load_workbook(xlsx_path, read_only=True)
+    conn = sqlite3.connect(db_path)
+    try:
+        for ws in wb.worksheets:
+            rows = ws.iter_rows()
+            header = [cell.value for cell in next(rows)]
+            columns = ", ".join(quote_identifier(str(name)) for name in header)
+            conn.execute(f"CREATE TABLE {quote_identifier(ws.title)} ({columns})")
+            placeholders = ", ".join("?" for _ in header)
+            data = []
+            for row in rows:
+                values = []
+                for cell in row:
+                    value = cell.value
+                    if (isinstance(value, float) and '%' in cell.number_format) \
+                            or isinstance(value, datetime):
+                        value = export_value(value, cell.number_format)
+                    values.append(value)
+                data.append(values)
+            conn.executemany(f"INSERT INTO {quote_identifier(ws.title)} VALUES ({placeholders})", data)
+        conn.commit()
+    finally:
+        conn.close()
+        wb.close()
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def compare(label: str, expected: dict, got: dict, problems: list):
+    if set(expected) != set(got):
+        problems.append(f"[{label}] sheet 不一致: {sorted(got)} != {sorted(expected)}")
+        return
+    for name in expected:
+        rows_expected = expected[name].to_rows()
+        rows_got = got[name].to_rows()
+        if rows_expected != rows_got or [list(r) for r in rows_expected] != [list(r) for r in rows_got]:
+            bad = next((i for i, (a, b) in enumerate(zip(rows_expected, rows_got)) if a != b), None)
+            detail = f"第{bad}行 {rows_got[bad]} != {rows_expected[bad]}" if bad is not None \
+                else f"行数 {len(rows_got)} != {len(rows_expected)}"
+            problems.append(f"[{label}] {name} 不一致: {detail}")
+
+
+def check_run(work_dir: str, xlsx_path: str, csv_path: str, db_path: str, problems: list):
+    template_path = os.path.join(work_dir, "template.pptx")
+    mappings_path = os.path.join(work_dir, "slide_mappings.json")
+    write_template(template_path, n_slides=6)
+    write_mappings(mappings_path, build_mappings(6, 1))
+    outputs = {}
+    for path in (xlsx_path, csv_path, db_path):
+        ext = os.path.splitext(path)[1]
+        input_dir = os.path.join(work_dir, "in" + ext)
+        output_dir = os.path.join(work_dir, "out" + ext)
+        os.makedirs(input_dir)
+        shutil.copyfile(path, os.path.join(input_dir, "book" + ext))
+        stats = run_processing(template_path, input_dir, output_dir, mappings_path,
+                               max_workers=1, incremental=False)
+        if stats is None or stats.processed != 1:
+            problems.append(f"[run_processing {ext}] 未成功生成")
+            continue
+        outputs[ext] = read_members(os.path.join(output_dir, "book.pptx"))
+    for ext in (".csv", ".sqlite"):
+        if ext in outputs and outputs[ext] != outputs.get(".xlsx"):
+            problems.append(f"[run_processing {ext}] 生成的PPT与 .xlsx 输入不一致")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="CSV / SQLite 数据提供者一致性与耗时")
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--sheets", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    work_dir = tempfile.mkdtemp(prefix="ppt_bench_providers_")
+    problems = []
+    try:
+        xlsx_path = os.path.join(work_dir, "book.xlsx")
+        csv_path = os.path.join(work_dir, "book.csv")
+        db_path = os.path.join(work_dir, "book.sqlite")
+        write_workbook(xlsx_path, n_rows=args.rows, n_cols=8, n_sheets=args.sheets)
+        export_csv(xlsx_path, csv_path)
+        export_sqlite(xlsx_path, db_path)
+
+        excel, excel_seconds = timed(lambda: ExcelDataProvider(xlsx_path).read_data())
+        from_csv, csv_seconds = timed(lambda: CsvDataProvider(csv_path).read_data())
+        from_db, db_seconds = timed(lambda: SqliteDataProvider(db_path).read_data())
+        compare("csv", {"Sheet1": excel["Sheet1"]}, from_csv, problems)
+        compare("sqlite", excel, from_db, problems)
+
+        # 只读部分sheet和列
+        sheets = {"Sheet1"}
+        columns = {"Sheet1": {"[A]", "[C]", "[H]"}}
+        subset = ExcelDataProvider(xlsx_path).read_data(sheets, columns)
+        compare("csv 部分列", subset, CsvDataProvider(csv_path).read_data(sheets, columns), problems)
+        compare("sqlite 部分列", subset, SqliteDataProvider(db_path).read_data(sheets, columns), problems)
+
+        pool = get_sqlite_pool()
+        print(f"读取 {args.sheets} 个sheet x {args.rows} 行 x 8 列:")
+        print(f"  xlsx   {excel_seconds * 1000:8.0f}ms")
+        print(f"  csv    {csv_seconds * 1000:8.0f}ms (仅 Sheet1)")
+        print(f"  sqlite {db_seconds * 1000:8.0f}ms")
+        print(f"SQLite 连接池: 新建 {pool.opened} 次, 复用 {pool.reused} 次")
+
+        check_run(work_dir, xlsx_path, csv_path, db_path, problems)
+    finally:
+        get_sqlite_pool().close_all()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    for problem in problems[:10]:
+        print(problem)
+    if problems:
+        return 1
+    print("检查通过")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
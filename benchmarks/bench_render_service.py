@@ -0,0 +1,181 @@
+# benchmarks/bench_render_service.py
+"""
+常驻生成服务(render_server) vs 每次启动命令行(cli_main) 的单份PPT延迟.
+
+1. 冷启动: 每份PPT启动一次 cli_main 子进程(导入依赖、解析模板和映射);
+2. 常驻: 启动 render_server 子进程(Unix socket), 依次发送按路径和按内容上传的请求;
+3. 检查常驻服务的输出与 cli_main 的输出逐部件一致;
+4. 以 -w 1 --max-queue 1 另起一个服务, 并发发送请求, 检查超出排队上限的请求得到 503;
+最后打印服务 /stats 中的耗时直方图分位数. 任何检查失败都以非零状态退出.
+
+用法(在仓库根目录):
+    python -m benchmarks.bench_render_service
+    python -m benchmarks.bench_render_service --requests 20 --rows 200
+"""
+
+import argparse
+import http.client
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from benchmarks.bench_executor import prepare_inputs
+from benchmarks.bench_spool import read_members
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, socket_path: str, timeout: float = 60):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+def request(socket_path: str, method: str, path: str, body: bytes = None, headers: dict = None):
+    conn = UnixHTTPConnection(socket_path)
+    try:
+        conn.request(method, path, body=body, headers=headers or {})
+        response = conn.getresponse()
+        return response.status, response.read()
+    finally:
+        conn.close()
+
+
+def start_server(socket_path: str, template_path: str, mappings_path: str, *extra) -> subprocess.Popen:
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "client_gui.render_server", "--unix-socket", socket_path,
+         "--template", f"default={template_path}", "--mappings", f"default={mappings_path}",
+         "--log-level", "WARNING", *extra],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    deadline = time.perf_counter() + 60
+    while time.perf_counter() < deadline:
+        if os.path.exists(socket_path):
+            try:
+                if request(socket_path, "GET", "/health")[0] == 200:
+                    return proc
+            except OSError:
+                pass
+        time.sleep(0.05)
+    proc.kill()
+    raise RuntimeError("生成服务未能启动")
+
+
+def stop_server(proc: subprocess.Popen):
+    proc.terminate()
+    proc.wait(timeout=30)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="常驻生成服务 vs 命令行冷启动")
+    parser.add_argument("--requests", type=int, default=10)
+    parser.add_argument("--rows", type=int, default=50)
+    parser.add_argument("--slides", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    work_dir = tempfile.mkdtemp(prefix="ppt_bench_render_")
+    problems = []
+    try:
+        template_path, input_dir, mappings_path = prepare_inputs(
+            work_dir, 1, args.rows, n_slides=args.slides, n_sheets=3)
+        workbook = os.path.join(input_dir, "book0000.xlsx")
+        with open(workbook, "rb") as f:
+            workbook_bytes = f.read()
+
+        # 1. 冷启动
+        cold = []
+        for i in range(args.requests):
+            cold_out = os.path.join(work_dir, "cold")
+            start = time.perf_counter()
+            subprocess.run([sys.executable, "-m", "client_gui.cli_main", "-t", template_path,
+                            "-i", input_dir, "-o", cold_out, "-m", mappings_path,
+                            "--no-incremental", "--quiet"],
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+            cold.append(time.perf_counter() - start)
+        golden = read_members(os.path.join(work_dir, "cold", "book0000.pptx"))
+
+        # 2. 常驻服务
+        socket_path = os.path.join(work_dir, "render.sock")
+        server = start_server(socket_path, template_path, mappings_path)
+        warm_path, warm_bytes = [], []
+        try:
+            for i in range(args.requests):
+                output_path = os.path.join(work_dir, "warm", f"out{i}.pptx")
+                payload = json.dumps({"workbook_path": workbook, "output_path": output_path}).encode()
+                start = time.perf_counter()
+                status, body = request(socket_path, "POST", "/render", payload,
+                                       {"Content-Type": "application/json"})
+                warm_path.append(time.perf_counter() - start)
+                if status != 200:
+                    problems.append(f"按路径请求失败: {status} {body[:200]!r}")
+                elif read_members(output_path) != golden:
+                    problems.append(f"按路径请求的输出与命令行不一致: out{i}.pptx")
+
+                start = time.perf_counter()
+                status, body = request(socket_path, "POST", "/render", workbook_bytes,
+                                       {"Content-Type": "application/octet-stream"})
+                warm_bytes.append(time.perf_counter() - start)
+                if status != 200:
+                    problems.append(f"上传内容请求失败: {status} {body[:200]!r}")
+                else:
+                    uploaded = os.path.join(work_dir, "warm", f"bytes{i}.pptx")
+                    with open(uploaded, "wb") as f:
+                        f.write(body)
+                    if read_members(uploaded) != golden:
+                        problems.append(f"上传内容请求的输出与命令行不一致: bytes{i}.pptx")
+            stats = json.loads(request(socket_path, "GET", "/stats")[1])
+        finally:
+            stop_server(server)
+
+        # 4. 排队上限
+        busy_socket = os.path.join(work_dir, "busy.sock")
+        server = start_server(busy_socket, template_path, mappings_path, "-w", "1", "--max-queue", "1")
+        statuses = []
+        try:
+            def fire():
+                statuses.append(request(busy_socket, "POST", "/render", workbook_bytes,
+                                        {"Content-Type": "application/octet-stream"})[0])
+            threads = [threading.Thread(target=fire) for _ in range(8)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            busy_stats = json.loads(request(busy_socket, "GET", "/stats")[1])
+        finally:
+            stop_server(server)
+        if 503 not in statuses or 200 not in statuses:
+            problems.append(f"排队上限未生效: {sorted(statuses)}")
+
+        def ms(values):
+            values = sorted(values)
+            return f"p50={values[len(values) // 2] * 1000:.0f}ms max={values[-1] * 1000:.0f}ms"
+
+        print(f"命令行冷启动(每份): {ms(cold)}")
+        print(f"常驻服务 按路径:     {ms(warm_path)}")
+        print(f"常驻服务 上传内容:   {ms(warm_bytes)}")
+        print(f"服务端 total 直方图: p50<={stats['latency_seconds']['total']['p50']}s "
+              f"p99<={stats['latency_seconds']['total']['p99']}s, 请求 {stats['requests']}")
+        print(f"排队上限(-w 1 --max-queue 1, 8 个并发): 状态码 {sorted(statuses)}, "
+              f"请求 {busy_stats['requests']}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    for problem in problems[:10]:
+        print(problem)
+    if problems:
+        return 1
+    print("常驻服务输出与命令行一致")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,155 @@
+# benchmarks/bench_save.py
+"""
+PPT 保存基准: prs.save(全部重新序列化+压缩) 与 write_package(复用模板中已压缩的部件,
+其余部件并行压缩) 的耗时对比. 模板含约 50MB 随机像素图片.
+
+同时检查:
+- write_package 的输出能被 python-pptx 打开, 幻灯片数量一致;
+- 除幻灯片、presentation.xml 和 [Content_Types].xml 外, 模板的每个成员(版式/母版/主题/
+  图片及各 .rels)在输出中都与模板中的压缩数据逐字节相同. 分别用 python-pptx 生成的模板
+  和 PowerPoint 写法(XML 声明用双引号 + CRLF, 重新序列化后与模板不同)的模板检查.
+任何检查失败都以非零状态退出.
+
+用法(在仓库根目录):
+    python -m benchmarks.bench_save
+    python -m benchmarks.bench_save --media-mb 100 --compress-level 1
+"""
+
+import argparse
+import os
+import shutil
+import struct
+import sys
+import tempfile
+import time
+import zipfile
+
+from pptx import Presentation
+
+from benchmarks.fixtures import (
+    build_mappings, write_media_template, write_powerpoint_style_copy, write_workbook
+)
+from business_logic.processor import collect_data_request, fill_placeholders, prepare_slides
+from data_access.excel_reader import ExcelDataProvider
+from ppt_engine.deck_manager import save_ppt
+from ppt_engine.template_cache import TemplateCache
+
+
+def _raw_member(zf: zipfile.ZipFile, name: str) -> bytes:
+    info = zf.getinfo(name)
+    zf.fp.seek(info.header_offset)
+    header = struct.unpack(zipfile.structFileHeader, zf.fp.read(zipfile.sizeFileHeader))
+    zf.fp.seek(info.header_offset + zipfile.sizeFileHeader + header[-2] + header[-1])
+    return zf.fp.read(info.compress_size)
+
+
+#: 生成时会改动的成员; 本基准的映射覆盖所有幻灯片
+def _is_rewritten(name: str) -> bool:
+    return (name in ("[Content_Types].xml", "ppt/presentation.xml", "ppt/_rels/presentation.xml.rels")
+            or name.startswith("ppt/slides/"))
+
+
+def check_untouched_members(template_path: str, output_path: str, label: str, problems: list) -> int:
+    """
+    模板中不会被改动的成员, 在输出中的压缩数据必须与模板逐字节相同; 返回这类成员数.
+    """
+    untouched = 0
+    with zipfile.ZipFile(template_path) as tz, zipfile.ZipFile(output_path) as oz:
+        output_names = set(oz.namelist())
+        for name in tz.namelist():
+            if _is_rewritten(name):
+                continue
+            untouched += 1
+            if name not in output_names:
+                problems.append(f"[{label}] 输出缺少未改动的成员: {name}")
+            elif _raw_member(oz, name) != _raw_member(tz, name):
+                problems.append(f"[{label}] 未改动的成员与模板不一致: {name}")
+    return untouched
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="PPT 保存基准")
+    parser.add_argument("--media-mb", type=int, default=50)
+    parser.add_argument("--slides", type=int, default=10)
+    parser.add_argument("--compress-level", type=int, default=6)
+    parser.add_argument("--repeat", type=int, default=3, help="每种方式重复次数, 取最小值")
+    args = parser.parse_args(argv)
+
+    work_dir = tempfile.mkdtemp(prefix="ppt_bench_save_")
+    problems = []
+    try:
+        template_path = os.path.join(work_dir, "template.pptx")
+        workbook_path = os.path.join(work_dir, "book.xlsx")
+        write_media_template(template_path, media_mb=args.media_mb, n_slides=args.slides)
+        write_workbook(workbook_path, n_rows=20, n_cols=3, n_sheets=3)
+        mappings = build_mappings(args.slides, 3)
+        print(f"模板大小: {os.path.getsize(template_path) / 1024 / 1024:.1f} MB")
+
+        cache = TemplateCache()
+        index = cache.get_placeholder_index(template_path)
+
+        def filled_deck():
+            prs = cache.get(template_path)
+            sheets, columns = collect_data_request(prs, mappings, index)
+            data = ExcelDataProvider(workbook_path).read_data(sheets=sheets, columns=columns)
+            fill_placeholders(prs, prepare_slides(prs, mappings, data), data, index)
+            return prs
+
+        modes = {
+            "prs.save": lambda prs, out: save_ppt(prs, out),
+            "write_package": lambda prs, out: save_ppt(prs, out, template_path=template_path,
+                                                       compresslevel=args.compress_level),
+        }
+        results = {}
+        for name, save in modes.items():
+            output_path = os.path.join(work_dir, f"{name}.pptx")
+            best = None
+            for _ in range(args.repeat):
+                prs = filled_deck()
+                start = time.perf_counter()
+                save(prs, output_path)
+                seconds = time.perf_counter() - start
+                best = seconds if best is None else min(best, seconds)
+            results[name] = (best, os.path.getsize(output_path), output_path)
+
+        print(f"{'方式':<16} {'保存(s)':>10} {'输出(MB)':>10}")
+        for name, (seconds, size, _) in results.items():
+            print(f"{name:<16} {seconds:>10.3f} {size / 1024 / 1024:>10.1f}")
+        base, fast = results["prs.save"][0], results["write_package"][0]
+        print(f"加速: {base / fast:.1f}x")
+
+        fast_output = results["write_package"][2]
+        n_slides = len(Presentation(fast_output).slides)
+        if n_slides != len(Presentation(results["prs.save"][2]).slides):
+            problems.append("[python-pptx 模板] write_package 输出的页数与 prs.save 不同")
+        untouched = check_untouched_members(template_path, fast_output, "python-pptx 模板", problems)
+        print(f"write_package 输出可正常打开, {n_slides} 页; 未改动的成员 {untouched} 个")
+
+        # PowerPoint 写法的模板: 未改动的 XML 不能靠重新序列化后比较 CRC 来复用
+        ppt_style_path = os.path.join(work_dir, "template_powerpoint.pptx")
+        write_powerpoint_style_copy(template_path, ppt_style_path)
+        ppt_style_cache = TemplateCache()
+        prs = ppt_style_cache.get(ppt_style_path)
+        index = ppt_style_cache.get_placeholder_index(ppt_style_path)
+        sheets, columns = collect_data_request(prs, mappings, index)
+        data = ExcelDataProvider(workbook_path).read_data(sheets=sheets, columns=columns)
+        fill_placeholders(prs, prepare_slides(prs, mappings, data), data, index)
+        ppt_style_output = os.path.join(work_dir, "write_package_powerpoint.pptx")
+        save_ppt(prs, ppt_style_output, template_path=ppt_style_path,
+                 compresslevel=args.compress_level)
+        untouched = check_untouched_members(ppt_style_path, ppt_style_output,
+                                            "PowerPoint 写法的模板", problems)
+        print(f"PowerPoint 写法的模板: 未改动的成员 {untouched} 个, 应与模板逐字节相同")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    for problem in problems[:10]:
+        print(problem)
+    if problems:
+        return 1
+    print("检查通过")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
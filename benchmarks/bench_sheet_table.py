@@ -0,0 +1,156 @@
+# benchmarks/bench_sheet_table.py
+"""
+按列存储的 SheetTable vs 行字典列表: 内存占用与输出一致性.
+
+1. 生成一个 --rows 行 x 8 列的工作簿(文本列为重复的区域名);
+2. 各起一个子进程读取, 报告峰值 RSS:
+   - table: read_data 的结果(SheetTable);
+   - rows:  把结果转为行字典列表(原结构)后释放 SheetTable;
+3. 用 tracemalloc 分别统计两种结构本身占用的内存;
+4. 用同一份数据分别以 SheetTable 和行字典列表生成PPT(pptx / lxml 两种引擎), 检查输出逐部件一致.
+任何检查失败都以非零状态退出.
+
+用法(在仓库根目录):
+    python -m benchmarks.bench_sheet_table
+    python -m benchmarks.bench_sheet_table --rows 200000
+"""
+
+import argparse
+import gc
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.bench_spool import read_members
+from benchmarks.fixtures import build_mappings, write_template, write_workbook
+from business_logic.processor import process_ppt_with_data
+from data_access.base_provider import BaseDataProvider
+from data_access.excel_reader import ExcelDataProvider
+from data_access.sheet_table import SheetTable
+
+
+class _StaticProvider(BaseDataProvider):
+    """
+    返回固定数据的提供者(忽略 sheets/columns).
+    """
+
+    def __init__(self, data: dict):
+        self.data = data
+
+    def read_data(self, sheets=None, columns=None):
+        return self.data
+
+
+def peak_rss_mb() -> float:
+    """
+    本进程的峰值 RSS. ru_maxrss 会跨 execve 保留父进程的值, 因此优先读 /proc 的 VmHWM.
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def child(path: str, mode: str):
+    """
+    子进程: 读取工作簿, 按 mode 保留一种结构, 输出峰值 RSS 与耗时(JSON).
+    """
+    start = time.perf_counter()
+    data = ExcelDataProvider(path).read_data()
+    if mode == "rows":
+        data = {name: table.to_rows() for name, table in data.items()}
+    gc.collect()
+    print(json.dumps({
+        "seconds": time.perf_counter() - start,
+        "rows": sum(len(rows) for rows in data.values()),
+        "maxrss_mb": peak_rss_mb(),
+    }))
+
+
+def traced_mb(build) -> float:
+    """
+    build() 返回的对象本身新分配的内存(MB).
+    """
+    gc.collect()
+    tracemalloc.start()
+    obj = build()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del obj
+    return size / 2 ** 20
+
+
+def check_render(work_dir: str, problems: list):
+    template_path = os.path.join(work_dir, "template.pptx")
+    book = os.path.join(work_dir, "small.xlsx")
+    write_template(template_path, n_slides=6)
+    write_workbook(book, n_rows=30, n_sheets=2)
+    mappings = build_mappings(6, 2)
+    tables = ExcelDataProvider(book).read_data()
+    rows = {name: table.to_rows() for name, table in tables.items()}
+    for engine in ("pptx", "lxml"):
+        outputs = []
+        for data in (rows, tables):
+            output = os.path.join(work_dir, f"{engine}_{len(outputs)}.pptx")
+            process_ppt_with_data(template_path, output, _StaticProvider(data), mappings, engine=engine)
+            outputs.append(read_members(output))
+        if outputs[0] != outputs[1]:
+            problems.append(f"[{engine}] SheetTable 与行字典列表生成的PPT不一致")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="SheetTable vs 行字典列表 内存与一致性")
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--child", nargs=2, metavar=("PATH", "MODE"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.child:
+        child(*args.child)
+        return 0
+
+    work_dir = tempfile.mkdtemp(prefix="ppt_bench_sheet_table_")
+    problems = []
+    try:
+        book = os.path.join(work_dir, "book.xlsx")
+        write_workbook(book, n_rows=args.rows, n_cols=8, n_sheets=1)
+
+        for mode in ("rows", "table"):
+            out = subprocess.run([sys.executable, "-m", "benchmarks.bench_sheet_table",
+                                  "--child", book, mode],
+                                 check=True, capture_output=True, text=True).stdout
+            result = json.loads(out)
+            print(f"{mode:>5}: 峰值RSS {result['maxrss_mb']:.1f}MB, "
+                  f"读取 {result['seconds']:.2f}s, {result['rows']} 行")
+
+        tables = ExcelDataProvider(book).read_data()
+        rows = {name: table.to_rows() for name, table in tables.items()}
+        if tables != rows:
+            problems.append("SheetTable 与行字典列表内容不一致")
+        rows_mb = traced_mb(lambda: {name: table.to_rows() for name, table in tables.items()})
+        table_mb = traced_mb(lambda: {name: SheetTable.from_rows(r) for name, r in rows.items()})
+        print(f"数据本身: 行字典列表 {rows_mb:.1f}MB, SheetTable {table_mb:.1f}MB")
+
+        check_render(work_dir, problems)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    for problem in problems[:10]:
+        print(problem)
+    if problems:
+        return 1
+    print("检查通过")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
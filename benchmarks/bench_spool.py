@@ -0,0 +1,148 @@
+# benchmarks/bench_spool.py
+"""
+共享队列目录(spool_main)的本机检查: 多个本地工作进程 + 模拟崩溃.
+
+1. 生成一批工作簿, 先用 run_processing 生成一份基准输出(golden);
+2. spool_main submit 提交任务, 启动 --workers 个 spool_main work 子进程(短租约);
+3. 运行中每隔一段时间 SIGKILL 一个工作进程(不释放租约, 可能留下临时文件),
+   并启动一个新的工作进程补位; 另外 SIGSTOP 暂停一个工作进程超过租约时长后再 SIGCONT,
+   模拟卡住的主机: 它的任务被其他工作进程接手, 恢复后续约失败, 不得写出结果;
+4. 队列排空后检查: 每个任务都有 done 状态、没有 failed、running 目录为空、
+   没有残留的 .tmp 文件, 每个输出PPT的各部件与基准输出一致.
+任何检查失败都以非零状态退出.
+
+用法(在仓库根目录):
+    python -m benchmarks.bench_spool
+    python -m benchmarks.bench_spool --files 60 --workers 4 --kills 4 --lease-seconds 2
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+import zipfile
+
+from benchmarks.bench_executor import prepare_inputs
+from client_gui.controller.processing_controller import run_processing
+from client_gui.services.spool_queue import DONE_DIR, SpoolQueue
+
+
+def spool_cmd(*args) -> list:
+    return [sys.executable, "-m", "client_gui.spool_main", "--log-level", "WARNING", *args]
+
+
+def start_worker(queue_dir: str, lease_seconds: float) -> subprocess.Popen:
+    return subprocess.Popen(
+        spool_cmd("work", "-q", queue_dir, "--lease-seconds", str(lease_seconds),
+                  "--poll-interval", "0.2", "--exit-when-empty"),
+        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+    )
+
+
+def read_members(path: str) -> dict:
+    with zipfile.ZipFile(path) as zf:
+        return {name: zf.read(name) for name in zf.namelist()}
+
+
+def check_outputs(golden_dir: str, output_dir: str) -> list:
+    problems = []
+    for root, _, files in os.walk(golden_dir):
+        for name in files:
+            if not name.endswith(".pptx"):
+                continue
+            rel = os.path.relpath(os.path.join(root, name), golden_dir)
+            candidate = os.path.join(output_dir, rel)
+            if not os.path.exists(candidate):
+                problems.append(f"缺少输出: {rel}")
+            elif read_members(os.path.join(golden_dir, rel)) != read_members(candidate):
+                problems.append(f"输出与基准不一致: {rel}")
+    for root, _, files in os.walk(output_dir):
+        problems.extend(f"残留临时文件: {name}" for name in files if name.endswith(".tmp"))
+    return problems
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="共享队列多工作进程 + 崩溃模拟检查")
+    parser.add_argument("--files", type=int, default=40)
+    parser.add_argument("--rows", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=3)
+    parser.add_argument("--kills", type=int, default=3, help="运行中 SIGKILL 的工作进程数")
+    parser.add_argument("--stalls", type=int, default=1, help="运行中暂停超过租约时长的工作进程数")
+    parser.add_argument("--lease-seconds", type=float, default=2.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    rng = random.Random(args.seed)
+
+    work_dir = tempfile.mkdtemp(prefix="ppt_bench_spool_")
+    try:
+        template_path, input_dir, mappings_path = prepare_inputs(
+            work_dir, args.files, args.rows, n_slides=10, n_sheets=3)
+        golden_dir = os.path.join(work_dir, "golden")
+        run_processing(template_path=template_path, excel_dir=input_dir, output_dir=golden_dir,
+                       slide_mappings_file=mappings_path, max_workers=1, incremental=False)
+
+        queue_dir = os.path.join(work_dir, "queue")
+        output_dir = os.path.join(work_dir, "output")
+        submit = subprocess.run(
+            spool_cmd("submit", "-q", queue_dir, "-t", template_path, "-i", input_dir,
+                      "-o", output_dir, "-m", mappings_path),
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, check=True
+        )
+        print(f"提交: {json.loads(submit.stdout)['submitted']} 个任务")
+
+        start = time.perf_counter()
+        workers = [start_worker(queue_dir, args.lease_seconds) for _ in range(args.workers)]
+        killed = stalled = 0
+        finished = []
+        queue = SpoolQueue(queue_dir, lease_seconds=args.lease_seconds)
+        while workers:
+            time.sleep(0.2)
+            if killed < args.kills and queue.counts()["running"] and rng.random() < 0.3:
+                victim = workers.pop(rng.randrange(len(workers)))
+                victim.send_signal(signal.SIGKILL)
+                victim.wait()
+                killed += 1
+                workers.append(start_worker(queue_dir, args.lease_seconds))
+            elif stalled < args.stalls and queue.counts()["running"] and rng.random() < 0.3:
+                victim = rng.choice(workers)
+                victim.send_signal(signal.SIGSTOP)
+                time.sleep(args.lease_seconds * 2)
+                victim.send_signal(signal.SIGCONT)
+                stalled += 1
+            for proc in [p for p in workers if p.poll() is not None]:
+                workers.remove(proc)
+                finished.append(json.loads(proc.stdout.read() or b"{}"))
+        elapsed = time.perf_counter() - start
+
+        counts = queue.counts()
+        statuses = [json.load(open(os.path.join(queue_dir, DONE_DIR, name), encoding="utf-8"))
+                    for name in os.listdir(os.path.join(queue_dir, DONE_DIR)) if name.endswith(".json")]
+        retried = sum(1 for s in statuses if s["attempts"] > 1)
+        print(f"耗时 {elapsed:.2f}s, 杀死工作进程 {killed} 个, 暂停工作进程 {stalled} 个, "
+              f"重新领取后完成的任务 {retried} 个")
+        print(f"队列: {counts}")
+        print(f"正常退出的工作进程: {[{k: f.get(k) for k in ('done', 'failed', 'lost')} for f in finished]}")
+
+        problems = check_outputs(golden_dir, output_dir)
+        if counts["done"] != args.files:
+            problems.append(f"完成数 {counts['done']} != 任务数 {args.files}")
+        if counts["failed"] or counts["running"] or counts["pending"]:
+            problems.append(f"队列未正常排空: {counts}")
+        for problem in problems[:10]:
+            print(problem)
+        if problems:
+            return 1
+        print("所有任务完成, 输出与基准一致")
+        return 0
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
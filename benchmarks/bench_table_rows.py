@@ -0,0 +1,89 @@
+# benchmarks/bench_table_rows.py
+"""
+行模板表格(映射类型 table_row_template)的耗时.
+
+模板: 一页, 标题文本框含占位符, 表格第1行表头、第2行为行模板 [A] [B] ...、第3行为合计行.
+对不同数据行数(默认 1k/2.5k/5k/10k)计时 prepare_slides + fill_placeholders,
+打印每千行耗时(线性时应基本不变).
+表格行数、首末行与合计行内容、外框高度、max_rows 续页拆分、两种引擎一致、
+空白模板行按列位置填充由 tests/test_table_rows.py 检查.
+
+用法(在仓库根目录):
+    python -m benchmarks.bench_table_rows
+    python -m benchmarks.bench_table_rows --rows 1000 --rows 20000
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from pptx import Presentation
+from pptx.util import Inches
+
+from benchmarks.fixtures import column_key
+from business_logic.processor import TABLE_ROW_TEMPLATE, fill_placeholders, prepare_slides
+from ppt_engine.template_cache import TemplateCache
+
+
+def write_row_template(path: str, n_cols: int = 5, placeholders: bool = True):
+    """
+    placeholders=False 时模板行留空, 按列位置填充.
+    """
+    prs = Presentation()
+    slide = prs.slides.add_slide(prs.slide_layouts[6])
+    slide.shapes.add_textbox(Inches(0.5), Inches(0.2), Inches(8), Inches(0.8)).text_frame.text = \
+        f"区域 {column_key(0)} 明细"
+    table = slide.shapes.add_table(3, n_cols, Inches(0.5), Inches(1), Inches(9), Inches(1.2)).table
+    for c in range(n_cols):
+        table.cell(0, c).text = f"列{c + 1}"
+        if placeholders:
+            table.cell(1, c).text = column_key(c)
+    table.cell(2, 0).text = f"合计 {column_key(0)}"
+    prs.save(path)
+
+
+def build_rows(n_rows: int, n_cols: int = 5) -> list:
+    return [{column_key(c): f"r{r}c{c}" for c in range(n_cols)} for r in range(n_rows)]
+
+
+def render(template_path: str, cache: TemplateCache, rows: list, engine: str, max_rows=None):
+    prs = cache.get(template_path)
+    index = cache.get_placeholder_index(template_path)
+    mapping = {"sheet": "Sheet1", "type": TABLE_ROW_TEMPLATE}
+    if max_rows:
+        mapping["max_rows"] = max_rows
+    all_data = {"Sheet1": rows}
+    start = time.perf_counter()
+    plan = prepare_slides(prs, {1: mapping}, all_data)
+    fill_placeholders(prs, plan, all_data, index, engine)
+    return prs, time.perf_counter() - start
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="行模板表格耗时")
+    parser.add_argument("--rows", type=int, action="append", help="数据行数, 可重复")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+    sizes = args.rows or [1000, 2500, 5000, 10000]
+
+    work_dir = tempfile.mkdtemp(prefix="ppt_bench_table_rows_")
+    try:
+        template_path = os.path.join(work_dir, "row_template.pptx")
+        write_row_template(template_path)
+        cache = TemplateCache()
+
+        print(f"{'行数':>8} {'耗时(ms)':>10} {'每千行(ms)':>11}")
+        for n_rows in sizes:
+            rows = build_rows(n_rows)
+            best = min(render(template_path, cache, rows, "lxml")[1] for _ in range(args.repeat))
+            print(f"{n_rows:>8} {best * 1000:>10.1f} {best * 1000 / n_rows * 1000:>11.2f}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
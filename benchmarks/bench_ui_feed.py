@@ -0,0 +1,179 @@
+# benchmarks/bench_ui_feed.py
+"""
+界面日志/进度缓冲(client_gui.services.ui_feed)与 run_processing 的 status_callback.
+
+1. 真实运行: 一批工作簿(含无法读取的文件)经 run_processing 生成, 日志和进度写入 UiFeed,
+   另一线程按界面的刷新间隔 drain; 检查最后的进度 完成+失败 = 总数、失败数正确、百分比为 100,
+   完整日志文件包含全部日志, 并统计界面刷新次数与日志条数(原实现每条日志一个信号);
+2. 模拟万个文件、每个失败文件带堆栈的日志: 比较原方式(每条日志都留在日志窗口)与环形缓冲
+   保留的行数和字符数, 以及每条 log 调用的耗时; 检查省略行数的计数和完整日志文件的行数.
+Qt 不参与, 本脚本不需要 PyQt5. 任何检查失败都以非零状态退出.
+
+用法(在仓库根目录):
+    python -m benchmarks.bench_ui_feed
+    python -m benchmarks.bench_ui_feed --files 20000 --max-lines 2000
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import traceback
+
+from benchmarks.fixtures import build_mappings, write_mappings, write_template, write_workbook
+from client_gui.controller.processing_controller import run_processing
+from client_gui.services.ui_feed import (
+    FEED_INTERVAL_MS, UiFeed, format_progress, format_stage_means, format_stage_summary
+)
+
+
+def check_run(work_dir: str, problems: list):
+    input_dir = os.path.join(work_dir, "in")
+    output_dir = os.path.join(work_dir, "out")
+    os.makedirs(input_dir)
+    os.makedirs(output_dir)
+    for i in range(24):
+        write_workbook(os.path.join(input_dir, f"book{i:02d}.xlsx"), n_rows=5, n_cols=3, n_sheets=2, seed=i)
+    n_bad = 4
+    for i in range(n_bad):
+        with open(os.path.join(input_dir, f"bad{i}.xlsx"), "wb") as f:
+            f.write(b"not a workbook")
+    template_path = os.path.join(work_dir, "template.pptx")
+    write_template(template_path, n_slides=4)
+    mappings_path = os.path.join(work_dir, "mappings.json")
+    write_mappings(mappings_path, build_mappings(4, 2))
+
+    feed = UiFeed(max_lines=50, log_file=os.path.join(output_dir, "run.log"))
+    messages = []
+    snapshots = []
+    drains = 0
+    stop = threading.Event()
+
+    def log(message):
+        messages.append(message)
+        feed.log(message)
+
+    def gui_loop():
+        nonlocal drains
+        while not stop.is_set():
+            time.sleep(FEED_INTERVAL_MS / 1000)
+            _, _, snapshot = feed.drain()
+            drains += 1
+            if snapshot is not None:
+                snapshots.append(snapshot)
+
+    gui = threading.Thread(target=gui_loop)
+    gui.start()
+    try:
+        stats = run_processing(template_path, input_dir, output_dir, mappings_path, max_workers=2,
+                               incremental=False, log_callback=log,
+                               status_callback=feed.update_progress)
+    finally:
+        stop.set()
+        gui.join()
+        feed.close()
+    _, _, last = feed.drain()
+    if last is not None:
+        snapshots.append(last)
+
+    if stats is None or not snapshots:
+        problems.append("[运行] 没有得到结果或进度")
+        return
+    final = snapshots[-1]
+    if final.done + final.failed != final.total or final.total != 24 + n_bad:
+        problems.append(f"[运行] 最后的进度不完整: {format_progress(final)}")
+    if final.failed != n_bad or stats.failed != n_bad:
+        problems.append(f"[运行] 失败数应为 {n_bad}: 进度 {final.failed}, 统计 {stats.failed}")
+    if final.percentage != 100 or not final.total_known:
+        problems.append(f"[运行] 结束时百分比应为 100: {final.percentage}")
+    with open(feed.log_file, encoding="utf-8") as f:
+        logged = f.read()
+    if any(message.rstrip("\n") not in logged for message in messages):
+        problems.append("[运行] 完整日志文件缺少部分日志")
+    print(f"运行: {len(messages)} 条日志, 界面刷新 {drains} 次; {format_progress(final)}")
+    print(format_stage_means(final))
+    print(format_stage_summary(stats))
+
+
+def fake_traceback() -> str:
+    try:
+        raise ValueError("无法读取工作簿")
+    except ValueError:
+        return traceback.format_exc()
+
+
+def simulate(work_dir: str, n_files: int, fail_every: int, max_lines: int, problems: list):
+    trace = fake_traceback()
+    messages = []
+    for i in range(n_files):
+        if i % fail_every == 0:
+            messages.append(f"处理 book{i:05d}.xlsx 时发生异常: 无法读取工作簿\n{trace}")
+        else:
+            messages.append(f"已处理: book{i:05d}.xlsx -> book{i:05d}.pptx")
+    n_lines = sum(len(m.splitlines()) for m in messages)
+
+    # 原方式: 每条日志一个信号, 全部留在日志窗口
+    naive_chars = sum(len(m) for m in messages)
+
+    log_file = os.path.join(work_dir, "sim.log")
+    feed = UiFeed(max_lines=max_lines, log_file=log_file)
+    shown = []
+    drained_total = 0
+    dropped_total = 0
+    drains = 0
+    start = time.perf_counter()
+    for i, message in enumerate(messages):
+        feed.log(message)
+        if i % 1000 == 999 or i == len(messages) - 1:  # 相当于界面的一次刷新
+            lines, dropped, _ = feed.drain()
+            drains += 1
+            shown = (shown + lines)[-max_lines:]
+            drained_total += len(lines)
+            dropped_total += dropped
+    feed_seconds = time.perf_counter() - start
+    feed.close()
+
+    with open(log_file, encoding="utf-8") as f:
+        file_lines = sum(1 for _ in f)
+    if file_lines != n_lines:
+        problems.append(f"[模拟] 完整日志应有 {n_lines} 行, 实际 {file_lines}")
+    if len(shown) > max_lines:
+        problems.append(f"[模拟] 日志窗口保留了 {len(shown)} 行, 超过上限 {max_lines}")
+    if drained_total + dropped_total != n_lines:
+        problems.append(f"[模拟] 显示 {drained_total} 行 + 省略 {dropped_total} 行 != {n_lines} 行")
+    print(f"模拟 {n_files} 个文件({n_lines} 行日志): 原方式 {len(messages)} 个信号, "
+          f"日志窗口保留 {naive_chars / 1024:.0f} KB 文本且不断增长")
+    print(f"  环形缓冲: 窗口最多 {max_lines} 行({sum(map(len, shown)) / 1024:.0f} KB), "
+          f"省略 {dropped_total} 行(完整保存在文件中); "
+          f"工作线程每条 log {feed_seconds / len(messages) * 1e6:.1f}us(含写文件), "
+          f"界面刷新 {drains} 次")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="界面日志/进度缓冲")
+    parser.add_argument("--files", type=int, default=10000)
+    parser.add_argument("--fail-every", type=int, default=10)
+    parser.add_argument("--max-lines", type=int, default=1000, help="日志窗口保留的行数")
+    args = parser.parse_args(argv)
+
+    work_dir = tempfile.mkdtemp(prefix="ppt_bench_ui_feed_")
+    problems = []
+    try:
+        check_run(work_dir, problems)
+        simulate(work_dir, args.files, args.fail_every, args.max_lines, problems)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    for problem in problems[:10]:
+        print(problem)
+    if problems:
+        return 1
+    print("检查通过")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
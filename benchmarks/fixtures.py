@@ -0,0 +1,185 @@
+# benchmarks/fixtures.py
+"""
+基准测试用的合成输入: PPT 模板、Excel 工作簿和 slide_mappings.
+全部在本地生成, 同样的参数总是得到同样的内容.
+"""
+
+import json
+import random
+import struct
+import zipfile
+import zlib
+from datetime import datetime, timedelta
+from io import BytesIO
+from typing import Dict
+
+from openpyxl import Workbook
+from openpyxl.utils import get_column_letter
+from pptx import Presentation
+from pptx.util import Inches
+
+
+def column_key(col_idx: int) -> str:
+    """
+    0-based 列号 -> "[A]".
+    """
+    return f"[{get_column_letter(col_idx + 1)}]"
+
+
+def build_template(n_slides: int = 10, table_rows: int = 4, table_cols: int = 3) -> Presentation:
+    """
+    生成模板: 每页一个标题文本框 + 一个表格, 表格第1行为表头, 其余为 [A] [B] ... 占位符.
+    """
+    prs = Presentation()
+    layout = prs.slide_layouts[6]
+    for i in range(n_slides):
+        slide = prs.slides.add_slide(layout)
+        box = slide.shapes.add_textbox(Inches(1), Inches(0.5), Inches(6), Inches(1))
+        box.text_frame.text = f"第{i + 1}页"
+        table = slide.shapes.add_table(
+            table_rows, table_cols, Inches(1), Inches(2), Inches(6), Inches(2)
+        ).table
+        for c in range(table_cols):
+            table.cell(0, c).text = f"列{c + 1}"
+        for r in range(1, table_rows):
+            for c in range(table_cols):
+                table.cell(r, c).text = column_key(c)
+    return prs
+
+
+def build_text_template(n_slides: int = 100, boxes_per_slide: int = 6, paragraphs_per_box: int = 5,
+                        placeholder_every: int = 2) -> Presentation:
+    """
+    生成文字密集的模板: 每页多个文本框, 每个文本框多段;
+    每 placeholder_every 页中只有一页含占位符, 其余页为纯文本.
+    """
+    prs = Presentation()
+    layout = prs.slide_layouts[6]
+    for i in range(n_slides):
+        slide = prs.slides.add_slide(layout)
+        with_placeholders = placeholder_every and i % placeholder_every == 0
+        for b in range(boxes_per_slide):
+            box = slide.shapes.add_textbox(Inches(0.5), Inches(0.5 + b), Inches(8), Inches(1))
+            tf = box.text_frame
+            for p_idx in range(paragraphs_per_box):
+                paragraph = tf.paragraphs[0] if p_idx == 0 else tf.add_paragraph()
+                run = paragraph.add_run()
+                run.text = f"第{i + 1}页 文本框{b + 1} 第{p_idx + 1}段 说明文字"
+                if with_placeholders:
+                    run = paragraph.add_run()
+                    run.text = f" {column_key(p_idx % 5)} / {column_key((p_idx + 1) % 5)} [未映射]"
+    return prs
+
+
+def build_template_bytes(n_slides: int = 10, table_rows: int = 4, table_cols: int = 3) -> bytes:
+    stream = BytesIO()
+    build_template(n_slides, table_rows, table_cols).save(stream)
+    return stream.getvalue()
+
+
+def write_template(path: str, n_slides: int = 10, table_rows: int = 4, table_cols: int = 3):
+    build_template(n_slides, table_rows, table_cols).save(path)
+
+
+#: python-pptx 写出的 XML 声明; PowerPoint 保存的文件用双引号并以 CRLF 结尾
+_PPTX_XML_DECLARATION = b"<?xml version='1.0' encoding='UTF-8' standalone='yes'?>\n"
+_POWERPOINT_XML_DECLARATION = b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\r\n'
+
+
+def write_powerpoint_style_copy(src: str, dst: str):
+    """
+    复制模板, 把各 XML/.rels 成员的声明改成 PowerPoint 的写法(双引号 + CRLF).
+    内容不变, 但 python-pptx 重新序列化后不再与模板逐字节相同, 模拟用 PowerPoint 制作的模板.
+    """
+    with zipfile.ZipFile(src) as zin, zipfile.ZipFile(dst, "w", zipfile.ZIP_DEFLATED) as zout:
+        for item in zin.infolist():
+            data = zin.read(item.filename)
+            if data.startswith(_PPTX_XML_DECLARATION):
+                data = _POWERPOINT_XML_DECLARATION + data[len(_PPTX_XML_DECLARATION):]
+            zout.writestr(item, data)
+
+
+def build_png_bytes(width: int, height: int, seed: int = 0) -> bytes:
+    """
+    生成随机像素的 RGB PNG(几乎不可压缩), 模拟照片/背景图等大尺寸媒体.
+    """
+    rng = random.Random(seed)
+    raw = b"".join(b"\x00" + rng.randbytes(width * 3) for _ in range(height))
+
+    def chunk(tag: bytes, data: bytes) -> bytes:
+        return (struct.pack(">I", len(data)) + tag + data
+                + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF))
+
+    ihdr = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", ihdr)
+            + chunk(b"IDAT", zlib.compress(raw, 1)) + chunk(b"IEND", b""))
+
+
+def write_media_template(path: str, media_mb: int = 50, n_images: int = 5, n_slides: int = 10,
+                         table_rows: int = 4, table_cols: int = 3):
+    """
+    在 build_template 的基础上加入 n_images 张随机像素图片, 总计约 media_mb MB,
+    依次放在前 n_images 页上.
+    """
+    prs = build_template(n_slides, table_rows, table_cols)
+    side = int((media_mb * 1024 * 1024 / n_images / 3) ** 0.5)
+    slides = list(prs.slides)
+    for i in range(n_images):
+        image = BytesIO(build_png_bytes(side, side, seed=i))
+        slides[i % n_slides].shapes.add_picture(image, Inches(7), Inches(0.5), Inches(2), Inches(2))
+    prs.save(path)
+
+
+def write_workbook(path: str, n_rows: int = 20, n_cols: int = 6, n_sheets: int = 3, seed: int = 0):
+    """
+    生成工作簿: Sheet1..SheetN, 第1行表头, 之后 n_rows 行数据.
+    列类型轮换: 文本 / 小数 / 百分比 / 日期 / 整数.
+    """
+    rng = random.Random(seed)
+    wb = Workbook()
+    wb.remove(wb.active)
+    base_date = datetime(2024, 1, 1)
+    for s in range(n_sheets):
+        ws = wb.create_sheet(f"Sheet{s + 1}")
+        ws.append([f"列{c + 1}" for c in range(n_cols)])
+        for r in range(n_rows):
+            row = []
+            for c in range(n_cols):
+                kind = c % 5
+                if kind == 0:
+                    row.append(f"区域{rng.randint(1, 20)}")
+                elif kind in (1, 2):
+                    row.append(rng.random() * 1000 if kind == 1 else rng.random())
+                elif kind == 3:
+                    row.append(base_date + timedelta(days=rng.randint(0, 365)))
+                else:
+                    row.append(rng.randint(0, 10000))
+            ws.append(row)
+        for c in range(2, n_cols, 5):
+            for cells in ws.iter_rows(min_row=2, min_col=c + 1, max_col=c + 1):
+                cells[0].number_format = "0.00%"
+    wb.save(path)
+
+
+def build_mappings(n_slides: int, n_sheets: int, copy_every: int = 3,
+                   table_every: int = 2) -> Dict[int, dict]:
+    """
+    生成 slide_mappings: 每 table_every 页一张 row_for_table_row,
+    每 copy_every 页一张 copy=True 的单行页, 其余为普通单行页.
+    只映射 Sheet1..Sheet{n_sheets}; 工作簿中更多的sheet相当于辅助sheet.
+    """
+    mappings = {}
+    for idx in range(1, n_slides + 1):
+        sheet = f"Sheet{(idx - 1) % n_sheets + 1}"
+        if table_every and idx % table_every == 0:
+            mappings[idx] = {"sheet": sheet, "type": "row_for_table_row"}
+        elif copy_every and idx % copy_every == 0:
+            mappings[idx] = {"sheet": sheet, "type": "row", "copy": True}
+        else:
+            mappings[idx] = {"sheet": sheet, "type": "row"}
+    return mappings
+
+
+def write_mappings(path: str, mappings: Dict[int, dict]):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({str(k): v for k, v in mappings.items()}, f, indent=2, ensure_ascii=False)
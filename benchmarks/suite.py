@@ -0,0 +1,252 @@
+# benchmarks/suite.py
+"""
+可复现的基准套件.
+
+run: 按场景生成合成模板/工作簿/映射, 分阶段计时
+     (open_template / read_data / prepare_slides / fill_placeholders / save_ppt),
+     再在多个并行数下计时完整的 run_processing, 结果写成 JSON.
+compare: 对比两份结果, 超过阈值的变慢项标记为 SLOWER, 有变慢时退出码为 1.
+
+用法(在仓库根目录):
+    python -m benchmarks.suite run --out bench_results.json
+    python -m benchmarks.suite run --quick --out current.json
+    python -m benchmarks.suite compare baseline.json current.json --threshold 0.15
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from io import BytesIO
+
+from benchmarks.fixtures import build_mappings, write_mappings, write_template, write_workbook
+from business_logic.processor import (
+    collect_data_request, fill_placeholders, prepare_slides
+)
+from data_access.excel_reader import ExcelDataProvider
+from ppt_engine.deck_manager import save_ppt
+from ppt_engine.template_cache import TemplateCache
+
+#: 单文件分阶段计时的场景.
+#: rows/cols/sheets: 工作簿规模; mapped_sheets: 映射用到的sheet数(其余为辅助sheet);
+#: slides/table_rows/table_cols: 模板规模; copy_every/table_every: 映射类型的混合比例.
+SCENARIOS = {
+    "baseline": dict(rows=20, cols=6, sheets=3, mapped_sheets=3, slides=10,
+                     table_rows=4, table_cols=6, copy_every=3, table_every=2),
+    "copy_heavy": dict(rows=300, cols=6, sheets=2, mapped_sheets=2, slides=6,
+                       table_rows=4, table_cols=6, copy_every=2, table_every=0),
+    "table_heavy": dict(rows=40, cols=8, sheets=2, mapped_sheets=2, slides=12,
+                        table_rows=41, table_cols=8, copy_every=0, table_every=1),
+    "wide": dict(rows=50, cols=40, sheets=2, mapped_sheets=2, slides=8,
+                 table_rows=4, table_cols=20, copy_every=4, table_every=2),
+    "helper_sheets": dict(rows=200, cols=10, sheets=20, mapped_sheets=2, slides=8,
+                          table_rows=6, table_cols=10, copy_every=0, table_every=2),
+    "many_slides": dict(rows=10, cols=6, sheets=3, mapped_sheets=3, slides=80,
+                        table_rows=4, table_cols=6, copy_every=5, table_every=3),
+}
+
+#: --quick 时只跑这些场景
+QUICK_SCENARIOS = ("baseline", "copy_heavy", "table_heavy")
+
+STAGES = ("open_template", "read_data", "prepare_slides", "fill_placeholders", "save_ppt")
+
+
+def generate_scenario(work_dir: str, name: str, params: dict, n_files: int = 1) -> dict:
+    """
+    在 work_dir/name 下生成一个场景的输入, 返回各路径.
+    """
+    scenario_dir = os.path.join(work_dir, name)
+    input_dir = os.path.join(scenario_dir, "input")
+    os.makedirs(input_dir)
+    template_path = os.path.join(scenario_dir, "template.pptx")
+    mappings_path = os.path.join(scenario_dir, "slide_mappings.json")
+    write_template(template_path, n_slides=params["slides"],
+                   table_rows=params["table_rows"], table_cols=params["table_cols"])
+    mappings = build_mappings(params["slides"], params["mapped_sheets"],
+                              copy_every=params["copy_every"], table_every=params["table_every"])
+    write_mappings(mappings_path, mappings)
+    first = os.path.join(input_dir, "book0000.xlsx")
+    write_workbook(first, n_rows=params["rows"], n_cols=params["cols"], n_sheets=params["sheets"])
+    for i in range(1, n_files):
+        shutil.copyfile(first, os.path.join(input_dir, f"book{i:04d}.xlsx"))
+    return {
+        "dir": scenario_dir,
+        "input_dir": input_dir,
+        "template": template_path,
+        "mappings_file": mappings_path,
+        "mappings": mappings,
+        "workbook": first,
+    }
+
+
+def time_stages(paths: dict, repeat: int) -> dict:
+    """
+    对单个文件逐阶段计时, 每个阶段取 repeat 次的中位数(秒).
+    模板缓存预热后再计时, 与批量运行时的稳态一致.
+    """
+    cache = TemplateCache()
+    cache.get(paths["template"])
+    index = cache.get_placeholder_index(paths["template"])
+    samples = {stage: [] for stage in STAGES}
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        prs = cache.get(paths["template"])
+        t1 = time.perf_counter()
+        sheets, columns = collect_data_request(prs, paths["mappings"], index)
+        all_data = ExcelDataProvider(paths["workbook"]).read_data(sheets=sheets, columns=columns)
+        t2 = time.perf_counter()
+        fill_plan = prepare_slides(prs, paths["mappings"], all_data)
+        t3 = time.perf_counter()
+        fill_placeholders(prs, fill_plan, all_data, index)
+        t4 = time.perf_counter()
+        save_ppt(prs, BytesIO(), template_path=paths["template"])
+        t5 = time.perf_counter()
+        for stage, seconds in zip(STAGES, (t1 - t0, t2 - t1, t3 - t2, t4 - t3, t5 - t4)):
+            samples[stage].append(seconds)
+    stages = {stage: statistics.median(values) for stage, values in samples.items()}
+    stages["total"] = sum(stages.values())
+    return stages
+
+
+def time_run_processing(paths: dict, workers: int, executor_mode: str) -> dict:
+    from client_gui.controller.processing_controller import run_processing
+
+    output_dir = os.path.join(paths["dir"], f"output_{executor_mode}_{workers}")
+    os.makedirs(output_dir)
+    start = time.perf_counter()
+    summary = run_processing(
+        template_path=paths["template"],
+        excel_dir=paths["input_dir"],
+        output_dir=output_dir,
+        slide_mappings_file=paths["mappings_file"],
+        max_workers=workers,
+        executor_mode=executor_mode,
+        incremental=False
+    )
+    seconds = time.perf_counter() - start
+    shutil.rmtree(output_dir, ignore_errors=True)
+    files = summary.total if summary else 0
+    return {"seconds": seconds, "files": files,
+            "files_per_sec": files / seconds if seconds else 0.0}
+
+
+def cmd_run(args) -> int:
+    names = QUICK_SCENARIOS if args.quick else tuple(SCENARIOS)
+    if args.scenario:
+        names = tuple(args.scenario)
+    repeat = 3 if args.quick else args.repeat
+
+    results = {
+        "meta": {
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "repeat": repeat,
+        },
+        "stages": {},
+        "run_processing": {},
+    }
+    work_dir = tempfile.mkdtemp(prefix="ppt_bench_suite_")
+    try:
+        for name in names:
+            params = SCENARIOS[name]
+            paths = generate_scenario(work_dir, name, params)
+            stages = time_stages(paths, repeat)
+            results["stages"][name] = {"params": params, "seconds": stages}
+            print(f"[{name}] " + " ".join(f"{k}={v * 1000:.1f}ms" for k, v in stages.items()),
+                  file=sys.stderr)
+
+        batch_params = SCENARIOS["baseline"]
+        paths = generate_scenario(work_dir, "batch", batch_params, n_files=args.files)
+        for mode in args.executor:
+            for workers in args.workers:
+                key = f"{mode}_w{workers}"
+                results["run_processing"][key] = time_run_processing(paths, workers, mode)
+                print(f"[run_processing {key}] "
+                      f"{results['run_processing'][key]['files_per_sec']:.1f} 文件/秒",
+                      file=sys.stderr)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+    print(f"结果已写入 {args.out}", file=sys.stderr)
+    return 0
+
+
+def _flatten(results: dict) -> dict:
+    """
+    结果 -> {指标名: 秒数}, 数值越大越慢.
+    """
+    metrics = {}
+    for name, entry in results.get("stages", {}).items():
+        for stage, seconds in entry["seconds"].items():
+            metrics[f"stages.{name}.{stage}"] = seconds
+    for key, entry in results.get("run_processing", {}).items():
+        metrics[f"run_processing.{key}"] = entry["seconds"]
+    return metrics
+
+
+def cmd_compare(args) -> int:
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = _flatten(json.load(f))
+    with open(args.current, "r", encoding="utf-8") as f:
+        current = _flatten(json.load(f))
+
+    regressions = 0
+    print(f"{'指标':<48} {'基线(ms)':>10} {'当前(ms)':>10} {'变化':>8}")
+    for metric in sorted(set(baseline) & set(current)):
+        base, cur = baseline[metric], current[metric]
+        # 极短的阶段噪声太大, 低于 min_ms 的不判定
+        if max(base, cur) * 1000 < args.min_ms:
+            flag = ""
+        elif base > 0 and cur / base > 1 + args.threshold:
+            flag = "SLOWER"
+            regressions += 1
+        elif base > 0 and cur / base < 1 - args.threshold:
+            flag = "faster"
+        else:
+            flag = ""
+        change = f"{(cur / base - 1) * 100:+.0f}%" if base > 0 else "n/a"
+        print(f"{metric:<48} {base * 1000:>10.1f} {cur * 1000:>10.1f} {change:>8} {flag}")
+
+    missing = sorted(set(baseline) - set(current))
+    if missing:
+        print(f"当前结果缺少 {len(missing)} 项: {', '.join(missing)}")
+    print(f"变慢 {regressions} 项 (阈值 {args.threshold:.0%})")
+    return 1 if regressions else 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="PPT 生成基准套件")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="运行基准并写出 JSON")
+    run.add_argument("--out", default="bench_results.json")
+    run.add_argument("--quick", action="store_true", help="只跑部分场景, 每项重复3次")
+    run.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), help="只跑指定场景")
+    run.add_argument("--repeat", type=int, default=5)
+    run.add_argument("--files", type=int, default=16, help="run_processing 计时的文件数")
+    run.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    run.add_argument("--executor", nargs="+", choices=("thread", "process"), default=["thread"])
+    run.set_defaults(func=cmd_run)
+
+    compare = sub.add_parser("compare", help="与基线结果对比")
+    compare.add_argument("baseline")
+    compare.add_argument("current")
+    compare.add_argument("--threshold", type=float, default=0.15, help="变慢判定阈值, 默认 15%%")
+    compare.add_argument("--min-ms", type=float, default=1.0, help="低于此耗时的指标不判定")
+    compare.set_defaults(func=cmd_compare)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,62 @@
+# business_logic/cancellation.py
+
+import threading
+from typing import Callable, List
+
+
+class ProcessingCancelled(Exception):
+    """
+    处理被取消(在阶段边界检查到取消请求).
+    """
+
+
+class CancellationToken:
+    """
+    协作式取消令牌: 由界面(停止按钮)或命令行(Ctrl+C)调用 cancel(),
+    处理流程在各阶段边界调用 raise_if_cancelled() 检查.
+
+    event 默认是 threading.Event; 进程池模式下传入 multiprocessing 的 Event,
+    工作进程用它构造自己的令牌.
+    """
+
+    def __init__(self, event=None):
+        self._event = event if event is not None else threading.Event()
+        self._callbacks: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    def cancel(self):
+        """
+        请求取消, 并依次调用已注册的回调(只调用一次).
+        """
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._event.set()
+            callbacks = list(self._callbacks)
+        for callback in callbacks:
+            callback()
+
+    def add_callback(self, callback: Callable[[], None]):
+        """
+        注册取消时调用的回调; 已取消时立即调用.
+        """
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise ProcessingCancelled("处理已取消")
+
+    def __getstate__(self):
+        # 跨进程只传递 event, 回调留在本进程
+        return {"event": self._event}
+
+    def __setstate__(self, state):
+        self.__init__(state["event"])
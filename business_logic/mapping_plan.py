@@ -0,0 +1,242 @@
+# business_logic/mapping_plan.py
+"""
+slide_mappings 的类型化模型与编译后的执行计划.
+
+slide_mappings.json 形如 {"3": {"sheet": "明细", "type": "table_row_template", "max_rows": 20}}:
+- 键: 模板中的幻灯片序号(从1开始);
+- sheet: 数据所在的sheet名, 必填;
+- type: "row"(默认, 一行数据填一整页) / "row_for_table_row"(多行数据填同一张表格)
+        / "table_row_template"(行模板表格, 见 processor.TABLE_ROW_TEMPLATE);
+- copy: 仅 type 为 "row" 时可用, true 表示每行数据复制一页;
+- max_rows: 仅行模板表格可用, 每页最多的数据行数(正整数).
+
+compile_mappings 每次运行只执行一次: 校验以上字段, 按幻灯片序号排好, 得到 MappingPlan;
+MappingPlan.check_template 再对照模板校验一次(幻灯片是否存在、行模板页是否有表格).
+每个文件只需 MappingPlan.prepare: 按各sheet的行数算出每个映射生成几页,
+以页数的前缀和得到每个映射在复制后的位置, 不再在每次复制后逐个调整后面映射的偏移.
+"""
+
+import os
+import threading
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from ppt_engine.deck_manager import copy_slide_after
+
+#: 一行数据填一整页(默认)
+ROW = "row"
+
+#: 多行数据填同一张表格(表格行数固定)
+ROW_FOR_TABLE_ROW = "row_for_table_row"
+
+#: 行模板表格: 表格第2行为行模板, 按数据行数复制该行;
+#: 映射中给出 max_rows 时, 每页最多 max_rows 行, 其余行放到复制出的续页上.
+TABLE_ROW_TEMPLATE = "table_row_template"
+
+#: 可用的映射类型
+MAPPING_TYPES = (ROW, ROW_FOR_TABLE_ROW, TABLE_ROW_TEMPLATE)
+
+
+class MappingError(ValueError):
+    """
+    映射配置不合法; problems 为全部问题(每条一行).
+    """
+
+    def __init__(self, problems: Sequence[str], source: Optional[str] = None):
+        self.problems = list(problems)
+        prefix = f"映射配置有误({source})" if source else "映射配置有误"
+        super().__init__(prefix + ":\n  " + "\n  ".join(self.problems))
+
+
+class SlideMappingEntry:
+    """
+    一张模板幻灯片的映射.
+    """
+
+    __slots__ = ("slide_no", "sheet", "type", "copy", "max_rows")
+
+    def __init__(self, slide_no: int, sheet: str, type: str = ROW, copy: bool = False,
+                 max_rows: Optional[int] = None):
+        self.slide_no = slide_no
+        self.sheet = sheet
+        self.type = type
+        self.copy = copy
+        self.max_rows = max_rows
+
+    def pages(self, n_rows: int) -> List[Tuple[int, int]]:
+        """
+        该映射在有 n_rows 行数据时生成的各页, 每页为数据行范围 (起, 止).
+        """
+        if self.type == TABLE_ROW_TEMPLATE:
+            if self.max_rows is None or n_rows <= self.max_rows:
+                return [(0, n_rows)]
+            return [(start, min(start + self.max_rows, n_rows))
+                    for start in range(0, n_rows, self.max_rows)]
+        if self.copy and n_rows > 1:
+            return [(i, i + 1) for i in range(n_rows)]
+        return [(0, n_rows)]
+
+    def to_dict(self) -> Dict[str, Any]:
+        cfg = {"sheet": self.sheet, "type": self.type}
+        if self.copy:
+            cfg["copy"] = True
+        if self.max_rows is not None:
+            cfg["max_rows"] = self.max_rows
+        return cfg
+
+    def __repr__(self):
+        return f"SlideMappingEntry({self.slide_no}, {self.to_dict()!r})"
+
+
+def _parse_entry(key, cfg, problems: List[str]) -> Optional[SlideMappingEntry]:
+    try:
+        slide_no = int(key)
+    except (TypeError, ValueError):
+        problems.append(f"键 {key!r}: 应为幻灯片序号(整数)")
+        return None
+    label = f"幻灯片{slide_no}"
+    if isinstance(key, bool) or slide_no < 1:
+        problems.append(f"{label}: 幻灯片序号应从1开始")
+        return None
+    if not isinstance(cfg, dict):
+        problems.append(f"{label}: 映射应为对象, 实际为 {type(cfg).__name__}")
+        return None
+
+    count = len(problems)
+    sheet = cfg.get("sheet")
+    if not isinstance(sheet, str) or not sheet:
+        problems.append(f"{label}: sheet 应为非空字符串: {sheet!r}")
+    data_type = cfg.get("type", ROW)
+    if data_type not in MAPPING_TYPES:
+        problems.append(f"{label}: 未知的 type {data_type!r}, 可选: {', '.join(MAPPING_TYPES)}")
+    copy = cfg.get("copy", False)
+    if not isinstance(copy, bool):
+        problems.append(f"{label}: copy 应为 true/false: {copy!r}")
+    elif copy and data_type != ROW:
+        problems.append(f"{label}: copy 只能用于 type 为 {ROW!r} 的映射")
+    max_rows = cfg.get("max_rows")
+    if max_rows is not None:
+        if data_type != TABLE_ROW_TEMPLATE:
+            problems.append(f"{label}: max_rows 只能用于 type 为 {TABLE_ROW_TEMPLATE!r} 的映射")
+        elif not isinstance(max_rows, int) or isinstance(max_rows, bool) or max_rows <= 0:
+            problems.append(f"{label}: max_rows 应为正整数: {max_rows!r}")
+    if len(problems) > count:
+        return None
+    return SlideMappingEntry(slide_no, sheet, data_type, copy, max_rows)
+
+
+def _has_table(slide) -> bool:
+    return any(getattr(shape, "has_table", False) and shape.has_table for shape in slide.shapes)
+
+
+class MappingPlan:
+    """
+    编译后的映射: entries 按幻灯片序号排序; sheets 为用到的sheet.
+    与模板无关, 可在线程/进程之间共用; 对照各模板的校验结果按模板文件缓存.
+    """
+
+    def __init__(self, entries: Sequence[SlideMappingEntry]):
+        self.entries = tuple(sorted(entries, key=lambda e: e.slide_no))
+        self.sheets = frozenset(entry.sheet for entry in self.entries)
+        self._template_checks: Dict[tuple, List[str]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def to_dict(self) -> Dict[int, Dict[str, Any]]:
+        return {entry.slide_no: entry.to_dict() for entry in self.entries}
+
+    def __getstate__(self):
+        return {"entries": self.entries}
+
+    def __setstate__(self, state):
+        self.__init__(state["entries"])
+
+    def template_problems(self, prs) -> List[str]:
+        """
+        对照模板(已打开的 Presentation)检查: 映射的幻灯片存在, 行模板页含表格.
+        """
+        slides = list(prs.slides)
+        problems = []
+        for entry in self.entries:
+            if entry.slide_no > len(slides):
+                problems.append(f"幻灯片{entry.slide_no}: 超出模板页数 {len(slides)}")
+            elif entry.type == TABLE_ROW_TEMPLATE and not _has_table(slides[entry.slide_no - 1]):
+                problems.append(f"幻灯片{entry.slide_no}: {TABLE_ROW_TEMPLATE} 需要模板页上有表格")
+        return problems
+
+    def check_template(self, template_path: str, prs):
+        """
+        对照模板校验, 有问题时抛出 MappingError.
+        同一模板文件(路径、修改时间、大小均相同)只检查一次.
+        """
+        st = os.stat(template_path)
+        key = (os.path.abspath(template_path), st.st_mtime_ns, st.st_size)
+        with self._lock:
+            problems = self._template_checks.get(key)
+        if problems is None:
+            problems = self.template_problems(prs)
+            with self._lock:
+                self._template_checks[key] = problems
+        if problems:
+            raise MappingError(problems, os.path.basename(template_path))
+
+    def prepare(self, prs, all_data: Mapping[str, Sequence]) -> List[dict]:
+        """
+        按数据行数复制幻灯片, 返回 fill_plan(每页一项, 按页序排列).
+        映射 i 复制后的位置 = 原序号 + 前面各映射新增的页数之和.
+        """
+        fill_plan = []
+        added = 0
+        for entry in self.entries:
+            pages = entry.pages(len(all_data.get(entry.sheet, ())))
+            real_idx = entry.slide_no + added
+            copies_needed = len(pages) - 1
+            if copies_needed:
+                copy_slide_after(prs, base_index=real_idx, count=copies_needed)
+            for i, (row_start, row_end) in enumerate(pages):
+                item = {
+                    "slide_index": real_idx + i,
+                    "template_slide": entry.slide_no,
+                    "sheet_name": entry.sheet,
+                    "type": entry.type,
+                    "row_data_index": row_start,
+                    "copy_mode": copies_needed > 0
+                }
+                if entry.type == TABLE_ROW_TEMPLATE:
+                    item["row_end"] = row_end
+                fill_plan.append(item)
+            added += copies_needed
+        return fill_plan
+
+
+def compile_mappings(slide_mappings: Mapping, source: Optional[str] = None) -> MappingPlan:
+    """
+    校验 slide_mappings({幻灯片序号: 映射}, 键可以是整数或数字字符串), 返回 MappingPlan;
+    有问题时抛出 MappingError, 列出全部问题. source 为出错信息中显示的来源(如文件名).
+    """
+    problems = []
+    entries = {}
+    for key, cfg in slide_mappings.items():
+        entry = _parse_entry(key, cfg, problems)
+        if entry is None:
+            continue
+        if entry.slide_no in entries:
+            problems.append(f"幻灯片{entry.slide_no}: 重复的映射")
+            continue
+        entries[entry.slide_no] = entry
+    if problems:
+        raise MappingError(problems, source)
+    return MappingPlan(list(entries.values()))
+
+
+def as_mapping_plan(slide_mappings) -> MappingPlan:
+    """
+    已编译的 MappingPlan 原样返回, 字典则编译.
+    """
+    if isinstance(slide_mappings, MappingPlan):
+        return slide_mappings
+    return compile_mappings(slide_mappings)
@@ -0,0 +1,333 @@
+# business_logic/metrics.py
+
+import os
+import time
+from typing import Dict, List, Optional
+
+#: 单个PPT的生成阶段, 顺序与 process_ppt_with_data 一致
+STAGES = ("open_template", "read_data", "prepare_slides", "fill_placeholders", "save")
+
+#: 单个PPT的计数器
+COUNTERS = ("rows_read", "slides_cloned", "placeholders_replaced", "output_bytes")
+
+#: 经数据缓存读取时(见 data_access.data_cache)额外累计的计数器
+DATA_CACHE_COUNTERS = ("data_cache_hits", "data_cache_misses", "data_cache_saved_ms")
+
+#: 汇总时输出的分位数
+QUANTILES = (0.5, 0.9, 0.99)
+
+#: Prometheus 文本文件名, 写在输出目录下
+PROMETHEUS_FILENAME = "ppt_generator_metrics.prom"
+
+
+class DeckMetrics:
+    """
+    单个PPT的分阶段耗时(秒)和计数器.
+    只含基本类型, 可在进程间传递.
+    """
+
+    def __init__(self):
+        self.stage_seconds: Dict[str, float] = {}
+        self.counters: Dict[str, int] = {name: 0 for name in COUNTERS}
+        self._stage_start = None
+
+    def start(self):
+        self._stage_start = time.perf_counter()
+
+    def lap(self, stage: str):
+        """
+        记录从上一次 start/lap 到现在的耗时, 作为 stage 的耗时.
+        """
+        now = time.perf_counter()
+        self.stage_seconds[stage] = self.stage_seconds.get(stage, 0.0) + (now - self._stage_start)
+        self._stage_start = now
+
+    def add(self, counter: str, value: int):
+        self.counters[counter] = self.counters.get(counter, 0) + value
+
+    def __getstate__(self):
+        return {"stage_seconds": self.stage_seconds, "counters": self.counters}
+
+    def __setstate__(self, state):
+        self.stage_seconds = state["stage_seconds"]
+        self.counters = state["counters"]
+        self._stage_start = None
+
+
+class ProgressSnapshot:
+    """
+    运行中某一时刻的进度(供界面显示, 只含基本类型):
+    done = 已生成 + 未变化跳过; total_known 为 False 时输入目录尚未扫描完, total 还会增长.
+    stage_means 为已完成文件各阶段的平均耗时(秒).
+    """
+
+    __slots__ = ("done", "failed", "cancelled", "total", "total_known", "elapsed",
+                 "files_per_second", "eta_seconds", "stage_means")
+
+    def __init__(self, done: int, failed: int, cancelled: int, total: int, total_known: bool,
+                 elapsed: float, files_per_second: float, eta_seconds: Optional[float],
+                 stage_means: Dict[str, float]):
+        self.done = done
+        self.failed = failed
+        self.cancelled = cancelled
+        self.total = total
+        self.total_known = total_known
+        self.elapsed = elapsed
+        self.files_per_second = files_per_second
+        self.eta_seconds = eta_seconds
+        self.stage_means = stage_means
+
+    @property
+    def finished(self) -> int:
+        return self.done + self.failed + self.cancelled
+
+    @property
+    def percentage(self) -> int:
+        percentage = int(self.finished / self.total * 100) if self.total else 0
+        # 总数尚未确定时不显示 100%
+        return percentage if self.total_known else min(percentage, 99)
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    """
+    最近秩法分位数, sorted_values 需已排序且非空.
+    """
+    rank = max(1, int(round(q * len(sorted_values) + 0.5 - 1e-9)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class RunStats:
+    """
+    一次 run_processing 的汇总统计:
+    - 文件数: total / processed / skipped / failed,
+      取消时另有 cancelled(已开始, 在阶段边界停止) / not_started(未开始);
+    - 各阶段耗时的分位数、总和;
+    - 计数器合计, 吞吐量(文件/秒).
+    """
+
+    def __init__(self, total: int = 0):
+        self.total = total
+        self.processed = 0
+        self.skipped = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.not_started = 0
+        self.was_cancelled = False
+        self.stage_samples: Dict[str, List[float]] = {stage: [] for stage in STAGES}
+        self.counters: Dict[str, int] = {name: 0 for name in COUNTERS}
+        self.started_at = time.perf_counter()
+        self.wall_seconds: Optional[float] = None
+        self._stage_totals: Dict[str, float] = {stage: 0.0 for stage in STAGES}
+
+    def record_deck(self, metrics: DeckMetrics):
+        self.processed += 1
+        for stage, seconds in metrics.stage_seconds.items():
+            self.stage_samples.setdefault(stage, []).append(seconds)
+            self._stage_totals[stage] = self._stage_totals.get(stage, 0.0) + seconds
+        for name, value in metrics.counters.items():
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def finish(self):
+        self.wall_seconds = time.perf_counter() - self.started_at
+
+    @property
+    def elapsed(self) -> float:
+        if self.wall_seconds is not None:
+            return self.wall_seconds
+        return time.perf_counter() - self.started_at
+
+    @property
+    def files_per_second(self) -> float:
+        elapsed = self.elapsed
+        return self.processed / elapsed if elapsed > 0 else 0.0
+
+    def snapshot(self, total_known: bool = True) -> ProgressSnapshot:
+        """
+        当前进度. 速度按已生成和失败的文件计(跳过的文件几乎不耗时), 剩余时间按该速度估计;
+        还没有文件完成时 eta_seconds 为 None. 不排序样本, 每个文件完成后调用也很便宜.
+        """
+        elapsed = self.elapsed
+        worked = self.processed + self.failed
+        rate = worked / elapsed if elapsed > 0 else 0.0
+        finished = self.processed + self.skipped + self.failed + self.cancelled + self.not_started
+        remaining = max(self.total - finished, 0)
+        eta = remaining / rate if rate > 0 else None
+        stage_means = {stage: total / self.processed for stage, total in self._stage_totals.items()
+                       if self.processed}
+        return ProgressSnapshot(self.processed + self.skipped, self.failed,
+                                self.cancelled + self.not_started, self.total, total_known,
+                                elapsed, rate, eta, stage_means)
+
+    @property
+    def data_cache_hit_rate(self) -> Optional[float]:
+        """
+        数据缓存命中率, 未经缓存读取时为 None.
+        """
+        hits = self.counters.get("data_cache_hits", 0)
+        lookups = hits + self.counters.get("data_cache_misses", 0)
+        return hits / lookups if lookups else None
+
+    def stage_summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        {阶段: {"count", "sum", "p50", "p90", "p99", "max"}}, 没有样本的阶段省略.
+        """
+        summary = {}
+        for stage, samples in self.stage_samples.items():
+            if not samples:
+                continue
+            ordered = sorted(samples)
+            entry = {"count": len(ordered), "sum": sum(ordered), "max": ordered[-1]}
+            for q in QUANTILES:
+                entry[f"p{int(q * 100)}"] = _percentile(ordered, q)
+            summary[stage] = entry
+        return summary
+
+    def to_dict(self) -> dict:
+        return {
+            "total": self.total,
+            "processed": self.processed,
+            "skipped": self.skipped,
+            "failed": self.failed,
+            "cancelled": self.cancelled,
+            "not_started": self.not_started,
+            "was_cancelled": self.was_cancelled,
+            "wall_seconds": self.elapsed,
+            "files_per_second": self.files_per_second,
+            "stages": self.stage_summary(),
+            "counters": dict(self.counters),
+            "data_cache_hit_rate": self.data_cache_hit_rate,
+        }
+
+    def format_summary(self) -> str:
+        """
+        给日志窗口看的简短汇总.
+        """
+        lines = [f"吞吐量: {self.files_per_second:.2f} 文件/秒, 总耗时 {self.elapsed:.2f}s"]
+        for stage, entry in self.stage_summary().items():
+            lines.append(
+                f"  {stage}: p50={entry['p50'] * 1000:.1f}ms "
+                f"p90={entry['p90'] * 1000:.1f}ms max={entry['max'] * 1000:.1f}ms"
+            )
+        lines.append("  " + ", ".join(f"{k}={v}" for k, v in self.counters.items()
+                                      if k not in DATA_CACHE_COUNTERS))
+        hit_rate = self.data_cache_hit_rate
+        if hit_rate is not None:
+            hits = self.counters.get("data_cache_hits", 0)
+            lookups = hits + self.counters.get("data_cache_misses", 0)
+            saved = self.counters.get("data_cache_saved_ms", 0) / 1000
+            lines.append(f"  数据缓存: 命中 {hits}/{lookups} ({hit_rate:.0%}), 节省读取 {saved:.2f}s")
+        return "\n".join(lines)
+
+    def to_prometheus(self, prefix: str = "ppt_generator") -> str:
+        """
+        Prometheus 文本格式(可供 node_exporter textfile collector 采集).
+        """
+        lines = [
+            f"# HELP {prefix}_files Files in the last run by outcome.",
+            f"# TYPE {prefix}_files gauge",
+        ]
+        for outcome in ("total", "processed", "skipped", "failed", "cancelled", "not_started"):
+            lines.append(f'{prefix}_files{{outcome="{outcome}"}} {getattr(self, outcome)}')
+
+        lines += [
+            f"# HELP {prefix}_run_duration_seconds Wall time of the last run.",
+            f"# TYPE {prefix}_run_duration_seconds gauge",
+            f"{prefix}_run_duration_seconds {self.elapsed:.6f}",
+            f"# HELP {prefix}_files_per_second Generated decks per second in the last run.",
+            f"# TYPE {prefix}_files_per_second gauge",
+            f"{prefix}_files_per_second {self.files_per_second:.6f}",
+            f"# HELP {prefix}_stage_seconds Per-deck time spent in each generation stage.",
+            f"# TYPE {prefix}_stage_seconds summary",
+        ]
+        for stage, entry in self.stage_summary().items():
+            for q in QUANTILES:
+                value = entry[f"p{int(q * 100)}"]
+                lines.append(f'{prefix}_stage_seconds{{stage="{stage}",quantile="{q}"}} {value:.6f}')
+            lines.append(f'{prefix}_stage_seconds_sum{{stage="{stage}"}} {entry["sum"]:.6f}')
+            lines.append(f'{prefix}_stage_seconds_count{{stage="{stage}"}} {entry["count"]}')
+
+        for name, value in self.counters.items():
+            lines += [
+                f"# HELP {prefix}_{name}_total Sum of {name} over decks in the last run.",
+                f"# TYPE {prefix}_{name}_total counter",
+                f"{prefix}_{name}_total {value}",
+            ]
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, output_dir: str) -> str:
+        """
+        原子写入 output_dir/ppt_generator_metrics.prom, 返回文件路径.
+        """
+        path = os.path.join(output_dir, PROMETHEUS_FILENAME)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp_path, path)
+        return path
+
+
+#: LatencyHistogram 默认的桶上界(秒)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class LatencyHistogram:
+    """
+    固定桶的耗时直方图, 用于长期运行的服务(样本数不随请求数增长).
+    分位数取所在桶的上界, 超出最大桶时为 +Inf.
+    非线程安全, 由调用方加锁.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.bucket_counts = [0] * (len(self.buckets) + 1)  # 最后一个为 +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds: float):
+        i = 0
+        while i < len(self.buckets) and seconds > self.buckets[i]:
+            i += 1
+        self.bucket_counts[i] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = max(1, int(round(q * self.count + 0.5 - 1e-9)))
+        seen = 0
+        for i, n in enumerate(self.bucket_counts):
+            seen += n
+            if seen >= rank:
+                return self.buckets[i] if i < len(self.buckets) else float("inf")
+        return float("inf")
+
+    def to_dict(self) -> dict:
+        """
+        {"count", "sum", "buckets": {上界: 累计个数, ..., "+Inf": count}, "p50", "p90", "p99"}
+        分位数超出最大桶时为 None(JSON 中没有无穷大).
+        """
+        cumulative = {}
+        seen = 0
+        for bound, n in zip(self.buckets + (None,), self.bucket_counts):
+            seen += n
+            cumulative["+Inf" if bound is None else f"{bound:g}"] = seen
+        result = {"count": self.count, "sum": self.sum, "buckets": cumulative}
+        for q in QUANTILES:
+            value = self.quantile(q)
+            result[f"p{int(q * 100)}"] = None if value == float("inf") else value
+        return result
+
+    def prometheus_lines(self, name: str, labels: str = "") -> List[str]:
+        """
+        Prometheus histogram 的 _bucket/_sum/_count 行(不含 HELP/TYPE).
+        labels 形如 'stage="save"', 会与 le 标签合并.
+        """
+        sep = "," if labels else ""
+        lines = []
+        for bound, cumulative in self.to_dict()["buckets"].items():
+            lines.append(f'{name}_bucket{{{labels}{sep}le="{bound}"}} {cumulative}')
+        suffix = f"{{{labels}}}" if labels else ""
+        lines.append(f"{name}_sum{suffix} {self.sum:.6f}")
+        lines.append(f"{name}_count{suffix} {self.count}")
+        return lines
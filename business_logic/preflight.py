@@ -0,0 +1,291 @@
+# business_logic/preflight.py
+"""
+生成前的批量预检(run_processing(preflight=True)).
+
+只读每个输入文件的元数据(sheet 名、表头宽度、行数, 见 BaseDataProvider.describe),
+不解析单元格、不打开模板副本、不写任何输出, 对照编译后的映射和模板占位符逐个文件检查:
+- 错误: 映射用到的 sheet 不存在; 占位符引用的列超出 sheet 的列数(会显示为"未知");
+  文件无法读取; 所用模板与映射不符;
+- 警告: 映射用到的 sheet 没有数据行.
+同时按行数算出每个文件将生成的幻灯片页数, 并用 CostModel 估计生成耗时.
+
+行数多为估计值(Excel 取 dimension, CSV 按换行数), 只影响页数和耗时的估计, 不影响检查结果.
+"""
+
+import os
+import re
+import time
+from typing import Dict, List, Mapping, Optional, Set
+
+from openpyxl.utils import column_index_from_string
+
+from business_logic.mapping_plan import MappingPlan
+from business_logic.metrics import PROMETHEUS_FILENAME, STAGES
+from data_access.base_provider import SheetInfo
+from ppt_engine.placeholders import PlaceholderIndex
+
+#: 引用数据列的占位符, 如 "[A]" / "[AB]"; 其他占位符(如 "[名称]")总是显示为"未知"
+COLUMN_PLACEHOLDER = re.compile(r"\[([A-Z]{1,3})\]")
+
+#: Excel 的最大列数
+_MAX_COLUMN = 16384
+
+
+def placeholder_column(key: str) -> Optional[int]:
+    """
+    占位符引用的 1-based 列号, 不是列引用时返回 None.
+    """
+    match = COLUMN_PLACEHOLDER.fullmatch(key)
+    if not match:
+        return None
+    col_idx = column_index_from_string(match.group(1))
+    return col_idx if col_idx <= _MAX_COLUMN else None
+
+
+class CostModel:
+    """
+    单个文件生成耗时的粗略估计:
+        deck_seconds + 读取的数据行数 x row_seconds + 复制的页数 x slide_seconds
+    默认值在单核上用 benchmarks.fixtures 的样例测得; 有上次运行的指标文件时用 from_metrics 校准.
+    """
+
+    def __init__(self, deck_seconds: float = 0.02, row_seconds: float = 0.000014,
+                 slide_seconds: float = 0.0014):
+        self.deck_seconds = deck_seconds
+        self.row_seconds = row_seconds
+        self.slide_seconds = slide_seconds
+
+    def estimate(self, rows_read: int, slides_cloned: int) -> float:
+        return self.deck_seconds + rows_read * self.row_seconds + slides_cloned * self.slide_seconds
+
+    @classmethod
+    def from_metrics(cls, output_dir: str) -> "CostModel":
+        """
+        用输出目录中上次运行的指标文件(ppt_generator_metrics.prom)校准: 按上次实际的各阶段总耗时
+        与本模型对同样工作量(文件数、读取行数、复制页数)的估计之比, 等比例缩放三项系数.
+        只按比例缩放, 小批量的样本也不会把固定开销错算到每行上. 文件不存在或没有数据时返回默认模型.
+        """
+        model = cls()
+        values = _read_prometheus(os.path.join(output_dir, PROMETHEUS_FILENAME))
+        decks = values.get('ppt_generator_stage_seconds_count{stage="open_template"}', 0)
+        if not decks:
+            return model
+        actual = sum(values.get(f'ppt_generator_stage_seconds_sum{{stage="{stage}"}}', 0.0)
+                     for stage in STAGES)
+        predicted = (decks * model.deck_seconds
+                     + values.get("ppt_generator_rows_read_total", 0) * model.row_seconds
+                     + values.get("ppt_generator_slides_cloned_total", 0) * model.slide_seconds)
+        if actual > 0 and predicted > 0:
+            scale = actual / predicted
+            model = cls(model.deck_seconds * scale, model.row_seconds * scale, model.slide_seconds * scale)
+        return model
+
+    def __repr__(self):
+        return (f"CostModel(deck={self.deck_seconds * 1000:.1f}ms, row={self.row_seconds * 1e6:.1f}us, "
+                f"slide={self.slide_seconds * 1000:.2f}ms)")
+
+
+def _read_prometheus(path: str) -> Dict[str, float]:
+    values = {}
+    try:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("#"):
+                    continue
+                name, _, value = line.rstrip("\n").rpartition(" ")
+                try:
+                    values[name] = float(value)
+                except ValueError:
+                    continue
+    except OSError:
+        pass
+    return values
+
+
+class TemplateInfo:
+    """
+    预检用到的模板信息: 页数、各映射页上的占位符, 以及模板与映射不符的问题.
+    """
+
+    def __init__(self, path: str, n_slides: int, slide_keys: Dict[int, Set[str]],
+                 problems: List[str], warnings: List[str]):
+        self.path = path
+        self.n_slides = n_slides
+        self.slide_keys = slide_keys
+        self.problems = problems
+        self.warnings = warnings
+
+
+def inspect_template(path: str, prs, placeholder_index: PlaceholderIndex,
+                     plan: MappingPlan) -> TemplateInfo:
+    """
+    对照映射检查模板(已打开的 Presentation 及其占位符索引), 不修改 prs.
+    """
+    slide_keys = {entry.slide_no: placeholder_index.keys_for_slide(entry.slide_no) for entry in plan}
+    warnings = []
+    for slide_no, keys in slide_keys.items():
+        named = sorted(key for key in keys if placeholder_column(key) is None)
+        if named:
+            warnings.append(f"幻灯片{slide_no}: 占位符 {', '.join(named)} 不是列引用, 将显示为\"未知\"")
+    return TemplateInfo(path, len(prs.slides), slide_keys, plan.template_problems(prs), warnings)
+
+
+class FilePreflight:
+    """
+    单个输入文件的预检结果. rows 为各映射sheet的行数, rows_exact 为 False 时页数和耗时是估计值.
+    """
+
+    def __init__(self, file: str, template: str):
+        self.file = file
+        self.template = template
+        self.errors: List[str] = []
+        self.warnings: List[str] = []
+        self.rows: Dict[str, int] = {}
+        self.rows_exact = True
+        self.expected_slides = 0
+        self.estimated_seconds = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+    def to_dict(self) -> dict:
+        return {
+            "file": self.file,
+            "template": self.template,
+            "ok": self.ok,
+            "errors": self.errors,
+            "warnings": self.warnings,
+            "rows": self.rows,
+            "rows_exact": self.rows_exact,
+            "expected_slides": self.expected_slides,
+            "estimated_seconds": round(self.estimated_seconds, 4),
+        }
+
+
+def check_file(result: FilePreflight, sheets: Mapping[str, SheetInfo], plan: MappingPlan,
+               template: TemplateInfo, cost_model: CostModel) -> FilePreflight:
+    """
+    对照映射和模板检查一个文件的 sheet 信息, 填写 result 并返回.
+    """
+    if template.problems:
+        result.errors.append(f"模板 {os.path.basename(template.path)} 与映射不符"
+                             f"({len(template.problems)} 个问题)")
+
+    missing: Dict[str, List[int]] = {}
+    for entry in plan:
+        info = sheets.get(entry.sheet)
+        if info is None:
+            missing.setdefault(entry.sheet, []).append(entry.slide_no)
+            continue
+        beyond = sorted((key for key in template.slide_keys.get(entry.slide_no, ())
+                         if (placeholder_column(key) or 0) > info.n_cols),
+                        key=placeholder_column)
+        if beyond:
+            result.errors.append(f"幻灯片{entry.slide_no}: sheet {entry.sheet!r} 只有 {info.n_cols} 列, "
+                                 f"占位符 {', '.join(beyond)} 将显示为\"未知\"")
+    for sheet_name, slide_nos in missing.items():
+        result.errors.append(f"缺少sheet {sheet_name!r}(幻灯片 {', '.join(map(str, slide_nos))})")
+
+    for sheet_name in sorted(plan.sheets):
+        info = sheets.get(sheet_name)
+        if info is None:
+            continue
+        result.rows[sheet_name] = info.n_rows
+        result.rows_exact = result.rows_exact and info.rows_exact
+        if info.n_rows == 0:
+            result.warnings.append(f"sheet {sheet_name!r} 没有数据行")
+
+    added = 0
+    for entry in plan:
+        if entry.slide_no <= template.n_slides:
+            added += len(entry.pages(result.rows.get(entry.sheet, 0))) - 1
+    result.expected_slides = template.n_slides + added
+    result.estimated_seconds = cost_model.estimate(sum(result.rows.values()), added)
+    return result
+
+
+class PreflightReport:
+    """
+    一次预检的汇总: 每个文件的结果、各模板的问题, 以及合计页数和估计耗时.
+    """
+
+    def __init__(self, workers: int = 1, cost_model: Optional[CostModel] = None):
+        self.workers = max(workers, 1)
+        self.cost_model = cost_model or CostModel()
+        self.files: List[FilePreflight] = []
+        self.templates: Dict[str, TemplateInfo] = {}
+        self.cancelled = False
+        self._start = time.perf_counter()
+        self.elapsed = 0.0
+
+    def add(self, result: FilePreflight):
+        self.files.append(result)
+
+    def finish(self):
+        self.files.sort(key=lambda r: r.file)
+        self.elapsed = time.perf_counter() - self._start
+
+    @property
+    def problem_files(self) -> List[FilePreflight]:
+        return [r for r in self.files if not r.ok]
+
+    @property
+    def template_problems(self) -> Dict[str, List[str]]:
+        return {path: info.problems for path, info in self.templates.items() if info.problems}
+
+    @property
+    def ok(self) -> bool:
+        return not self.problem_files and not self.template_problems and not self.cancelled
+
+    @property
+    def expected_slides(self) -> int:
+        return sum(r.expected_slides for r in self.files)
+
+    @property
+    def estimated_seconds(self) -> float:
+        """
+        按 workers 个并行单位均摊后的估计总耗时.
+        """
+        return sum(r.estimated_seconds for r in self.files) / self.workers
+
+    def format_summary(self, max_files: int = 20) -> str:
+        lines = [f"预检: {len(self.files)} 个文件, 有问题 {len(self.problem_files)} 个, "
+                 f"用时 {self.elapsed:.2f}s"]
+        for path, info in self.templates.items():
+            for problem in info.problems:
+                lines.append(f"  模板 {os.path.basename(path)}: {problem}")
+            for warning in info.warnings:
+                lines.append(f"  模板 {os.path.basename(path)}(警告): {warning}")
+        shown = 0
+        for result in self.files:
+            if not result.errors and not result.warnings:
+                continue
+            if shown == max_files:
+                lines.append("  ... 其余有问题或警告的文件见完整报告")
+                break
+            shown += 1
+            for error in result.errors:
+                lines.append(f"  {result.file}: {error}")
+            for warning in result.warnings:
+                lines.append(f"  {result.file}(警告): {warning}")
+        approx = "" if all(r.rows_exact for r in self.files) else "约 "
+        lines.append(f"  预计生成 {approx}{self.expected_slides} 页, "
+                     f"{self.workers} 个并行单位约需 {self.estimated_seconds:.1f}s ({self.cost_model!r})")
+        return "\n".join(lines)
+
+    def to_dict(self) -> dict:
+        return {
+            "ok": self.ok,
+            "files_total": len(self.files),
+            "files_with_problems": len(self.problem_files),
+            "cancelled": self.cancelled,
+            "expected_slides": self.expected_slides,
+            "estimated_seconds": round(self.estimated_seconds, 3),
+            "workers": self.workers,
+            "elapsed_seconds": round(self.elapsed, 4),
+            "template_problems": self.template_problems,
+            "template_warnings": {path: info.warnings for path, info in self.templates.items()
+                                  if info.warnings},
+            "files": [r.to_dict() for r in self.files],
+        }
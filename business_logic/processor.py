@@ -1,91 +1,170 @@
 # business_logic/processor.py
 
-from typing import Dict, List, Any
-from ppt_engine.deck_manager import open_ppt, save_ppt, close_ppt, copy_slide_after
+import os
+from typing import Dict, List, Any, Optional, Set, Tuple, Union
+from ppt_engine.deck_manager import open_ppt, save_ppt, close_ppt
+from ppt_engine.template_cache import TemplateCache, get_template_cache
+from ppt_engine.placeholders import PlaceholderIndex, collect_slide_placeholders
 from ppt_engine.slide_handler import fill_table_with_rows, fill_table_with_single_dict
+from ppt_engine.xml_fill import (
+    fill_slide_rows_xml, fill_slide_single_xml, fill_table_row_template_xml,
+    row_template_positional_keys
+)
+from business_logic.cancellation import CancellationToken
+from business_logic.mapping_plan import MappingPlan, TABLE_ROW_TEMPLATE, as_mapping_plan
+from business_logic.metrics import DeckMetrics
+
+#: 生成引擎版本. 修改会影响输出内容的逻辑时递增,
+#: 增量构建据此判断旧输出是否仍然可用.
+ENGINE_VERSION = "3"
+
+#: 可选的占位符填充引擎, 输出完全相同:
+#: - "pptx": 经 python-pptx 形状对象模型(slide_handler), 默认;
+#: - "lxml": 直接在幻灯片 XML 上用预编译 XPath 替换(xml_fill), 表格多时更快.
+FILL_ENGINES = ("pptx", "lxml")
 
 def process_ppt_with_data(template_path: str, output_path: str, data_provider,
-                          slide_mappings: Dict[int, Dict[str, Any]]):
+                          slide_mappings: Union[MappingPlan, Dict[int, Dict[str, Any]]],
+                          template_cache: Optional[TemplateCache] = None,
+                          cancel_token: Optional[CancellationToken] = None,
+                          engine: str = "pptx") -> DeckMetrics:
     """
     两阶段：
       1) prepare_slides -> 先复制所有需要多份的幻灯片
       2) fill_placeholders -> 再统一占位符替换
-    """
-    # 1. 打开PPT模板
-    prs = open_ppt(template_path)
 
-    # 2. 读取Excel数据
-    all_data = data_provider.read_data()
+    模板从 template_cache(默认为进程内共享缓存) 取私有副本,
+    同一模板只解析一次; 模板的占位符索引也只分析一次.
+
+    slide_mappings 可以是已编译的 MappingPlan(每次运行编译一次, 见 mapping_plan),
+    映射对照模板的校验每个模板只做一次, 不通过时抛出 MappingError;
+    也可以是映射字典, 此时每次调用都重新编译和校验.
+
+    返回 DeckMetrics: 各阶段耗时, 以及读取行数/复制页数/替换占位符数/输出字节数.
+    data_provider.read_stats() 的计数(如数据缓存命中)一并计入.
+
+    cancel_token 被取消时, 在下一个阶段开始前抛出 ProcessingCancelled;
+    保存中途出错时删除写了一半的输出文件.
+
+    engine 选择占位符填充引擎, 见 FILL_ENGINES.
+    """
+    if engine not in FILL_ENGINES:
+        raise ValueError(f"未知的填充引擎: {engine}, 可选: {', '.join(FILL_ENGINES)}")
+    check_cancelled = cancel_token.raise_if_cancelled if cancel_token is not None else lambda: None
+    plan = as_mapping_plan(slide_mappings)
+    metrics = DeckMetrics()
+    metrics.start()
+
+    # 1. 打开PPT模板(从缓存取副本)
+    check_cancelled()
+    cache = template_cache if template_cache is not None else get_template_cache()
+    prs = cache.get(template_path)
+    placeholder_index = cache.get_placeholder_index(template_path)
+    plan.check_template(template_path, prs)
+    metrics.lap("open_template")
+
+    # 2. 读取Excel数据(只读映射用到的sheet, 以及模板中出现的列)
+    check_cancelled()
+    sheets, columns = collect_data_request(prs, plan, placeholder_index)
+    all_data = data_provider.read_data(sheets=sheets, columns=columns)
+    metrics.add("rows_read", sum(len(rows) for rows in all_data.values()))
+    for name, value in data_provider.read_stats().items():
+        metrics.add(name, value)
+    metrics.lap("read_data")
 
     # 3. 幻灯片布局(复制)
-    fill_plan = prepare_slides(prs, slide_mappings, all_data)
+    check_cancelled()
+    n_slides = len(prs.slides)
+    fill_plan = plan.prepare(prs, all_data)
+    metrics.add("slides_cloned", len(prs.slides) - n_slides)
+    metrics.lap("prepare_slides")
 
     # 4. 填充占位符
-    fill_placeholders(prs, fill_plan, all_data)
+    check_cancelled()
+    metrics.add("placeholders_replaced",
+                fill_placeholders(prs, fill_plan, all_data, placeholder_index, engine))
+    metrics.lap("fill_placeholders")
 
     # 5. 保存&关闭
-    save_ppt(prs, output_path)
+    check_cancelled()
+    try:
+        # 未复制/填充过的部件(版式/母版/图片/媒体等)直接复用模板中已压缩的数据
+        save_ppt(prs, output_path, template_path=template_path,
+                 dirty_parts=touched_slide_parts(prs, fill_plan))
+    except BaseException:
+        _remove_partial_output(output_path)
+        raise
+    metrics.lap("save")
+    if isinstance(output_path, str):
+        metrics.add("output_bytes", os.path.getsize(output_path))
+    return metrics
+
+def _remove_partial_output(output_path):
+    if isinstance(output_path, str) and os.path.exists(output_path):
+        try:
+            os.remove(output_path)
+        except OSError:
+            pass
+
+def touched_slide_parts(prs, fill_plan: List[dict]) -> Set:
+    """
+    fill_plan 涉及的幻灯片部件(复制出的副本和被填充的原页); 其余幻灯片与模板相同.
+    """
+    slides = prs.slides
+    return {slides[item["slide_index"] - 1].part for item in fill_plan
+            if 0 < item["slide_index"] <= len(slides)}
 
-def prepare_slides(prs, slide_mappings: Dict[int, dict], all_data: dict) -> List[dict]:
+def collect_data_request(prs, slide_mappings: Union[MappingPlan, Dict[int, dict]],
+                         placeholder_index: Optional[PlaceholderIndex] = None
+                         ) -> Tuple[Set[str], Dict[str, Set[str]]]:
     """
-    跟原先一样: 根据 slide_mappings 先复制需要多份的幻灯片
-    并返回 fill_plan
+    根据映射和模板占位符, 算出需要读取的 sheet 集合,
+    以及每个 sheet 需要的列 {sheet: {"[A]", ...}}.
+    一个 sheet 的列 = 映射到该 sheet 的所有幻灯片上出现的占位符,
+    行模板页上按列位置填充的表格(模板行没有占位符)另需该表格宽度内的各列.
+    有 placeholder_index 时直接使用, 否则扫描 prs.
     """
-    fill_plan = []
-    sorted_keys = sorted(slide_mappings.keys())
-
-    # offset_map 维护复制时的索引偏移
-    offset_map = {k: k for k in sorted_keys}
-
-    # python-pptx slides[] 是 0-based,
-    # 但你原先映射中 slide_idx 是 1-based.
-    # => 我们会在 fill_placeholders 里做 "slides[idx-1]"
-    for k in sorted_keys:
-        cfg = slide_mappings[k]
-        sheet_name = cfg.get("sheet")
-        data_type  = cfg.get("type")
-        do_copy    = cfg.get("copy", False)
-        data_rows  = all_data.get(sheet_name, [])
-        n_rows     = len(data_rows)
-
-        real_idx = offset_map[k]
-
-        if not do_copy or n_rows <= 1:
-            # 不复制 or 只有1行 => 只用一张
-            fill_plan.append({
-                "slide_index": real_idx,
-                "sheet_name": sheet_name,
-                "type": data_type,
-                "row_data_index": 0,
-                "copy_mode": False
-            })
-        else:
-            # 需要复制 => n_rows多张
-            copies_needed = n_rows - 1
-            copy_slide_after(prs, base_index=real_idx, count=copies_needed)
-            # 更新 offset_map
-            for other_k in sorted_keys:
-                if other_k >= k and other_k != k:
-                    offset_map[other_k] += copies_needed
-            # 记录 fill_plan
-            for i in range(n_rows):
-                fill_plan.append({
-                    "slide_index": real_idx + i,
-                    "sheet_name": sheet_name,
-                    "type": data_type,
-                    "row_data_index": i,
-                    "copy_mode": True
-                })
-
-    return fill_plan
-
-def fill_placeholders(prs, fill_plan: List[dict], all_data: dict):
+    if placeholder_index is not None:
+        slide_keys = placeholder_index.keys_for_slide
+    else:
+        slide_placeholders = collect_slide_placeholders(prs)
+        slide_keys = lambda idx: slide_placeholders.get(idx, set())
+    plan = as_mapping_plan(slide_mappings)
+    sheets = set(plan.sheets)
+    columns = {}
+    slides = prs.slides
+    for entry in plan:
+        keys = columns.setdefault(entry.sheet, set())
+        keys.update(slide_keys(entry.slide_no))
+        if entry.type == TABLE_ROW_TEMPLATE and entry.slide_no <= len(slides):
+            keys.update(row_template_positional_keys(slides[entry.slide_no - 1]))
+    return sheets, columns
+
+def prepare_slides(prs, slide_mappings: Union[MappingPlan, Dict[int, dict]],
+                   all_data: dict) -> List[dict]:
+    """
+    根据映射先复制需要多份的幻灯片, 返回 fill_plan(见 MappingPlan.prepare).
+    """
+    return as_mapping_plan(slide_mappings).prepare(prs, all_data)
+
+def fill_placeholders(prs, fill_plan: List[dict], all_data: dict,
+                      placeholder_index: Optional[PlaceholderIndex] = None,
+                      engine: str = "pptx") -> int:
     """
     复制完后, 幻灯片数量和顺序已固定
     我们遍历 fill_plan,
     对 slide_index 那张幻灯片做替换
+
+    有 placeholder_index 时, 没有占位符的幻灯片整张跳过,
+    其余幻灯片只访问索引记录的形状/单元格/run.
+    engine="lxml" 时直接在幻灯片 XML 上替换(见 xml_fill), 结果相同.
+    all_data 中每个sheet可以是行字典列表或 SheetTable, 结果相同.
+    返回替换的占位符总数.
     """
+    use_xml = engine == "lxml"
+    replaced = 0
     fill_plan_sorted = sorted(fill_plan, key=lambda x: x["slide_index"])
+    slides = list(prs.slides)
 
     for item in fill_plan_sorted:
         idx        = item["slide_index"]  # 1-based
@@ -96,15 +175,32 @@ def fill_placeholders(prs, fill_plan: List[dict], all_data: dict):
         data_rows  = all_data.get(sheet_name, [])
 
         # python-pptx slides是0-based => slides[idx-1]
-        if (idx-1) < 0 or (idx-1) >= len(prs.slides):
+        if (idx-1) < 0 or (idx-1) >= len(slides):
             print(f"[fill_placeholders] 幻灯片索引{idx}超范围, 跳过.")
             continue
 
-        slide = prs.slides[idx - 1]
-        if data_type == "row_for_table_row":
+        slide_entry = None
+        if placeholder_index is not None:
+            slide_entry = placeholder_index.for_slide(item.get("template_slide", idx))
+            if slide_entry is None and data_type != TABLE_ROW_TEMPLATE:
+                # 该页没有占位符(行模板页仍需展开表格行, 可能按列位置填充)
+                continue
+
+        slide = slides[idx - 1]
+        if data_type == TABLE_ROW_TEMPLATE:
+            # 需要增加表格行, 两种引擎都在 XML 层面处理
+            replaced += fill_table_row_template_xml(slide, data_rows[row_i:item["row_end"]])
+        elif data_type == "row_for_table_row":
             # => 多行 => 同一张
-            fill_table_with_rows(slide, data_rows)
+            if use_xml:
+                replaced += fill_slide_rows_xml(slide, data_rows)
+            else:
+                replaced += fill_table_with_rows(slide, data_rows, slide_entry)
         else:
             # => 一行 => 整张
             row_data = data_rows[row_i] if 0 <= row_i < len(data_rows) else {}
-            fill_table_with_single_dict(slide, row_data)
\ No newline at end of file
+            if use_xml:
+                replaced += fill_slide_single_xml(slide, row_data)
+            else:
+                replaced += fill_table_with_single_dict(slide, row_data, slide_entry)
+    return replaced
@@ -0,0 +1,233 @@
+"""
+命令行入口(无界面), 供定时任务/容器使用。
+这条路径上不会导入 PyQt5, 也不需要显示环境。
+
+用法(在仓库根目录):
+    python -m client_gui.cli_main -t 模板.pptx -i Excel目录 -o 输出目录 \\
+        [-m slide_mappings.json] [-w 8] [--executor process]
+
+结束时向标准输出打印一行 JSON 汇总, 日志写到标准错误。
+--preflight 只做预检, 不生成PPT: JSON 中为每个文件的问题、预计页数和耗时,
+有问题时退出码为 1。
+Ctrl+C(SIGINT) 请求协作式取消: 未开始的文件不再处理, 正在处理的文件在阶段边界停止,
+此时退出码为 130。
+"""
+import time
+
+_START = time.perf_counter()
+
+import sys
+import json
+import signal
+import logging
+import argparse
+import contextlib
+
+#: 可选执行方式, 与 processing_controller.EXECUTOR_MODES 一致
+EXECUTOR_CHOICES = ("thread", "process")
+
+#: 可选填充引擎, 与 processor.FILL_ENGINES 一致
+ENGINE_CHOICES = ("pptx", "lxml")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="ppt-generator",
+        description="根据 Excel 数据批量生成 PPT(无界面)。"
+    )
+    parser.add_argument("-t", "--template", required=True, help="PPT 模板(.pptx)")
+    parser.add_argument("-i", "--input-dir", required=True, help="Excel 文件目录")
+    parser.add_argument("-o", "--output-dir", required=True, help="输出目录")
+    parser.add_argument("-m", "--mappings", default=None, help="slide_mappings.json")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="并行数, 默认 CPU 核心数")
+    parser.add_argument("--executor", choices=EXECUTOR_CHOICES, default="thread",
+                        help="执行方式: thread(线程池) / process(进程池)")
+    parser.add_argument("--engine", choices=ENGINE_CHOICES, default="pptx",
+                        help="占位符填充引擎: pptx(python-pptx 对象模型) / lxml(直接操作 XML, 更快)")
+    parser.add_argument("--template-rule", action="append", default=[], metavar="PATTERN=TEMPLATE",
+                        help="按文件名通配符选择模板, 可重复, 如 'east_*=east.pptx'")
+    parser.add_argument("--template-cache-mb", type=int, default=None, help="模板缓存上限(MB)")
+    parser.add_argument("--compress-level", type=int, choices=range(10), default=None,
+                        metavar="0-9", help="输出PPT的压缩级别, 默认 6; 越小保存越快、文件越大")
+    parser.add_argument("--data-cache-dir", default=None,
+                        help="解析后的输入数据缓存目录; 内容未变的输入再次生成时不重新解析")
+    parser.add_argument("--data-cache-mb", type=int, default=None, help="数据缓存目录的大小上限(MB), 默认 1024")
+    parser.add_argument("--preflight", action="store_true",
+                        help="只预检: 对照映射和模板检查全部输入文件并估计页数和耗时, 不生成PPT")
+    parser.add_argument("--no-incremental", action="store_true", help="忽略构建清单, 全部重新生成")
+    parser.add_argument("--no-recursive", action="store_true", help="只处理输入目录这一层, 不扫描子目录")
+    parser.add_argument("--max-in-flight", type=int, default=None,
+                        help="同时排队或运行的文件数上限, 默认为并行数的2倍")
+    add_logging_arguments(parser, default_level="WARNING")
+    parser.add_argument("--quiet", action="store_true", help="不在标准错误输出进度日志")
+    parser.add_argument("--assert-headless", action="store_true",
+                        help="若运行过程中载入了 PyQt5 则以非零状态退出(用于 CI 检查)")
+    return parser
+
+
+def add_logging_arguments(parser: argparse.ArgumentParser, default_level: str) -> None:
+    """
+    添加日志相关参数, 命令行入口、队列 worker 和常驻服务共用同一组参数。
+    """
+    parser.add_argument("--log-level", default=default_level,
+                        help=f"标准错误的日志级别, 默认 {default_level}")
+    parser.add_argument("--log-file", default=None,
+                        help="另外写入该日志文件(DEBUG 级别, 按大小轮转)")
+    parser.add_argument("--log-max-mb", type=int, default=10, help="日志文件轮转的大小(MB), 默认 10")
+    parser.add_argument("--log-module-level", action="append", default=[], metavar="MODULE=LEVEL",
+                        help="单独设置模块的日志级别, 可重复, 如 'data_access=WARNING'")
+    parser.add_argument("--log-sample", type=int, default=1, metavar="N",
+                        help="逐文件的 DEBUG 日志每 N 条只记录一条, 默认全部记录")
+
+
+def setup_logging(parser: argparse.ArgumentParser, args, default_level: int) -> None:
+    """
+    按 add_logging_arguments 添加的参数配置日志: 标准错误按 --log-level 输出,
+    指定 --log-file 时另外以 DEBUG 级别写入轮转文件。参数格式错误时由 parser 报错退出。
+    """
+    from client_gui.utils.logger import configure_logging, parse_module_levels
+    try:
+        module_levels = parse_module_levels(args.log_module_level)
+    except ValueError as e:
+        parser.error(str(e))
+    stream_level = getattr(logging, args.log_level.upper(), default_level)
+    configure_logging(
+        log_file=args.log_file,
+        level=logging.DEBUG if args.log_file else stream_level,
+        module_levels=module_levels,
+        max_bytes=args.log_max_mb * 1024 * 1024,
+        per_file_sample=args.log_sample,
+        stream=sys.stderr,
+        stream_level=stream_level
+    )
+
+
+def parse_template_rules(raw_rules):
+    rules = []
+    for raw in raw_rules:
+        pattern, sep, template = raw.partition("=")
+        if not sep or not pattern or not template:
+            raise argparse.ArgumentTypeError(f"模板规则格式应为 PATTERN=TEMPLATE: {raw}")
+        rules.append((pattern, template))
+    return rules
+
+
+def qt_loaded() -> bool:
+    return any(name == "PyQt5" or name.startswith("PyQt5.") for name in sys.modules)
+
+
+def print_preflight(args, report, startup_seconds: float, processing_seconds: float) -> int:
+    summary = report.to_dict() if report is not None else {"ok": False}
+    summary["stage_seconds"] = {
+        "startup": round(startup_seconds, 4),
+        "preflight": round(processing_seconds, 4),
+        "total": round(time.perf_counter() - _START, 4),
+    }
+    summary["pyqt5_loaded"] = qt_loaded()
+    print(json.dumps(summary, ensure_ascii=False), flush=True)
+
+    if args.assert_headless and summary["pyqt5_loaded"]:
+        print("错误: 无界面路径载入了 PyQt5", file=sys.stderr)
+        return 3
+    if report is None:
+        return 2
+    if report.cancelled:
+        return 130
+    return 0 if report.ok else 1
+
+
+def main(argv=None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    try:
+        template_rules = parse_template_rules(args.template_rule)
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
+
+    setup_logging(parser, args, default_level=logging.WARNING)
+
+    # 依赖(python-pptx/openpyxl)随 controller 一起导入, 计入启动耗时
+    from business_logic.cancellation import CancellationToken
+    from client_gui.controller.processing_controller import run_processing
+    startup_seconds = time.perf_counter() - _START
+
+    def log_to_stderr(message: str):
+        if not args.quiet:
+            print(message, file=sys.stderr, flush=True)
+
+    cancel_token = CancellationToken()
+
+    def on_sigint(signum, frame):
+        if cancel_token.cancelled:
+            # 第二次 Ctrl+C: 不再等待
+            raise KeyboardInterrupt
+        print("收到中断信号, 正在取消(再按一次强制退出)...", file=sys.stderr, flush=True)
+        cancel_token.cancel()
+
+    previous_handler = signal.signal(signal.SIGINT, on_sigint)
+    run_start = time.perf_counter()
+    # 部分模块直接 print, 统一转到标准错误, 保证标准输出只有 JSON 汇总
+    with contextlib.redirect_stdout(sys.stderr):
+        result = run_processing(
+            template_path=args.template,
+            excel_dir=args.input_dir,
+            output_dir=args.output_dir,
+            slide_mappings_file=args.mappings,
+            max_workers=args.workers,
+            log_callback=log_to_stderr,
+            template_rules=template_rules or None,
+            template_cache_mb=args.template_cache_mb,
+            compress_level=args.compress_level,
+            fill_engine=args.engine,
+            data_cache_dir=args.data_cache_dir,
+            data_cache_mb=args.data_cache_mb,
+            executor_mode=args.executor,
+            incremental=not args.no_incremental,
+            cancel_token=cancel_token,
+            recursive=not args.no_recursive,
+            max_in_flight=args.max_in_flight,
+            preflight=args.preflight
+        )
+    signal.signal(signal.SIGINT, previous_handler)
+    processing_seconds = time.perf_counter() - run_start
+
+    if args.preflight:
+        return print_preflight(args, result, startup_seconds, processing_seconds)
+
+    summary = {
+        "ok": result is not None and result.failed == 0 and not cancel_token.cancelled,
+        "files_total": result.total if result else 0,
+        "files_processed": result.processed if result else 0,
+        "files_skipped": result.skipped if result else 0,
+        "files_failed": result.failed if result else 0,
+        "files_cancelled": result.cancelled if result else 0,
+        "files_not_started": result.not_started if result else 0,
+        "cancelled": cancel_token.cancelled,
+        "files_per_second": round(result.files_per_second, 3) if result else 0.0,
+        "stage_seconds": {
+            "startup": round(startup_seconds, 4),
+            "processing": round(processing_seconds, 4),
+            "total": round(time.perf_counter() - _START, 4),
+        },
+        "deck_stages": {
+            stage: {k: round(v, 4) for k, v in entry.items()}
+            for stage, entry in result.stage_summary().items()
+        } if result else {},
+        "counters": dict(result.counters) if result else {},
+        "data_cache_hit_rate": result.data_cache_hit_rate if result else None,
+        "pyqt5_loaded": qt_loaded(),
+    }
+    print(json.dumps(summary, ensure_ascii=False), flush=True)
+
+    if args.assert_headless and summary["pyqt5_loaded"]:
+        print("错误: 无界面路径载入了 PyQt5", file=sys.stderr)
+        return 3
+    if result is None:
+        return 2
+    if cancel_token.cancelled:
+        return 130
+    return 0 if summary["ok"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,121 @@
 import os
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import Callable, Optional
+import multiprocessing
+from concurrent.futures import (
+    ThreadPoolExecutor, ProcessPoolExecutor, CancelledError, FIRST_COMPLETED, wait
+)
+from typing import Callable, Optional, Union
 import logging
 import traceback  # 引入 traceback 模块以获取堆栈信息
-from client_gui.services.excel_processor import process_excel_file
+from business_logic.cancellation import CancellationToken, ProcessingCancelled
+from business_logic.mapping_plan import MappingError, MappingPlan, compile_mappings
+from business_logic.metrics import ProgressSnapshot, RunStats
+from business_logic.preflight import CostModel, PreflightReport, inspect_template
+from business_logic.processor import ENGINE_VERSION, FILL_ENGINES
+from client_gui.services.build_manifest import BuildManifest, hash_mappings
+from client_gui.services.excel_processor import (
+    process_excel_file, output_path_for, preflight_excel_file
+)
+from client_gui.services.input_discovery import iter_excel_files
 from client_gui.services.mapping_loader import load_slide_mappings
+from client_gui.services.process_worker import (
+    init_process_worker, process_excel_file_in_worker, replay_worker_records
+)
+from client_gui.services.template_router import (
+    TemplateRules, resolve_template, missing_rule_templates, rule_templates
+)
+from client_gui.utils.logger import logger_levels, per_file_logger
+from data_access.data_cache import set_data_cache
+from data_access.provider_registry import INPUT_EXTENSIONS
+from ppt_engine.deck_manager import set_save_options
+from ppt_engine.template_cache import get_template_cache, set_template_cache_limit
 
 logger = logging.getLogger(__name__)
+# 每个文件一条的 DEBUG 日志, 可单独设置级别或抽样(见 utils.logger)
+file_logger = per_file_logger(__name__)
+
+#: 可选的执行方式: 线程池 / 进程池
+EXECUTOR_MODES = ("thread", "process")
+
+#: 增量构建时, 每完成多少个文件写一次构建清单
+MANIFEST_SAVE_EVERY = 100
+
+#: 未指定 max_in_flight 时, 每个并行单位允许排队+运行的任务数
+IN_FLIGHT_PER_WORKER = 2
+
+def _save_manifest(manifest: BuildManifest):
+    try:
+        manifest.save()
+    except Exception as e:
+        logger.error(f"保存构建清单失败: {e}")
+
+def _check_mapping_templates(mapping_plan: MappingPlan, templates: list):
+    """
+    对照每个模板校验映射; 模板经共享缓存打开, 之后生成时不再重复解析.
+    """
+    cache = get_template_cache()
+    for path in dict.fromkeys(templates):
+        mapping_plan.check_template(path, cache.get(path))
+
+def _run_preflight(
+    mapping_plan: MappingPlan,
+    template_path: str,
+    excel_dir: str,
+    output_dir: str,
+    template_rules: Optional[TemplateRules],
+    workers: int,
+    recursive: bool,
+    cancel_token: CancellationToken,
+    progress_callback: Optional[Callable[[int], None]],
+    log_callback: Optional[Callable[[str], None]]
+) -> PreflightReport:
+    """
+    预检(见 business_logic.preflight): 各模板在主线程检查一次,
+    输入文件在线程池中并行读取元数据并检查, 不创建输出目录, 不写任何文件.
+    """
+    cost_model = CostModel.from_metrics(output_dir)
+    report = PreflightReport(workers, cost_model)
+    cache = get_template_cache()
+
+    def template_info(path: str):
+        info = report.templates.get(path)
+        if info is None:
+            info = inspect_template(path, cache.get(path), cache.get_placeholder_index(path),
+                                    mapping_plan)
+            report.templates[path] = info
+        return info
+
+    in_flight_limit = workers * IN_FLIGHT_PER_WORKER
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = set()
+
+        def collect(futures):
+            for future in futures:
+                pending.discard(future)
+                report.add(future.result())
+
+        for excel_file in iter_excel_files(excel_dir, recursive=recursive, exclude_dir=output_dir):
+            if cancel_token.cancelled:
+                report.cancelled = True
+                break
+            info = template_info(resolve_template(excel_file, template_path, template_rules))
+            pending.add(executor.submit(preflight_excel_file, excel_file, mapping_plan,
+                                        excel_dir, info, cost_model))
+            if len(pending) >= in_flight_limit:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+        collect(list(pending))
+    report.finish()
+
+    if progress_callback:
+        progress_callback(100)
+    summary_msg = report.format_summary()
+    if report.ok:
+        logger.info(summary_msg)
+    else:
+        logger.warning(summary_msg)
+    if log_callback:
+        log_callback(summary_msg)
+    return report
 
 def run_processing(
     template_path: str,
@@ -15,21 +124,90 @@ def run_processing(
     slide_mappings_file: Optional[str] = None,
     max_workers: Optional[int] = None,
     progress_callback: Optional[Callable[[int], None]] = None,
-    log_callback: Optional[Callable[[str], None]] = None
-) -> None:
+    log_callback: Optional[Callable[[str], None]] = None,
+    template_rules: Optional[TemplateRules] = None,
+    template_cache_mb: Optional[int] = None,
+    executor_mode: str = "thread",
+    incremental: bool = True,
+    cancel_token: Optional[CancellationToken] = None,
+    recursive: bool = True,
+    max_in_flight: Optional[int] = None,
+    compress_level: Optional[int] = None,
+    fill_engine: str = "pptx",
+    data_cache_dir: Optional[str] = None,
+    data_cache_mb: Optional[int] = None,
+    preflight: bool = False,
+    status_callback: Optional[Callable[[ProgressSnapshot], None]] = None
+) -> Optional[Union[RunStats, PreflightReport]]:
     """
     主处理逻辑：
-    1. 收集Excel文件
-    2. 加载映射配置
+    1. 检查Excel目录
+    2. 加载映射配置, 编译为 MappingPlan 并对照模板校验(不合法时记录全部问题并返回 None)
     3. 确保输出目录存在
-    4. 并行处理Excel文件
-    5. 更新进度和日志
+    4. 边扫描Excel文件边提交并行处理
+    5. 更新进度和日志(progress_callback 收到百分比, 已完成、失败和取消的文件都计入;
+       status_callback 在每个文件结束时收到 ProgressSnapshot: 完成/失败/总数、速度、剩余时间)
+
+    Excel文件用 os.scandir 逐个发现(recursive=True 时包含子目录),
+    发现一个提交一个, 同时排队或运行的任务不超过 max_in_flight
+    (默认 并行数 x IN_FLIGHT_PER_WORKER), 输入数量再多, 出第一个结果的时间和内存占用也不随之增长.
+    输出路径与输入目录结构一致: 输入/a/b.xlsx -> 输出/a/b.pptx.
+    输入可以是 .xlsx / .csv / .sqlite, 数据提供者按扩展名选择(见 provider_registry).
+
+    template_rules 可按Excel文件名为每个文件选择模板(见 template_router),
+    未命中的文件使用 template_path. 模板经进程内缓存只解析一次,
+    template_cache_mb 设置缓存的内存上限(MB).
+    compress_level 为输出PPT的 deflate 压缩级别(0-9, 默认6); 保存时与模板相同的部件
+    直接复用模板中已压缩的数据(见 deck_manager.write_package).
+
+    executor_mode:
+      - "thread": 线程池(默认), 受 GIL 限制;
+      - "process": 进程池, 每个工作进程启动时导入依赖并接收一次映射,
+        工作进程中的日志记录回传到主进程, 进度与日志回调仍在主进程触发.
+
+    fill_engine 选择占位符填充引擎("pptx" / "lxml", 见 processor.FILL_ENGINES), 输出相同.
+
+    incremental=True 时使用输出目录下的构建清单(见 build_manifest):
+    Excel、所用模板、映射内容和引擎版本都未变化且输出仍存在的文件直接跳过.
+
+    data_cache_dir 不为空时, 解析后的输入数据缓存到该目录(见 data_access.data_cache),
+    内容未变的文件再次生成时(如只改了模板或映射)不再重新解析; data_cache_mb 为缓存目录的
+    大小上限(MB). 命中率和节省的读取时间计入 RunStats 并写入汇总日志.
+
+    返回 RunStats: 文件数 total/processed/skipped/failed, 各阶段耗时分位数,
+    读取行数/复制页数/替换占位符数/输出字节数合计, 以及吞吐量(文件/秒);
+    同时写入输出目录下的 Prometheus 文本文件(见 business_logic.metrics).
+    参数错误等导致无法开始处理时返回 None.
+
+    cancel_token 被取消时: 排队中的任务立即撤销(计入 not_started),
+    正在处理的文件在下一个阶段边界停止(计入 cancelled), 不留下写了一半的输出;
+    输入目录仍扫描到底(只计数, 不提交), 尚未扫描到的文件也计入 not_started.
+
+    preflight=True 时只做预检(见 business_logic.preflight), 不生成任何PPT:
+    并行读取每个输入文件的 sheet 名、列数和行数, 对照映射和模板占位符逐个文件报告问题,
+    并给出预计生成的页数和耗时(有上次运行的指标文件时据此校准), 返回 PreflightReport.
+    模板与映射不符时也不中止, 而是计入报告.
     """
 
     logger.debug("开始运行 run_processing 函数。")
     logger.debug(f"输入参数 - template_path: {template_path}, excel_dir: {excel_dir}, "
                  f"output_dir: {output_dir}, slide_mappings_file: {slide_mappings_file}, "
-                 f"max_workers: {max_workers}")
+                 f"max_workers: {max_workers}, executor_mode: {executor_mode}, "
+                 f"incremental: {incremental}")
+
+    if executor_mode not in EXECUTOR_MODES:
+        msg = f"未知的执行方式: {executor_mode}, 可选: {', '.join(EXECUTOR_MODES)}"
+        logger.error(msg)
+        if log_callback:
+            log_callback(msg)
+        return
+
+    if fill_engine not in FILL_ENGINES:
+        msg = f"未知的填充引擎: {fill_engine}, 可选: {', '.join(FILL_ENGINES)}"
+        logger.error(msg)
+        if log_callback:
+            log_callback(msg)
+        return
 
     # 验证模板文件路径
     if not os.path.isfile(template_path):
@@ -41,6 +219,30 @@ def run_processing(
     else:
         logger.debug(f"找到模板文件: {template_path}")
 
+    # 验证模板路由规则中的模板
+    missing_templates = missing_rule_templates(template_rules)
+    if missing_templates:
+        msg = f"模板路由规则中的模板文件不存在: {missing_templates}"
+        logger.error(msg)
+        if log_callback:
+            log_callback(msg)
+        return
+
+    if template_cache_mb:
+        set_template_cache_limit(template_cache_mb * 1024 * 1024)
+
+    data_cache_bytes = data_cache_mb * 1024 * 1024 if data_cache_mb else None
+    set_data_cache(data_cache_dir, data_cache_bytes)
+
+    if compress_level is not None:
+        try:
+            set_save_options(compresslevel=compress_level)
+        except ValueError as e:
+            logger.error(str(e))
+            if log_callback:
+                log_callback(str(e))
+            return
+
     # 验证Excel目录路径
     if not os.path.isdir(excel_dir):
         msg = f"Excel目录不存在: {excel_dir}"
@@ -51,10 +253,10 @@ def run_processing(
     else:
         logger.debug(f"找到Excel目录: {excel_dir}")
 
-    # 收集Excel文件
+    # 检查Excel目录可读(文件在处理过程中边扫描边提交)
     try:
-        excel_files = [f for f in os.listdir(excel_dir) if f.lower().endswith(".xlsx")]
-        logger.debug(f"在目录 {excel_dir} 中找到 {len(excel_files)} 个xlsx文件: {excel_files}")
+        with os.scandir(excel_dir):
+            pass
     except Exception as e:
         msg = f"无法读取Excel目录 {excel_dir}: {e}"
         logger.error(msg)
@@ -63,21 +265,21 @@ def run_processing(
             log_callback(msg + "\n" + traceback.format_exc())
         return
 
-    total_files = len(excel_files)
-    if total_files == 0:
-        msg = f"在目录 {excel_dir} 中未找到任何xlsx文件。"
-        logger.warning(msg)
-        if log_callback:
-            log_callback(msg)
-        return
-
-    # 加载映射配置
+    # 加载映射配置, 编译并对照模板校验(每次运行一次)
     try:
         slide_mapping = load_slide_mappings(slide_mappings_file)
         if not slide_mapping:
             logger.warning("加载的slide_mapping为空。")
         else:
-            logger.debug(f"加载的slide_mapping内容: {slide_mapping}")
+            logger.debug("加载的slide_mapping: %d 个映射", len(slide_mapping))
+        mapping_plan = compile_mappings(slide_mapping, slide_mappings_file)
+        if not preflight:
+            _check_mapping_templates(mapping_plan, [template_path] + rule_templates(template_rules))
+    except MappingError as e:
+        logger.error(str(e))
+        if log_callback:
+            log_callback(str(e))
+        return
     except Exception as e:
         msg = f"加载slide_mappings文件时出错: {e}"
         logger.error(msg)
@@ -86,6 +288,26 @@ def run_processing(
             log_callback(msg + "\n" + traceback.format_exc())
         return
 
+    # 确定并行线程数
+    if max_workers and isinstance(max_workers, int):
+        workers = max_workers
+    else:
+        workers = os.cpu_count() or 4
+    if cancel_token is None:
+        cancel_token = CancellationToken()
+
+    if preflight:
+        try:
+            return _run_preflight(mapping_plan, template_path, excel_dir, output_dir, template_rules,
+                                  workers, recursive, cancel_token, progress_callback, log_callback)
+        except Exception as e:
+            msg = f"预检时发生异常: {e}"
+            logger.error(msg)
+            logger.error(traceback.format_exc())  # 记录完整堆栈信息
+            if log_callback:
+                log_callback(msg + "\n" + traceback.format_exc())
+            return
+
     # 确保输出目录存在
     if not os.path.isdir(output_dir):
         try:
@@ -104,71 +326,229 @@ def run_processing(
     else:
         logger.debug(f"输出目录已存在: {output_dir}")
 
-    # 确定并行线程数
-    if max_workers and isinstance(max_workers, int):
-        workers = max_workers
-    else:
-        workers = os.cpu_count() or 4
-    msg = f"使用 {workers} 个并行线程处理Excel文件。"
+    in_flight_limit = max_in_flight if max_in_flight and max_in_flight > 0 \
+        else workers * IN_FLIGHT_PER_WORKER
+    unit = "进程" if executor_mode == "process" else "线程"
+    msg = f"使用 {workers} 个并行{unit}处理Excel文件。"
     logger.info(msg)
     if log_callback:
         log_callback(msg)
 
+    # 增量构建: 读取构建清单
+    manifest = None
+    if incremental:
+        manifest = BuildManifest.load(output_dir)
+        if not manifest.begin(ENGINE_VERSION, hash_mappings(slide_mapping)):
+            logger.info("构建清单不存在, 或映射/引擎版本已变化, 全部重建。")
+
     # 并行处理Excel文件
-    processed = 0
+    stats = RunStats(total=0)
+    finished = 0
+    discovery_done = False
+    last_percentage = -1
+    file_hashes = {}
+    template_hashes = {}
     logger.debug("开始并行处理Excel文件。")
     try:
-        with ThreadPoolExecutor(max_workers=workers) as executor:
-            future_to_file = {
-                executor.submit(
-                    process_excel_file,
-                    excel_file,
-                    slide_mapping,
-                    excel_dir,
-                    output_dir,
-                    template_path
-                ): excel_file
-                for excel_file in excel_files
-            }
-            logger.debug("所有Excel文件任务已提交。")
-
-            for future in as_completed(future_to_file):
-                excel_file = future_to_file[future]
-                logger.debug(f"开始处理文件: {excel_file}")
+        if executor_mode == "process":
+            # spawn: 与 GUI 的 Qt 线程共存更安全, 且各平台行为一致
+            mp_context = multiprocessing.get_context("spawn")
+            # 工作进程看不到主进程的令牌, 取消时通过共享的 Event 通知
+            cancel_event = mp_context.Event()
+            cancel_token.add_callback(cancel_event.set)
+            executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=mp_context,
+                initializer=init_process_worker,
+                initargs=(
+                    mapping_plan,
+                    logging.getLogger().getEffectiveLevel(),
+                    template_cache_mb * 1024 * 1024 if template_cache_mb else None,
+                    cancel_event,
+                    compress_level,
+                    fill_engine,
+                    data_cache_dir,
+                    data_cache_bytes,
+                    logger_levels()
+                )
+            )
+        else:
+            executor = ThreadPoolExecutor(max_workers=workers)
+
+        with executor:
+            future_to_file = {}
+
+            def cancel_pending():
+                # 撤销尚未开始的任务; 已在运行的任务由令牌在阶段边界停止
+                for pending in list(future_to_file):
+                    pending.cancel()
+
+            def report_progress():
+                nonlocal last_percentage
+                snapshot = stats.snapshot(total_known=discovery_done)
+                if status_callback:
+                    status_callback(snapshot)
+                percentage = snapshot.percentage
+                if percentage == last_percentage:
+                    return
+                last_percentage = percentage
+                if progress_callback:
+                    progress_callback(percentage)
+                logger.debug(f"当前进度: {percentage}%")
+
+            def handle_done(future):
+                nonlocal finished
+                excel_file = future_to_file.pop(future)
+                hashes = file_hashes.pop(excel_file, None)
                 try:
                     result = future.result()
-                    if result:
-                        processed += 1
-                        logger.debug(f"成功处理文件: {excel_file} ({processed}/{total_files})")
+                    if executor_mode == "process":
+                        result, records = result
+                        replay_worker_records(records)
+                    if result is not None:
+                        stats.record_deck(result)
+                        file_logger.debug("成功处理文件: %s (%d/%d)", excel_file,
+                                          stats.processed, stats.total)
+                        if manifest is not None and hashes is not None:
+                            manifest.record(excel_file, *hashes,
+                                            output_path_for(excel_file, output_dir))
                     else:
-                        logger.debug(f"跳过文件: {excel_file}")
+                        stats.failed += 1
+                        file_logger.debug("跳过文件: %s", excel_file)
+                        if manifest is not None:
+                            manifest.forget(excel_file)
+                except CancelledError:
+                    stats.not_started += 1
+                    file_logger.debug("未开始, 已撤销: %s", excel_file)
+                except ProcessingCancelled as e:
+                    stats.cancelled += 1
+                    if executor_mode == "process":
+                        replay_worker_records(getattr(e, "log_records", []))
                 except Exception as e:
+                    stats.failed += 1
                     error_msg = f"处理 {excel_file} 时发生异常: {e}"
                     logger.error(error_msg)
                     logger.error(traceback.format_exc())  # 记录完整堆栈信息
                     if log_callback:
                         log_callback(error_msg + "\n" + traceback.format_exc())
-                # 更新进度
-                try:
-                    percentage = int((processed / total_files) * 100)
-                except ZeroDivisionError:
-                    percentage = 0
-                    logger.warning("总文件数为0，无法计算进度百分比。")
-                if progress_callback:
-                    progress_callback(percentage)
-                logger.debug(f"当前进度: {percentage}%")
+                finished += 1
+                if manifest is not None and finished % MANIFEST_SAVE_EVERY == 0:
+                    _save_manifest(manifest)
+                report_progress()
+
+            def wait_for_slot(limit: int):
+                # 同时排队或运行的任务达到 limit 时, 等待至少一个完成
+                while len(future_to_file) >= max(limit, 1):
+                    done, _ = wait(list(future_to_file), return_when=FIRST_COMPLETED)
+                    for future in done:
+                        handle_done(future)
+
+            cancel_token.add_callback(cancel_pending)
+            for excel_file in iter_excel_files(excel_dir, recursive=recursive,
+                                               exclude_dir=output_dir):
+                stats.total += 1
+                if cancel_token.cancelled:
+                    # 取消后继续扫描(不提交), 未扫描到的文件同样计入"未开始"
+                    stats.not_started += 1
+                    finished += 1
+                    continue
+                file_template = resolve_template(excel_file, template_path, template_rules)
+                if manifest is not None:
+                    try:
+                        if file_template not in template_hashes:
+                            template_hashes[file_template] = manifest.content_hash(file_template)
+                        input_hash = manifest.content_hash(os.path.join(excel_dir, excel_file))
+                    except OSError as e:
+                        logger.warning(f"无法计算 {excel_file} 的哈希, 将直接生成: {e}")
+                    else:
+                        if manifest.is_up_to_date(excel_file, input_hash,
+                                                  template_hashes[file_template],
+                                                  output_path_for(excel_file, output_dir)):
+                            stats.skipped += 1
+                            finished += 1
+                            file_logger.debug("输入未变化, 跳过: %s", excel_file)
+                            report_progress()
+                            continue
+                        file_hashes[excel_file] = (input_hash, template_hashes[file_template])
+                if executor_mode == "process":
+                    future = executor.submit(
+                        process_excel_file_in_worker,
+                        excel_file,
+                        excel_dir,
+                        output_dir,
+                        file_template
+                    )
+                else:
+                    future = executor.submit(
+                        process_excel_file,
+                        excel_file,
+                        mapping_plan,
+                        excel_dir,
+                        output_dir,
+                        file_template,
+                        cancel_token,
+                        fill_engine
+                    )
+                future_to_file[future] = excel_file
+                wait_for_slot(in_flight_limit)
+
+            discovery_done = True
+            logger.debug(f"Excel文件扫描结束, 共 {stats.total} 个。")
+            if stats.skipped:
+                msg = f"{stats.skipped} 个文件的输入未变化, 跳过生成。"
+                logger.info(msg)
+                if log_callback:
+                    log_callback(msg)
+            wait_for_slot(1)
+            report_progress()
 
     except Exception as e:
-        msg = f"多线程处理时发生异常: {e}"
+        msg = f"并行处理时发生异常: {e}"
         logger.error(msg)
         logger.error(traceback.format_exc())  # 记录完整堆栈信息
         if log_callback:
             log_callback(msg + "\n" + traceback.format_exc())
         return
+    finally:
+        if manifest is not None:
+            # 完整扫描过输入目录时, 删除已不存在(删除或改名)的输入的记录
+            if discovery_done and not cancel_token.cancelled:
+                pruned = manifest.prune_unseen()
+                if pruned:
+                    logger.debug(f"构建清单中删除 {pruned} 条已不存在的输入记录。")
+            _save_manifest(manifest)
+
+    stats.finish()
 
-    # 完成日志
-    completion_msg = f"所有Excel处理完毕! 共处理 {processed} 个文件。输出目录: {output_dir}"
-    logger.info(completion_msg)
+    if stats.total == 0 and not cancel_token.cancelled:
+        msg = f"在目录 {excel_dir} 中未找到任何输入文件({'/'.join(INPUT_EXTENSIONS)})。"
+        logger.warning(msg)
+        if log_callback:
+            log_callback(msg)
+
+    if cancel_token.cancelled:
+        stats.was_cancelled = True
+        completion_msg = (f"处理已取消: 完成 {stats.processed} 个, 中途取消 {stats.cancelled} 个, "
+                          f"未开始 {stats.not_started} 个, 失败 {stats.failed} 个。")
+        logger.warning(completion_msg)
+    else:
+        # 完成日志
+        completion_msg = f"所有Excel处理完毕! 共处理 {stats.processed} 个文件。输出目录: {output_dir}"
+        if manifest is not None:
+            completion_msg += f" 未变化跳过 {stats.skipped} 个文件。"
+        logger.info(completion_msg)
     if log_callback:
         log_callback(completion_msg)
+    if stats.processed:
+        summary_msg = stats.format_summary()
+        logger.info(summary_msg)
+        if log_callback:
+            log_callback(summary_msg)
+
+    # 指标文件, 供 Prometheus(node_exporter textfile collector)采集
+    try:
+        stats.write_prometheus(output_dir)
+    except Exception as e:
+        logger.error(f"写入指标文件失败: {e}")
     logger.debug("run_processing 函数结束。")
+    return stats
@@ -5,9 +5,12 @@ from PyQt5.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QLabel, QLineEdit, QPushButton, QFileDialog,
     QMessageBox, QProgressBar, QPlainTextEdit,
-    QFormLayout, QGroupBox, QSplitter
+    QFormLayout, QGroupBox, QSplitter, QComboBox, QCheckBox, QSpinBox
+)
+from PyQt5.QtCore import Qt, QTimer
+from client_gui.services.ui_feed import (
+    DEFAULT_LOG_LINES, FEED_INTERVAL_MS, format_progress, format_stage_means, format_stage_summary
 )
-from PyQt5.QtCore import Qt
 from client_gui.threads.worker_thread import WorkerThread
 from client_gui.utils.logger import configure_logging
 from client_gui.utils.exception_handler import show_error
@@ -18,11 +21,19 @@ class PPTClientGUI(QMainWindow):
     """
     主窗口：左侧表单 + 右侧日志(QPlainTextEdit)，
     支持自定义 slide_mappings.json，允许用户指定并行数量。
+    运行中按 FEED_INTERVAL_MS 定时批量刷新日志、进度和阶段耗时面板,
+    日志窗口只保留最近的若干行(完整日志见输出目录下的运行日志文件)。
     """
 
     def __init__(self, parent=None):
         super().__init__(parent)
         self.log_box = None
+        self.spin_log_lines = None
+        self.label_status = None
+        self.label_stages = None
+        self.feed_timer = None
+        self.combo_executor_mode = None
+        self.check_incremental = None
         self.input_max_workers = None
         self.label_max_workers = None
         self.progress_bar = None
@@ -63,6 +74,18 @@ class PPTClientGUI(QMainWindow):
         self.label_max_workers = QLabel("并行线程数:")
         self.input_max_workers = QLineEdit()
         self.input_max_workers.setPlaceholderText("默认: CPU核心数")
+        self.combo_executor_mode = QComboBox()
+        self.combo_executor_mode.addItem("线程", "thread")
+        self.combo_executor_mode.addItem("进程(多核)", "process")
+        self.check_incremental = QCheckBox("跳过输入未变化的文件(增量生成)")
+        self.check_incremental.setChecked(True)
+        self.spin_log_lines = QSpinBox()
+        self.spin_log_lines.setRange(500, 200000)
+        self.spin_log_lines.setSingleStep(1000)
+        self.spin_log_lines.setValue(DEFAULT_LOG_LINES)
+        self.label_status = QLabel("")
+        self.label_stages = QLabel("各阶段耗时: 暂无")
+        self.label_stages.setTextInteractionFlags(Qt.TextSelectableByMouse)
 
         # 表单布局
         form_layout = QFormLayout()
@@ -73,6 +96,9 @@ class PPTClientGUI(QMainWindow):
         form_layout.addRow("输出目录:", self.edit_output)
         form_layout.addRow("", self.btn_output)
         form_layout.addRow(self.label_max_workers, self.input_max_workers)
+        form_layout.addRow("执行方式:", self.combo_executor_mode)
+        form_layout.addRow("", self.check_incremental)
+        form_layout.addRow("日志保留行数:", self.spin_log_lines)
         group_box = QGroupBox("配置信息")
         group_box.setLayout(form_layout)
 
@@ -88,12 +114,24 @@ class PPTClientGUI(QMainWindow):
         left_layout.addWidget(group_box)
         left_layout.addLayout(button_layout)
         left_layout.addWidget(self.progress_bar)
+        left_layout.addWidget(self.label_status)
+        stage_layout = QVBoxLayout()
+        stage_layout.addWidget(self.label_stages)
+        stage_box = QGroupBox("阶段耗时")
+        stage_box.setLayout(stage_layout)
+        left_layout.addWidget(stage_box)
         left_widget = QWidget()
         left_widget.setLayout(left_layout)
 
         # 右侧日志
         self.log_box = QPlainTextEdit()
         self.log_box.setReadOnly(True)
+        self.log_box.setMaximumBlockCount(self.spin_log_lines.value())
+
+        # 定时取走工作线程的日志和进度
+        self.feed_timer = QTimer(self)
+        self.feed_timer.setInterval(FEED_INTERVAL_MS)
+        self.feed_timer.timeout.connect(self.flush_feed)
 
         # 分割器
         splitter = QSplitter(Qt.Horizontal)
@@ -133,6 +171,11 @@ class PPTClientGUI(QMainWindow):
                 if self.mapping_file:
                     self.log_box.appendPlainText(f"上次使用的映射文件: {self.mapping_file}")
                 self.input_max_workers.setText(data.get("max_workers", ""))
+                mode_index = self.combo_executor_mode.findData(data.get("executor_mode", "thread"))
+                if mode_index >= 0:
+                    self.combo_executor_mode.setCurrentIndex(mode_index)
+                self.check_incremental.setChecked(data.get("incremental", True))
+                self.spin_log_lines.setValue(data.get("max_log_lines", DEFAULT_LOG_LINES))
             except Exception as e:
                 logger.error(f"载入配置失败: {e}")
 
@@ -145,7 +188,10 @@ class PPTClientGUI(QMainWindow):
             "excel_dir": self.edit_excel.text(),
             "output_dir": self.edit_output.text(),
             "slide_mappings_file": self.mapping_file,
-            "max_workers": self.input_max_workers.text()
+            "max_workers": self.input_max_workers.text(),
+            "executor_mode": self.combo_executor_mode.currentData(),
+            "incremental": self.check_incremental.isChecked(),
+            "max_log_lines": self.spin_log_lines.value()
         }
         try:
             with open(self.config_file, "w", encoding="utf-8") as f:
@@ -223,9 +269,14 @@ class PPTClientGUI(QMainWindow):
             self.log_box.appendPlainText(f"设置并行线程数为: {max_workers}")
         else:
             self.log_box.appendPlainText("未设置并行线程数，使用默认值 (CPU核心数)")
+        executor_mode = self.combo_executor_mode.currentData()
+        self.log_box.appendPlainText(f"执行方式: {self.combo_executor_mode.currentText()}")
 
+        self.log_box.setMaximumBlockCount(self.spin_log_lines.value())
         self.log_box.appendPlainText("开始执行...")
         self.progress_bar.setValue(0)
+        self.label_status.setText("")
+        self.label_stages.setText("各阶段耗时: 暂无")
 
         # 启动工作线程
         self.worker = WorkerThread(
@@ -233,37 +284,67 @@ class PPTClientGUI(QMainWindow):
             excel_dir=excel_dir,
             output_dir=output_dir,
             slide_mappings_file=self.mapping_file,
-            max_workers=max_workers
+            max_workers=max_workers,
+            executor_mode=executor_mode,
+            incremental=self.check_incremental.isChecked(),
+            max_log_lines=self.spin_log_lines.value()
         )
-        self.worker.progress_update.connect(self.update_progress)
-        self.worker.log_update.connect(self.update_log)
+        self.worker.stats_ready.connect(self.show_stats)
         self.worker.finished.connect(self.on_finished)
         self.worker.start()
+        self.feed_timer.start()
 
     def stop_process(self):
         """
-        停止处理任务（需实现停止逻辑）。
+        停止处理任务：请求工作线程取消，等待正在处理的文件在阶段边界停下。
         """
-        QMessageBox.information(self, "信息", "停止功能尚未实现。")
+        if self.worker is None or not self.worker.isRunning():
+            QMessageBox.information(self, "信息", "当前没有正在执行的任务。")
+            return
+        if self.worker.cancel_token.cancelled:
+            return
+        self.worker.cancel()
+        self.btn_stop.setEnabled(False)
+        self.log_box.appendPlainText("正在停止，等待正在处理的文件结束当前阶段...")
 
-    def update_progress(self, value: int):
+    def flush_feed(self):
         """
-        更新进度条。
+        取走工作线程自上次刷新以来的日志和最新进度, 一次性更新界面。
         """
-        self.progress_bar.setValue(value)
+        if self.worker is None:
+            return
+        feed = self.worker.feed
+        lines, dropped, snapshot = feed.drain()
+        if dropped:
+            self.log_box.appendPlainText(f"... 省略 {dropped} 行, 完整日志见 {feed.log_file}")
+        if lines:
+            self.log_box.appendPlainText("\n".join(lines))
+        if snapshot is not None:
+            self.progress_bar.setValue(snapshot.percentage)
+            self.label_status.setText(format_progress(snapshot))
+            self.label_stages.setText(format_stage_means(snapshot))
 
-    def update_log(self, message: str):
+    def show_stats(self, stats):
         """
-        更新日志显示。
+        运行结束后用 RunStats 的分位数更新阶段耗时面板。
         """
-        self.log_box.appendPlainText(message)
+        self.flush_feed()
+        self.label_stages.setText(format_stage_summary(stats))
 
     def on_finished(self):
         """
         处理完成后的操作。
         """
-        self.log_box.appendPlainText("处理完成。")
-        self.progress_bar.setValue(100)
+        self.feed_timer.stop()
+        self.flush_feed()
+        if self.worker is not None and self.worker.cancel_token.cancelled:
+            self.log_box.appendPlainText("处理已停止。")
+        else:
+            self.log_box.appendPlainText("处理完成。")
+            self.progress_bar.setValue(100)
+        if self.worker is not None and self.worker.feed.log_file:
+            self.log_box.appendPlainText(f"完整日志: {self.worker.feed.log_file}")
+        self.btn_stop.setEnabled(True)
         self.worker = None
 
     def closeEvent(self, event):
@@ -1,4 +1,5 @@
 import sys
+import multiprocessing
 from PyQt5.QtWidgets import QApplication
 from client_gui.utils.logger import configure_logging
 from client_gui.utils.exception_handler import show_error
@@ -8,6 +9,8 @@ def main():
     """
     GUI入口。
     """
+    # PyInstaller 打包后使用进程池时需要
+    multiprocessing.freeze_support()
     configure_logging()
     sys.excepthook = show_error
     app = QApplication(sys.argv)
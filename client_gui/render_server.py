@@ -0,0 +1,246 @@
+"""
+常驻的本地生成服务: 依赖、模板和映射只载入一次, 通过 HTTP(TCP 或 Unix socket)按需生成单份PPT,
+省去每次启动时导入 python-pptx/openpyxl、解析模板和映射的开销。
+
+用法(在仓库根目录):
+    python -m client_gui.render_server --template 周报=模板.pptx --mappings 周报=slide_mappings.json \\
+        [--port 8765 | --unix-socket /run/ppt_render.sock] [-w 2] [--max-queue 16]
+
+接口:
+    POST /render    JSON 请求体:
+                      {"template": "周报", "mappings": "周报",
+                       "workbook_path": "/data/a.xlsx" 或 "workbook_base64": "...",
+                       "output_path": "/out/a.pptx"(可选), "engine": "lxml"(可选)}
+                    或请求体直接是 .xlsx 内容, 参数放在查询串:
+                      POST /render?template=周报&mappings=周报
+                    给出 output_path 时写入该文件并返回 JSON, 否则响应体为PPT内容.
+                    只注册了一个模板/映射时对应ID可省略.
+    GET  /stats     JSON: 请求计数、排队数、排队/处理/总耗时和各阶段耗时的直方图
+    GET  /metrics   同上, Prometheus 文本格式
+    GET  /health    {"ok": true}
+
+状态码: 400 参数错误, 404 模板/映射ID未注册, 413 请求体过大, 503 排队已满(带 Retry-After), 500 生成失败。
+服务按请求中的路径读写本机文件, 只应监听本机地址或受权限保护的 Unix socket。
+"""
+import os
+import sys
+import json
+import base64
+import signal
+import logging
+import argparse
+import socketserver
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from client_gui.cli_main import ENGINE_CHOICES, add_logging_arguments, setup_logging
+
+logger = logging.getLogger(__name__)
+
+PPTX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.presentationml.presentation"
+
+#: 请求体大小上限(字节)
+MAX_BODY_BYTES = 64 * 1024 * 1024
+
+
+class RenderRequestHandler(BaseHTTPRequestHandler):
+    server_version = "ppt-render"
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def service(self):
+        return self.server.render_service
+
+    def address_string(self) -> str:
+        # Unix socket 的 client_address 不是 (host, port)
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "local"
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+    def _send(self, status: int, body: bytes, content_type: str, headers: dict = None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status: int, payload: dict, headers: dict = None):
+        self._send(status, json.dumps(payload, ensure_ascii=False).encode("utf-8"),
+                   "application/json; charset=utf-8", headers)
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if path == "/stats":
+            self._send_json(200, self.service.stats())
+        elif path == "/metrics":
+            self._send(200, self.service.to_prometheus().encode("utf-8"), "text/plain; version=0.0.4")
+        elif path == "/health":
+            self._send_json(200, {"ok": True})
+        else:
+            self._send_json(404, {"error": f"未知路径: {path}"})
+
+    def do_POST(self):
+        from client_gui.services.render_service import ServiceBusy, UnknownResource
+
+        url = urlparse(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY_BYTES:
+            # 不读取请求体, 响应后关闭连接
+            self.close_connection = True
+            self._send_json(413, {"error": f"请求体超过上限 {MAX_BODY_BYTES} 字节"})
+            return
+        body = self.rfile.read(length) if length else b""
+        if url.path != "/render":
+            self._send_json(404, {"error": f"未知路径: {url.path}"})
+            return
+        try:
+            request = self._parse_render_request(url.query, body)
+            result = self.service.render(request)
+        except ServiceBusy as e:
+            self._send_json(503, {"error": str(e)}, {"Retry-After": "1"})
+            return
+        except UnknownResource as e:
+            self._send_json(404, {"error": e.args[0]})
+            return
+        except ValueError as e:
+            self._send_json(400, {"error": str(e)})
+            return
+        except Exception as e:
+            logger.error(f"生成失败: {e}")
+            self._send_json(500, {"error": f"{type(e).__name__}: {e}"})
+            return
+
+        summary = {"seconds": round(result["seconds"], 4),
+                   "stage_seconds": {k: round(v, 4) for k, v in result["stage_seconds"].items()},
+                   "counters": result["counters"]}
+        if "data" in result:
+            self._send(200, result["data"], PPTX_CONTENT_TYPE,
+                       {"X-Render-Summary": json.dumps(summary)})
+        else:
+            self._send_json(200, dict(summary, output_path=result["output_path"]))
+
+    def _parse_render_request(self, query: str, body: bytes) -> dict:
+        content_type = (self.headers.get("Content-Type") or "").split(";")[0].strip()
+        if content_type == "application/json":
+            try:
+                payload = json.loads(body or b"{}")
+            except ValueError as e:
+                raise ValueError(f"请求体不是合法的 JSON: {e}")
+            request = {key: payload.get(key)
+                       for key in ("template", "mappings", "workbook_path", "output_path", "engine")}
+            if payload.get("workbook_base64") is not None:
+                try:
+                    request["workbook_bytes"] = base64.b64decode(payload["workbook_base64"], validate=True)
+                except ValueError as e:
+                    raise ValueError(f"workbook_base64 无法解码: {e}")
+            return request
+        params = {key: values[0] for key, values in parse_qs(query).items()}
+        request = {key: params.get(key) for key in ("template", "mappings", "output_path", "engine")}
+        request["workbook_bytes"] = body or None
+        return request
+
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def server_bind(self):
+        # 上次异常退出留下的 socket 文件
+        if os.path.exists(self.server_address):
+            os.remove(self.server_address)
+        super().server_bind()
+
+
+def parse_named_paths(raw_items, option: str) -> list:
+    items = []
+    for raw in raw_items:
+        name, sep, path = raw.partition("=")
+        if not sep or not name or not path:
+            raise argparse.ArgumentTypeError(f"{option} 格式应为 ID=路径: {raw}")
+        items.append((name, path))
+    return items
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="ppt-render-server",
+        description="常驻的本地 PPT 生成服务(HTTP / Unix socket)。"
+    )
+    parser.add_argument("--template", action="append", default=[], metavar="ID=PATH", required=True,
+                        help="注册模板, 可重复")
+    parser.add_argument("--mappings", action="append", default=[], metavar="ID=PATH", required=True,
+                        help="注册 slide_mappings.json, 可重复")
+    parser.add_argument("--host", default="127.0.0.1", help="监听地址, 默认 127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765, help="监听端口, 默认 8765")
+    parser.add_argument("--unix-socket", default=None, help="改为监听 Unix socket(忽略 --host/--port)")
+    parser.add_argument("-w", "--workers", type=int, default=2, help="同时生成的请求数, 默认 2")
+    parser.add_argument("--max-queue", type=int, default=16,
+                        help="排队请求上限, 超出时返回 503, 默认 16")
+    parser.add_argument("--engine", choices=ENGINE_CHOICES, default="pptx", help="默认的占位符填充引擎")
+    parser.add_argument("--template-cache-mb", type=int, default=None, help="模板缓存上限(MB)")
+    parser.add_argument("--compress-level", type=int, choices=range(10), default=None,
+                        metavar="0-9", help="输出PPT的压缩级别, 默认 6")
+    add_logging_arguments(parser, default_level="INFO")
+    return parser
+
+
+def main(argv=None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    try:
+        templates = parse_named_paths(args.template, "--template")
+        mappings = parse_named_paths(args.mappings, "--mappings")
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
+
+    setup_logging(parser, args, default_level=logging.INFO)
+
+    from client_gui.services.render_service import RenderService
+    from ppt_engine.deck_manager import set_save_options
+    from ppt_engine.template_cache import set_template_cache_limit
+
+    if args.template_cache_mb:
+        set_template_cache_limit(args.template_cache_mb * 1024 * 1024)
+    if args.compress_level is not None:
+        set_save_options(compresslevel=args.compress_level)
+    service = RenderService(max_workers=args.workers, max_queue=args.max_queue,
+                            fill_engine=args.engine)
+    try:
+        for template_id, path in templates:
+            service.register_template(template_id, path)
+        for mappings_id, path in mappings:
+            service.register_mappings(mappings_id, path)
+    except FileNotFoundError as e:
+        logger.error(str(e))
+        return 2
+
+    if args.unix_socket:
+        server = UnixHTTPServer(args.unix_socket, RenderRequestHandler)
+        address = args.unix_socket
+    else:
+        server = ThreadingHTTPServer((args.host, args.port), RenderRequestHandler)
+        server.daemon_threads = True
+        address = f"http://{args.host}:{server.server_address[1]}"
+    server.render_service = service
+
+    def on_signal(signum, frame):
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, on_signal)
+    logger.info(f"生成服务已启动: {address}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("生成服务正在退出...")
+    finally:
+        server.server_close()
+        service.shutdown()
+        if args.unix_socket and os.path.exists(args.unix_socket):
+            os.remove(args.unix_socket)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
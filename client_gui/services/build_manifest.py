@@ -0,0 +1,164 @@
+import os
+import json
+import hashlib
+import logging
+from typing import Dict, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+#: 构建清单文件名, 存放在输出目录下
+MANIFEST_FILENAME = ".ppt_build_manifest.json"
+
+_HASH_CHUNK = 1024 * 1024
+
+
+def hash_file(path: str) -> str:
+    """
+    文件内容的 sha256(分块读取, 不整读入内存).
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def hash_mappings(slide_mapping: dict) -> str:
+    """
+    映射内容的 sha256(按 key 排序后序列化, 与文件格式/缩进无关).
+    """
+    canonical = json.dumps(
+        {str(k): v for k, v in slide_mapping.items()},
+        sort_keys=True, ensure_ascii=False, separators=(",", ":")
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class BuildManifest:
+    """
+    增量构建清单, 记录上次成功生成每个PPT时的输入:
+    - 全局: 引擎版本、映射哈希; 任一变化 => 全部重建;
+    - 每个Excel: 内容哈希、所用模板的哈希、输出文件路径.
+
+    为避免每次都完整读取未变化的文件, 同时记录文件大小和 mtime,
+    两者都未变化时直接沿用上次的哈希.
+
+    本次构建中没有访问过的记录(输入已删除或改名)在完整扫描输入后由 prune_unseen 删除.
+    """
+
+    VERSION = 1
+
+    def __init__(self, path: str):
+        self.path = path
+        self.engine_version = None
+        self.mappings_hash = None
+        self.files: Dict[str, dict] = {}
+        self._hash_cache: Dict[str, dict] = {}
+        self._seen_paths: Set[str] = set()
+        self._seen_files: Set[str] = set()
+        self._dirty = False
+
+    @classmethod
+    def load(cls, output_dir: str) -> "BuildManifest":
+        manifest = cls(os.path.join(output_dir, MANIFEST_FILENAME))
+        if not os.path.isfile(manifest.path):
+            return manifest
+        try:
+            with open(manifest.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == cls.VERSION:
+                manifest.engine_version = data.get("engine_version")
+                manifest.mappings_hash = data.get("mappings_hash")
+                manifest.files = data.get("files", {})
+                manifest._hash_cache = data.get("hash_cache", {})
+        except Exception as e:
+            logger.warning(f"构建清单读取失败, 将全部重建: {e}")
+        return manifest
+
+    def begin(self, engine_version: str, mappings_hash: str) -> bool:
+        """
+        开始一次构建. 引擎版本或映射变化时清空所有记录.
+        返回 True 表示之前的记录仍然有效.
+        """
+        valid = (self.engine_version == engine_version and self.mappings_hash == mappings_hash)
+        if not valid:
+            self.files = {}
+            self.engine_version = engine_version
+            self.mappings_hash = mappings_hash
+            self._dirty = True
+        return valid
+
+    def content_hash(self, path: str) -> str:
+        """
+        返回文件内容哈希; 大小和 mtime 未变时复用上次的结果.
+        """
+        abs_path = os.path.abspath(path)
+        self._seen_paths.add(abs_path)
+        st = os.stat(abs_path)
+        cached = self._hash_cache.get(abs_path)
+        if cached and cached["size"] == st.st_size and cached["mtime_ns"] == st.st_mtime_ns:
+            return cached["sha256"]
+        digest = hash_file(abs_path)
+        self._hash_cache[abs_path] = {
+            "size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": digest
+        }
+        self._dirty = True
+        return digest
+
+    def is_up_to_date(self, excel_file: str, input_hash: str, template_hash: str,
+                      output_path: str) -> bool:
+        self._seen_files.add(excel_file)
+        record = self.files.get(excel_file)
+        return (
+            record is not None
+            and record.get("input_hash") == input_hash
+            and record.get("template_hash") == template_hash
+            and record.get("output_path") == os.path.abspath(output_path)
+            and os.path.isfile(output_path)
+        )
+
+    def record(self, excel_file: str, input_hash: str, template_hash: str, output_path: str):
+        self.files[excel_file] = {
+            "input_hash": input_hash,
+            "template_hash": template_hash,
+            "output_path": os.path.abspath(output_path),
+        }
+        self._dirty = True
+
+    def forget(self, excel_file: str):
+        if self.files.pop(excel_file, None) is not None:
+            self._dirty = True
+
+    def prune_unseen(self) -> int:
+        """
+        删除本次构建中没有访问过的哈希缓存和文件记录, 返回删除的条数.
+        只在完整扫描过输入目录后调用; 扫描中途(如被取消)调用会删掉尚未扫描到的记录.
+        """
+        stale_paths = [path for path in self._hash_cache if path not in self._seen_paths]
+        stale_files = [name for name in self.files if name not in self._seen_files]
+        for path in stale_paths:
+            del self._hash_cache[path]
+        for name in stale_files:
+            del self.files[name]
+        if stale_paths or stale_files:
+            self._dirty = True
+        return len(stale_paths) + len(stale_files)
+
+    def save(self, force: bool = False):
+        """
+        原子写入: 先写临时文件, 再 os.replace.
+        """
+        if not (self._dirty or force):
+            return
+        data = {
+            "version": self.VERSION,
+            "engine_version": self.engine_version,
+            "mappings_hash": self.mappings_hash,
+            "files": self.files,
+            "hash_cache": self._hash_cache,
+        }
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
@@ -1,40 +1,87 @@
 import os
 import logging
+from typing import Optional
+from business_logic.cancellation import CancellationToken, ProcessingCancelled
+from business_logic.metrics import DeckMetrics
+from business_logic.preflight import CostModel, FilePreflight, TemplateInfo, check_file
 from business_logic.processor import process_ppt_with_data
-from client_gui.model.mapping_model import SlideMapping
-from data_access.excel_reader import ExcelDataProvider
+from client_gui.utils.logger import per_file_logger
+from data_access.provider_registry import create_data_provider
 
 logger = logging.getLogger(__name__)
+# 每个文件一条的日志, 可单独设置级别或抽样(见 utils.logger)
+file_logger = per_file_logger(__name__)
+
+def output_path_for(excel_file: str, output_dir: str) -> str:
+    """
+    Excel文件对应的输出PPT路径. excel_file 为相对输入目录的路径,
+    输出保持相同的子目录结构.
+    """
+    base_name, _ = os.path.splitext(excel_file)
+    return os.path.join(output_dir, f"{base_name}.pptx")
 
 def process_excel_file(
     excel_file: str,
     slide_mapping,
     input_dir: str,
     output_dir: str,
-    template_path: str
-) -> bool:
+    template_path: str,
+    cancel_token: Optional[CancellationToken] = None,
+    fill_engine: str = "pptx"
+) -> Optional[DeckMetrics]:
     """
     处理单个Excel文件，生成对应的PPT。
+    数据提供者按扩展名选择(.xlsx / .csv / .sqlite, 见 provider_registry)。
+    slide_mapping 为编译好的 MappingPlan(也可以是映射字典)。
+    成功时返回该文件的 DeckMetrics(分阶段耗时与计数), 失败时返回 None。
+    被取消时抛出 ProcessingCancelled, 由调用方计入"已取消"。
     """
     try:
         excel_path = os.path.join(input_dir, excel_file)
-        base_name, _ = os.path.splitext(excel_file)
-        output_ppt_filename = f"{base_name}.pptx"
-        output_path = os.path.join(output_dir, output_ppt_filename)
+        output_path = output_path_for(excel_file, output_dir)
+        output_ppt_filename = os.path.basename(output_path)
 
         if os.path.exists(output_path):
-            logger.info(f"已存在同名PPT，将覆盖: {output_ppt_filename}")
+            file_logger.info("已存在同名PPT，将覆盖: %s", output_ppt_filename)
             # 继续处理，允许覆盖
+        else:
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
 
-        provider = ExcelDataProvider(excel_path)
-        process_ppt_with_data(
+        provider = create_data_provider(excel_path)
+        metrics = process_ppt_with_data(
             template_path=template_path,
             output_path=output_path,
             data_provider=provider,
-            slide_mappings=slide_mapping
+            slide_mappings=slide_mapping,
+            cancel_token=cancel_token,
+            engine=fill_engine
         )
-        logger.info(f"已处理: {excel_file} -> {output_ppt_filename}")
-        return True  # 已处理
+        file_logger.info("已处理: %s -> %s", excel_file, output_ppt_filename)
+        return metrics  # 已处理
+    except ProcessingCancelled:
+        logger.info(f"已取消: {excel_file}")
+        raise
     except Exception as e:
         logger.error(f"处理 {excel_file} 时出错: {e}")
-        return False  # 处理失败
+        return None  # 处理失败
+
+def preflight_excel_file(
+    excel_file: str,
+    mapping_plan,
+    input_dir: str,
+    template_info: TemplateInfo,
+    cost_model: CostModel
+) -> FilePreflight:
+    """
+    预检单个输入文件: 只读取 sheet 名、列数和行数(见 BaseDataProvider.describe),
+    对照映射和模板检查, 不生成PPT。文件无法读取时记为错误, 不抛出异常。
+    """
+    result = FilePreflight(excel_file, template_info.path)
+    try:
+        provider = create_data_provider(os.path.join(input_dir, excel_file))
+        sheets = provider.describe(mapping_plan.sheets)
+    except Exception as e:
+        file_logger.debug("预检时无法读取 %s: %s", excel_file, e)
+        result.errors.append(f"无法读取: {e}")
+        return result
+    return check_file(result, sheets, mapping_plan, template_info, cost_model)
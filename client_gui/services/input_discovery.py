@@ -0,0 +1,67 @@
+import os
+import logging
+from typing import Iterator, Optional
+
+from data_access.provider_registry import INPUT_EXTENSIONS
+
+logger = logging.getLogger(__name__)
+
+#: 作为输入的文件扩展名(小写): Excel 以及 CSV / SQLite(见 provider_registry)
+EXCEL_EXTENSIONS = INPUT_EXTENSIONS
+
+
+def _is_excel_file(name: str) -> bool:
+    # "~$" 开头的是 Excel 打开文件时生成的锁文件, 不是工作簿
+    return name.lower().endswith(EXCEL_EXTENSIONS) and not name.startswith("~$")
+
+
+def iter_excel_files(
+    input_dir: str,
+    recursive: bool = True,
+    exclude_dir: Optional[str] = None
+) -> Iterator[str]:
+    """
+    用 os.scandir 逐个产出 input_dir 下的Excel文件, 返回相对 input_dir 的路径.
+    边扫描边产出: 目录中的文件按 os.scandir 返回的顺序立即产出, 不先读完整个目录,
+    上万个文件的扁平目录也能马上开始处理. 子目录在当前目录扫描完后按名称顺序进入,
+    同一目录内文件的顺序取决于文件系统.
+
+    recursive=False 时只扫描 input_dir 这一层.
+    exclude_dir(如位于输入目录内的输出目录)不会被扫描.
+    子目录无法读取时记录警告并跳过; input_dir 本身无法读取时抛出 OSError.
+    """
+    excluded = os.path.realpath(exclude_dir) if exclude_dir else None
+    # 栈中为 (绝对路径, 相对路径); 逆序入栈, 使子目录按名称顺序处理
+    stack = [(input_dir, "")]
+    is_root = True
+    while stack:
+        dir_path, rel_dir = stack.pop()
+        try:
+            it = os.scandir(dir_path)
+        except OSError as e:
+            if is_root:
+                raise
+            logger.warning(f"无法读取目录 {dir_path}, 已跳过: {e}")
+            continue
+        is_root = False
+
+        # 只缓存子目录(数量通常远少于文件), 文件随读随产出
+        sub_dirs = []
+        with it:
+            try:
+                for entry in it:
+                    rel_path = os.path.join(rel_dir, entry.name) if rel_dir else entry.name
+                    try:
+                        if entry.is_file():
+                            if _is_excel_file(entry.name):
+                                yield rel_path
+                        elif recursive and entry.is_dir(follow_symlinks=False):
+                            if excluded and os.path.realpath(entry.path) == excluded:
+                                continue
+                            sub_dirs.append((entry.name, entry.path, rel_path))
+                    except OSError as e:
+                        logger.warning(f"无法访问 {entry.path}, 已跳过: {e}")
+            except OSError as e:
+                logger.warning(f"读取目录 {dir_path} 时出错, 其余条目已跳过: {e}")
+        sub_dirs.sort()
+        stack.extend((path, rel_path) for _, path, rel_path in reversed(sub_dirs))
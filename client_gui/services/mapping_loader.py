@@ -1,5 +1,7 @@
 import os
 import json
+from typing import Optional
+from business_logic.mapping_plan import MappingPlan, compile_mappings
 
 # 默认映射，可根据需要在此处定义
 default_mappings = {}
@@ -31,4 +33,11 @@ def _convert_keys_to_int(raw_mappings: dict, config_path: str) -> dict:
         except ValueError:
             print(f"Warning: 无法将 key='{k}' 转成 int, 跳过 (文件: {config_path}).")
     print(f"已从 {config_path} 载入 slide_mappings.")
-    return slide_mappings
\ No newline at end of file
+    return slide_mappings
+
+def load_mapping_plan(slide_mapping_config: Optional[str]) -> MappingPlan:
+    """
+    载入映射并编译为 MappingPlan(见 business_logic.mapping_plan),
+    映射不合法时抛出 MappingError.
+    """
+    return compile_mappings(load_slide_mappings(slide_mapping_config), slide_mapping_config)
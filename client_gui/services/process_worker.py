@@ -0,0 +1,104 @@
+import os
+import logging
+import queue
+from logging.handlers import QueueHandler
+from typing import Dict, List, Optional, Tuple
+
+from business_logic.cancellation import CancellationToken, ProcessingCancelled
+from business_logic.metrics import DeckMetrics
+from client_gui.services.excel_processor import process_excel_file
+from client_gui.utils.logger import per_file_logger
+from data_access.data_cache import set_data_cache
+from ppt_engine.deck_manager import set_save_options
+from ppt_engine.template_cache import set_template_cache_limit
+
+file_logger = per_file_logger(__name__)
+
+# 每个工作进程各自持有一份映射和取消令牌, 由 init_process_worker 在进程启动时写入
+_worker_slide_mapping = None
+_worker_cancel_token: Optional[CancellationToken] = None
+_worker_fill_engine = "pptx"
+
+
+def init_process_worker(slide_mapping, log_level: int, template_cache_bytes: Optional[int] = None,
+                        cancel_event=None, compress_level: Optional[int] = None,
+                        fill_engine: str = "pptx", data_cache_dir: Optional[str] = None,
+                        data_cache_bytes: Optional[int] = None,
+                        module_levels: Optional[Dict[str, int]] = None):
+    """
+    进程池 initializer: 每个工作进程只执行一次.
+    导入本模块时 python-pptx / openpyxl 已随 excel_processor 一起载入,
+    映射(已编译的 MappingPlan)在这里传入一次, 之后的任务不再重复传输.
+    cancel_event 为主进程创建的 multiprocessing Event, 主进程取消时被置位.
+    compress_level 为输出PPT的压缩级别, fill_engine 为占位符填充引擎, 均已由主进程校验.
+    data_cache_dir / data_cache_bytes 为输入数据缓存的目录和上限, 各进程共用同一目录.
+    log_level 为主进程根 logger 的级别, module_levels 为主进程中单独设置的模块级别
+    (见 utils.logger.logger_levels), 工作进程按同样的级别过滤后再把记录传回主进程.
+    """
+    global _worker_slide_mapping, _worker_cancel_token, _worker_fill_engine
+    _worker_slide_mapping = slide_mapping
+    _worker_fill_engine = fill_engine
+    if cancel_event is not None:
+        _worker_cancel_token = CancellationToken(cancel_event)
+    logging.getLogger().setLevel(log_level)
+    for name, level in (module_levels or {}).items():
+        logging.getLogger(name).setLevel(level)
+    if template_cache_bytes:
+        set_template_cache_limit(template_cache_bytes)
+    if compress_level is not None:
+        set_save_options(compresslevel=compress_level)
+    set_data_cache(data_cache_dir, data_cache_bytes)
+
+
+def process_excel_file_in_worker(
+    excel_file: str,
+    input_dir: str,
+    output_dir: str,
+    template_path: str
+) -> Tuple[Optional[DeckMetrics], List[logging.LogRecord]]:
+    """
+    在工作进程中处理单个Excel文件.
+    返回 (处理结果 DeckMetrics 或 None, 本任务产生的日志记录), 日志记录由主进程重新分发.
+    被取消时抛出的 ProcessingCancelled 带有 log_records 属性(取消前的日志记录),
+    主进程同样重新分发.
+    """
+    records = queue.SimpleQueue()
+    handler = QueueHandler(records)
+    root_logger = logging.getLogger()
+    root_logger.addHandler(handler)
+    try:
+        try:
+            file_logger.debug("工作进程 %d 开始处理: %s", os.getpid(), excel_file)
+            result = process_excel_file(
+                excel_file,
+                _worker_slide_mapping,
+                input_dir,
+                output_dir,
+                template_path,
+                _worker_cancel_token,
+                _worker_fill_engine
+            )
+        finally:
+            root_logger.removeHandler(handler)
+    except ProcessingCancelled as e:
+        # 异常的 __dict__ 随 pickle 一起传回主进程
+        e.log_records = _drain(records)
+        raise
+    return result, _drain(records)
+
+
+def _drain(records: queue.SimpleQueue) -> List[logging.LogRecord]:
+    collected = []
+    while not records.empty():
+        collected.append(records.get_nowait())
+    return collected
+
+
+def replay_worker_records(records: List[logging.LogRecord]):
+    """
+    在主进程中把工作进程的日志记录交给对应 logger 处理.
+    """
+    for record in records:
+        logger = logging.getLogger(record.name)
+        if logger.isEnabledFor(record.levelno):
+            logger.handle(record)
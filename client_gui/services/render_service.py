@@ -0,0 +1,262 @@
+import os
+import time
+import logging
+import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from io import BytesIO
+from typing import Dict, Optional
+
+from business_logic.mapping_plan import MappingPlan
+from business_logic.metrics import STAGES, LatencyHistogram
+from business_logic.processor import FILL_ENGINES, process_ppt_with_data
+from client_gui.services.mapping_loader import load_mapping_plan
+from data_access.provider_registry import create_data_provider
+from ppt_engine.template_cache import get_template_cache
+
+logger = logging.getLogger(__name__)
+
+#: 默认排队上限(不含正在处理的请求)
+DEFAULT_MAX_QUEUE = 16
+
+#: 请求计数器
+REQUEST_COUNTERS = ("accepted", "rejected", "succeeded", "failed")
+
+
+class ServiceBusy(Exception):
+    """
+    排队的请求已达上限, 拒绝新请求(HTTP 503).
+    """
+
+
+class UnknownResource(KeyError):
+    """
+    请求中的模板ID或映射ID未注册(HTTP 404).
+    """
+
+
+class _MappingsEntry:
+    """
+    已注册的映射文件(编译为 MappingPlan): 文件修改后在下一次请求时重新载入.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.mtime_ns = None
+        self.mappings = None
+        self.lock = threading.Lock()
+
+    def get(self) -> MappingPlan:
+        mtime_ns = os.stat(self.path).st_mtime_ns
+        with self.lock:
+            if self.mtime_ns != mtime_ns:
+                self.mappings = load_mapping_plan(self.path)
+                self.mtime_ns = mtime_ns
+            return self.mappings
+
+
+class RenderService:
+    """
+    常驻进程内的单份PPT生成服务:
+    - 模板和映射在启动时按ID注册并预热(解析模板、分析占位符、载入映射),
+      之后每个请求只取模板的深拷贝, 不再重复导入依赖和解析;
+    - 固定大小的线程池处理请求, 排队数超过 max_queue 时 submit 抛出 ServiceBusy;
+    - stats() 返回请求计数、排队/处理/总耗时直方图和各生成阶段耗时直方图.
+
+    请求(dict):
+      template, mappings: 已注册的ID, 只注册了一个时可省略;
+      workbook_path 或 workbook_bytes: 工作簿路径(.xlsx / .csv / .sqlite)或 .xlsx 内容(二选一);
+      output_path: 可选, 给出时写入该文件, 否则返回PPT内容;
+      engine: 可选, 默认为服务的 fill_engine.
+    """
+
+    def __init__(self, max_workers: int = 2, max_queue: int = DEFAULT_MAX_QUEUE,
+                 fill_engine: str = "pptx"):
+        if fill_engine not in FILL_ENGINES:
+            raise ValueError(f"未知的填充引擎: {fill_engine}, 可选: {', '.join(FILL_ENGINES)}")
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.fill_engine = fill_engine
+        self.templates: Dict[str, str] = {}
+        self._mappings: Dict[str, _MappingsEntry] = {}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="render")
+        self._lock = threading.Lock()
+        self._pending = 0  # 已接受、尚未完成的请求(排队 + 处理中)
+        self._running = 0
+        self.counters = {name: 0 for name in REQUEST_COUNTERS}
+        self.histograms = {name: LatencyHistogram() for name in ("queue_wait", "render", "total")}
+        self.stage_histograms = {stage: LatencyHistogram() for stage in STAGES}
+        self.started_at = time.time()
+
+    # ---- 注册与预热 ----
+    def register_template(self, template_id: str, path: str):
+        """
+        注册模板并预热: 解析母版、分析占位符索引(进程内模板缓存).
+        """
+        if not os.path.isfile(path):
+            raise FileNotFoundError(f"模板文件不存在: {path}")
+        path = os.path.abspath(path)
+        get_template_cache().get_placeholder_index(path)
+        self.templates[template_id] = path
+        logger.info(f"已载入模板 {template_id}: {path}")
+
+    def register_mappings(self, mappings_id: str, path: str):
+        if not os.path.isfile(path):
+            raise FileNotFoundError(f"映射文件不存在: {path}")
+        entry = _MappingsEntry(os.path.abspath(path))
+        entry.get()
+        self._mappings[mappings_id] = entry
+        logger.info(f"已载入映射 {mappings_id}: {path}")
+
+    def _resolve(self, registry: dict, key: Optional[str], kind: str):
+        if key is None and len(registry) == 1:
+            return next(iter(registry.values()))
+        if key not in registry:
+            raise UnknownResource(f"未注册的{kind}: {key}, 可选: {', '.join(registry)}")
+        return registry[key]
+
+    # ---- 请求 ----
+    def submit(self, request: dict) -> Future:
+        """
+        校验请求并放入线程池. 参数错误抛出 ValueError / UnknownResource,
+        排队已满抛出 ServiceBusy. Future 的结果见 _render.
+        """
+        template_path = self._resolve(self.templates, request.get("template"), "模板")
+        mappings_entry = self._resolve(self._mappings, request.get("mappings"), "映射")
+        engine = request.get("engine") or self.fill_engine
+        if engine not in FILL_ENGINES:
+            raise ValueError(f"未知的填充引擎: {engine}, 可选: {', '.join(FILL_ENGINES)}")
+        if (request.get("workbook_path") is None) == (request.get("workbook_bytes") is None):
+            raise ValueError("请求需要 workbook_path 或 workbook_bytes 之一")
+        if request.get("workbook_path") is not None and not os.path.isfile(request["workbook_path"]):
+            raise ValueError(f"Excel文件不存在: {request['workbook_path']}")
+
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                self.counters["rejected"] += 1
+                raise ServiceBusy(f"排队请求已达上限 {self.max_queue}")
+            self._pending += 1
+            self.counters["accepted"] += 1
+        accepted_at = time.perf_counter()
+        try:
+            return self._executor.submit(self._render, request, template_path,
+                                         mappings_entry, engine, accepted_at)
+        except BaseException:
+            with self._lock:
+                self._pending -= 1
+            raise
+
+    def render(self, request: dict) -> dict:
+        """
+        submit 并等待结果.
+        """
+        return self.submit(request).result()
+
+    def _render(self, request: dict, template_path: str, mappings_entry: _MappingsEntry,
+                engine: str, accepted_at: float) -> dict:
+        """
+        返回 {"output_path" 或 "data", "seconds", "stage_seconds", "counters"}.
+        """
+        started = time.perf_counter()
+        with self._lock:
+            self._running += 1
+            self.histograms["queue_wait"].observe(started - accepted_at)
+        workbook_path = request.get("workbook_path")
+        tmp_workbook = None
+        metrics = None
+        try:
+            if workbook_path is None:
+                # 数据提供者按路径读取, 上传的内容先落到临时文件
+                fd, tmp_workbook = tempfile.mkstemp(suffix=".xlsx", prefix="render_")
+                with os.fdopen(fd, "wb") as f:
+                    f.write(request["workbook_bytes"])
+                workbook_path = tmp_workbook
+            output_path = request.get("output_path")
+            if output_path:
+                os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+                output = output_path
+            else:
+                output = BytesIO()
+            metrics = process_ppt_with_data(
+                template_path=template_path,
+                output_path=output,
+                data_provider=create_data_provider(workbook_path),
+                slide_mappings=mappings_entry.get(),
+                engine=engine
+            )
+            result = {"seconds": time.perf_counter() - started,
+                      "stage_seconds": dict(metrics.stage_seconds)}
+            if output_path:
+                result["output_path"] = output_path
+            else:
+                result["data"] = output.getvalue()
+                metrics.add("output_bytes", len(result["data"]))
+            result["counters"] = dict(metrics.counters)
+            return result
+        finally:
+            if tmp_workbook is not None:
+                try:
+                    os.remove(tmp_workbook)
+                except OSError:
+                    pass
+            finished = time.perf_counter()
+            with self._lock:
+                self._running -= 1
+                self._pending -= 1
+                self.counters["succeeded" if metrics is not None else "failed"] += 1
+                self.histograms["render"].observe(finished - started)
+                self.histograms["total"].observe(finished - accepted_at)
+                if metrics is not None:
+                    for stage, seconds in metrics.stage_seconds.items():
+                        self.stage_histograms[stage].observe(seconds)
+
+    # ---- 统计 ----
+    def stats(self) -> dict:
+        cache = get_template_cache()
+        with self._lock:
+            return {
+                "uptime_seconds": time.time() - self.started_at,
+                "workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "running": self._running,
+                "queued": self._pending - self._running,
+                "requests": dict(self.counters),
+                "latency_seconds": {name: h.to_dict() for name, h in self.histograms.items()},
+                "stage_seconds": {stage: h.to_dict() for stage, h in self.stage_histograms.items()
+                                  if h.count},
+                "templates": dict(self.templates),
+                "mappings": {key: entry.path for key, entry in self._mappings.items()},
+                "template_cache": {"hits": cache.hits, "misses": cache.misses,
+                                   "bytes": cache.total_bytes},
+            }
+
+    def to_prometheus(self, prefix: str = "ppt_render") -> str:
+        """
+        Prometheus 文本格式的请求计数和耗时直方图.
+        """
+        with self._lock:
+            lines = [
+                f"# HELP {prefix}_requests_total Render requests by outcome.",
+                f"# TYPE {prefix}_requests_total counter",
+            ]
+            for name, value in self.counters.items():
+                lines.append(f'{prefix}_requests_total{{outcome="{name}"}} {value}')
+            lines += [
+                f"# HELP {prefix}_queued Requests waiting for a worker.",
+                f"# TYPE {prefix}_queued gauge",
+                f"{prefix}_queued {self._pending - self._running}",
+                f"# HELP {prefix}_latency_seconds Request latency by phase.",
+                f"# TYPE {prefix}_latency_seconds histogram",
+            ]
+            for name, histogram in self.histograms.items():
+                lines += histogram.prometheus_lines(f"{prefix}_latency_seconds", f'phase="{name}"')
+            lines += [
+                f"# HELP {prefix}_stage_seconds Per-deck time spent in each generation stage.",
+                f"# TYPE {prefix}_stage_seconds histogram",
+            ]
+            for stage, histogram in self.stage_histograms.items():
+                lines += histogram.prometheus_lines(f"{prefix}_stage_seconds", f'stage="{stage}"')
+        return "\n".join(lines) + "\n"
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,298 @@
+import os
+import json
+import time
+import socket
+import hashlib
+import logging
+from typing import Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+#: 队列目录下的子目录
+PENDING_DIR = "pending"
+RUNNING_DIR = "running"
+DONE_DIR = "done"
+FAILED_DIR = "failed"
+SPOOL_DIRS = (PENDING_DIR, RUNNING_DIR, DONE_DIR, FAILED_DIR)
+
+#: 默认租约时长(秒). 工作进程每 1/3 租约续约一次.
+DEFAULT_LEASE_SECONDS = 60.0
+
+#: 同一任务因租约过期被重新领取的最大次数, 超过后记为失败
+DEFAULT_MAX_ATTEMPTS = 3
+
+#: running 目录下文件名中任务ID与持有者之间的分隔符
+_OWNER_SEP = "@"
+
+
+def make_worker_id() -> str:
+    """
+    主机名-进程号-随机后缀, 用于租约文件名和临时输出文件名.
+    """
+    host = socket.gethostname().split(".")[0] or "host"
+    return f"{host}-{os.getpid()}-{os.urandom(2).hex()}".replace(_OWNER_SEP, "_")
+
+
+def make_job_id(rel_path: str) -> str:
+    """
+    由相对路径得到稳定的任务ID: 路径哈希前缀 + 文件名(去掉分隔符等特殊字符).
+    同一批次重复提交时ID不变.
+    """
+    digest = hashlib.sha1(rel_path.replace(os.sep, "/").encode("utf-8")).hexdigest()[:12]
+    stem = os.path.splitext(os.path.basename(rel_path))[0]
+    safe = "".join(ch if ch.isalnum() or ch in "-_" else "_" for ch in stem)[:60]
+    return f"{digest}_{safe}"
+
+
+def _write_json_atomic(path: str, data: dict):
+    """
+    先写同目录下的隐藏临时文件再 rename; 扫描时忽略 "." 开头的文件.
+    队列目录由多台主机共享, 临时文件名含主机名、进程号和随机后缀(make_worker_id),
+    不同主机上进程号相同的进程写同一任务时不会互相覆盖临时文件.
+    """
+    directory, name = os.path.split(path)
+    tmp_path = os.path.join(directory, f".{name}.{make_worker_id()}.tmp")
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _read_json(path: str) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class Lease:
+    """
+    一个已领取的任务: running/<job_id>@<worker_id>.json.
+    文件存在即持有租约; 租约时间取文件的 mtime/ctime(领取时的 rename、续约时的 utime 都会更新).
+    """
+
+    def __init__(self, queue: "SpoolQueue", job_id: str, worker_id: str, job: dict,
+                 previous_owner: Optional[str] = None):
+        self.queue = queue
+        self.job_id = job_id
+        self.worker_id = worker_id
+        self.job = job
+        self.previous_owner = previous_owner
+        self.path = queue.running_path(job_id, worker_id)
+
+    def renew(self) -> bool:
+        """
+        续约. 返回 False 表示租约已丢失(过期后被其他工作进程领取).
+        """
+        try:
+            os.utime(self.path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def complete(self, status: dict) -> bool:
+        """
+        写 done/<job_id>.json 并释放租约. 租约已丢失时不写, 返回 False.
+        """
+        if not self.renew():
+            return False
+        _write_json_atomic(self.queue.status_path(DONE_DIR, self.job_id), status)
+        self._release()
+        return True
+
+    def fail(self, status: dict) -> bool:
+        """
+        写 failed/<job_id>.json 并释放租约. 租约已丢失时不写, 返回 False.
+        """
+        if not self.renew():
+            return False
+        _write_json_atomic(self.queue.status_path(FAILED_DIR, self.job_id), status)
+        self._release()
+        return True
+
+    def _release(self):
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+
+class SpoolQueue:
+    """
+    基于共享目录(如 NFS)的任务队列, 不依赖任何服务进程:
+
+        <queue_dir>/pending/<job_id>.json              待处理
+        <queue_dir>/running/<job_id>@<worker_id>.json  已被领取(租约)
+        <queue_dir>/done/<job_id>.json                 完成状态(含指标)
+        <queue_dir>/failed/<job_id>.json               失败状态(含错误)
+
+    领取: rename pending -> running, 同一任务只有一个工作进程能成功.
+    续约: 持有者定期 utime 自己的 running 文件.
+    过期: 超过 lease_seconds 未续约的 running 文件可被任何工作进程
+    rename 成自己的名字重新领取(同样只有一个能成功), 原持有者续约失败后放弃该任务.
+
+    过期判断使用本机时钟与文件时间比较, 各主机的时钟需同步(NTP),
+    lease_seconds 应远大于时钟偏差.
+    """
+
+    def __init__(self, queue_dir: str, lease_seconds: float = DEFAULT_LEASE_SECONDS,
+                 max_attempts: int = DEFAULT_MAX_ATTEMPTS):
+        self.queue_dir = queue_dir
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        for name in SPOOL_DIRS:
+            os.makedirs(os.path.join(queue_dir, name), exist_ok=True)
+
+    # ---- 路径 ----
+    def _dir(self, name: str) -> str:
+        return os.path.join(self.queue_dir, name)
+
+    def pending_path(self, job_id: str) -> str:
+        return os.path.join(self._dir(PENDING_DIR), f"{job_id}.json")
+
+    def running_path(self, job_id: str, worker_id: str) -> str:
+        return os.path.join(self._dir(RUNNING_DIR), f"{job_id}{_OWNER_SEP}{worker_id}.json")
+
+    def status_path(self, state: str, job_id: str) -> str:
+        return os.path.join(self._dir(state), f"{job_id}.json")
+
+    def _iter_names(self, state: str) -> Iterator[str]:
+        with os.scandir(self._dir(state)) as it:
+            names = sorted(e.name for e in it if e.name.endswith(".json") and not e.name.startswith("."))
+        return iter(names)
+
+    # ---- 提交 ----
+    def submit(self, job_id: str, job: dict, force: bool = False) -> bool:
+        """
+        写入一个待处理任务. 已存在(任意状态)且 force=False 时跳过, 返回 False.
+        force=True 时清除旧的完成/失败状态后重新排队(正在运行的任务仍然跳过).
+        """
+        if self._exists_anywhere(job_id, include_finished=not force):
+            return False
+        if force:
+            for state in (DONE_DIR, FAILED_DIR):
+                try:
+                    os.unlink(self.status_path(state, job_id))
+                except FileNotFoundError:
+                    pass
+        job = dict(job, job_id=job_id, attempts=0, submitted_at=time.time())
+        _write_json_atomic(self.pending_path(job_id), job)
+        return True
+
+    def _exists_anywhere(self, job_id: str, include_finished: bool) -> bool:
+        if os.path.exists(self.pending_path(job_id)):
+            return True
+        prefix = f"{job_id}{_OWNER_SEP}"
+        if any(name.startswith(prefix) for name in self._iter_names(RUNNING_DIR)):
+            return True
+        if include_finished:
+            return any(os.path.exists(self.status_path(state, job_id))
+                       for state in (DONE_DIR, FAILED_DIR))
+        return False
+
+    # ---- 领取 ----
+    def claim(self, worker_id: str) -> Optional[Lease]:
+        """
+        领取一个任务: 先取待处理任务, 没有时尝试接手租约已过期的任务.
+        没有可领取的任务时返回 None.
+        """
+        for name in self._iter_names(PENDING_DIR):
+            job_id = name[:-len(".json")]
+            try:
+                os.rename(self.pending_path(job_id), self.running_path(job_id, worker_id))
+            except FileNotFoundError:
+                continue  # 被其他工作进程抢先领取
+            lease = self._start_lease(job_id, worker_id, previous_owner=None)
+            if lease is not None:
+                return lease
+        return self._reclaim_expired(worker_id)
+
+    def _reclaim_expired(self, worker_id: str) -> Optional[Lease]:
+        now = time.time()
+        for name, job_id, owner in self._iter_running():
+            path = os.path.join(self._dir(RUNNING_DIR), name)
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            if now - max(st.st_mtime, st.st_ctime) < self.lease_seconds:
+                continue
+            try:
+                os.rename(path, self.running_path(job_id, worker_id))
+            except FileNotFoundError:
+                continue  # 原持有者刚完成, 或被其他工作进程接手
+            logger.warning(f"任务 {job_id} 的租约已过期(原持有者 {owner}), 由 {worker_id} 重新领取。")
+            lease = self._start_lease(job_id, worker_id, previous_owner=owner)
+            if lease is not None:
+                return lease
+        return None
+
+    def _iter_running(self) -> Iterator[Tuple[str, str, str]]:
+        for name in self._iter_names(RUNNING_DIR):
+            job_id, sep, owner = name[:-len(".json")].rpartition(_OWNER_SEP)
+            if sep:
+                yield name, job_id, owner
+
+    def _start_lease(self, job_id: str, worker_id: str, previous_owner: Optional[str]) -> Optional[Lease]:
+        """
+        领取成功后: 刷新租约时间、累加尝试次数; 超过最大次数时直接记为失败.
+        """
+        path = self.running_path(job_id, worker_id)
+        try:
+            os.utime(path)
+            job = _read_json(path)
+        except FileNotFoundError:
+            return None
+        except ValueError as e:
+            logger.error(f"任务文件损坏, 记为失败: {job_id}: {e}")
+            job = {"job_id": job_id, "attempts": self.max_attempts}
+        job["attempts"] = job.get("attempts", 0) + 1
+        lease = Lease(self, job_id, worker_id, job, previous_owner)
+        if job["attempts"] > self.max_attempts:
+            lease.fail({
+                "job_id": job_id,
+                "status": "failed",
+                "error": f"租约过期次数超过 {self.max_attempts} 次, 放弃",
+                "attempts": job["attempts"] - 1,
+                "worker": worker_id,
+                "finished_at": time.time(),
+            })
+            return None
+        _write_json_atomic(path, job)
+        return lease
+
+    # ---- 查询 ----
+    def counts(self) -> Dict[str, int]:
+        """
+        {"pending", "running", "expired", "done", "failed"}
+        """
+        now = time.time()
+        running = expired = 0
+        for name, _, _ in self._iter_running():
+            running += 1
+            try:
+                st = os.stat(os.path.join(self._dir(RUNNING_DIR), name))
+            except FileNotFoundError:
+                continue
+            if now - max(st.st_mtime, st.st_ctime) >= self.lease_seconds:
+                expired += 1
+        return {
+            "pending": sum(1 for _ in self._iter_names(PENDING_DIR)),
+            "running": running,
+            "expired": expired,
+            "done": sum(1 for _ in self._iter_names(DONE_DIR)),
+            "failed": sum(1 for _ in self._iter_names(FAILED_DIR)),
+        }
+
+    def is_drained(self) -> bool:
+        """
+        没有待处理和运行中的任务.
+        """
+        counts = self.counts()
+        return counts["pending"] == 0 and counts["running"] == 0
+
+    def failed_jobs(self) -> List[dict]:
+        return [_read_json(os.path.join(self._dir(FAILED_DIR), name))
+                for name in self._iter_names(FAILED_DIR)]
@@ -0,0 +1,186 @@
+import os
+import time
+import socket
+import logging
+import threading
+from typing import Dict, Optional
+
+from business_logic.cancellation import CancellationToken, ProcessingCancelled
+from business_logic.mapping_plan import MappingPlan
+from business_logic.processor import process_ppt_with_data
+from client_gui.services.mapping_loader import load_mapping_plan
+from client_gui.services.spool_queue import Lease, SpoolQueue, make_worker_id
+from data_access.provider_registry import create_data_provider
+from ppt_engine.deck_manager import set_save_options
+
+logger = logging.getLogger(__name__)
+
+#: 每个租约周期内续约的次数
+RENEWALS_PER_LEASE = 3
+
+#: 队列为空时两次领取之间的等待(秒)
+DEFAULT_POLL_INTERVAL = 2.0
+
+
+def temp_output_path(output_path: str, worker_id: str) -> str:
+    """
+    工作进程写入的临时输出, 完成后 os.replace 为正式输出; 带上 worker_id,
+    接手过期任务时可以找到并删除原持有者留下的文件.
+    """
+    return f"{output_path}.{worker_id}.tmp"
+
+
+class _LeaseRenewer(threading.Thread):
+    """
+    后台线程: 每 lease_seconds / RENEWALS_PER_LEASE 续约一次.
+    续约失败(租约已被他人接手)时取消 job_token, 处理在下一个阶段边界停止.
+    """
+
+    def __init__(self, lease: Lease, lease_seconds: float, job_token: CancellationToken):
+        super().__init__(name=f"lease-{lease.job_id}", daemon=True)
+        self.lease = lease
+        self.interval = lease_seconds / RENEWALS_PER_LEASE
+        self.job_token = job_token
+        self.lost = False
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            if not self.lease.renew():
+                self.lost = True
+                logger.warning(f"任务 {self.lease.job_id} 的租约已丢失, 停止处理。")
+                self.job_token.cancel()
+                return
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+class SpoolWorker:
+    """
+    从 SpoolQueue 领取任务并生成PPT, 每个任务:
+    1. 领取(租约), 启动续约线程;
+    2. 生成到临时文件 <输出>.<worker_id>.tmp;
+    3. 确认仍持有租约后 os.replace 为正式输出, 写 done/ 状态文件并释放租约;
+       出错时写 failed/ 状态文件.
+    租约丢失的任务不写输出也不写状态, 由接手的工作进程负责.
+    """
+
+    def __init__(self, queue: SpoolQueue, worker_id: Optional[str] = None,
+                 poll_interval: float = DEFAULT_POLL_INTERVAL,
+                 stop_token: Optional[CancellationToken] = None):
+        self.queue = queue
+        self.worker_id = worker_id or make_worker_id()
+        self.poll_interval = poll_interval
+        # stop_token 被取消后不再领取新任务, 当前任务照常完成
+        self.stop_token = stop_token or CancellationToken()
+        self._wake = threading.Event()
+        self.stop_token.add_callback(self._wake.set)
+        self._mappings_cache: Dict[str, MappingPlan] = {}
+        self.counts = {"done": 0, "failed": 0, "lost": 0}
+
+    def run(self, exit_when_empty: bool = False, max_jobs: Optional[int] = None) -> Dict[str, int]:
+        """
+        循环领取并处理任务, 返回本工作进程的 {"done", "failed", "lost"} 计数.
+        exit_when_empty=True 时队列中没有待处理和运行中的任务后退出;
+        否则一直轮询, 直到 stop_token 被取消.
+        """
+        logger.info(f"工作进程 {self.worker_id} 已启动, 队列: {self.queue.queue_dir}")
+        handled = 0
+        while not self.stop_token.cancelled:
+            if max_jobs is not None and handled >= max_jobs:
+                break
+            lease = self.queue.claim(self.worker_id)
+            if lease is None:
+                if exit_when_empty and self.queue.is_drained():
+                    break
+                # 可能有其他工作进程的任务尚未过期, 稍后再看
+                self._wake.wait(self.poll_interval)
+                continue
+            self.run_job(lease)
+            handled += 1
+        logger.info(f"工作进程 {self.worker_id} 退出: {self.counts}")
+        return dict(self.counts)
+
+    def _load_mappings(self, mappings_file: Optional[str]) -> MappingPlan:
+        key = mappings_file or ""
+        if key not in self._mappings_cache:
+            self._mappings_cache[key] = load_mapping_plan(mappings_file)
+        return self._mappings_cache[key]
+
+    def run_job(self, lease: Lease) -> str:
+        """
+        处理一个已领取的任务, 返回 "done" / "failed" / "lost".
+        """
+        job = lease.job
+        output_path = job["output_path"]
+        tmp_path = temp_output_path(output_path, self.worker_id)
+        if lease.previous_owner:
+            _remove_quietly(temp_output_path(output_path, lease.previous_owner))
+
+        job_token = CancellationToken()
+        renewer = _LeaseRenewer(lease, self.queue.lease_seconds, job_token)
+        renewer.start()
+        started_at = time.time()
+        status = {
+            "job_id": lease.job_id,
+            "excel_path": job.get("excel_path"),
+            "output_path": output_path,
+            "template_path": job.get("template_path"),
+            "worker": self.worker_id,
+            "host": socket.gethostname(),
+            "attempts": job.get("attempts", 1),
+            "started_at": started_at,
+        }
+        error = None
+        metrics = None
+        try:
+            if job.get("compress_level") is not None:
+                set_save_options(compresslevel=job["compress_level"])
+            os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+            metrics = process_ppt_with_data(
+                template_path=job["template_path"],
+                output_path=tmp_path,
+                data_provider=create_data_provider(job["excel_path"]),
+                slide_mappings=self._load_mappings(job.get("mappings_file")),
+                cancel_token=job_token,
+                engine=job.get("fill_engine", "pptx")
+            )
+        except ProcessingCancelled:
+            pass  # 只有租约丢失会取消 job_token
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            logger.error(f"处理任务 {lease.job_id} ({job.get('excel_path')}) 时出错: {e}")
+        finally:
+            renewer.stop()
+
+        status["finished_at"] = time.time()
+        status["seconds"] = round(status["finished_at"] - started_at, 4)
+        if renewer.lost or not lease.renew():
+            _remove_quietly(tmp_path)
+            self.counts["lost"] += 1
+            return "lost"
+
+        if error is None:
+            os.replace(tmp_path, output_path)
+            status["status"] = "done"
+            status["stage_seconds"] = {k: round(v, 4) for k, v in metrics.stage_seconds.items()}
+            status["counters"] = dict(metrics.counters)
+            outcome = "done" if lease.complete(status) else "lost"
+        else:
+            _remove_quietly(tmp_path)
+            status["status"] = "failed"
+            status["error"] = error
+            outcome = "failed" if lease.fail(status) else "lost"
+        self.counts[outcome] += 1
+        if outcome == "done":
+            logger.info(f"已处理: {job.get('excel_path')} -> {os.path.basename(output_path)}")
+        return outcome
+
+
+def _remove_quietly(path: str):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
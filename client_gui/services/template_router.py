@@ -0,0 +1,57 @@
+import os
+import fnmatch
+from typing import Callable, Dict, Optional, Sequence, Tuple, Union
+
+#: 模板路由规则:
+#: - 可调用对象: rule(excel_file) -> 模板路径, 返回 None 表示使用默认模板;
+#: - 或 [(文件名通配符, 模板路径), ...] / {通配符: 模板路径}, 按顺序取第一个匹配项.
+TemplateRules = Union[
+    Callable[[str], Optional[str]],
+    Sequence[Tuple[str, str]],
+    Dict[str, str],
+]
+
+
+def _iter_pattern_rules(template_rules) -> Sequence[Tuple[str, str]]:
+    if isinstance(template_rules, dict):
+        return list(template_rules.items())
+    return list(template_rules)
+
+
+def resolve_template(
+    excel_file: str,
+    default_template: str,
+    template_rules: Optional[TemplateRules] = None
+) -> str:
+    """
+    为单个Excel文件选择PPT模板, 未命中任何规则时返回 default_template.
+    通配符只匹配文件名(不含目录), 不区分大小写.
+    """
+    if not template_rules:
+        return default_template
+
+    if callable(template_rules):
+        chosen = template_rules(excel_file)
+        return chosen or default_template
+
+    file_name = os.path.basename(excel_file).lower()
+    for pattern, template_path in _iter_pattern_rules(template_rules):
+        if fnmatch.fnmatch(file_name, pattern.lower()):
+            return template_path
+    return default_template
+
+
+def rule_templates(template_rules: Optional[TemplateRules]) -> list:
+    """
+    通配符规则中的全部模板路径(可调用规则无法预先列出, 返回空列表).
+    """
+    if not template_rules or callable(template_rules):
+        return []
+    return [path for _, path in _iter_pattern_rules(template_rules)]
+
+
+def missing_rule_templates(template_rules: Optional[TemplateRules]) -> list:
+    """
+    返回通配符规则中指向不存在文件的模板路径(可调用规则无法预先检查, 返回空列表).
+    """
+    return [path for path in rule_templates(template_rules) if not os.path.isfile(path)]
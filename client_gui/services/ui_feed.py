@@ -0,0 +1,131 @@
+import os
+import threading
+from collections import deque
+from typing import List, Optional, Tuple
+
+from business_logic.metrics import STAGES, ProgressSnapshot
+
+#: 界面刷新日志和进度的间隔(毫秒)
+FEED_INTERVAL_MS = 250
+
+#: 界面日志默认保留的行数
+DEFAULT_LOG_LINES = 5000
+
+#: 完整运行日志的文件名, 写在输出目录下(每次运行覆盖)
+RUN_LOG_FILENAME = "ppt_generator_run.log"
+
+#: 阶段面板中的显示名称
+STAGE_LABELS = {
+    "open_template": "打开模板",
+    "read_data": "读取数据",
+    "prepare_slides": "复制幻灯片",
+    "fill_placeholders": "填充占位符",
+    "save": "保存",
+}
+
+
+class UiFeed:
+    """
+    工作线程与界面之间的缓冲: 工作线程调用 log / update_progress 只做内存操作(和一次文件写入),
+    不发 Qt 信号; 界面用定时器调用 drain, 一次取走这段时间内的日志和最新进度.
+
+    - 待显示的日志行放在容量为 max_lines 的环形缓冲中, 两次 drain 之间的输出超过容量时
+      只保留最新的 max_lines 行, dropped 记录省略的行数;
+    - log_file 不为空时, 每条日志同时写入该文件(完整日志, 不受容量限制).
+    线程安全.
+    """
+
+    def __init__(self, max_lines: int = DEFAULT_LOG_LINES, log_file: Optional[str] = None):
+        self.max_lines = max(max_lines, 1)
+        self.log_file = log_file
+        self._lines = deque(maxlen=self.max_lines)
+        self._dropped = 0
+        self._snapshot: Optional[ProgressSnapshot] = None
+        self._lock = threading.Lock()
+        self._file = open(log_file, "w", encoding="utf-8") if log_file else None
+
+    def log(self, message: str):
+        lines = message.splitlines() or [""]
+        with self._lock:
+            overflow = len(self._lines) + len(lines) - self.max_lines
+            if overflow > 0:
+                self._dropped += overflow
+            self._lines.extend(lines)
+            if self._file is not None:
+                self._file.write("\n".join(lines) + "\n")
+
+    def update_progress(self, snapshot: ProgressSnapshot):
+        self._snapshot = snapshot
+
+    def drain(self) -> Tuple[List[str], int, Optional[ProgressSnapshot]]:
+        """
+        取走待显示的日志行、其间省略的行数和最新进度(没有新进度时为 None).
+        """
+        with self._lock:
+            lines = list(self._lines)
+            self._lines.clear()
+            dropped, self._dropped = self._dropped, 0
+            snapshot, self._snapshot = self._snapshot, None
+            if self._file is not None:
+                self._file.flush()
+        return lines, dropped, snapshot
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def format_duration(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return "--:--"
+    seconds = int(round(seconds))
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes:02d}:{seconds:02d}"
+
+
+def format_progress(snapshot: ProgressSnapshot) -> str:
+    """
+    进度标签: 完成/失败/总数、速度与剩余时间.
+    """
+    total = f"{snapshot.total}" if snapshot.total_known else f"≥{snapshot.total}"
+    text = (f"完成 {snapshot.done} / 失败 {snapshot.failed} / 共 {total}  "
+            f"{snapshot.files_per_second:.1f} 文件/秒  剩余 {format_duration(snapshot.eta_seconds)}")
+    if snapshot.cancelled:
+        text += f"  已取消 {snapshot.cancelled}"
+    return text
+
+
+def format_stage_means(snapshot: ProgressSnapshot) -> str:
+    """
+    运行中的阶段面板: 各阶段平均耗时及占比.
+    """
+    total = sum(snapshot.stage_means.values())
+    if not total:
+        return "各阶段耗时: 暂无"
+    lines = ["各阶段平均耗时(每个文件):"]
+    for stage in STAGES:
+        mean = snapshot.stage_means.get(stage)
+        if mean is not None:
+            lines.append(f"  {STAGE_LABELS.get(stage, stage)}: {mean * 1000:.1f}ms ({mean / total:.0%})")
+    return "\n".join(lines)
+
+
+def format_stage_summary(stats) -> str:
+    """
+    运行结束后的阶段面板: 由 RunStats 的分位数生成.
+    """
+    summary = stats.stage_summary()
+    if not summary:
+        return "各阶段耗时: 暂无"
+    lines = [f"各阶段耗时({stats.processed} 个文件):"]
+    for stage, entry in summary.items():
+        lines.append(f"  {STAGE_LABELS.get(stage, stage)}: p50 {entry['p50'] * 1000:.1f}ms  "
+                     f"p90 {entry['p90'] * 1000:.1f}ms  max {entry['max'] * 1000:.1f}ms")
+    return "\n".join(lines)
+
+
+def run_log_path(output_dir: str) -> str:
+    return os.path.join(output_dir, RUN_LOG_FILENAME)
@@ -0,0 +1,158 @@
+"""
+共享队列目录(如 NFS)上的分布式生成, 无需任何服务进程。
+
+    # 在任意一台机器上提交: 每个Excel文件写一个任务文件
+    python -m client_gui.spool_main submit -q /mnt/share/queue \\
+        -t 模板.pptx -i Excel目录 -o 输出目录 [-m slide_mappings.json]
+
+    # 在任意多台机器上各启动任意多个工作进程
+    python -m client_gui.spool_main work -q /mnt/share/queue [--exit-when-empty]
+
+    # 查看进度
+    python -m client_gui.spool_main status -q /mnt/share/queue
+
+任务中记录的是绝对路径, 各机器需以相同路径挂载输入、输出、模板和映射文件;
+所有工作进程应使用相同的 --lease-seconds. 队列格式见 services/spool_queue.py.
+各子命令向标准输出打印一行 JSON 汇总, 日志写到标准错误。
+"""
+import os
+import sys
+import json
+import signal
+import logging
+import argparse
+import contextlib
+
+from client_gui.cli_main import ENGINE_CHOICES, add_logging_arguments, parse_template_rules, setup_logging
+from client_gui.services.spool_queue import DEFAULT_LEASE_SECONDS, DEFAULT_MAX_ATTEMPTS
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="ppt-generator-spool",
+        description="基于共享队列目录的多机批量生成 PPT。"
+    )
+    add_logging_arguments(parser, default_level="INFO")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    submit = sub.add_parser("submit", help="为输入目录中的每个Excel文件提交一个任务")
+    submit.add_argument("-q", "--queue-dir", required=True, help="共享队列目录")
+    submit.add_argument("-t", "--template", required=True, help="PPT 模板(.pptx)")
+    submit.add_argument("-i", "--input-dir", required=True, help="Excel 文件目录")
+    submit.add_argument("-o", "--output-dir", required=True, help="输出目录")
+    submit.add_argument("-m", "--mappings", default=None, help="slide_mappings.json")
+    submit.add_argument("--template-rule", action="append", default=[], metavar="PATTERN=TEMPLATE",
+                        help="按文件名通配符选择模板, 可重复, 如 'east_*=east.pptx'")
+    submit.add_argument("--engine", choices=ENGINE_CHOICES, default="pptx", help="占位符填充引擎")
+    submit.add_argument("--compress-level", type=int, choices=range(10), default=None,
+                        metavar="0-9", help="输出PPT的压缩级别, 默认 6")
+    submit.add_argument("--no-recursive", action="store_true", help="只处理输入目录这一层")
+    submit.add_argument("--force", action="store_true",
+                        help="已完成或失败的任务也重新排队(默认跳过)")
+
+    work = sub.add_parser("work", help="启动一个工作进程, 领取并处理任务")
+    work.add_argument("-q", "--queue-dir", required=True, help="共享队列目录")
+    work.add_argument("--lease-seconds", type=float, default=DEFAULT_LEASE_SECONDS,
+                      help=f"租约时长(秒), 超时未续约的任务会被重新领取, 默认 {DEFAULT_LEASE_SECONDS:g}")
+    work.add_argument("--max-attempts", type=int, default=DEFAULT_MAX_ATTEMPTS,
+                      help=f"同一任务最多被领取的次数, 默认 {DEFAULT_MAX_ATTEMPTS}")
+    work.add_argument("--poll-interval", type=float, default=2.0, help="队列为空时的轮询间隔(秒)")
+    work.add_argument("--exit-when-empty", action="store_true",
+                      help="没有待处理和运行中的任务后退出(默认一直轮询)")
+    work.add_argument("--max-jobs", type=int, default=None, help="处理这么多个任务后退出")
+    work.add_argument("--worker-id", default=None, help="工作进程ID, 默认 主机名-进程号-随机后缀")
+
+    status = sub.add_parser("status", help="打印队列状态")
+    status.add_argument("-q", "--queue-dir", required=True, help="共享队列目录")
+    status.add_argument("--lease-seconds", type=float, default=DEFAULT_LEASE_SECONDS,
+                        help="判断租约过期所用的时长(秒)")
+    return parser
+
+
+def cmd_submit(args) -> dict:
+    from client_gui.services.excel_processor import output_path_for
+    from client_gui.services.input_discovery import iter_excel_files
+    from client_gui.services.spool_queue import SpoolQueue, make_job_id
+    from client_gui.services.template_router import resolve_template, missing_rule_templates
+
+    template_rules = parse_template_rules(args.template_rule)
+    missing = [p for p in [args.template] if not os.path.isfile(p)] + missing_rule_templates(template_rules)
+    if missing:
+        raise argparse.ArgumentTypeError(f"模板文件不存在: {missing}")
+    if args.mappings and not os.path.isfile(args.mappings):
+        raise argparse.ArgumentTypeError(f"映射文件不存在: {args.mappings}")
+
+    queue = SpoolQueue(args.queue_dir)
+    input_dir = os.path.abspath(args.input_dir)
+    output_dir = os.path.abspath(args.output_dir)
+    submitted = skipped = 0
+    for excel_file in iter_excel_files(input_dir, recursive=not args.no_recursive, exclude_dir=output_dir):
+        template_path = resolve_template(excel_file, args.template, template_rules or None)
+        job = {
+            "excel_path": os.path.join(input_dir, excel_file),
+            "output_path": output_path_for(excel_file, output_dir),
+            "template_path": os.path.abspath(template_path),
+            "mappings_file": os.path.abspath(args.mappings) if args.mappings else None,
+            "fill_engine": args.engine,
+            "compress_level": args.compress_level,
+        }
+        if queue.submit(make_job_id(excel_file), job, force=args.force):
+            submitted += 1
+        else:
+            skipped += 1
+    return {"submitted": submitted, "skipped": skipped, "queue": queue.counts()}
+
+
+def cmd_work(args) -> dict:
+    from business_logic.cancellation import CancellationToken
+    from client_gui.services.spool_queue import SpoolQueue
+    from client_gui.services.spool_worker import SpoolWorker
+
+    stop_token = CancellationToken()
+
+    def on_signal(signum, frame):
+        if stop_token.cancelled:
+            raise KeyboardInterrupt
+        print("收到中断信号, 处理完当前任务后退出(再按一次强制退出)...", file=sys.stderr, flush=True)
+        stop_token.cancel()
+
+    signal.signal(signal.SIGINT, on_signal)
+    signal.signal(signal.SIGTERM, on_signal)
+    queue = SpoolQueue(args.queue_dir, lease_seconds=args.lease_seconds, max_attempts=args.max_attempts)
+    worker = SpoolWorker(queue, worker_id=args.worker_id, poll_interval=args.poll_interval,
+                         stop_token=stop_token)
+    counts = worker.run(exit_when_empty=args.exit_when_empty, max_jobs=args.max_jobs)
+    return {"worker": worker.worker_id, **counts}
+
+
+def cmd_status(args) -> dict:
+    from client_gui.services.spool_queue import SpoolQueue
+
+    queue = SpoolQueue(args.queue_dir, lease_seconds=args.lease_seconds)
+    return {"queue": queue.counts(),
+            "failed_jobs": [{"job_id": s.get("job_id"), "excel_path": s.get("excel_path"),
+                             "error": s.get("error")} for s in queue.failed_jobs()]}
+
+
+def main(argv=None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    setup_logging(parser, args, default_level=logging.INFO)
+    command = {"submit": cmd_submit, "work": cmd_work, "status": cmd_status}[args.command]
+    try:
+        # 部分模块直接 print, 统一转到标准错误, 保证标准输出只有 JSON 汇总
+        with contextlib.redirect_stdout(sys.stderr):
+            summary = command(args)
+    except argparse.ArgumentTypeError as e:
+        print(f"错误: {e}", file=sys.stderr)
+        return 2
+    print(json.dumps(summary, ensure_ascii=False), flush=True)
+    if args.command == "work":
+        return 1 if summary["failed"] else 0
+    if args.command == "status":
+        return 1 if summary["failed_jobs"] else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
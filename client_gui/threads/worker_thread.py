@@ -1,12 +1,15 @@
 from PyQt5.QtCore import QThread, pyqtSignal
+from business_logic.cancellation import CancellationToken
 from client_gui.controller.processing_controller import run_processing
+from client_gui.services.ui_feed import DEFAULT_LOG_LINES, UiFeed, run_log_path
 
 class WorkerThread(QThread):
     """
     后台工作线程，执行PPT生成任务。
+    日志和进度不逐条发信号, 而是写入 feed(见 services/ui_feed.py),
+    由界面定时取走; 完整日志同时写入输出目录下的运行日志文件。
     """
-    progress_update = pyqtSignal(int)
-    log_update = pyqtSignal(str)
+    stats_ready = pyqtSignal(object)
     finished = pyqtSignal()
 
     def __init__(
@@ -15,7 +18,10 @@ class WorkerThread(QThread):
         excel_dir: str,
         output_dir: str,
         slide_mappings_file: str,
-        max_workers: int = None
+        max_workers: int = None,
+        executor_mode: str = "thread",
+        incremental: bool = True,
+        max_log_lines: int = DEFAULT_LOG_LINES
     ):
         super().__init__()
         self.template_path = template_path
@@ -23,24 +29,37 @@ class WorkerThread(QThread):
         self.output_dir = output_dir
         self.slide_mappings_file = slide_mappings_file
         self.max_workers = max_workers
+        self.executor_mode = executor_mode
+        self.incremental = incremental
+        self.cancel_token = CancellationToken()
+        self.feed = UiFeed(max_log_lines, run_log_path(output_dir))
 
     def run(self):
         """
         执行PPT生成任务。
         """
-        run_processing(
-            template_path=self.template_path,
-            excel_dir=self.excel_dir,
-            output_dir=self.output_dir,
-            slide_mappings_file=self.slide_mappings_file,
-            max_workers=self.max_workers,
-            progress_callback=self.emit_progress,
-            log_callback=self.emit_log
-        )
+        try:
+            stats = run_processing(
+                template_path=self.template_path,
+                excel_dir=self.excel_dir,
+                output_dir=self.output_dir,
+                slide_mappings_file=self.slide_mappings_file,
+                max_workers=self.max_workers,
+                executor_mode=self.executor_mode,
+                incremental=self.incremental,
+                cancel_token=self.cancel_token,
+                log_callback=self.feed.log,
+                status_callback=self.feed.update_progress
+            )
+        finally:
+            self.feed.close()
+        if stats is not None:
+            self.stats_ready.emit(stats)
         self.finished.emit()
 
-    def emit_progress(self, value: int):
-        self.progress_update.emit(value)
-
-    def emit_log(self, message: str):
-        self.log_update.emit(message)
+    def cancel(self):
+        """
+        请求停止: 排队中的文件不再处理, 正在处理的文件在下一阶段前停止。
+        可在界面线程中调用。
+        """
+        self.cancel_token.cancel()
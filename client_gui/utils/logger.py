@@ -1,13 +1,157 @@
+import atexit
+import itertools
 import logging
-import os
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Dict, Iterable, Optional, Union
 from client_gui.utils.resources import get_log_file_path
 
-def configure_logging() -> None:
+#: 日志格式
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+#: 单个日志文件的大小上限(字节)和保留的备份数, 超过后轮转为 .1 .2 ...
+DEFAULT_LOG_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_LOG_BACKUP_COUNT = 5
+
+#: 默认的模块日志级别(第三方库的 DEBUG 日志对排查本程序的问题帮助不大)
+DEFAULT_MODULE_LEVELS = {
+    "PIL": logging.INFO,
+}
+
+#: 逐文件日志所用 logger 名称的后缀, 见 per_file_logger
+PER_FILE_SUFFIX = ".files"
+
+_listener: Optional[QueueListener] = None
+
+
+def per_file_logger(name: str) -> logging.Logger:
+    """
+    模块的逐文件日志(每个输入文件一条或几条的 DEBUG 日志)使用的 logger: "<模块名>.files".
+    可单独设置级别, 并受 configure_logging 的抽样设置影响.
+    """
+    return logging.getLogger(name + PER_FILE_SUFFIX)
+
+
+class PerFileSampler(logging.Filter):
+    """
+    逐文件 logger 的 DEBUG 及以下日志每 every 条只保留一条; 其他日志不受影响.
+    """
+
+    def __init__(self, every: int):
+        super().__init__()
+        self.every = max(every, 1)
+        self._counter = itertools.count()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG or not record.name.endswith(PER_FILE_SUFFIX):
+            return True
+        return next(self._counter) % self.every == 0
+
+
+class _InProcessQueueHandler(QueueHandler):
+    """
+    只在进程内传递记录: 调用方线程不格式化消息, 由监听线程的处理器格式化.
+    (QueueHandler 默认在放入队列前格式化, 以便跨进程传递.)
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def parse_module_levels(specs: Iterable[str]) -> Dict[str, int]:
+    """
+    ["client_gui.services=INFO", "data_access=WARNING"] -> {模块名: 级别}.
+    格式不对或级别未知时抛出 ValueError.
+    """
+    levels = {}
+    for spec in specs:
+        name, sep, level_name = spec.partition("=")
+        level = logging.getLevelName(level_name.strip().upper())
+        if not sep or not name.strip() or not isinstance(level, int):
+            raise ValueError(f"模块日志级别格式应为 模块名=级别(如 data_access=WARNING): {spec}")
+        levels[name.strip()] = level
+    return levels
+
+
+def logger_levels() -> Dict[str, int]:
+    """
+    当前进程中单独设置过级别的 logger(模块级别, 含 DEFAULT_MODULE_LEVELS) -> 级别.
+    进程池的工作进程启动时据此设置同样的级别(见 process_worker.init_process_worker),
+    否则工作进程只有根 logger 的级别, 低于它的模块日志在放入队列前就被丢弃.
+    """
+    return {
+        name: logger.level
+        for name, logger in list(logging.Logger.manager.loggerDict.items())
+        if isinstance(logger, logging.Logger) and logger.level != logging.NOTSET
+    }
+
+
+def stop_logging() -> None:
     """
-    配置全局日志
+    停止监听线程, 写完队列中剩余的日志并关闭处理器. 进程退出时自动调用.
     """
-    logging.basicConfig(
-        filename=get_log_file_path(),
-        level=logging.DEBUG,  # 记录更多信息
-        format='%(asctime)s - %(levelname)s - %(message)s'
-    )
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    _listener = None
+
+
+def configure_logging(
+    log_file: Optional[str] = None,
+    level: Union[int, str] = logging.DEBUG,
+    module_levels: Optional[Dict[str, int]] = None,
+    max_bytes: int = DEFAULT_LOG_MAX_BYTES,
+    backup_count: int = DEFAULT_LOG_BACKUP_COUNT,
+    per_file_sample: int = 1,
+    stream=None,
+    stream_level: Union[int, str] = logging.NOTSET
+) -> None:
+    """
+    配置全局日志(队列 + 监听线程):
+    - 各线程记录日志时只把记录放入队列, 格式化和写文件都在一个监听线程中完成,
+      工作线程不再争用文件处理器的锁、等待磁盘写入;
+    - log_file 超过 max_bytes 时轮转, 保留 backup_count 个备份;
+      log_file 和 stream 都未给出时写入 ~/PPTClient_error.log;
+    - stream 不为空时(如 sys.stderr)输出到该流, stream_level 为其单独的级别;
+    - module_levels 为各模块(logger 名称前缀)的级别, 在 DEFAULT_MODULE_LEVELS 之上覆盖;
+    - per_file_sample > 1 时, 逐文件 logger(见 per_file_logger)的 DEBUG 日志每 N 条只保留一条.
+    重复调用时替换之前的配置.
+    """
+    stop_logging()
+    formatter = logging.Formatter(LOG_FORMAT)
+    handlers = []
+    if log_file is None and stream is None:
+        log_file = get_log_file_path()
+    if log_file:
+        file_handler = RotatingFileHandler(log_file, maxBytes=max_bytes,
+                                           backupCount=backup_count, encoding="utf-8")
+        file_handler.setFormatter(formatter)
+        handlers.append(file_handler)
+    if stream is not None:
+        stream_handler = logging.StreamHandler(stream)
+        stream_handler.setFormatter(formatter)
+        stream_handler.setLevel(stream_level)
+        handlers.append(stream_handler)
+
+    records = queue.SimpleQueue()
+    queue_handler = _InProcessQueueHandler(records)
+    if per_file_sample > 1:
+        queue_handler.addFilter(PerFileSampler(per_file_sample))
+
+    root_logger = logging.getLogger()
+    for handler in list(root_logger.handlers):
+        root_logger.removeHandler(handler)
+    root_logger.addHandler(queue_handler)
+    root_logger.setLevel(level if isinstance(level, int) else logging.getLevelName(level.upper()))
+    for name, module_level in {**DEFAULT_MODULE_LEVELS, **(module_levels or {})}.items():
+        logging.getLogger(name).setLevel(module_level)
+
+    global _listener
+    _listener = QueueListener(records, *handlers, respect_handler_level=True)
+    _listener.start()
+
+
+atexit.register(stop_logging)
@@ -1,17 +1,35 @@
 # data_access/base_provider.py
 
 from abc import ABC, abstractmethod
-from typing import Dict, List, Any
+from typing import Dict, Any, Optional, Sequence, Set, Mapping, Tuple
+
+class SheetInfo:
+    """
+    sheet 的概况(预检用, 不读取数据): 数据行数(不含表头)与列数.
+    rows_exact 为 False 时行数为估计值(如 Excel 的 dimension 也计入了末尾的空行).
+    """
+    __slots__ = ("n_rows", "n_cols", "rows_exact")
+
+    def __init__(self, n_rows: int, n_cols: int, rows_exact: bool = True):
+        self.n_rows = n_rows
+        self.n_cols = n_cols
+        self.rows_exact = rows_exact
+
+    def __repr__(self):
+        approx = "" if self.rows_exact else "~"
+        return f"SheetInfo(rows={approx}{self.n_rows}, cols={self.n_cols})"
 
 class BaseDataProvider(ABC):
     """
     数据提供者的抽象基类。
     用于从各种源(Excel/CSV/DB...)获取数据,
     并返回统一的 {sheetName: [row_dict, row_dict, ...]} 结构。
+    每个sheet的行可以是行字典列表, 也可以是按列存储的 SheetTable(行视图用法相同).
     """
 
     @abstractmethod
-    def read_data(self) -> Dict[str, List[Dict[str, Any]]]:
+    def read_data(self, sheets: Optional[Set[str]] = None,
+                  columns: Optional[Dict[str, Set[str]]] = None) -> Dict[str, Sequence[Mapping[str, Any]]]:
         """
         返回形如:
         {
@@ -22,5 +40,48 @@ class BaseDataProvider(ABC):
             "Sheet2": [...],
             ...
         }
+
+        sheets: 只读取这些sheet, None 表示全部;
+        columns: {sheet名: {"[A]", "[C]", ...}}, 只转换这些列,
+                 未出现在其中的sheet读取全部列.
+        判断空行时仍看整行, 因此只读部分列不会改变行数.
+        """
+        pass
+
+    @staticmethod
+    def wants_sheet(sheet_name: str, sheets: Optional[Set[str]]) -> bool:
+        return sheets is None or sheet_name in sheets
+
+    @staticmethod
+    def sheet_columns(sheet_name: str,
+                      columns: Optional[Dict[str, Set[str]]]) -> Optional[Set[str]]:
+        """
+        返回某sheet需要的列集合, None 表示全部列.
+        """
+        if columns is None:
+            return None
+        return columns.get(sheet_name)
+
+    def cache_options(self) -> Tuple:
+        """
+        影响读取结果的选项(不含 sheets/columns), 与文件内容一起组成数据缓存的键(见 data_cache).
+        """
+        return ()
+
+    def read_stats(self) -> Dict[str, int]:
+        """
+        最近一次 read_data 的附加计数(如数据缓存命中), 计入 DeckMetrics 的计数器.
+        """
+        return {}
+
+    def describe(self, sheets: Optional[Set[str]] = None) -> Dict[str, SheetInfo]:
+        """
+        返回 {sheet名: SheetInfo}, sheets 为 None 时包含全部sheet.
+        默认实现读取数据后统计; 各提供者改为只读元数据和表头.
         """
-        pass
\ No newline at end of file
+        info = {}
+        for name, rows in self.read_data(sheets).items():
+            keys = getattr(rows, "keys", None)
+            n_cols = len(keys) if keys is not None else (len(rows[0]) if rows else 0)
+            info[name] = SheetInfo(len(rows), n_cols)
+        return info
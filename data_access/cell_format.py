@@ -0,0 +1,174 @@
+# data_access/cell_format.py
+"""
+单元格值 -> 占位符替换用的值的转换.
+
+每种数字格式只编译一次格式化函数(get_formatter), 四舍五入函数和 quantize 精度
+按位数缓存(rounder / quantizer). 常见的值走快速路径, 不构造 Decimal:
+- 整数值的小数(3.0): 四舍五入后不变;
+- 小数位数不超过目标位数的小数(12.5): str() 是能还原该值的最短表示, 补零后还是同一个值;
+- 日期: 年份 >= 1000 时直接取 isoformat 的前 10 位.
+其余值仍按 Decimal(str(value)).quantize(..., ROUND_HALF_UP), 结果与逐个转换完全相同.
+
+CSV / SQLite 的值没有数字格式, 由 convert_text_value / convert_sql_value 按同样的规则转换.
+"""
+
+import re
+from datetime import datetime
+from decimal import Decimal, ROUND_HALF_UP
+from functools import lru_cache
+from typing import Any, Callable, List
+
+#: 小数保留的位数
+DECIMAL_PLACES = 2
+
+#: 整数值快速路径的范围: 超出时 Decimal 的行为(精度/异常)由慢速路径原样保留
+_INTEGER_FAST_LIMIT = 1e15
+
+Formatter = Callable[[Any], Any]
+
+
+@lru_cache(maxsize=None)
+def quantizer(ndigits: int) -> Decimal:
+    """
+    ndigits 位小数的 quantize 精度, 如 2 -> Decimal("1.00"), 每种位数只构造一次.
+    """
+    return Decimal('1.' + '0' * ndigits)
+
+
+@lru_cache(maxsize=None)
+def rounder(ndigits: int) -> Callable[[Any], float]:
+    """
+    传统四舍五入到 ndigits 位小数的函数, 每种位数只构造一次(精度已绑定).
+    """
+    quant = quantizer(ndigits)
+
+    def round_to(value) -> float:
+        if isinstance(value, float):
+            if value.is_integer() and -_INTEGER_FAST_LIMIT < value < _INTEGER_FAST_LIMIT:
+                return value
+            text = str(value)
+            dot = text.find('.')
+            if dot >= 0 and 'e' not in text and len(text) - dot - 1 <= ndigits:
+                return value
+        else:
+            text = str(value)
+        return float(Decimal(text).quantize(quant, ROUND_HALF_UP))
+
+    return round_to
+
+
+def round_half_up(value, ndigits):
+    """
+    传统四舍五入到 ndigits 位小数
+    """
+    return rounder(ndigits)(value)
+
+
+_round_default = rounder(DECIMAL_PLACES)
+
+
+def format_date(value: datetime) -> str:
+    if value.year >= 1000:
+        return value.isoformat()[:10]
+    return value.strftime('%Y-%m-%d')
+
+
+def _format_plain(value):
+    if isinstance(value, float):
+        return _round_default(value)
+    if isinstance(value, datetime):
+        return format_date(value)
+    return value
+
+
+def _format_percent(value):
+    if isinstance(value, float):
+        return f"{_round_default(value * 100)}%"
+    if isinstance(value, datetime):
+        return format_date(value)
+    return value
+
+
+@lru_cache(maxsize=None)
+def get_formatter(number_format: str) -> Formatter:
+    """
+    数字格式 -> 格式化函数(输入为非空的单元格值):
+    - 百分比格式的小数 => "12.35%"
+    - 其他小数 => 四舍五入到2位
+    - 日期 => "YYYY-MM-DD"
+    - 其他值原样返回
+    只有小数的转换依赖数字格式.
+    """
+    return _format_percent if '%' in (number_format or "") else _format_plain
+
+
+def convert_cell_value(cell_value, number_format: str):
+    """
+    单元格值 -> 占位符替换用的值, 空值 => "".
+    """
+    if cell_value is None:
+        return ""
+    return get_formatter(number_format)(cell_value)
+
+
+def format_column(values: List[Any], formatter: Formatter) -> List[Any]:
+    """
+    用同一个格式化函数转换一整列的值, 空值 => "".
+    """
+    return ["" if value is None else formatter(value) for value in values]
+
+
+_INT_TEXT = re.compile(r"-?(?:0|[1-9][0-9]*)")
+_FLOAT_TEXT = re.compile(r"-?(?:(?:0|[1-9][0-9]*)(?:\.[0-9]*)?|\.[0-9]+)(?:[eE][-+]?[0-9]+)?")
+_DATE_TEXT = re.compile(r"[0-9]{4}-[0-9]{2}-[0-9]{2}(?:[ T][0-9]{2}:[0-9]{2}(?::[0-9]{2}(?:\.[0-9]+)?)?)?")
+
+
+def _parse_date_text(text: str):
+    """
+    ISO 日期/时间文本 -> datetime, 不是合法日期时返回 None.
+    """
+    if not _DATE_TEXT.fullmatch(text):
+        return None
+    try:
+        return datetime.fromisoformat(text)
+    except ValueError:
+        return None
+
+
+def convert_text_value(text: str):
+    """
+    文本单元格(CSV) -> 与 Excel 单元格相同的占位符值:
+    - 空 => "";
+    - 整数(如 "8376") => int; 小数 => 四舍五入到2位; "42.0571%" => "42.06%";
+      有前导零的编号(如 "007")保持文本;
+    - ISO 日期/时间 => "YYYY-MM-DD";
+    - 其余原样返回.
+    """
+    if not text:
+        return ""
+    if _INT_TEXT.fullmatch(text):
+        return int(text)
+    if _FLOAT_TEXT.fullmatch(text):
+        return _format_plain(float(text))
+    if text[-1] == '%' and _FLOAT_TEXT.fullmatch(text, 0, len(text) - 1):
+        return f"{_round_default(float(text[:-1]))}%"
+    if text[0].isdigit():
+        date = _parse_date_text(text)
+        if date is not None:
+            return format_date(date)
+    return text
+
+
+def convert_sql_value(value):
+    """
+    SQLite 的值 -> 占位符值: NULL => "", REAL 四舍五入到2位,
+    TEXT 按 convert_text_value 转换(SQLite 没有日期和百分比类型, 通常以文本存储),
+    其余(INTEGER / BLOB)原样返回.
+    """
+    if value is None:
+        return ""
+    if isinstance(value, float):
+        return _format_plain(value)
+    if isinstance(value, str):
+        return convert_text_value(value)
+    return value
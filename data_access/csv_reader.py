@@ -0,0 +1,94 @@
+# data_access/csv_reader.py
+
+import csv
+import os
+from typing import Dict, Optional, Sequence, Set
+from data_access.base_provider import BaseDataProvider, SheetInfo
+from data_access.cell_format import convert_text_value
+from data_access.sheet_table import TableBuilder
+
+#: CSV 文件对应的sheet名, 与新建 Excel 工作簿的第一个sheet同名
+DEFAULT_CSV_SHEET = "Sheet1"
+
+#: describe 统计行数时每次读取的字节数
+_COUNT_CHUNK = 1024 * 1024
+
+#: 依次尝试的编码: 带/不带 BOM 的 UTF-8, 以及国内系统常见的 GBK 系导出
+DEFAULT_CSV_ENCODINGS = ("utf-8-sig", "gb18030")
+
+class CsvDataProvider(BaseDataProvider):
+    """
+    从CSV文件读取数据, 一个文件即一个sheet(名称为 sheet_name).
+    返回 {sheet_name: SheetTable}, 结构与 ExcelDataProvider 相同:
+    第一行为表头, 之后每行按列位置对应 "[A]" "[B]" ..., 空行跳过,
+    行宽以最宽的一行(含表头)为准, 较短的行补 "".
+
+    CSV 没有数字格式, 值按 cell_format.convert_text_value 转换:
+    整数/小数/百分比/ISO 日期与 Excel 中同样的值得到相同的结果.
+    逐行流式读取, 边读边按列压缩, 不载入整个文件.
+    前一个编码解码失败时换下一个编码重新读取.
+    """
+    def __init__(self, csv_file: str, sheet_name: str = DEFAULT_CSV_SHEET,
+                 encodings: Sequence[str] = DEFAULT_CSV_ENCODINGS, delimiter: str = ","):
+        if not os.path.isfile(csv_file):
+            raise FileNotFoundError(f"CSV文件不存在: {csv_file}")
+        self.csv_file = csv_file
+        self.sheet_name = sheet_name
+        self.encodings = tuple(encodings)
+        self.delimiter = delimiter
+
+    def cache_options(self):
+        return self.sheet_name, self.encodings, self.delimiter
+
+    def read_data(self, sheets: Optional[Set[str]] = None,
+                  columns: Optional[Dict[str, Set[str]]] = None):
+        if not self.wants_sheet(self.sheet_name, sheets):
+            return {}
+        wanted_cols = self.sheet_columns(self.sheet_name, columns)
+        error = None
+        for encoding in self.encodings:
+            try:
+                return {self.sheet_name: self._read_table(encoding, wanted_cols)}
+            except UnicodeDecodeError as e:
+                error = e
+        raise ValueError(f"无法解码CSV文件 {self.csv_file}"
+                         f"(已尝试 {', '.join(self.encodings)}): {error}")
+
+    def describe(self, sheets: Optional[Set[str]] = None):
+        """
+        列数取表头宽度, 行数按换行符个数估计(不解析CSV, 空行和带引号的换行也计入).
+        """
+        if not self.wants_sheet(self.sheet_name, sheets):
+            return {}
+        header = self._read_header()
+        newlines = 0
+        last = b"\n"
+        with open(self.csv_file, "rb") as f:
+            for chunk in iter(lambda: f.read(_COUNT_CHUNK), b""):
+                newlines += chunk.count(b"\n")
+                last = chunk[-1:]
+        n_lines = newlines + (last != b"\n")
+        return {self.sheet_name: SheetInfo(max(n_lines - 1, 0), len(header), rows_exact=False)}
+
+    def _read_header(self) -> list:
+        error = None
+        for encoding in self.encodings:
+            try:
+                with open(self.csv_file, newline="", encoding=encoding) as f:
+                    return next(csv.reader(f, delimiter=self.delimiter), [])
+            except UnicodeDecodeError as e:
+                error = e
+        raise ValueError(f"无法解码CSV文件 {self.csv_file}"
+                         f"(已尝试 {', '.join(self.encodings)}): {error}")
+
+    def _read_table(self, encoding: str, wanted_cols: Optional[Set[str]]):
+        builder = TableBuilder(wanted_cols, convert_text_value)
+        with open(self.csv_file, newline="", encoding=encoding) as f:
+            reader = csv.reader(f, delimiter=self.delimiter)
+            header = next(reader, None)
+            if header is not None:
+                builder.ensure_columns(len(header))
+            for row in reader:
+                if any(row):
+                    builder.append(row)
+        return builder.finish()
@@ -0,0 +1,381 @@
+# data_access/data_cache.py
+"""
+已解析输入数据的磁盘缓存.
+
+同一份 Excel 常被反复生成(只改了模板或映射), 每次都要重新解压、解析、转换整本工作簿.
+DataCache 把 read_data 的结果(SheetTable 的紧凑列: array / 字典编码 / 列表)以二进制形式
+存到缓存目录, 下次读取同样内容的文件时直接载入:
+- 键为 文件内容 sha256 + 提供者类型及其 cache_options(如 streaming / max_empty_rows)
+  + DATA_CACHE_VERSION, 与文件路径、修改时间无关;
+- 条目记录它覆盖的 sheets/columns. 请求的sheet和列都在其中时命中, 从条目中取子集;
+  否则按 "原覆盖范围 ∪ 本次请求" 重新读取并替换条目, 模板增删占位符后很快又能命中;
+- 写入先写同目录下的临时文件再 os.replace, 多个线程/进程同时读写同一目录也不会读到半个文件;
+- 缓存目录总大小超过 max_bytes 时按最近使用时间(命中时刷新 mtime)淘汰最旧的条目.
+  目录大小在本进程内累计(写入/删除条目时增减), 只在首次写入和累计值超过上限时扫描整个目录;
+  多个进程共用目录时各自只累计自己的写入, 超过上限时的扫描会按实际大小校正.
+
+条目用 pickle 序列化, 缓存目录只应由本程序写入, 不要指向不可信的目录.
+缓存读写出错只记日志, 退回直接读取, 不影响生成.
+"""
+
+import hashlib
+import logging
+import os
+import pickle
+import threading
+import time
+from typing import Dict, Optional, Set, Tuple
+
+from data_access.base_provider import BaseDataProvider
+from data_access.sheet_table import SheetTable
+
+logger = logging.getLogger(__name__)
+
+#: 缓存格式/数据转换逻辑的版本, 修改 cell_format 等会影响读取结果的逻辑时递增
+DATA_CACHE_VERSION = "1"
+
+#: 默认缓存上限(字节)
+DEFAULT_DATA_CACHE_MAX_BYTES = 1024 * 1024 * 1024
+
+#: 条目文件的扩展名和文件头
+ENTRY_SUFFIX = ".pdc"
+_MAGIC = b"PPTDATA" + DATA_CACHE_VERSION.encode("ascii") + b"\n"
+
+#: 超过这么久(秒)的临时文件视为写入进程已退出, 淘汰时一并删除
+STALE_TMP_SECONDS = 3600
+
+_HASH_CHUNK = 1024 * 1024
+
+
+def _normalize_request(sheets: Optional[Set[str]], columns: Optional[Dict[str, Set[str]]]):
+    sheets = frozenset(sheets) if sheets is not None else None
+    columns = {name: frozenset(cols) for name, cols in columns.items()} if columns is not None else None
+    return sheets, columns
+
+
+def _columns_for(request, sheet_name: str) -> Tuple[bool, Optional[frozenset]]:
+    """
+    (是否请求了该sheet, 请求的列; None 表示全部列)
+    """
+    sheets, columns = request
+    if sheets is not None and sheet_name not in sheets:
+        return False, None
+    return True, BaseDataProvider.sheet_columns(sheet_name, columns)
+
+
+def _covers(covered, request) -> bool:
+    """
+    covered 覆盖的sheet和列是否包含 request 请求的全部sheet和列.
+    """
+    covered_sheets, covered_columns = covered
+    sheets, columns = request
+    if sheets is None:
+        if covered_sheets is not None:
+            return False
+        names = set(columns or ()) | set(covered_columns or ())
+    else:
+        names = sheets
+    for name in names:
+        wanted, cols = _columns_for(request, name)
+        if not wanted:
+            continue
+        has_sheet, has_cols = _columns_for(covered, name)
+        if not has_sheet:
+            return False
+        if has_cols is not None and (cols is None or not cols <= has_cols):
+            return False
+    return True
+
+
+def _merge_requests(a, b):
+    """
+    两个请求的并集: 任一方请求全部sheet/全部列时结果也是全部.
+    """
+    sheets = None if a[0] is None or b[0] is None else a[0] | b[0]
+    columns = {}
+    for name in set(a[1] or ()) | set(b[1] or ()):
+        merged = frozenset()
+        for request in (a, b):
+            wanted, cols = _columns_for(request, name)
+            if not wanted:
+                continue
+            if cols is None:
+                merged = None
+                break
+            merged |= cols
+        if merged is not None:
+            columns[name] = merged
+    return sheets, columns
+
+
+class _CacheEntry:
+    """
+    一个缓存条目: 覆盖的请求范围、读取结果(按sheet顺序)以及当初读取的耗时.
+    """
+
+    def __init__(self, covered, tables: Dict[str, SheetTable], read_seconds: float):
+        self.covered = covered
+        self.tables = tables
+        self.read_seconds = read_seconds
+
+    def covers(self, request) -> bool:
+        return _covers(self.covered, request)
+
+    def select(self, request) -> Dict[str, SheetTable]:
+        result = {}
+        for name, table in self.tables.items():
+            wanted, cols = _columns_for(request, name)
+            if wanted:
+                result[name] = table.select(cols)
+        return result
+
+    def dumps(self) -> bytes:
+        tables = [(name, table.keys, table.columns, table.n_rows) for name, table in self.tables.items()]
+        payload = {"covered": self.covered, "read_seconds": self.read_seconds, "tables": tables}
+        return _MAGIC + pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def loads(cls, data: bytes) -> "_CacheEntry":
+        if not data.startswith(_MAGIC):
+            raise ValueError("缓存条目的文件头或版本不符")
+        payload = pickle.loads(data[len(_MAGIC):])
+        tables = {name: SheetTable(keys, columns, n_rows)
+                  for name, keys, columns, n_rows in payload["tables"]}
+        return cls(payload["covered"], tables, payload["read_seconds"])
+
+
+class DataCache:
+    """
+    输入数据的磁盘缓存(说明见模块文档). 线程安全; 多个进程可共用同一目录.
+    hits / misses / saved_seconds 为本进程内的累计值.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = DEFAULT_DATA_CACHE_MAX_BYTES):
+        self.cache_dir = os.path.abspath(cache_dir)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._hashes: Dict[str, Tuple[int, int, str]] = {}
+        # 目录中条目的总大小(本进程的累计值); None 表示尚未扫描
+        self._total_bytes: Optional[int] = None
+        self.scans = 0
+        self.hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+
+    def content_hash(self, path: str) -> str:
+        """
+        文件内容的 sha256; 本进程内大小和 mtime 未变时复用上次的结果.
+        """
+        abs_path = os.path.abspath(path)
+        st = os.stat(abs_path)
+        with self._lock:
+            cached = self._hashes.get(abs_path)
+        if cached and cached[0] == st.st_size and cached[1] == st.st_mtime_ns:
+            return cached[2]
+        digest = hashlib.sha256()
+        with open(abs_path, "rb") as f:
+            for chunk in iter(lambda: f.read(_HASH_CHUNK), b""):
+                digest.update(chunk)
+        with self._lock:
+            self._hashes[abs_path] = (st.st_size, st.st_mtime_ns, digest.hexdigest())
+        return digest.hexdigest()
+
+    def key_for(self, path: str, provider: BaseDataProvider) -> str:
+        parts = (DATA_CACHE_VERSION, type(provider).__name__, repr(provider.cache_options()),
+                 self.content_hash(path))
+        return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + ENTRY_SUFFIX)
+
+    def load(self, key: str) -> Optional[_CacheEntry]:
+        """
+        读取条目并刷新其最近使用时间; 不存在或已损坏时返回 None(损坏的条目删除).
+        """
+        path = self._entry_path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        try:
+            entry = _CacheEntry.loads(data)
+        except Exception as e:
+            logger.warning(f"数据缓存条目无法读取, 已删除: {path}: {e}")
+            self._remove(path)
+            self._add_bytes(-len(data))
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry
+
+    def store(self, key: str, entry: _CacheEntry):
+        data = entry.dumps()
+        if len(data) > self.max_bytes:
+            logger.debug(f"数据缓存条目 {len(data)} 字节超过上限, 不缓存")
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._entry_path(key)
+        try:
+            replaced_bytes = os.path.getsize(path)
+        except OSError:
+            replaced_bytes = 0
+        tmp_path = os.path.join(self.cache_dir,
+                                f".{key}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            self._remove(tmp_path)
+            raise
+        total = self._add_bytes(len(data) - replaced_bytes)
+        if total is None or total > self.max_bytes:
+            self.evict(keep=path)
+
+    def _add_bytes(self, delta: int) -> Optional[int]:
+        """
+        累计目录大小的增减, 返回新的累计值(尚未扫描过时为 None).
+        """
+        with self._lock:
+            if self._total_bytes is not None:
+                self._total_bytes = max(0, self._total_bytes + delta)
+            return self._total_bytes
+
+    def evict(self, keep: Optional[str] = None):
+        """
+        扫描缓存目录, 总大小超过 max_bytes 时按 mtime 从旧到新删除条目(不删 keep);
+        同时清理写入进程已退出后遗留的临时文件. 扫描结果作为新的累计值.
+        store 只在首次写入和累计值超过上限时调用.
+        """
+        entries = []
+        total = 0
+        now = time.time()
+        with self._lock:
+            self.scans += 1
+        with os.scandir(self.cache_dir) as it:
+            for item in it:
+                try:
+                    st = item.stat()
+                except OSError:
+                    continue
+                if item.name.startswith("."):
+                    if item.name.endswith(".tmp") and now - st.st_mtime > STALE_TMP_SECONDS:
+                        self._remove(item.path)
+                elif item.name.endswith(ENTRY_SUFFIX):
+                    entries.append((st.st_mtime, st.st_size, item.path))
+                    total += st.st_size
+        if total > self.max_bytes:
+            for _, size, path in sorted(entries):
+                if path == keep:
+                    continue
+                self._remove(path)
+                total -= size
+                if total <= self.max_bytes:
+                    break
+        with self._lock:
+            self._total_bytes = total
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def size_bytes(self) -> int:
+        try:
+            with os.scandir(self.cache_dir) as it:
+                return sum(item.stat().st_size for item in it if item.name.endswith(ENTRY_SUFFIX))
+        except FileNotFoundError:
+            return 0
+
+    def record(self, hit: bool, saved_seconds: float = 0.0):
+        with self._lock:
+            if hit:
+                self.hits += 1
+                self.saved_seconds += saved_seconds
+            else:
+                self.misses += 1
+
+
+class CachedDataProvider(BaseDataProvider):
+    """
+    经 DataCache 读取的数据提供者, 包装 provider(读取的是 path 这个文件).
+    结果与直接调用 provider.read_data 相同.
+    read_stats() 返回最近一次读取的 data_cache_hits / data_cache_misses / data_cache_saved_ms,
+    saved_ms 为条目当初的读取耗时减去本次计算哈希和载入的耗时.
+    """
+
+    def __init__(self, provider: BaseDataProvider, path: str, cache: DataCache):
+        self.provider = provider
+        self.path = path
+        self.cache = cache
+        self._stats: Dict[str, int] = {}
+
+    def cache_options(self):
+        return self.provider.cache_options()
+
+    def read_stats(self) -> Dict[str, int]:
+        return dict(self._stats)
+
+    def describe(self, sheets: Optional[Set[str]] = None):
+        return self.provider.describe(sheets)
+
+    def read_data(self, sheets: Optional[Set[str]] = None,
+                  columns: Optional[Dict[str, Set[str]]] = None):
+        start = time.perf_counter()
+        request = _normalize_request(sheets, columns)
+        try:
+            key = self.cache.key_for(self.path, self.provider)
+            entry = self.cache.load(key)
+        except Exception as e:
+            logger.warning(f"数据缓存不可用, 直接读取 {self.path}: {e}")
+            self._stats = {}
+            return self.provider.read_data(sheets, columns)
+
+        if entry is not None and entry.covers(request):
+            result = entry.select(request)
+            saved = max(0.0, entry.read_seconds - (time.perf_counter() - start))
+            self.cache.record(True, saved)
+            self._stats = {"data_cache_hits": 1, "data_cache_misses": 0,
+                           "data_cache_saved_ms": int(saved * 1000)}
+            return result
+
+        # 未命中: 连同已有条目覆盖的范围一起读取, 替换旧条目
+        covered = request if entry is None else _merge_requests(entry.covered, request)
+        read_start = time.perf_counter()
+        tables = self.provider.read_data(covered[0], covered[1])
+        read_seconds = time.perf_counter() - read_start
+        tables = {name: table if isinstance(table, SheetTable) else SheetTable.from_rows(table)
+                  for name, table in tables.items()}
+        fresh = _CacheEntry(covered, tables, read_seconds)
+        try:
+            self.cache.store(key, fresh)
+        except Exception as e:
+            logger.warning(f"写入数据缓存失败: {e}")
+        self.cache.record(False)
+        self._stats = {"data_cache_hits": 0, "data_cache_misses": 1, "data_cache_saved_ms": 0}
+        return fresh.select(request)
+
+
+# 进程内共享的数据缓存, 未配置时为 None(不缓存)
+_data_cache: Optional[DataCache] = None
+
+
+def set_data_cache(cache_dir: Optional[str], max_bytes: Optional[int] = None):
+    """
+    配置进程内共享的数据缓存; cache_dir 为 None 时关闭.
+    """
+    global _data_cache
+    if cache_dir is None:
+        _data_cache = None
+    elif (_data_cache is None or _data_cache.cache_dir != os.path.abspath(cache_dir)
+          or (max_bytes and _data_cache.max_bytes != max_bytes)):
+        _data_cache = DataCache(cache_dir, max_bytes or DEFAULT_DATA_CACHE_MAX_BYTES)
+
+
+def get_data_cache() -> Optional[DataCache]:
+    return _data_cache
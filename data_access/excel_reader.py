@@ -1,69 +1,315 @@
 # data_access/excel_reader.py
 
+import logging
 import os
+import posixpath
+import zipfile
+from typing import Dict, List, Optional, Set, Tuple
+from lxml import etree
 from openpyxl import load_workbook
-from openpyxl.utils import get_column_letter
-from datetime import datetime
-from decimal import Decimal, ROUND_HALF_UP
+from openpyxl.utils.cell import column_index_from_string, coordinate_from_string, range_boundaries
+from data_access.base_provider import BaseDataProvider, SheetInfo
+from data_access.cell_format import (  # noqa: F401  round_half_up/convert_cell_value 沿用原导入路径
+    convert_cell_value, format_column, get_formatter, round_half_up
+)
+from data_access.sheet_table import CHUNK_ROWS, ColumnBuilder, SheetTable, column_keys, select_columns
 
-def round_half_up(value, ndigits):
+logger = logging.getLogger(__name__)
+
+#: 流式模式下, 连续遇到多少个空行即认为数据结束; None 表示读到最后一行, 与整本载入的输出一致.
+#: 空行之后仍有数据的sheet在设置上限后会少读行, 因此默认不提前停止.
+DEFAULT_MAX_EMPTY_ROWS = None
+
+class _ColumnBuffer:
+    """
+    读取时按列收集的原始值; 小数另按顺序记下其数字格式的键.
+    每读 CHUNK_ROWS 行整块转换(flush)并压缩进 builder, 原始值随即释放:
+    一块中小数的格式都相同(常见情况)时整块用同一个格式化函数, 否则按各自的格式转换.
+    每种格式的格式化函数只编译一次(get_formatter).
+    """
+    __slots__ = ("values", "float_formats", "builder")
+
+    def __init__(self, n_missing: int = 0):
+        self.values = []
+        self.float_formats = []
+        self.builder = ColumnBuilder()
+        # 该列出现之前的行在这一列上为空
+        self.builder.extend([""] * n_missing)
+
+    def _convert(self, number_formats: dict) -> list:
+        distinct = set(self.float_formats)
+        if len(distinct) <= 1:
+            number_format = number_formats[distinct.pop()] if distinct else "General"
+            return format_column(self.values, get_formatter(number_format))
+        float_formats = iter(self.float_formats)
+        plain = get_formatter("General")
+        return ["" if value is None
+                else get_formatter(number_formats[next(float_formats)])(value)
+                if isinstance(value, float) else plain(value)
+                for value in self.values]
+
+    def flush(self, number_formats: dict):
+        self.builder.extend(self._convert(number_formats))
+        self.values = []
+        self.float_formats = []
+
+def _collect(buffers: List[_ColumnBuffer], picked: list, format_key, number_formats: dict):
     """
-    传统四舍五入到 ndigits 位小数
+    把一行选中的单元格(None 表示该行没有这一列)追加到各列.
+    format_key(cell) 为区分数字格式的键, number_formats 记录 {键: 数字格式}.
     """
-    dec = Decimal(str(value))
-    quant = Decimal('1.' + '0' * ndigits)
-    return float(dec.quantize(quant, rounding=ROUND_HALF_UP))
+    for buffer, cell in zip(buffers, picked):
+        if cell is None:
+            buffer.values.append(None)
+            continue
+        value = cell.value
+        buffer.values.append(value)
+        if isinstance(value, float):
+            key = format_key(cell)
+            buffer.float_formats.append(key)
+            if key not in number_formats:
+                number_formats[key] = cell.number_format
+
+def _flush(buffers: List[_ColumnBuffer], number_formats: dict):
+    for buffer in buffers:
+        buffer.flush(number_formats)
+
+def _to_table(selected: List[Tuple[int, str]], buffers: List[_ColumnBuffer],
+              number_formats: dict, n_rows: int) -> SheetTable:
+    _flush(buffers, number_formats)
+    return SheetTable([key for _, key in selected],
+                      [buffer.builder.finish() for buffer in buffers], n_rows)
+
+def _style_format_key(cell):
+    # read_only 单元格: 数字格式编号, 比 number_format 属性的查找便宜
+    return cell.style_array.numFmtId
+
+def _number_format_key(cell):
+    return cell.number_format
+
+_NS_MAIN = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_REL_ID = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id"
+_DIMENSION = _NS_MAIN + "dimension"
+_ROW = _NS_MAIN + "row"
+_CELL = _NS_MAIN + "c"
+_VALUE_TAGS = (_NS_MAIN + "v", _NS_MAIN + "is")
+
+#: describe 解析工作表时每次读取的字节数; 通常头一两块就包含 dimension 和表头行,
+#: 块越小读到表头后多解析的内容越少
+_DESCRIBE_CHUNK = 4 * 1024
+
+def _rels_path(part: str) -> str:
+    directory, name = posixpath.split(part)
+    return posixpath.join(directory, "_rels", name + ".rels")
+
+def _sheet_parts(zf: zipfile.ZipFile) -> List[Tuple[str, str]]:
+    """
+    [(sheet名, 工作表部件路径), ...], 按工作簿中的顺序; 只解析 workbook.xml 及其关系.
+    """
+    root_rels = etree.fromstring(zf.read("_rels/.rels"))
+    workbook_path = next(rel.get("Target") for rel in root_rels
+                         if rel.get("Type", "").endswith("/officeDocument")).lstrip("/")
+    workbook = etree.fromstring(zf.read(workbook_path))
+    targets = {rel.get("Id"): rel.get("Target")
+               for rel in etree.fromstring(zf.read(_rels_path(workbook_path)))}
+    base = posixpath.dirname(workbook_path)
+    parts = []
+    for sheet in workbook.iter(_NS_MAIN + "sheet"):
+        target = targets[sheet.get(_REL_ID)]
+        path = target.lstrip("/") if target.startswith("/") \
+            else posixpath.normpath(posixpath.join(base, target))
+        parts.append((sheet.get("name"), path))
+    return parts
+
+def _row_width(row) -> int:
+    width = 0
+    for i, cell in enumerate(row.iterchildren(_CELL), start=1):
+        ref = cell.get("r")
+        width = max(width, column_index_from_string(coordinate_from_string(ref)[0]) if ref else i)
+    return width
 
-class ExcelDataProvider:
+def _iter_sheet_elements(stream):
+    """
+    逐块解析工作表, 依次产出 dimension 和 row 元素; 调用方停止迭代后不再读取剩余内容.
+    """
+    parser = etree.XMLPullParser(events=("end",), tag=(_DIMENSION, _ROW))
+    for chunk in iter(lambda: stream.read(_DESCRIBE_CHUNK), b""):
+        parser.feed(chunk)
+        for _, elem in parser.read_events():
+            yield elem
+    parser.close()
+    for _, elem in parser.read_events():
+        yield elem
+
+def _describe_sheet_part(stream) -> SheetInfo:
+    """
+    有 dimension 时只读到表头行为止: 列数取 dimension 与表头的较大者, 行数按 dimension 估计;
+    没有 dimension 时扫描全部行(只看结构, 不转换值), 统计非空行数和最大列数.
+    """
+    dimension = None
+    header_seen = False
+    n_rows = 0
+    n_cols = 0
+    for elem in _iter_sheet_elements(stream):
+        if elem.tag == _DIMENSION:
+            ref = elem.get("ref", "")
+            if ":" in ref:
+                dimension = range_boundaries(ref)
+            continue
+        n_cols = max(n_cols, _row_width(elem))
+        if not header_seen:
+            header_seen = True
+            if dimension is not None:
+                _, _, max_col, max_row = dimension
+                return SheetInfo(max(max_row - 1, 0), max(max_col, n_cols), rows_exact=False)
+        elif any(cell.find(tag) is not None for cell in elem.iterchildren(_CELL) for tag in _VALUE_TAGS):
+            n_rows += 1
+        elem.clear()
+        while elem.getprevious() is not None:
+            del elem.getparent()[0]
+    if dimension is not None:
+        _, _, max_col, max_row = dimension
+        return SheetInfo(max(max_row - 1, 0), max(max_col, n_cols), rows_exact=False)
+    return SheetInfo(n_rows, n_cols)
+
+class ExcelDataProvider(BaseDataProvider):
     """
     从Excel读取数据的类。
-    返回 {sheetName: [ { '[A]':valA, '[B]':valB, ... }, ... ]}
+    返回 {sheetName: SheetTable}, 每行 t[i] 的用法与 { '[A]':valA, '[B]':valB, ... } 相同
+    (按列存储, 见 data_access/sheet_table.py).
+
+    streaming=True(默认) 时使用 openpyxl 的 read_only 模式逐行读取,
+    连续 max_empty_rows 个空行后停止读取该sheet(None 表示不提前停止);
+    streaming=False 时按原方式整本载入.
+    两种模式输出一致.
+
+    read_data 可只读取指定的sheet和列(见 BaseDataProvider.read_data),
+    未请求的sheet整张跳过, 未请求的列不做格式转换.
     """
-    def __init__(self, excel_file: str):
+    def __init__(self, excel_file: str, streaming: bool = True,
+                 max_empty_rows: Optional[int] = DEFAULT_MAX_EMPTY_ROWS):
         if not os.path.isfile(excel_file):
             raise FileNotFoundError(f"Excel文件不存在: {excel_file}")
         self.excel_file = excel_file
+        self.streaming = streaming
+        self.max_empty_rows = max_empty_rows
+
+    def cache_options(self):
+        return self.streaming, self.max_empty_rows
 
-    def read_data(self):
+    def describe(self, sheets: Optional[Set[str]] = None) -> Dict[str, SheetInfo]:
+        """
+        只解析 workbook.xml 和各工作表开头的 dimension / 表头行, 不载入共享字符串和单元格数据.
+        """
+        info = {}
+        with zipfile.ZipFile(self.excel_file) as zf:
+            for sheet_name, part in _sheet_parts(zf):
+                if self.wants_sheet(sheet_name, sheets):
+                    with zf.open(part) as stream:
+                        info[sheet_name] = _describe_sheet_part(stream)
+        return info
+
+    def read_data(self, sheets: Optional[Set[str]] = None,
+                  columns: Optional[Dict[str, Set[str]]] = None):
+        if self.streaming:
+            return self._read_data_streaming(sheets, columns)
+        return self._read_data_full(sheets, columns)
+
+    def _read_data_full(self, sheets=None, columns=None):
         wb = load_workbook(self.excel_file, data_only=True)
         result = {}
 
         for sheet_name in wb.sheetnames:
+            if not self.wants_sheet(sheet_name, sheets):
+                continue
+            wanted_cols = self.sheet_columns(sheet_name, columns)
             sheet = wb[sheet_name]
             max_row = sheet.max_row
             max_col = sheet.max_column
-            sheet_data = []
+            selected = select_columns(column_keys(max_col), wanted_cols)
+            buffers = [_ColumnBuffer() for _ in selected]
+            number_formats = {}
+            n_rows = 0
 
             # 从第2行开始读，第一行可能是表头
             for row_idx in range(2, max_row + 1):
-                row_dict = {}
-                non_empty_flag = False
-                for col_idx in range(1, max_col + 1):
-                    cell = sheet.cell(row=row_idx, column=col_idx)
-                    cell_value = cell.value
-
-                    col_letter = get_column_letter(col_idx)
-                    ph_key = f"[{col_letter}]"
-
-                    if cell_value is not None:
-                        non_empty_flag = True
-                        if isinstance(cell_value, float):
-                            format = cell.number_format
-                            if '%' in format:
-                                percentage_value = round_half_up(cell_value * 100, 2)
-                                cell_value = f"{percentage_value}%"
-                            else:
-                                cell_value = round_half_up(cell_value, 2)
-                        elif isinstance(cell_value, datetime):
-                            cell_value = cell_value.strftime('%Y-%m-%d')
-                    else:
-                        cell_value = ""
-
-                    row_dict[ph_key] = cell_value
+                picked = [sheet.cell(row=row_idx, column=col_idx + 1) for col_idx, _ in selected]
+                non_empty_flag = any(cell.value is not None for cell in picked)
+
+                if not non_empty_flag and wanted_cols is not None:
+                    # 只读部分列时, 空行判断仍以整行为准
+                    non_empty_flag = any(
+                        sheet.cell(row=row_idx, column=col_idx).value is not None
+                        for col_idx in range(1, max_col + 1)
+                    )
 
                 if non_empty_flag:
-                    sheet_data.append(row_dict)
+                    n_rows += 1
+                    _collect(buffers, picked, _number_format_key, number_formats)
+                    if n_rows % CHUNK_ROWS == 0:
+                        _flush(buffers, number_formats)
+
+            result[sheet_name] = _to_table(selected, buffers, number_formats, n_rows)
+
+        return result
+
+    def _read_data_streaming(self, sheets=None, columns=None):
+        wb = load_workbook(self.excel_file, data_only=True, read_only=True)
+        try:
+            result = {}
+            for sheet_name in wb.sheetnames:
+                if not self.wants_sheet(sheet_name, sheets):
+                    continue
+                result[sheet_name] = self._read_sheet_streaming(
+                    wb[sheet_name], self.sheet_columns(sheet_name, columns)
+                )
+            return result
+        finally:
+            # read_only 模式会保持文件句柄, 需显式关闭
+            wb.close()
+
+    def _read_sheet_streaming(self, sheet, wanted_cols: Optional[Set[str]] = None):
+        """
+        逐行读取一个sheet, 按列收集原始值, 分块转换并压缩(见 _ColumnBuffer).
+        行宽以 dimension 记录的列数为准, 若文件未记录 dimension,
+        则以实际出现的最大列数补齐.
+        """
+        max_col = sheet.max_column or 0
+        col_keys = column_keys(max_col)
+        selected = select_columns(col_keys, wanted_cols)
+        buffers = [_ColumnBuffer() for _ in selected]
+        number_formats = {}
+        n_rows = 0
+        empty_run = 0
+        max_empty_rows = self.max_empty_rows
+
+        # 从第2行开始读，第一行可能是表头
+        for row_idx, row in enumerate(sheet.iter_rows(min_row=2), start=2):
+            row_len = len(row)
+            if row_len > len(col_keys):
+                # 未记录 dimension 时出现了更多列: 之前的行在新列上为空
+                col_keys = column_keys(row_len)
+                new_selected = select_columns(col_keys, wanted_cols)
+                buffers.extend(_ColumnBuffer(n_rows) for _ in new_selected[len(selected):])
+                selected = new_selected
+            picked = [row[col_idx] if col_idx < row_len else None for col_idx, _ in selected]
+            non_empty_flag = any(cell is not None and cell.value is not None for cell in picked)
+
+            if not non_empty_flag and wanted_cols is not None:
+                # 只读部分列时, 空行判断仍以整行为准
+                non_empty_flag = any(cell.value is not None for cell in row)
 
-            result[sheet_name] = sheet_data
+            if non_empty_flag:
+                empty_run = 0
+                n_rows += 1
+                _collect(buffers, picked, _style_format_key, number_formats)
+                if n_rows % CHUNK_ROWS == 0:
+                    _flush(buffers, number_formats)
+            else:
+                empty_run += 1
+                if max_empty_rows is not None and empty_run >= max_empty_rows:
+                    logger.warning("%s: sheet '%s' 连续 %d 个空行, 忽略第 %d 行之后的内容",
+                                   self.excel_file, sheet.title, max_empty_rows, row_idx)
+                    break
 
-        return result
\ No newline at end of file
+        return _to_table(selected, buffers, number_formats, n_rows)
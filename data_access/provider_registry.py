@@ -0,0 +1,35 @@
+# data_access/provider_registry.py
+
+import os
+from typing import Dict, Type
+from data_access.base_provider import BaseDataProvider
+from data_access.csv_reader import CsvDataProvider
+from data_access.data_cache import CachedDataProvider, get_data_cache
+from data_access.excel_reader import ExcelDataProvider
+from data_access.sqlite_reader import SqliteDataProvider
+
+#: 输入文件扩展名(小写) -> 数据提供者
+DATA_PROVIDERS: Dict[str, Type[BaseDataProvider]] = {
+    ".xlsx": ExcelDataProvider,
+    ".csv": CsvDataProvider,
+    ".sqlite": SqliteDataProvider,
+    ".sqlite3": SqliteDataProvider,
+}
+
+#: 可作为输入的文件扩展名
+INPUT_EXTENSIONS = tuple(DATA_PROVIDERS)
+
+def create_data_provider(path: str) -> BaseDataProvider:
+    """
+    按扩展名为输入文件选择数据提供者, 不支持的扩展名抛出 ValueError.
+    配置了数据缓存(data_cache.set_data_cache)时, 经缓存读取.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    provider_cls = DATA_PROVIDERS.get(ext)
+    if provider_cls is None:
+        raise ValueError(f"不支持的输入文件类型: {path}, 可选: {', '.join(INPUT_EXTENSIONS)}")
+    provider = provider_cls(path)
+    cache = get_data_cache()
+    if cache is not None:
+        return CachedDataProvider(provider, path, cache)
+    return provider
@@ -0,0 +1,322 @@
+# data_access/sheet_table.py
+"""
+按列存储的 sheet 数据.
+
+read_data 原先为每一行构造一个 {"[A]": ..., "[B]": ...} 字典, 每行都有一份键的引用、
+每个值都是单独的对象, 重复的字符串(如区域名)也按行各存一份. SheetTable 改为每列存一次:
+- 全是小数的列存为 array('d'), 全是整数(int64 范围内)的列存为 array('q');
+- 全是字符串的列做字典编码: 不重复的值存一份, 每行只存一个编号(array);
+- 其余列存为列表, 其中的字符串经 sys.intern 共用;
+- 列键("[A]"...)由所有表共用.
+t[i] 返回行视图 RowView, 用法与原来的行字典相同(get / [] / in / items / len / ==),
+t[a:b] 返回行视图列表, 因此 fill_placeholders 和 slide_handler 无需区分两种结构.
+"""
+
+import sys
+from array import array
+from collections.abc import Mapping
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+from openpyxl.utils import get_column_letter
+
+#: 读取时每多少行整块压缩一次(见 ColumnBuilder / TableBuilder)
+CHUNK_ROWS = 4096
+
+_INT64_MIN = -(1 << 63)
+_INT64_MAX = (1 << 63) - 1
+
+
+@lru_cache(maxsize=None)
+def column_key(col_idx: int) -> str:
+    """
+    1-based 列号 -> "[A]", 同一列号总是返回同一个字符串对象.
+    """
+    return f"[{get_column_letter(col_idx)}]"
+
+
+@lru_cache(maxsize=None)
+def column_keys(n_cols: int) -> Tuple[str, ...]:
+    """
+    ("[A]", "[B]", ...), 相同列数的表共用同一组键字符串.
+    """
+    return tuple(column_key(col_idx) for col_idx in range(1, n_cols + 1))
+
+
+def select_columns(col_keys: Sequence[str], wanted_cols: Optional[Set[str]]) -> List[Tuple[int, str]]:
+    """
+    返回需要转换的 (0-based列号, 列key) 列表, wanted_cols 为 None 时返回全部列.
+    """
+    if wanted_cols is None:
+        return list(enumerate(col_keys))
+    return [(i, key) for i, key in enumerate(col_keys) if key in wanted_cols]
+
+
+class _EncodedColumn:
+    """
+    字典编码的字符串列: values[codes[i]].
+    """
+    __slots__ = ("values", "codes")
+
+    def __init__(self, values: List[str], codes: array):
+        self.values = values
+        self.codes = codes
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, i):
+        return self.values[self.codes[i]]
+
+    def __iter__(self):
+        values = self.values
+        return (values[code] for code in self.codes)
+
+
+def _code_typecode(n_values: int) -> str:
+    if n_values <= 1 << 8:
+        return 'B'
+    if n_values <= 1 << 16:
+        return 'H'
+    return 'I'
+
+
+class ColumnBuilder:
+    """
+    分块追加一列的值, 边读边压缩(见模块说明), 不必先把整列的原始值都留在内存里.
+    第一块决定存储方式, 之后出现不符合的值时整列退化为列表. finish() 返回紧凑存储.
+    """
+    __slots__ = ("kind", "data", "index")
+
+    def __init__(self):
+        self.kind = None
+        self.data = None
+        self.index = None
+
+    @staticmethod
+    def _kind_of(values: list) -> str:
+        kinds = {value.__class__ for value in values}
+        if kinds == {float}:
+            return "float"
+        if kinds == {int} and all(_INT64_MIN <= v <= _INT64_MAX for v in values):
+            return "int"
+        if kinds == {str}:
+            return "str"
+        return "list"
+
+    def _to_list(self):
+        data = list(self.finish())
+        intern = sys.intern
+        self.data = [intern(value) if value.__class__ is str else value for value in data]
+        self.kind = "list"
+        self.index = None
+
+    def extend(self, values: list):
+        if not values:
+            return
+        if self.kind is None:
+            self.kind = self._kind_of(values)
+            self.data = {"float": lambda: array('d'), "int": lambda: array('q'),
+                         "str": lambda: array('I'), "list": list}[self.kind]()
+            self.index = {} if self.kind == "str" else None
+        elif self.kind != "list" and self._kind_of(values) != self.kind:
+            self._to_list()
+
+        if self.kind == "str":
+            index = self.index
+            self.data.extend(index.setdefault(value, len(index)) for value in values)
+        elif self.kind == "list":
+            intern = sys.intern
+            self.data.extend(intern(value) if value.__class__ is str else value for value in values)
+        else:
+            self.data.extend(values)
+
+    def finish(self):
+        if self.kind is None:
+            return []
+        if self.kind == "str":
+            return _EncodedColumn([sys.intern(value) for value in self.index],
+                                  array(_code_typecode(len(self.index)), self.data))
+        return self.data
+
+
+def compact_column(values: list):
+    """
+    一列值 -> 紧凑存储(见模块说明). 按下标取回的值与原值类型、内容都相同.
+    """
+    builder = ColumnBuilder()
+    builder.extend(values)
+    return builder.finish()
+
+
+class TableBuilder:
+    """
+    逐行追加一个sheet的数据(CSV / SQLite 等没有数字格式的来源), 得到 SheetTable:
+    - 只转换 wanted_cols 中的列(None 表示全部), convert(原始值) 为单个值的转换;
+    - 行比之前的行宽时自动增加列, 之前的行在新列上为空("");
+    - 每 chunk_rows 行压缩一次, 原始值不整列保留.
+    是否跳过空行由调用方决定.
+    """
+
+    def __init__(self, wanted_cols: Optional[Set[str]], convert, chunk_rows: int = CHUNK_ROWS):
+        self.wanted_cols = wanted_cols
+        self.convert = convert
+        self.chunk_rows = chunk_rows
+        self.col_keys: Tuple[str, ...] = ()
+        self.selected: List[Tuple[int, str]] = []
+        self.builders: List[ColumnBuilder] = []
+        self.pending: List[list] = []
+        self.n_rows = 0
+
+    def ensure_columns(self, n_cols: int):
+        if n_cols <= len(self.col_keys):
+            return
+        self.col_keys = column_keys(n_cols)
+        selected = select_columns(self.col_keys, self.wanted_cols)
+        for _ in selected[len(self.selected):]:
+            builder = ColumnBuilder()
+            builder.extend([""] * self.n_rows)
+            self.builders.append(builder)
+            self.pending.append([])
+        self.selected = selected
+
+    def append(self, row: Sequence):
+        n_cols = len(row)
+        self.ensure_columns(n_cols)
+        convert = self.convert
+        for (col_idx, _), pending in zip(self.selected, self.pending):
+            pending.append(convert(row[col_idx]) if col_idx < n_cols else "")
+        self.n_rows += 1
+        if self.n_rows % self.chunk_rows == 0:
+            self._flush()
+
+    def _flush(self):
+        for builder, pending in zip(self.builders, self.pending):
+            builder.extend(pending)
+            pending.clear()
+
+    def finish(self) -> "SheetTable":
+        self._flush()
+        return SheetTable([key for _, key in self.selected],
+                          [builder.finish() for builder in self.builders], self.n_rows)
+
+
+class RowView(Mapping):
+    """
+    SheetTable 中一行的只读视图, 行为与原来的行字典相同.
+    """
+    __slots__ = ("_table", "_row")
+
+    def __init__(self, table: "SheetTable", row: int):
+        self._table = table
+        self._row = row
+
+    def __getitem__(self, key: str):
+        return self._table.columns[self._table.key_index[key]][self._row]
+
+    def get(self, key: str, default=None):
+        col = self._table.key_index.get(key)
+        if col is None:
+            return default
+        return self._table.columns[col][self._row]
+
+    def __contains__(self, key) -> bool:
+        return key in self._table.key_index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._table.keys)
+
+    def __len__(self) -> int:
+        return len(self._table.keys)
+
+    def __repr__(self):
+        return f"RowView({dict(self.items())!r})"
+
+
+class SheetTable:
+    """
+    一个 sheet 的数据: keys 为列键(顺序与原行字典相同), columns[j] 为第 j 列的紧凑存储.
+    len(t) 为行数, t[i] / 迭代得到 RowView, t[a:b] 得到 RowView 列表.
+    与行字典列表比较(==)时逐行比较内容.
+    """
+
+    __slots__ = ("keys", "key_index", "columns", "n_rows")
+
+    def __init__(self, keys: Sequence[str], columns: list, n_rows: int):
+        self.keys = tuple(sys.intern(key) for key in keys)
+        self.key_index = {key: j for j, key in enumerate(self.keys)}
+        self.columns = columns
+        self.n_rows = n_rows
+
+    @classmethod
+    def from_columns(cls, keys: Sequence[str], columns: List[list], n_rows: int) -> "SheetTable":
+        """
+        keys 与 columns 一一对应, 每列 n_rows 个值. 转换时逐列释放原列表.
+        """
+        compacted = []
+        for j in range(len(columns)):
+            compacted.append(compact_column(columns[j]))
+            columns[j] = None
+        return cls(keys, compacted, n_rows)
+
+    @classmethod
+    def from_rows(cls, rows: List[Dict[str, Any]]) -> "SheetTable":
+        """
+        行字典列表 -> SheetTable, 各行的键须相同.
+        """
+        if not rows:
+            return cls((), [], 0)
+        keys = list(rows[0])
+        return cls.from_columns(keys, [[row[key] for row in rows] for key in keys], len(rows))
+
+    def __len__(self) -> int:
+        return self.n_rows
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [RowView(self, r) for r in range(*i.indices(self.n_rows))]
+        if i < 0:
+            i += self.n_rows
+        if not 0 <= i < self.n_rows:
+            raise IndexError("SheetTable 行号超出范围")
+        return RowView(self, i)
+
+    def __iter__(self) -> Iterator[RowView]:
+        for r in range(self.n_rows):
+            yield RowView(self, r)
+
+    def __eq__(self, other):
+        if isinstance(other, SheetTable):
+            other = list(other)
+        elif not isinstance(other, (list, tuple)):
+            return NotImplemented
+        return len(other) == self.n_rows and all(a == b for a, b in zip(self, other))
+
+    __hash__ = None
+
+    def column(self, key: str) -> list:
+        """
+        某一列的全部值(列表).
+        """
+        return list(self.columns[self.key_index[key]])
+
+    def select(self, wanted_cols: Optional[Set[str]]) -> "SheetTable":
+        """
+        只含 wanted_cols 中各列的表(列顺序不变, 与原表共用列数据), None 表示全部列.
+        结果与按同样的列直接读取相同.
+        """
+        if wanted_cols is None:
+            return self
+        keys = [key for key in self.keys if key in wanted_cols]
+        return SheetTable(keys, [self.columns[self.key_index[key]] for key in keys], self.n_rows)
+
+    def to_rows(self) -> List[Dict[str, Any]]:
+        """
+        转回行字典列表.
+        """
+        columns = [self.column(key) for key in self.keys]
+        return [dict(zip(self.keys, values)) for values in zip(*columns)] if columns \
+            else [{} for _ in range(self.n_rows)]
+
+    def __repr__(self):
+        return f"SheetTable(rows={self.n_rows}, keys={list(self.keys)!r})"
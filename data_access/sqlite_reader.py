@@ -0,0 +1,172 @@
+# data_access/sqlite_reader.py
+
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+from urllib.request import pathname2url
+from data_access.base_provider import BaseDataProvider, SheetInfo
+from data_access.cell_format import convert_sql_value
+from data_access.sheet_table import TableBuilder
+
+#: 连接池中最多保留的空闲连接数(所有数据库文件合计)
+DEFAULT_MAX_IDLE_CONNECTIONS = 8
+
+def quote_identifier(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+class SqliteConnectionPool:
+    """
+    按数据库文件缓存空闲的只读连接, 线程池中的各任务(以及进程池中同一工作进程的各任务)
+    复用同一批连接, 不必每个文件、每个sheet都重新打开.
+    - 连接以只读方式打开(mode=ro), 可在线程之间传递, 但同一时刻只借给一个任务;
+    - 文件被修改(mtime/大小变化)后, 旧的空闲连接关闭, 不再复用;
+    - 空闲连接超过 max_idle 时关闭最久未用的.
+    """
+
+    def __init__(self, max_idle: int = DEFAULT_MAX_IDLE_CONNECTIONS):
+        self.max_idle = max_idle
+        self._idle: "OrderedDict[int, Tuple[str, tuple, sqlite3.Connection]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.opened = 0
+        self.reused = 0
+
+    @staticmethod
+    def _version(path: str) -> tuple:
+        st = os.stat(path)
+        return st.st_mtime_ns, st.st_size
+
+    def _take(self, path: str, version: tuple) -> Optional[sqlite3.Connection]:
+        stale = []
+        found = None
+        with self._lock:
+            for key, (idle_path, idle_version, conn) in list(self._idle.items()):
+                if idle_path != path:
+                    continue
+                if idle_version != version:
+                    del self._idle[key]
+                    stale.append(conn)
+                elif found is None:
+                    del self._idle[key]
+                    found = conn
+                    self.reused += 1
+            if found is None:
+                self.opened += 1
+        for conn in stale:
+            conn.close()
+        return found
+
+    def _give(self, path: str, version: tuple, conn: sqlite3.Connection):
+        evicted = []
+        with self._lock:
+            self._idle[id(conn)] = (path, version, conn)
+            while len(self._idle) > self.max_idle:
+                evicted.append(self._idle.popitem(last=False)[1][2])
+        for old in evicted:
+            old.close()
+
+    @contextmanager
+    def connection(self, db_file: str) -> Iterator[sqlite3.Connection]:
+        """
+        借出 db_file 的一个只读连接, 用完归还; 出错时关闭该连接, 不再复用.
+        """
+        path = os.path.abspath(db_file)
+        version = self._version(path)
+        conn = self._take(path, version)
+        if conn is None:
+            conn = sqlite3.connect(f"file:{pathname2url(path)}?mode=ro", uri=True,
+                                   check_same_thread=False)
+        try:
+            yield conn
+        except BaseException:
+            conn.close()
+            raise
+        self._give(path, version, conn)
+
+    def close_all(self):
+        with self._lock:
+            idle = [conn for _, _, conn in self._idle.values()]
+            self._idle.clear()
+        for conn in idle:
+            conn.close()
+
+
+# 进程内共享的连接池
+_pool = SqliteConnectionPool()
+
+def get_sqlite_pool() -> SqliteConnectionPool:
+    return _pool
+
+class SqliteDataProvider(BaseDataProvider):
+    """
+    从SQLite数据库读取数据, 每个映射用到的sheet执行一次查询.
+    返回 {sheet名: SheetTable}, 结构与 ExcelDataProvider 相同:
+    查询结果的列按位置对应 "[A]" "[B]" ...(列名相当于 Excel 的表头), 全为 NULL 的行跳过.
+
+    sheet 的查询默认为 SELECT * FROM "<sheet名>"(同名的表或视图), 也可在 queries 中
+    为某个sheet指定 SQL. 不指定 sheets 时读取 queries 中的sheet和库中全部表/视图.
+    值按 cell_format.convert_sql_value 转换, 与 Excel 中同样的值得到相同的结果.
+    连接从进程内共享的连接池借用(见 SqliteConnectionPool).
+    """
+    def __init__(self, db_file: str, queries: Optional[Dict[str, str]] = None,
+                 pool: Optional[SqliteConnectionPool] = None):
+        if not os.path.isfile(db_file):
+            raise FileNotFoundError(f"SQLite文件不存在: {db_file}")
+        self.db_file = db_file
+        self.queries = dict(queries or {})
+        self.pool = pool if pool is not None else get_sqlite_pool()
+
+    def cache_options(self):
+        return tuple(sorted(self.queries.items()))
+
+    @staticmethod
+    def table_names(conn: sqlite3.Connection) -> List[str]:
+        rows = conn.execute(
+            "SELECT name FROM sqlite_master WHERE type IN ('table', 'view') "
+            "AND name NOT LIKE 'sqlite_%' ORDER BY rowid"
+        ).fetchall()
+        return [name for (name,) in rows]
+
+    def _sheet_queries(self, conn: sqlite3.Connection, sheets: Optional[Set[str]]) -> List[Tuple[str, str]]:
+        tables = self.table_names(conn)
+        names = list(self.queries) + [name for name in tables if name not in self.queries]
+        return [(name, self.queries.get(name) or f"SELECT * FROM {quote_identifier(name)}")
+                for name in names if self.wants_sheet(name, sheets)]
+
+    def read_data(self, sheets: Optional[Set[str]] = None,
+                  columns: Optional[Dict[str, Set[str]]] = None):
+        result = {}
+        with self.pool.connection(self.db_file) as conn:
+            for sheet_name, query in self._sheet_queries(conn, sheets):
+                result[sheet_name] = self._read_query(
+                    conn, query, self.sheet_columns(sheet_name, columns))
+        return result
+
+    def describe(self, sheets: Optional[Set[str]] = None):
+        """
+        列数取查询结果的列数(不取数据), 行数为 count(*)(全为 NULL 的行也计入).
+        """
+        info = {}
+        with self.pool.connection(self.db_file) as conn:
+            for sheet_name, query in self._sheet_queries(conn, sheets):
+                cursor = conn.execute(f"SELECT * FROM ({query}) LIMIT 0")
+                n_cols = len(cursor.description or ())
+                cursor.close()
+                (n_rows,), = conn.execute(f"SELECT count(*) FROM ({query})").fetchall()
+                info[sheet_name] = SheetInfo(n_rows, n_cols, rows_exact=False)
+        return info
+
+    @staticmethod
+    def _read_query(conn: sqlite3.Connection, query: str, wanted_cols: Optional[Set[str]]):
+        builder = TableBuilder(wanted_cols, convert_sql_value)
+        cursor = conn.execute(query)
+        try:
+            builder.ensure_columns(len(cursor.description or ()))
+            for row in cursor:
+                if any(value is not None for value in row):
+                    builder.append(row)
+        finally:
+            cursor.close()
+        return builder.finish()
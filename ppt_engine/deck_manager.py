@@ -1,9 +1,52 @@
 # ppt_engine/deck_manager.py
 
-import time
 import copy
+import logging
+import os
+import struct
+import threading
+import time
+import zipfile
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 from pptx import Presentation
 from pptx.slide import Slide
+from pptx.opc.constants import CONTENT_TYPE as CT, RELATIONSHIP_TYPE as RT
+from pptx.opc.packuri import PACKAGE_URI, PackURI
+from pptx.oxml.ns import nsuri, qn
+from pptx.oxml.xmlchemy import OxmlElement
+from pptx.parts.slide import SlidePart
+from pptx.opc.serialized import PackageWriter
+
+logger = logging.getLogger(__name__)
+
+#: 保存时的 deflate 压缩级别(0-9), 与 zipfile 默认一致
+DEFAULT_COMPRESSLEVEL = 6
+
+#: 需要压缩的数据总量低于此值时不使用线程池
+PARALLEL_DEFLATE_MIN_BYTES = 256 * 1024
+
+_save_options = {
+    "compresslevel": DEFAULT_COMPRESSLEVEL,
+    "deflate_workers": min(4, os.cpu_count() or 1),
+}
+_deflate_pool = None
+_deflate_pool_lock = threading.Lock()
+
+#: _write_raw_member 用到的 zipfile.ZipFile 内部属性(非公开接口)
+_RAW_WRITE_ZIP_ATTRS = ("fp", "filelist", "NameToInfo", "start_dir", "_didModify", "_writecheck")
+
+#: 直接写入已压缩数据的方式不可用(zipfile 内部实现已变化)后置为 False,
+#: 之后的保存都改用 prs.save
+_raw_write_available = True
+
+
+class _RawWriteUnsupported(Exception):
+    """
+    当前 Python 的 zipfile 内部实现与 _write_raw_member 的假设不符.
+    """
 
 def open_ppt(file_path: str):
     """
@@ -13,11 +56,261 @@ def open_ppt(file_path: str):
     prs = Presentation(file_path)
     return prs
 
-def save_ppt(prs, output_path: str):
+def save_ppt(prs, output_path: str, template_path: Optional[str] = None,
+             compresslevel: Optional[int] = None, dirty_parts: Optional[Iterable] = None):
     """
     保存到指定路径 (相当于原先 prs.SaveAs(output_path, 24))
+
+    给出 template_path 时使用 write_package: 未改动的部件直接复制模板中
+    已压缩的数据, 其余部件在线程池中并行压缩; 否则使用 python-pptx 的 prs.save.
+    dirty_parts 见 write_package.
+    """
+    if template_path is None:
+        prs.save(output_path)
+        return
+    write_package(prs, output_path, template_path, compresslevel, dirty_parts)
+
+def set_save_options(compresslevel: Optional[int] = None, deflate_workers: Optional[int] = None):
+    """
+    设置 write_package 的默认压缩级别(0-9)和并行压缩线程数.
+    """
+    global _deflate_pool
+    if compresslevel is not None:
+        if not 0 <= compresslevel <= 9:
+            raise ValueError(f"压缩级别应为 0-9: {compresslevel}")
+        _save_options["compresslevel"] = compresslevel
+    if deflate_workers is not None and deflate_workers != _save_options["deflate_workers"]:
+        _save_options["deflate_workers"] = max(1, deflate_workers)
+        with _deflate_pool_lock:
+            old_pool, _deflate_pool = _deflate_pool, None
+        if old_pool is not None:
+            old_pool.shutdown(wait=False)
+
+def _get_deflate_pool() -> ThreadPoolExecutor:
+    global _deflate_pool
+    with _deflate_pool_lock:
+        if _deflate_pool is None:
+            _deflate_pool = ThreadPoolExecutor(max_workers=_save_options["deflate_workers"],
+                                               thread_name_prefix="deflate")
+        return _deflate_pool
+
+class _CollectingPkgWriter:
+    """
+    代替 python-pptx 的 _ZipPkgWriter, 只收集 (成员名, 内容), 不写文件.
+    """
+
+    def __init__(self):
+        self.members: List[Tuple[str, bytes]] = []
+
+    def write(self, pack_uri, blob):
+        self.members.append((pack_uri.membername, blob))
+
+def _is_dirty(part, prs, dirty_parts: Optional[Set]) -> bool:
+    """
+    部件是否可能与模板不同: presentation.xml(幻灯片列表)总是; 幻灯片为 dirty_parts 中的,
+    未给出 dirty_parts 时所有幻灯片都算; 其余部件(版式/母版/主题/媒体/备注等)生成过程中不改动.
+    """
+    if part is prs.part:
+        return True
+    if isinstance(part, SlidePart):
+        return dirty_parts is None or part in dirty_parts
+    return False
+
+def _rels_in_template(rels, template_members: Dict) -> bool:
+    """
+    关系的目标都是模板中已有的部件(没有指向新增部件的关系).
+    """
+    return all(rel.is_external or rel.target_part.partname.membername in template_members
+               for rel in rels.values())
+
+def _collect_package_members(prs, template_members: Dict,
+                             dirty_parts: Optional[Set] = None) -> List[Tuple[str, Optional[bytes]]]:
+    """
+    按 python-pptx 保存时的顺序列出包内所有成员 (成员名, 内容):
+    [Content_Types].xml、_rels/.rels, 以及每个部件和它的 .rels.
+    未改动(见 _is_dirty)且模板中有同名成员的部件内容为 None, 表示直接复制模板中的压缩数据,
+    不再序列化; 它们的 .rels 和包关系只要不指向新增部件也同样复制.
+    """
+    package = prs.part.package
+    parts = tuple(package.iter_parts())
+    writer = PackageWriter(None, package._rels, parts)
+    collector = _CollectingPkgWriter()
+    writer._write_content_types_stream(collector)
+    members: List[Tuple[str, Optional[bytes]]] = list(collector.members)
+
+    pkg_rels_name = PACKAGE_URI.rels_uri.membername
+    pkg_rels_clean = (pkg_rels_name in template_members
+                      and _rels_in_template(package._rels, template_members))
+    members.append((pkg_rels_name, None if pkg_rels_clean else package._rels.xml))
+
+    for part in parts:
+        name = part.partname.membername
+        clean = name in template_members and not _is_dirty(part, prs, dirty_parts)
+        members.append((name, None if clean else part.blob))
+        if part._rels:
+            rels_name = part.partname.rels_uri.membername
+            rels_clean = (clean and rels_name in template_members
+                          and _rels_in_template(part.rels, template_members))
+            members.append((rels_name, None if rels_clean else part.rels.xml))
+    return members
+
+@lru_cache(maxsize=32)
+def _template_members(path: str, mtime_ns: int, size: int) -> Dict[str, Tuple[zipfile.ZipInfo, int]]:
     """
-    prs.save(output_path)
+    模板 zip 的成员 -> (ZipInfo, 压缩数据在文件中的偏移). 按 (路径, mtime, 大小) 缓存.
+    """
+    members = {}
+    with open(path, "rb") as f, zipfile.ZipFile(f) as zf:
+        for info in zf.infolist():
+            f.seek(info.header_offset)
+            header = struct.unpack(zipfile.structFileHeader, f.read(zipfile.sizeFileHeader))
+            name_len, extra_len = header[-2], header[-1]
+            data_offset = info.header_offset + zipfile.sizeFileHeader + name_len + extra_len
+            members[info.filename] = (info, data_offset)
+    return members
+
+def _deflate(blob: bytes, compresslevel: int) -> bytes:
+    # zlib 在压缩时释放 GIL, 多个部件可在线程池中真正并行
+    compressor = zlib.compressobj(compresslevel, zlib.DEFLATED, -15)
+    return compressor.compress(blob) + compressor.flush()
+
+def _check_raw_write_support(zf: zipfile.ZipFile):
+    missing = [name for name in _RAW_WRITE_ZIP_ATTRS if not hasattr(zf, name)]
+    if missing:
+        raise _RawWriteUnsupported(f"zipfile.ZipFile 缺少 {', '.join(missing)}")
+
+def _write_raw_member(zf: zipfile.ZipFile, zinfo: zipfile.ZipInfo, chunks):
+    """
+    把已压缩好的数据作为一个成员写入 zf(不再经过 zipfile 的压缩).
+    zinfo 需已填好 CRC、compress_size、file_size、compress_type.
+
+    zipfile 没有写入已压缩数据的公开接口, 这里按 ZipFile.writestr 的做法直接维护其内部状态
+    (_writecheck / _didModify / filelist / NameToInfo / start_dir), 已在 CPython 3.11 上核对.
+    这些内部调用出错时抛出 _RawWriteUnsupported, 由 write_package 改用 prs.save.
+    """
+    try:
+        zinfo.header_offset = zf.fp.tell()
+        zf._writecheck(zinfo)
+        zf._didModify = True
+    except Exception as e:
+        raise _RawWriteUnsupported(f"zipfile 内部接口调用失败: {e!r}") from e
+    zf.fp.write(zinfo.FileHeader())
+    for chunk in chunks:
+        zf.fp.write(chunk)
+    try:
+        zf.filelist.append(zinfo)
+        zf.NameToInfo[zinfo.filename] = zinfo
+        zf.start_dir = zf.fp.tell()
+    except Exception as e:
+        raise _RawWriteUnsupported(f"zipfile 内部接口调用失败: {e!r}") from e
+
+def _copy_range(f, offset: int, length: int, chunk_size: int = 1024 * 1024):
+    f.seek(offset)
+    while length > 0:
+        chunk = f.read(min(chunk_size, length))
+        if not chunk:
+            raise IOError("模板文件被截断")
+        length -= len(chunk)
+        yield chunk
+
+def write_package(prs, output_path, template_path: str, compresslevel: Optional[int] = None,
+                  dirty_parts: Optional[Iterable] = None):
+    """
+    保存 prs, 尽量复用模板 template_path 中已压缩的数据:
+    - 未改动的部件(版式/母版/主题/图片/媒体等, 见 _is_dirty)及其 .rels 不序列化,
+      直接复制模板中的压缩数据, 输出中的这些成员与模板逐字节相同;
+    - dirty_parts 为复制或填充过的幻灯片部件, 未给出时所有幻灯片都算改动过;
+    - 其余成员(这些幻灯片、presentation.xml、[Content_Types].xml、.rels 等)序列化后,
+      大小和 CRC 与模板同名成员相同的也复用, 否则按 compresslevel 在线程池中并行 deflate.
+    内容与 prs.save 等价; 模板不可读时全部重新压缩.
+
+    复制压缩数据依赖 zipfile 的内部实现(见 _write_raw_member); 当前 Python 上不可用时
+    记录一次警告, 本次及之后的保存都改用 prs.save.
+    """
+    global _raw_write_available
+    if not _raw_write_available:
+        prs.save(output_path)
+        return
+    start = output_path.tell() if hasattr(output_path, "write") else None
+    try:
+        _write_package_raw(prs, output_path, template_path, compresslevel, dirty_parts)
+    except Exception as e:
+        # ZipFile 关闭时的异常可能掩盖 _RawWriteUnsupported, 同时检查 __context__
+        if not isinstance(e, _RawWriteUnsupported) \
+                and not isinstance(e.__context__, _RawWriteUnsupported):
+            raise
+        _raw_write_available = False
+        logger.warning(f"当前 Python 不支持直接复制模板中的压缩数据, 改用 prs.save 保存: {e}")
+        if start is not None:
+            output_path.seek(start)
+            output_path.truncate()
+        prs.save(output_path)
+
+def _write_package_raw(prs, output_path, template_path: str, compresslevel: Optional[int],
+                       dirty_parts: Optional[Iterable]):
+    if compresslevel is None:
+        compresslevel = _save_options["compresslevel"]
+
+    try:
+        st = os.stat(template_path)
+        template_members = _template_members(os.path.abspath(template_path),
+                                             st.st_mtime_ns, st.st_size)
+    except (OSError, zipfile.BadZipFile):
+        template_members = {}
+    members = _collect_package_members(
+        prs, template_members, set(dirty_parts) if dirty_parts is not None else None
+    )
+
+    # 判定每个成员是复用还是重新压缩
+    plan = []
+    to_compress = []
+    for name, blob in members:
+        if blob is None:
+            plan.append((name, None, None, template_members[name]))
+            continue
+        crc = zlib.crc32(blob)
+        entry = template_members.get(name)
+        if entry is not None and entry[0].file_size == len(blob) and entry[0].CRC == crc:
+            plan.append((name, blob, crc, entry))
+        else:
+            plan.append((name, blob, crc, None))
+            to_compress.append(blob)
+
+    if sum(len(blob) for blob in to_compress) >= PARALLEL_DEFLATE_MIN_BYTES:
+        pool = _get_deflate_pool()
+        futures = {id(blob): pool.submit(_deflate, blob, compresslevel) for blob in to_compress}
+        compressed = lambda blob: futures[id(blob)].result()
+    else:
+        compressed = lambda blob: _deflate(blob, compresslevel)
+
+    date_time = time.localtime(time.time())[:6]
+    template_file = open(template_path, "rb") if template_members else None
+    try:
+        with zipfile.ZipFile(output_path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+            _check_raw_write_support(zf)
+            for name, blob, crc, entry in plan:
+                if entry is not None:
+                    src_info, data_offset = entry
+                    zinfo = zipfile.ZipInfo(name, src_info.date_time)
+                    zinfo.compress_type = src_info.compress_type
+                    zinfo.CRC = src_info.CRC
+                    zinfo.file_size = src_info.file_size
+                    zinfo.compress_size = src_info.compress_size
+                    zinfo.external_attr = 0o600 << 16
+                    _write_raw_member(zf, zinfo,
+                                      _copy_range(template_file, data_offset, src_info.compress_size))
+                else:
+                    data = compressed(blob)
+                    zinfo = zipfile.ZipInfo(name, date_time)
+                    zinfo.compress_type = zipfile.ZIP_DEFLATED
+                    zinfo.CRC = crc
+                    zinfo.file_size = len(blob)
+                    zinfo.compress_size = len(data)
+                    zinfo.external_attr = 0o600 << 16
+                    _write_raw_member(zf, zinfo, (data,))
+    finally:
+        if template_file is not None:
+            template_file.close()
 
 def close_ppt(prs):
     """
@@ -25,18 +318,16 @@ def close_ppt(prs):
     """
     pass
 
-def copy_slide_after(prs, base_index: int, count: int = 1, sleep_time=0.5):
+def copy_slide_after(prs, base_index: int, count: int = 1):
     """
     在 base_index 这张幻灯片后复制 count 次 (python-pptx实现).
     返回复制后幻灯片总数.
 
     说明:
-    - python-pptx无内置复制slide的API，这里手写一个简易clone逻辑:
-      1) 找到 slides[base_index-1] (因为 python-pptx是0-based)
-      2) 复制其 shapes/notes(可选)，然后插入在 base_index 位置后面
-      3) 重复 count 次
+    - python-pptx无内置复制slide的API，这里通过 clone_slide_bulk 一次性
+      生成 count 个副本, 并一次性插入到 base_index 之后.
     - 可能无法完整复制动画/音视频/SmartArt等高级要素
-    - sleep_time 仅用来模拟在原先 win32com 逻辑里给粘贴留时间(在纯 python-pptx 中不一定需要)
+    - 原先 win32com 逻辑里的 sleep 等待已去掉, python-pptx 中不需要
     """
     # python-pptx: slides 是 0-based，而你的映射或逻辑多半是 1-based
     # 这里假设你传进来的 base_index 也是 1-based
@@ -48,69 +339,122 @@ def copy_slide_after(prs, base_index: int, count: int = 1, sleep_time=0.5):
         return len(prs.slides)
 
     slide_to_clone = prs.slides[actual_idx]
-
-    for _ in range(count):
-        time.sleep(sleep_time)  # 模拟原先 win32com 中的复制粘贴等待
-        clone_slide(prs, slide_to_clone)
+    clone_slide_bulk(prs, slide_to_clone, count)
 
     return len(prs.slides)
 
 def clone_slide(prs: Presentation, src_slide: Slide):
     """
     在 python-pptx 里克隆 src_slide，并将新幻灯片
-    紧跟在 src_slide 后面。
+    紧跟在 src_slide 后面。返回新幻灯片.
+    """
+    new_slides = clone_slide_bulk(prs, src_slide, 1)
+    return new_slides[0] if new_slides else None
+
+def clone_slide_bulk(prs: Presentation, src_slide: Slide, count: int) -> List[Slide]:
+    """
+    一次性把 src_slide 克隆 count 份, 按顺序紧跟在 src_slide 后面.
+    返回新幻灯片列表(按演示顺序).
 
     步骤:
-      1) 新增一张空白幻灯片(默认使用最后一个布局,例如空白布局).
-      2) 用XML方式复制 src_slide 的 spTree(所有 shapes) 到新幻灯片.
-      3) 将新幻灯片移动到 src_slide 后面(下标 = src_idx+1).
+      1) 找到 src_slide 在 sldIdLst 中的位置(只扫描一次).
+      2) 每个副本: 深拷贝整张 p:sld XML, 新建 SlidePart,
+         复制 src_slide 的关系(版式/图片/超链接等, 备注页除外).
+      3) 所有副本的 p:sldId 一次性插入到 src_slide 之后.
+
+    与逐张 add_slide + move_slide 相比, 总耗时随 count 线性增长.
 
     注意:
-      - 不支持复制动画、SmartArt、OLE 等复杂要素.
-      - 也未复制notes, chart, media. 如需可自行补充.
+      - 副本与原幻灯片共用同一版式和图片/图表部件.
+      - 不复制备注页(notes).
     """
-    # 1) 新增空白幻灯片(默认选用最后一个layout)
-    blank_layout = prs.slide_layouts[-1]
-    new_slide = prs.slides.add_slide(blank_layout)
+    if count <= 0:
+        return []
 
-    # 2) XML层面复制 shape
-    src_spTree = src_slide._element.xpath('./p:cSld/p:spTree')[0]
-    new_spTree = new_slide._element.xpath('./p:cSld/p:spTree')[0]
+    pres_part = prs.part
+    package = pres_part.package
+    sldIdLst = prs.slides._sldIdLst
+    src_part = src_slide.part
 
-    # 先清空 new_slide 里除了背景(bg)以外的元素
-    for shape_elem in list(new_spTree):
-        if shape_elem.tag.endswith('bg'):
-            continue
-        new_spTree.remove(shape_elem)
+    # 1) 定位 src_slide
+    src_pos = -1
+    slide_ids = []
+    used_partnames = set()
+    for i, sldId in enumerate(sldIdLst):
+        slide_ids.append(int(sldId.get("id")))
+        slide_part = pres_part.related_part(sldId.rId)
+        used_partnames.add(str(slide_part.partname))
+        if slide_part is src_part:
+            src_pos = i
+    if src_pos == -1:
+        # 理论上不该发生, 如果 src_slide 来自同一个 prs
+        logger.warning("未能找到 src_slide 的下标, 无法复制.")
+        return []
 
-    # 把 src_slide 的 spTree 整体复制过来
-    for elem in src_spTree:
-        new_spTree.append(copy.deepcopy(elem))
+    next_slide_id = max([255] + slide_ids) + 1
+    next_partname_no = len(sldIdLst) + 1
 
-    # 3) 将新幻灯片移动到 src_slide 后面
-    src_idx = get_slide_index(prs, src_slide)
-    if src_idx == -1:
-        # 理论上不该发生, 如果 src_slide 来自同一个 prs
-        print("警告: 未能找到 src_slide 的下标, 无法定位移动. 新slide保持末尾.")
-        return new_slide
-    # 新增幻灯片当前在末尾
-    new_idx = len(prs.slides) - 1
-    # 我们想让它紧挨在src_slide后面 => 目标索引 = src_idx + 1
-    target_idx = src_idx + 1
+    src_rels = [rel for rel in src_part.rels.values() if rel.reltype != RT.NOTES_SLIDE]
 
-    # 若 target_idx < new_idx, 说明要往前移动
-    if target_idx < new_idx:
-        move_slide(prs, new_idx, target_idx)
+    # 2) 逐个生成副本部件
+    new_sldIds = []
+    new_slides = []
+    for _ in range(count):
+        partname = "/ppt/slides/slide%d.xml" % next_partname_no
+        while partname in used_partnames:
+            next_partname_no += 1
+            partname = "/ppt/slides/slide%d.xml" % next_partname_no
+        used_partnames.add(partname)
+        next_partname_no += 1
+
+        new_part = SlidePart(
+            PackURI(partname), CT.PML_SLIDE, package, copy.deepcopy(src_part._element)
+        )
+        rId_map = {}
+        for rel in src_rels:
+            if rel.is_external:
+                new_rId = new_part.relate_to(rel.target_ref, rel.reltype, is_external=True)
+            else:
+                new_rId = new_part.relate_to(rel.target_part, rel.reltype)
+            if new_rId != rel.rId:
+                rId_map[rel.rId] = new_rId
+        if rId_map:
+            _remap_rIds(new_part._element, rId_map)
+
+        # 新部件不可能与已有关系重复, 直接追加, 避免 relate_to 的线性查重
+        rId = pres_part.rels._add_relationship(RT.SLIDE, new_part)
+
+        sldId = OxmlElement("p:sldId")
+        sldId.set("id", str(next_slide_id))
+        sldId.set(qn("r:id"), rId)
+        next_slide_id += 1
 
-    return new_slide
+        new_sldIds.append(sldId)
+        new_slides.append(new_part.slide)
+
+    # 3) 一次性插入
+    sldIdLst[src_pos + 1:src_pos + 1] = new_sldIds
+    return new_slides
+
+def _remap_rIds(element, rId_map: Dict[str, str]):
+    """
+    副本中的 r:id / r:embed / r:link 等关系引用按 rId_map 改写.
+    """
+    r_ns = "{%s}" % nsuri("r")
+    for node in element.iter():
+        for attr, value in node.attrib.items():
+            if attr.startswith(r_ns) and value in rId_map:
+                node.set(attr, rId_map[value])
 
 def get_slide_index(prs: Presentation, slide: Slide) -> int:
     """
     在 prs.slides 中找到给定 slide 的下标(0-based)。
     如果没找到，返回 -1。
+    只比较 sldIdLst 中的关系目标, 不创建 Slide 对象.
     """
-    for i, s in enumerate(prs.slides):
-        if s == slide:
+    pres_part = prs.part
+    for i, sldId in enumerate(prs.slides._sldIdLst):
+        if pres_part.related_part(sldId.rId) is slide.part:
             return i
     return -1
 
@@ -1,33 +1,177 @@
 # ppt_engine/placeholders.py
 
 import re
+from typing import Dict, List, Optional, Set, Tuple
 
 BRACKET_PATTERN = re.compile(r"\[[^\]]*\]")
 
+#: 文本框内含占位符的 run 位置: [(段落序号, run序号), ...]
+RunPositions = List[Tuple[int, int]]
 
-def replace_placeholders(tf, row_data: dict):
+
+def substitute_placeholders(text: str, row_data: dict) -> str:
+    """
+    一次扫描完成整段文本的替换, 找不到的占位符替换为 "未知".
+    """
+    return BRACKET_PATTERN.sub(lambda m: str(row_data.get(m.group(0), "未知")), text)
+
+
+def substitute_placeholders_count(text: str, row_data: dict) -> Tuple[str, int]:
+    """
+    同 substitute_placeholders, 另返回替换的占位符个数.
+    """
+    return BRACKET_PATTERN.subn(lambda m: str(row_data.get(m.group(0), "未知")), text)
+
+
+def replace_placeholders(tf, row_data: dict) -> int:
     """
         在 tf(paragraphs/runs) 内做占位符替换, 保留原 run 样式.
         bracket_pattern 用于匹配形如 [xxx].
         row_data 是 { "[A]":"valA", "[B]":"valB", ... }
 
-        不返回任何内容, 因为替换直接改 tf 内的 run.text.
+        替换直接改 tf 内的 run.text, 返回替换的占位符个数.
         """
+    replaced = 0
     for paragraph in tf.paragraphs:
         for run in paragraph.runs:
             old_run_text = run.text
-            if not old_run_text:
+            if not old_run_text or "[" not in old_run_text:
                 continue
 
-            # 查找占位符
-            matches = BRACKET_PATTERN.findall(old_run_text)
-            if not matches:
-                continue
+            new_run_text, n = substitute_placeholders_count(old_run_text, row_data)
+            replaced += n
+            if new_run_text != old_run_text:
+                run.text = new_run_text
+    return replaced
 
-            new_run_text = old_run_text
-            for ph in matches:
-                repl_val = str(row_data.get(ph, "未知"))
-                new_run_text = new_run_text.replace(ph, repl_val)
 
-            if new_run_text != old_run_text:
-                run.text = new_run_text
\ No newline at end of file
+def replace_placeholders_at(tf, run_positions: RunPositions, row_data: dict) -> int:
+    """
+    与 replace_placeholders 相同, 但只访问索引中记录的 run.
+    """
+    replaced = 0
+    paragraphs = tf.paragraphs
+    runs_cache = {}
+    for p_idx, r_idx in run_positions:
+        runs = runs_cache.get(p_idx)
+        if runs is None:
+            runs = runs_cache[p_idx] = paragraphs[p_idx].runs
+        run = runs[r_idx]
+        old_run_text = run.text
+        new_run_text, n = substitute_placeholders_count(old_run_text, row_data)
+        replaced += n
+        if new_run_text != old_run_text:
+            run.text = new_run_text
+    return replaced
+
+
+def _scan_text_frame(tf) -> Tuple[RunPositions, Set[str]]:
+    positions = []
+    keys = set()
+    for p_idx, paragraph in enumerate(tf.paragraphs):
+        for r_idx, run in enumerate(paragraph.runs):
+            text = run.text
+            if text and "[" in text:
+                found = BRACKET_PATTERN.findall(text)
+                if found:
+                    positions.append((p_idx, r_idx))
+                    keys.update(found)
+    return positions, keys
+
+
+class ShapePlaceholders:
+    """
+    一个含占位符的形状:
+    - shape_idx: 在 slide.shapes 中的序号;
+    - cells: 表格时为 {(行, 列): run位置}, 文本框时为 None;
+    - runs: 文本框时为 run位置.
+    """
+    __slots__ = ("shape_idx", "cells", "runs")
+
+    def __init__(self, shape_idx: int, cells: Optional[Dict[Tuple[int, int], RunPositions]] = None,
+                 runs: Optional[RunPositions] = None):
+        self.shape_idx = shape_idx
+        self.cells = cells
+        self.runs = runs
+
+    @property
+    def is_table(self) -> bool:
+        return self.cells is not None
+
+
+class SlidePlaceholders:
+    """
+    一张幻灯片上的占位符: 含占位符的形状列表 + 出现过的占位符集合.
+    """
+    __slots__ = ("shapes", "keys")
+
+    def __init__(self, shapes: List[ShapePlaceholders], keys: Set[str]):
+        self.shapes = shapes
+        self.keys = keys
+
+
+class PlaceholderIndex:
+    """
+    模板的占位符索引, 每个模板只分析一次.
+    记录哪些幻灯片/形状/表格单元格/run 含有占位符,
+    填充时只访问这些位置, 没有占位符的幻灯片整张跳过.
+
+    幻灯片序号是模板中的 1-based 序号; 复制出来的幻灯片与源幻灯片结构相同,
+    沿用源幻灯片的索引.
+    """
+
+    def __init__(self, slides: Dict[int, SlidePlaceholders]):
+        self.slides = slides
+
+    def for_slide(self, slide_no: int) -> Optional[SlidePlaceholders]:
+        return self.slides.get(slide_no)
+
+    def keys_for_slide(self, slide_no: int) -> Set[str]:
+        entry = self.slides.get(slide_no)
+        return entry.keys if entry is not None else set()
+
+
+def build_placeholder_index(prs) -> PlaceholderIndex:
+    """
+    分析模板, 生成 PlaceholderIndex.
+    与 slide_handler 的填充逻辑一致: 只看顶层形状, 表格优先, 其次文本框.
+    """
+    slides = {}
+    for slide_no, slide in enumerate(prs.slides, start=1):
+        shapes = []
+        keys = set()
+        for shape_idx, shape in enumerate(slide.shapes):
+            if shape.has_table:
+                table = shape.table
+                cells = {}
+                for r_idx, row in enumerate(table.rows):
+                    for c_idx, cell in enumerate(row.cells):
+                        positions, found = _scan_text_frame(cell.text_frame)
+                        if positions:
+                            cells[(r_idx, c_idx)] = positions
+                            keys.update(found)
+                if cells:
+                    shapes.append(ShapePlaceholders(shape_idx, cells=cells))
+            elif shape.has_text_frame:
+                positions, found = _scan_text_frame(shape.text_frame)
+                if positions:
+                    shapes.append(ShapePlaceholders(shape_idx, runs=positions))
+                    keys.update(found)
+        if shapes:
+            slides[slide_no] = SlidePlaceholders(shapes, keys)
+    return PlaceholderIndex(slides)
+
+
+def collect_slide_placeholders(prs) -> Dict[int, Set[str]]:
+    """
+    扫描模板, 返回 {幻灯片序号(1-based): {"[A]", "[B]", ...}}.
+    直接在 XML 的 a:t 文本上匹配, 结果是实际会被替换的占位符的超集.
+    """
+    result = {}
+    for idx, slide in enumerate(prs.slides, start=1):
+        found = set()
+        for text in slide._element.xpath(".//a:t/text()"):
+            if "[" in text:
+                found.update(BRACKET_PATTERN.findall(text))
+        result[idx] = found
+    return result
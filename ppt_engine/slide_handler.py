@@ -1,16 +1,41 @@
 # ppt_engine/slide_handler.py
 
-from typing import List, Dict, Any
-from ppt_engine.placeholders import replace_placeholders
+from typing import Sequence, Mapping, Any, Optional
+from ppt_engine.placeholders import (
+    SlidePlaceholders, replace_placeholders, replace_placeholders_at
+)
 
-def fill_table_with_rows(slide, data_rows: List[Dict[str, Any]]):
+def fill_table_with_rows(slide, data_rows: Sequence[Mapping[str, Any]],
+                         slide_entry: Optional[SlidePlaceholders] = None) -> int:
     """
     多行数据 -> 同一张表格:
     - 第1行是表头, 从第2行起写 data_rows
-    - 若 data_rows 超过表格行数, 只写到最后
+    - 若 data_rows 超过表格行数, 只写到最后(需要按数据行数增加表格行时
+      使用行模板表格, 见 xml_fill.fill_table_row_template_xml)
+    - 文本框使用第一行数据
+
+    slide_entry 为模板占位符索引中该页的记录, 传入时只访问含占位符的形状/单元格.
+    返回替换的占位符个数.
     """
     if not data_rows:
-        return
+        return 0
+
+    replaced = 0
+    if slide_entry is not None:
+        shapes = list(slide.shapes)
+        for entry in slide_entry.shapes:
+            shape = shapes[entry.shape_idx]
+            if entry.is_table:
+                table = shape.table
+                write_start = 1  # 第1行(索引0)作为表头 => 从 row=1开始
+                for (r, c), run_positions in entry.cells.items():
+                    data_i = r - write_start
+                    if 0 <= data_i < len(data_rows):
+                        replaced += replace_placeholders_at(table.cell(r, c).text_frame,
+                                                            run_positions, data_rows[data_i])
+            else:
+                replaced += replace_placeholders_at(shape.text_frame, entry.runs, data_rows[0])
+        return replaced
 
     for shape in slide.shapes:
         if shape.has_table:  # python-pptx 判断表格
@@ -26,18 +51,37 @@ def fill_table_with_rows(slide, data_rows: List[Dict[str, Any]]):
                 for c in range(col_count):
                     cell = table.cell(current_row, c)
                     if cell.text_frame:
-                        replace_placeholders(cell.text_frame, row_data)
+                        replaced += replace_placeholders(cell.text_frame, row_data)
 
         elif shape.has_text_frame:  # 如果是文本框
-            replace_placeholders(shape.text_frame, data_rows)
+            replaced += replace_placeholders(shape.text_frame, data_rows[0])
+    return replaced
 
-def fill_table_with_single_dict(slide, row_data: Dict[str, Any]):
+def fill_table_with_single_dict(slide, row_data: Mapping[str, Any],
+                                slide_entry: Optional[SlidePlaceholders] = None) -> int:
     """
     一行数据 -> 整个表格(不做多行循环).
     也遍历文本框, 用 row_data 替换占位符
+
+    slide_entry 为模板占位符索引中该页的记录, 传入时只访问含占位符的形状/单元格.
+    返回替换的占位符个数.
     """
     if not row_data:
-        return
+        return 0
+
+    replaced = 0
+    if slide_entry is not None:
+        shapes = list(slide.shapes)
+        for entry in slide_entry.shapes:
+            shape = shapes[entry.shape_idx]
+            if entry.is_table:
+                table = shape.table
+                for (r, c), run_positions in entry.cells.items():
+                    replaced += replace_placeholders_at(table.cell(r, c).text_frame,
+                                                        run_positions, row_data)
+            else:
+                replaced += replace_placeholders_at(shape.text_frame, entry.runs, row_data)
+        return replaced
 
     for shape in slide.shapes:
         if shape.has_table:
@@ -50,7 +94,8 @@ def fill_table_with_single_dict(slide, row_data: Dict[str, Any]):
                 for c in range(col_count):
                     cell = table.cell(r, c)
                     if cell.text_frame:
-                        replace_placeholders(cell.text_frame, row_data)
+                        replaced += replace_placeholders(cell.text_frame, row_data)
 
         elif shape.has_text_frame:
-            replace_placeholders(shape.text_frame, row_data)
\ No newline at end of file
+            replaced += replace_placeholders(shape.text_frame, row_data)
+    return replaced
@@ -0,0 +1,170 @@
+# ppt_engine/template_cache.py
+
+import os
+import copy
+import zipfile
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from pptx import Presentation
+
+from ppt_engine.placeholders import PlaceholderIndex, build_placeholder_index
+
+#: 默认缓存上限(字节), 按模板解压后大小估算
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+def _estimate_template_bytes(file_path: str) -> int:
+    """
+    估算模板解析后的内存占用: 取 zip 内各部件解压后的大小之和.
+    """
+    try:
+        with zipfile.ZipFile(file_path) as zf:
+            return sum(info.file_size for info in zf.infolist())
+    except zipfile.BadZipFile:
+        return os.path.getsize(file_path)
+
+
+class _TemplateEntry:
+    """
+    缓存条目: 已解析的母版 Presentation + 占位符索引 + 条目锁.
+    母版本身永不交给调用方, 只交出它的深拷贝.
+    母版上也不能访问 python-pptx 的代理属性(如 prs.slides):
+    它们会缓存子元素引用, 深拷贝后这些引用会脱离新文档.
+    """
+    def __init__(self):
+        self.prs = None
+        self.size = 0
+        self.index = None
+        self.lock = threading.Lock()
+
+
+class TemplateCache:
+    """
+    已解析 PPT 模板的缓存。
+
+    - 每个模板(按绝对路径 + mtime + 大小区分)只解压/解析一次;
+    - get() 返回母版的深拷贝(lxml 层面复制, 远快于重新解析),
+      每个任务拿到的都是自己私有的 Presentation, 可随意修改;
+    - 总占用超过 max_bytes 时按 LRU 淘汰最久未使用的模板;
+    - get_placeholder_index() 返回该模板的占位符索引, 同样只分析一次.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[str, float, int], _TemplateEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _make_key(file_path: str) -> Tuple[str, float, int]:
+        abs_path = os.path.abspath(file_path)
+        st = os.stat(abs_path)
+        return abs_path, st.st_mtime, st.st_size
+
+    def _get_entry(self, file_path: str) -> Tuple[Tuple[str, float, int], _TemplateEntry]:
+        key = self._make_key(file_path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = _TemplateEntry()
+                self._entries[key] = entry
+            else:
+                self._entries.move_to_end(key)
+        return key, entry
+
+    def _ensure_loaded(self, key: Tuple[str, float, int], entry: _TemplateEntry):
+        """
+        调用方需持有 entry.lock.
+        同一模板并发请求时, 只有第一个线程解析, 其余等待后直接复用;
+        锁只保护解析, 深拷贝在锁外进行.
+        """
+        if entry.prs is not None:
+            with self._lock:
+                self.hits += 1
+            return
+        entry.prs = Presentation(key[0])
+        entry.size = _estimate_template_bytes(key[0])
+        with self._lock:
+            self.misses += 1
+            if self._entries.get(key) is entry:
+                self._total_bytes += entry.size
+                self._evict_locked(keep=key)
+
+    def get(self, file_path: str):
+        """
+        返回 file_path 对应模板的一个私有副本.
+        """
+        key, entry = self._get_entry(file_path)
+        with entry.lock:
+            self._ensure_loaded(key, entry)
+            master = entry.prs
+        # 深拷贝只读取母版, 放在锁外, 使用同一模板的各线程可以同时复制
+        return copy.deepcopy(master)
+
+    def get_placeholder_index(self, file_path: str) -> PlaceholderIndex:
+        """
+        返回 file_path 对应模板的占位符索引(只读, 各任务共享).
+        """
+        key, entry = self._get_entry(file_path)
+        with entry.lock:
+            if entry.index is not None:
+                return entry.index
+            self._ensure_loaded(key, entry)
+            master = entry.prs
+        # 在一次性副本上分析, 不触碰母版的代理属性; 并发时可能重复分析, 保留先完成的结果
+        index = build_placeholder_index(copy.deepcopy(master))
+        with entry.lock:
+            if entry.index is None:
+                entry.index = index
+            return entry.index
+
+    def _evict_locked(self, keep: Optional[Tuple[str, float, int]] = None):
+        """
+        按 LRU 淘汰, 直到总占用不超过 max_bytes.
+        keep 为刚放入的条目, 即使单个模板超过上限也保留它.
+        """
+        for old_key in list(self._entries):
+            if self._total_bytes <= self.max_bytes:
+                break
+            if old_key == keep:
+                continue
+            old_entry = self._entries.pop(old_key)
+            self._total_bytes -= old_entry.size
+
+    def set_max_bytes(self, max_bytes: int):
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict_locked()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_default_cache = TemplateCache()
+
+
+def get_template_cache() -> TemplateCache:
+    """
+    返回进程内共享的默认模板缓存.
+    """
+    return _default_cache
+
+
+def set_template_cache_limit(max_bytes: int):
+    """
+    调整默认模板缓存的内存上限(字节).
+    """
+    _default_cache.set_max_bytes(max_bytes)
@@ -0,0 +1,285 @@
+# ppt_engine/xml_fill.py
+"""
+直接在幻灯片 XML 上填充占位符的引擎("lxml" 引擎).
+
+与 slide_handler 的结果完全相同, 但不经过 python-pptx 的形状对象模型
+(slide.shapes / shape.table / table.cell / paragraphs / runs),
+而是用预编译的 XPath 直接取出含 "[" 的 a:t 节点后替换文本:
+- 顶层 p:sp 的文本框: p:cSld/p:spTree/p:sp/p:txBody/a:p/a:r/a:t
+- 顶层表格: p:cSld/p:spTree/p:graphicFrame/.../a:tbl/a:tr/a:tc/a:txBody/a:p/a:r/a:t
+组合形状(p:grpSp)内部与 python-pptx 引擎一样不处理.
+
+行模板表格(fill_table_row_template_xml)只能在 XML 层面增加表格行,
+两种引擎都使用这里的实现.
+"""
+
+import copy
+from typing import Any, Mapping, Sequence, Tuple
+
+from lxml import etree
+from openpyxl.utils import get_column_letter
+from pptx.oxml.ns import nsuri, qn
+from pptx.oxml.text import CT_RegularTextRun
+from pptx.oxml.xmlchemy import OxmlElement
+
+from ppt_engine.placeholders import substitute_placeholders_count
+
+_NAMESPACES = {"a": nsuri("a"), "p": nsuri("p")}
+
+#: 顶层文本框中含 "[" 的 a:t
+_TEXTBOX_T = etree.XPath(
+    "./p:cSld/p:spTree/p:sp/p:txBody/a:p/a:r/a:t[contains(., '[')]",
+    namespaces=_NAMESPACES
+)
+
+#: 顶层表格(a:tbl)
+_TABLES = etree.XPath(
+    "./p:cSld/p:spTree/p:graphicFrame/a:graphic/a:graphicData/a:tbl",
+    namespaces=_NAMESPACES
+)
+
+#: 一行中含 "[" 的 a:t
+_ROW_T = etree.XPath(
+    "./a:tc/a:txBody/a:p/a:r/a:t[contains(., '[')]",
+    namespaces=_NAMESPACES
+)
+
+_A_TR = qn("a:tr")
+_A_TC = qn("a:tc")
+_A_T = qn("a:t")
+_A_R = qn("a:r")
+_A_P = qn("a:p")
+_A_PPR = qn("a:pPr")
+_A_RPR = qn("a:rPr")
+_A_END_PARA_RPR = qn("a:endParaRPr")
+_A_TX_BODY = qn("a:txBody")
+_P_XFRM = qn("p:xfrm")
+_A_EXT = qn("a:ext")
+
+#: 行模板表格中作为行模板的行(0-based, 第1行为表头)
+TEMPLATE_ROW_INDEX = 1
+
+# 与 python-pptx 的 _Run.text 赋值一致: 制表符和换行以外的控制字符转义为 _xHHHH_
+_escape_ctrl_chars = CT_RegularTextRun._escape_ctrl_chars
+
+
+def _replace_t(t, row_data) -> int:
+    old_text = t.text or ""
+    new_text, n = substitute_placeholders_count(old_text, row_data)
+    if new_text != old_text:
+        t.text = _escape_ctrl_chars(new_text)
+    return n
+
+
+def _iter_table_rows(sld):
+    for tbl in _TABLES(sld):
+        for r_idx, tr in enumerate(tbl.iterchildren(_A_TR)):
+            yield r_idx, tr
+
+
+def fill_slide_rows_xml(slide, data_rows: Sequence[Mapping[str, Any]]) -> int:
+    """
+    与 slide_handler.fill_table_with_rows 相同: 表格第1行是表头, 第 r 行(r>=1)
+    使用 data_rows[r-1]; 顶层文本框使用 data_rows[0]. 返回替换的占位符个数.
+    """
+    if not data_rows:
+        return 0
+    sld = slide._element
+    replaced = 0
+    for r_idx, tr in _iter_table_rows(sld):
+        data_i = r_idx - 1
+        if 0 <= data_i < len(data_rows):
+            row_data = data_rows[data_i]
+            for t in _ROW_T(tr):
+                replaced += _replace_t(t, row_data)
+    for t in _TEXTBOX_T(sld):
+        replaced += _replace_t(t, data_rows[0])
+    return replaced
+
+
+def fill_slide_single_xml(slide, row_data: Mapping[str, Any]) -> int:
+    """
+    与 slide_handler.fill_table_with_single_dict 相同: 表格所有单元格和顶层文本框
+    都使用 row_data. 返回替换的占位符个数.
+    """
+    if not row_data:
+        return 0
+    sld = slide._element
+    replaced = 0
+    for _, tr in _iter_table_rows(sld):
+        for t in _ROW_T(tr):
+            replaced += _replace_t(t, row_data)
+    for t in _TEXTBOX_T(sld):
+        replaced += _replace_t(t, row_data)
+    return replaced
+
+
+def _frame_of(tbl):
+    """
+    a:tbl -> a:graphicData -> a:graphic -> p:graphicFrame
+    """
+    graphic_data = tbl.getparent()
+    graphic = graphic_data.getparent() if graphic_data is not None else None
+    return graphic.getparent() if graphic is not None else None
+
+
+def _fit_frame_height(tbl):
+    """
+    按各行高度之和调整表格外框(p:graphicFrame/p:xfrm/a:ext)的 cy.
+    """
+    frame = _frame_of(tbl)
+    xfrm = frame.find(_P_XFRM) if frame is not None else None
+    ext = xfrm.find(_A_EXT) if xfrm is not None else None
+    if ext is None:
+        return
+    ext.set("cy", str(sum(int(tr.get("h", "0")) for tr in tbl.iterchildren(_A_TR))))
+
+
+def _template_row(tbl):
+    rows = list(tbl.iterchildren(_A_TR))
+    return rows[TEMPLATE_ROW_INDEX] if len(rows) > TEMPLATE_ROW_INDEX else None
+
+
+def _placeholder_slots(template_tr):
+    """
+    模板行中含 "[" 的 a:t: (在 a:tr 子树中的文档顺序位置, 原文本); 复制后按相同顺序取回.
+    """
+    return [(pos, t.text) for pos, t in enumerate(template_tr.iter(_A_T))
+            if t.text and "[" in t.text and t.getparent().tag == _A_R]
+
+
+def _positional_keys(template_tr) -> Tuple[str, ...]:
+    """
+    没有占位符的模板行按列位置填充: 第 j 个单元格(a:tc, 含合并的单元格)对应数据的第 j 列,
+    返回各单元格对应的列键 ("[A]", "[B]", ...); 模板行含占位符时返回空元组.
+    """
+    if _placeholder_slots(template_tr):
+        return ()
+    n_cells = sum(1 for _ in template_tr.iterchildren(_A_TC))
+    return tuple(f"[{get_column_letter(j + 1)}]" for j in range(n_cells))
+
+
+def row_template_positional_keys(slide) -> Tuple[str, ...]:
+    """
+    行模板页上按列位置填充的表格需要的列键(各表格取最宽者); 没有这样的表格时为空元组.
+    读取数据时据此请求这些列(见 processor.collect_data_request).
+    """
+    keys = ()
+    for tbl in _TABLES(slide._element):
+        template_tr = _template_row(tbl)
+        if template_tr is not None:
+            keys = max(keys, _positional_keys(template_tr), key=len)
+    return keys
+
+
+def _set_cell_text(tc, text: str):
+    """
+    把单元格的文本替换为 text: 只保留第一段, 沿用其段落属性和第一个 run 的字符属性.
+    """
+    tx_body = tc.find(_A_TX_BODY)
+    if tx_body is None:
+        return
+    paragraphs = list(tx_body.iterchildren(_A_P))
+    if not paragraphs:
+        return
+    first = paragraphs[0]
+    for extra in paragraphs[1:]:
+        tx_body.remove(extra)
+    first_r = first.find(_A_R)
+    r_pr = first_r.find(_A_RPR) if first_r is not None else None
+    for child in list(first):
+        if child.tag not in (_A_PPR, _A_END_PARA_RPR):
+            first.remove(child)
+    if not text:
+        return
+    r = OxmlElement("a:r")
+    if r_pr is not None:
+        r.append(copy.deepcopy(r_pr))
+    t = OxmlElement("a:t")
+    t.text = _escape_ctrl_chars(text)
+    r.append(t)
+    end = first.find(_A_END_PARA_RPR)
+    if end is not None:
+        end.addprevious(r)
+    else:
+        first.append(r)
+
+
+def _fill_positional(tr, keys: Sequence[str], row_data: Mapping[str, Any]) -> int:
+    """
+    第 j 个单元格填入 row_data[keys[j]]; 数据中没有该列时保留模板内容,
+    合并单元格的延续部分(hMerge/vMerge)不填. 返回填充的单元格数.
+    """
+    filled = 0
+    for tc, key in zip(tr.iterchildren(_A_TC), keys):
+        if tc.get("hMerge") or tc.get("vMerge") or key not in row_data:
+            continue
+        value = row_data.get(key)
+        _set_cell_text(tc, "" if value is None else str(value))
+        filled += 1
+    return filled
+
+
+def _expand_row_template(tbl, data_rows: Sequence[Mapping[str, Any]]) -> int:
+    """
+    把 tbl 的第 TEMPLATE_ROW_INDEX 行作为行模板, 为每个数据行复制一份 a:tr 并填充,
+    插在模板行原来的位置; 模板行本身被移除.
+    - 模板行含占位符时替换其中的占位符, 没有占位符的单元格保持模板内容;
+    - 模板行没有占位符(空白或固定文字)时按列位置填充: 第 j 个单元格填数据的第 j 列
+      (见 _fill_positional), 返回值计入填充的单元格数.
+    模板行中含 "[" 的 a:t 位置只查找一次, 每行的开销只与该行大小有关, 总耗时与行数成线性.
+    """
+    template_tr = _template_row(tbl)
+    if template_tr is None:
+        return 0
+    slots = _placeholder_slots(template_tr)
+    positional_keys = () if slots else _positional_keys(template_tr)
+
+    replaced = 0
+    new_rows = []
+    for row_data in data_rows:
+        tr = copy.deepcopy(template_tr)
+        if slots:
+            ts = list(tr.iter(_A_T))
+            for pos, old_text in slots:
+                new_text, n = substitute_placeholders_count(old_text, row_data)
+                replaced += n
+                if new_text != old_text:
+                    ts[pos].text = _escape_ctrl_chars(new_text)
+        elif positional_keys:
+            replaced += _fill_positional(tr, positional_keys, row_data)
+        new_rows.append(tr)
+
+    insert_at = tbl.index(template_tr)
+    tbl.remove(template_tr)
+    tbl[insert_at:insert_at] = new_rows
+    _fit_frame_height(tbl)
+    return replaced
+
+
+def fill_table_row_template_xml(slide, data_rows: Sequence[Mapping[str, Any]]) -> int:
+    """
+    行模板表格: 顶层表格的第1行是表头, 第2行是行模板, 按 data_rows 的行数复制第2行并逐行填充
+    (模板行含占位符时替换占位符, 否则按列位置填充, 见 _expand_row_template),
+    表格外框高度随行数调整. 其余行(表头、模板行之后的合计行等)和顶层文本框使用 data_rows[0].
+    data_rows 为空时删除模板行, 不替换其他占位符. 返回替换的占位符个数.
+    """
+    sld = slide._element
+    tables = _TABLES(sld)
+    if not data_rows:
+        for tbl in tables:
+            _expand_row_template(tbl, [])
+        return 0
+
+    first_row = data_rows[0]
+    replaced = 0
+    for tbl in tables:
+        # 先填充固定行, 再展开模板行, 固定行不会被重复扫描
+        for r_idx, tr in enumerate(tbl.iterchildren(_A_TR)):
+            if r_idx != TEMPLATE_ROW_INDEX:
+                for t in _ROW_T(tr):
+                    replaced += _replace_t(t, first_row)
+        replaced += _expand_row_template(tbl, data_rows)
+    for t in _TEXTBOX_T(sld):
+        replaced += _replace_t(t, first_row)
+    return replaced
@@ -0,0 +1,16 @@
+# tests/conftest.py
+"""
+测试共用的 fixture. 合成输入来自 benchmarks/fixtures.py, 与基准脚本使用同一份生成代码.
+"""
+
+import pytest
+
+from ppt_engine.template_cache import TemplateCache
+
+
+@pytest.fixture
+def template_cache():
+    """
+    每个测试一份独立的模板缓存, 互不影响.
+    """
+    return TemplateCache()
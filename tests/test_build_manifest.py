@@ -0,0 +1,62 @@
+# tests/test_build_manifest.py
+"""
+增量构建清单(build_manifest): 完整运行后, 已删除或改名的输入不再留在清单中.
+"""
+
+import json
+import os
+
+from benchmarks.fixtures import build_mappings, write_mappings, write_template, write_workbook
+from client_gui.controller.processing_controller import run_processing
+from client_gui.services.build_manifest import MANIFEST_FILENAME, BuildManifest
+
+
+def read_manifest(output_dir: str) -> dict:
+    with open(os.path.join(output_dir, MANIFEST_FILENAME), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_prune_unseen_drops_records_not_touched(tmp_path):
+    kept, removed = tmp_path / "kept.xlsx", tmp_path / "removed.xlsx"
+    kept.write_bytes(b"kept")
+    removed.write_bytes(b"removed")
+    manifest = BuildManifest(str(tmp_path / MANIFEST_FILENAME))
+    manifest.begin("v1", "m1")
+    for path in (kept, removed):
+        manifest.is_up_to_date(path.name, manifest.content_hash(str(path)), "t", str(path) + ".pptx")
+        manifest.record(path.name, manifest.content_hash(str(path)), "t", str(path) + ".pptx")
+    manifest.save()
+
+    reloaded = BuildManifest.load(str(tmp_path))
+    assert reloaded.begin("v1", "m1")
+    input_hash = reloaded.content_hash(str(kept))
+    reloaded.is_up_to_date(kept.name, input_hash, "t", str(kept) + ".pptx")
+    assert reloaded.prune_unseen() == 2
+    assert list(reloaded.files) == ["kept.xlsx"]
+    assert list(reloaded._hash_cache) == [os.path.abspath(kept)]
+
+
+def test_run_drops_deleted_inputs(tmp_path):
+    input_dir, output_dir = tmp_path / "input", tmp_path / "output"
+    input_dir.mkdir()
+    template_path = str(tmp_path / "template.pptx")
+    mappings_path = str(tmp_path / "slide_mappings.json")
+    write_template(template_path, n_slides=2)
+    write_mappings(mappings_path, build_mappings(2, 2))
+    for name in ("a.xlsx", "b.xlsx"):
+        write_workbook(str(input_dir / name), n_rows=3, n_sheets=2)
+
+    def run():
+        run_processing(template_path=template_path, excel_dir=str(input_dir),
+                       output_dir=str(output_dir), slide_mappings_file=mappings_path, max_workers=1)
+
+    run()
+    assert sorted(read_manifest(str(output_dir))["files"]) == ["a.xlsx", "b.xlsx"]
+
+    os.rename(input_dir / "b.xlsx", input_dir / "c.xlsx")
+    run()
+    data = read_manifest(str(output_dir))
+    assert sorted(data["files"]) == ["a.xlsx", "c.xlsx"]
+    assert not any(path.endswith("b.xlsx") for path in data["hash_cache"])
+    assert sorted(os.path.basename(path) for path in data["hash_cache"]) == \
+        ["a.xlsx", "c.xlsx", "template.pptx"]
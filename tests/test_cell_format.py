@@ -0,0 +1,53 @@
+# tests/test_cell_format.py
+"""
+单元格值转换(data_access/cell_format)与原来逐单元格的实现一致:
+边界值语料逐个比较(原实现抛出异常的值要求抛出同类异常), 整列转换逐个比较,
+混用格式的工作簿在流式与整本载入两种模式下逐单元格比较.
+原实现和输入见 benchmarks/bench_cell_format.py.
+"""
+
+import pytest
+
+from benchmarks.bench_cell_format import (
+    NUMBER_FORMATS, edge_values, legacy_convert, legacy_read, outcome, same_rows,
+    write_mixed_workbook
+)
+from data_access.cell_format import convert_cell_value, format_column, get_formatter
+from data_access.excel_reader import ExcelDataProvider
+
+
+@pytest.fixture(scope="module")
+def corpus():
+    return edge_values()
+
+
+@pytest.mark.parametrize("number_format", NUMBER_FORMATS)
+def test_convert_matches_legacy(corpus, number_format):
+    mismatches = []
+    for value in corpus:
+        got = outcome(convert_cell_value, value, number_format)
+        expected = outcome(legacy_convert, value, number_format)
+        if got != expected:
+            mismatches.append((value, got, expected))
+    assert mismatches[:5] == []
+
+
+@pytest.mark.parametrize("number_format", NUMBER_FORMATS)
+def test_format_column_matches_legacy(corpus, number_format):
+    # 抛异常的值已在逐个转换中检查, 整列只比较不抛异常的值
+    safe = [v for v in corpus if outcome(legacy_convert, v, number_format)[0] != "raise"]
+    column = format_column(safe, get_formatter(number_format))
+    mismatches = [
+        (value, got) for value, got in zip(safe, column)
+        if outcome(lambda v: got, value) != outcome(legacy_convert, value, number_format)
+    ]
+    assert len(column) == len(safe)
+    assert mismatches[:5] == []
+
+
+@pytest.mark.parametrize("streaming", (True, False))
+def test_workbook_matches_legacy(tmp_path, streaming):
+    path = str(tmp_path / "mixed.xlsx")
+    write_mixed_workbook(path)
+    got = ExcelDataProvider(path, streaming=streaming).read_data()
+    assert same_rows(got, legacy_read(path))
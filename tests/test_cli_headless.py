@@ -0,0 +1,59 @@
+# tests/test_cli_headless.py
+"""
+命令行路径不得导入 PyQt5: 在子进程中导入 cli_main 和 processing_controller,
+以及完整运行一次命令行, 检查 sys.modules 中没有 PyQt5.
+
+子进程的 sys.path 最前面放一个空的 PyQt5 包, 未安装 PyQt5 的环境中
+误导入也会成功并留在 sys.modules 里, 而不是被 ImportError 掩盖.
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+from benchmarks.fixtures import build_mappings, write_mappings, write_template, write_workbook
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def headless_env(tmp_path) -> dict:
+    fake_qt = tmp_path / "fake_qt" / "PyQt5"
+    fake_qt.mkdir(parents=True)
+    (fake_qt / "__init__.py").write_text("", encoding="utf-8")
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join([str(fake_qt.parent), REPO_ROOT])
+    return env
+
+
+def test_import_does_not_load_pyqt5(tmp_path):
+    code = (
+        "import sys\n"
+        "import client_gui.cli_main\n"
+        "import client_gui.controller.processing_controller\n"
+        "import json\n"
+        "print(json.dumps(sorted(name for name in sys.modules if name.split('.')[0] == 'PyQt5')))\n"
+    )
+    result = subprocess.run([sys.executable, "-c", code], cwd=REPO_ROOT, env=headless_env(tmp_path),
+                            capture_output=True, text=True, check=True)
+    assert json.loads(result.stdout) == []
+
+
+def test_cli_run_does_not_load_pyqt5(tmp_path):
+    input_dir = tmp_path / "input"
+    input_dir.mkdir()
+    template_path = tmp_path / "template.pptx"
+    mappings_path = tmp_path / "slide_mappings.json"
+    write_template(str(template_path), n_slides=3)
+    write_mappings(str(mappings_path), build_mappings(3, 2))
+    write_workbook(str(input_dir / "book.xlsx"), n_rows=5, n_sheets=2)
+
+    result = subprocess.run(
+        [sys.executable, "-m", "client_gui.cli_main", "-t", str(template_path), "-i", str(input_dir),
+         "-o", str(tmp_path / "output"), "-m", str(mappings_path), "-w", "1", "--assert-headless"],
+        cwd=REPO_ROOT, env=headless_env(tmp_path), capture_output=True, text=True
+    )
+    assert result.returncode == 0, result.stderr
+    summary = json.loads(result.stdout.splitlines()[-1])
+    assert summary["pyqt5_loaded"] is False
+    assert (tmp_path / "output" / "book.pptx").is_file()
@@ -0,0 +1,86 @@
+# tests/test_deck_manager.py
+"""
+保存输出PPT(deck_manager.write_package): 未改动的成员直接复制模板中的压缩数据;
+zipfile 内部实现不符(属性缺失或调用出错)时改用 prs.save, 输出内容不变.
+保存耗时见 python -m benchmarks.bench_save.
+"""
+
+import io
+import logging
+import sys
+import zipfile
+
+import pytest
+from pptx import Presentation
+
+from benchmarks.fixtures import write_template
+from ppt_engine import deck_manager
+from ppt_engine.deck_manager import write_package
+
+
+def read_members(source) -> dict:
+    with zipfile.ZipFile(source) as zf:
+        return {name: zf.read(name) for name in zf.namelist()}
+
+
+@pytest.fixture
+def template(tmp_path):
+    path = str(tmp_path / "template.pptx")
+    write_template(path, n_slides=3)
+    return path
+
+
+@pytest.fixture
+def expected_members(template, tmp_path):
+    path = str(tmp_path / "expected.pptx")
+    Presentation(template).save(path)
+    return read_members(path)
+
+
+@pytest.fixture(autouse=True)
+def raw_write_enabled(monkeypatch):
+    monkeypatch.setattr(deck_manager, "_raw_write_available", True)
+
+
+def test_untouched_members_are_copied_from_template(template, tmp_path, expected_members):
+    output = str(tmp_path / "output.pptx")
+    write_package(Presentation(template), output, template, dirty_parts=[])
+    assert read_members(output) == expected_members
+
+    with zipfile.ZipFile(template) as src, zipfile.ZipFile(output) as dst:
+        layout = "ppt/slideLayouts/slideLayout1.xml"
+        src_info, dst_info = src.getinfo(layout), dst.getinfo(layout)
+        assert (dst_info.CRC, dst_info.compress_size, dst_info.date_time) == \
+            (src_info.CRC, src_info.compress_size, src_info.date_time)
+
+
+@pytest.mark.parametrize("breakage", ("missing", "raises"))
+@pytest.mark.parametrize("to_stream", (False, True))
+def test_falls_back_when_zipfile_internals_change(template, tmp_path, expected_members, monkeypatch,
+                                                  caplog, breakage, to_stream):
+    if breakage == "missing":
+        # 模拟新版本 Python 去掉了某个内部属性
+        monkeypatch.setattr(deck_manager, "_RAW_WRITE_ZIP_ATTRS",
+                            deck_manager._RAW_WRITE_ZIP_ATTRS + ("_removed_internal",))
+    else:
+        # 模拟内部方法的行为变化; 只影响 _write_raw_member 的调用, zipfile 自身的写入照常
+        real_writecheck = zipfile.ZipFile._writecheck
+
+        def changed_writecheck(self, zinfo):
+            if sys._getframe(1).f_code.co_name == "_write_raw_member":
+                raise TypeError("_writecheck() signature changed")
+            return real_writecheck(self, zinfo)
+        monkeypatch.setattr(zipfile.ZipFile, "_writecheck", changed_writecheck)
+
+    output = io.BytesIO(b"keep") if to_stream else str(tmp_path / "output.pptx")
+    if to_stream:
+        output.seek(0, io.SEEK_END)
+    with caplog.at_level(logging.WARNING, logger=deck_manager.__name__):
+        write_package(Presentation(template), output, template, dirty_parts=[])
+
+    if to_stream:
+        assert output.getvalue()[:4] == b"keep"
+        output = io.BytesIO(output.getvalue()[4:])
+    assert read_members(output) == expected_members
+    assert deck_manager._raw_write_available is False
+    assert any("prs.save" in record.getMessage() for record in caplog.records)
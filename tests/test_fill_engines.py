@@ -0,0 +1,41 @@
+# tests/test_fill_engines.py
+"""
+两种占位符填充引擎("pptx" / "lxml")的输出:
+- 固定的小模板和数据与 benchmarks/golden/ 中签入的幻灯片 XML 逐字节相同;
+- suite 场景和含控制字符的文字场景下, 两种引擎的输出和替换数相同.
+有意修改输出时运行 python -m benchmarks.bench_fill_engines --update-golden 并一起提交金样.
+"""
+
+import pytest
+
+from benchmarks.bench_fill_engines import (
+    SUITE_SCENARIOS, golden_scenarios, read_golden, render, suite_scenario, text_scenario
+)
+from business_logic.processor import FILL_ENGINES
+
+GOLDEN_NAMES = ("table", "text")
+
+
+@pytest.mark.parametrize("engine", FILL_ENGINES)
+@pytest.mark.parametrize("name", GOLDEN_NAMES)
+def test_matches_golden(tmp_path, template_cache, name, engine):
+    scenario = golden_scenarios(str(tmp_path))[name]
+    slides_xml = render(scenario, template_cache, engine)[0]
+    golden = read_golden(name)
+    assert len(slides_xml) == len(golden)
+    for slide_no, (expected, actual) in enumerate(zip(golden, slides_xml), start=1):
+        assert actual == expected, f"第{slide_no}页与金样不一致"
+
+
+@pytest.mark.parametrize("name", SUITE_SCENARIOS + ("text",))
+def test_engines_agree(tmp_path, template_cache, name):
+    if name == "text":
+        scenario = text_scenario(str(tmp_path), n_slides=12)
+    else:
+        scenario = suite_scenario(str(tmp_path), name)
+    expected, _, expected_replaced = render(scenario, template_cache, "pptx")
+    actual, _, actual_replaced = render(scenario, template_cache, "lxml")
+    assert actual_replaced == expected_replaced
+    assert len(actual) == len(expected)
+    for slide_no, (golden, candidate) in enumerate(zip(expected, actual), start=1):
+        assert candidate == golden, f"第{slide_no}页 XML 不一致"
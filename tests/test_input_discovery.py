@@ -0,0 +1,104 @@
+# tests/test_input_discovery.py
+"""
+输入扫描(input_discovery)与取消时的计数:
+- 扁平的大目录中第一个文件不等读完整个目录即产出;
+- 子目录按名称顺序进入, 输出目录和锁文件被跳过;
+- 取消后仍扫描到底, 未开始的文件数与输入总数对得上.
+耗时见 python -m benchmarks.bench_discovery.
+"""
+
+import os
+
+import pytest
+
+from benchmarks.fixtures import build_mappings, write_mappings, write_template, write_workbook
+from business_logic.cancellation import CancellationToken
+from client_gui.controller.processing_controller import run_processing
+from client_gui.services import input_discovery
+from client_gui.services.input_discovery import iter_excel_files
+
+
+class CountingScandir:
+    """
+    包装 os.scandir, 记录已从目录中读出的条目数.
+    """
+
+    def __init__(self):
+        self.read = 0
+        self._scandir = os.scandir
+
+    def __call__(self, path):
+        counter = self
+        inner = self._scandir(path)
+
+        class Wrapped:
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                inner.close()
+
+            def __iter__(self):
+                for entry in inner:
+                    counter.read += 1
+                    yield entry
+
+        return Wrapped()
+
+
+def test_first_file_yielded_before_directory_is_read(tmp_path, monkeypatch):
+    n_files = 20000
+    for i in range(n_files):
+        (tmp_path / f"book{i:05d}.xlsx").touch()
+    scandir = CountingScandir()
+    monkeypatch.setattr(input_discovery.os, "scandir", scandir)
+
+    files = iter_excel_files(str(tmp_path))
+    next(files)
+    assert scandir.read == 1
+    assert sum(1 for _ in files) == n_files - 1
+    assert scandir.read == n_files
+
+
+def test_walk_order_and_exclusions(tmp_path):
+    for rel in ("b/2.xlsx", "a/1.csv", "a/c/3.xlsx", "top.xlsx", "~$top.xlsx", "notes.txt",
+                "out/old.xlsx"):
+        path = tmp_path / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.touch()
+
+    files = list(iter_excel_files(str(tmp_path), exclude_dir=str(tmp_path / "out")))
+    assert files == ["top.xlsx", os.path.join("a", "1.csv"), os.path.join("a", "c", "3.xlsx"),
+                     os.path.join("b", "2.xlsx")]
+    assert list(iter_excel_files(str(tmp_path), recursive=False)) == ["top.xlsx"]
+
+
+def test_root_must_be_readable(tmp_path):
+    with pytest.raises(OSError):
+        list(iter_excel_files(str(tmp_path / "missing")))
+
+
+def test_cancel_counts_undiscovered_files_as_not_started(tmp_path):
+    n_files = 30
+    input_dir = tmp_path / "input"
+    input_dir.mkdir()
+    template_path = str(tmp_path / "template.pptx")
+    mappings_path = str(tmp_path / "slide_mappings.json")
+    write_template(template_path, n_slides=2)
+    write_mappings(mappings_path, build_mappings(2, 2))
+    write_workbook(str(input_dir / "book00.xlsx"), n_rows=3, n_sheets=2)
+    data = (input_dir / "book00.xlsx").read_bytes()
+    for i in range(1, n_files):
+        (input_dir / f"book{i:02d}.xlsx").write_bytes(data)
+
+    token = CancellationToken()
+    stats = run_processing(
+        template_path=template_path, excel_dir=str(input_dir), output_dir=str(tmp_path / "output"),
+        slide_mappings_file=mappings_path, max_workers=1, max_in_flight=2, incremental=False,
+        cancel_token=token, status_callback=lambda snapshot: token.cancel()
+    )
+    assert stats.was_cancelled
+    assert stats.total == n_files
+    assert stats.processed >= 1
+    assert stats.processed + stats.failed + stats.cancelled + stats.not_started == n_files
+    assert stats.not_started > 2
@@ -0,0 +1,94 @@
+# tests/test_process_worker.py
+"""
+进程池工作进程入口(process_worker): 本任务的日志记录随结果传回主进程并重新分发,
+被取消时也不丢失; 主进程中单独设置的模块级别同样作用于工作进程.
+"""
+
+import logging
+import pickle
+
+import pytest
+
+from benchmarks.fixtures import build_mappings, write_mappings, write_template, write_workbook
+from business_logic.cancellation import CancellationToken, ProcessingCancelled
+from business_logic.mapping_plan import compile_mappings
+from client_gui.controller.processing_controller import run_processing
+from client_gui.services import process_worker
+
+
+@pytest.fixture
+def worker_inputs(tmp_path, monkeypatch):
+    """
+    代替 init_process_worker 写入工作进程的全局状态(不改动本进程的根 logger 级别).
+    """
+    input_dir = tmp_path / "input"
+    input_dir.mkdir()
+    template_path = str(tmp_path / "template.pptx")
+    write_template(template_path, n_slides=2)
+    write_workbook(str(input_dir / "book.xlsx"), n_rows=3, n_sheets=2)
+    token = CancellationToken()
+    monkeypatch.setattr(process_worker, "_worker_slide_mapping", compile_mappings(build_mappings(2, 2)))
+    monkeypatch.setattr(process_worker, "_worker_cancel_token", token)
+    return {"input_dir": str(input_dir), "output_dir": str(tmp_path / "output"),
+            "template_path": template_path, "token": token}
+
+
+def run_worker(inputs):
+    return process_worker.process_excel_file_in_worker(
+        "book.xlsx", inputs["input_dir"], inputs["output_dir"], inputs["template_path"])
+
+
+def test_records_returned_with_result(worker_inputs, caplog):
+    caplog.set_level(logging.INFO)
+    result, records = run_worker(worker_inputs)
+    assert result is not None
+    assert any("已处理: book.xlsx" in record.getMessage() for record in records)
+
+
+def test_cancelled_task_keeps_records(worker_inputs, caplog):
+    caplog.set_level(logging.INFO)
+    worker_inputs["token"].cancel()
+    with pytest.raises(ProcessingCancelled) as exc_info:
+        run_worker(worker_inputs)
+
+    # 与跨进程传回时一样经过 pickle
+    error = pickle.loads(pickle.dumps(exc_info.value))
+    messages = [record.getMessage() for record in error.log_records]
+    assert any("已取消: book.xlsx" in message for message in messages)
+
+    caplog.clear()
+    process_worker.replay_worker_records(error.log_records)
+    assert any("已取消: book.xlsx" in record.getMessage() for record in caplog.records)
+
+
+@pytest.fixture
+def services_debug():
+    """
+    只把 client_gui.services 设为 DEBUG, 根 logger 保持 WARNING.
+    """
+    services_logger, root_logger = logging.getLogger("client_gui.services"), logging.getLogger()
+    saved = services_logger.level, root_logger.level
+    services_logger.setLevel(logging.DEBUG)
+    root_logger.setLevel(logging.WARNING)
+    yield
+    services_logger.setLevel(saved[0])
+    root_logger.setLevel(saved[1])
+
+
+def test_module_levels_reach_process_workers(tmp_path, services_debug, caplog):
+    input_dir = tmp_path / "input"
+    input_dir.mkdir()
+    template_path = str(tmp_path / "template.pptx")
+    mappings_path = str(tmp_path / "slide_mappings.json")
+    write_template(template_path, n_slides=2)
+    write_mappings(mappings_path, build_mappings(2, 2))
+    write_workbook(str(input_dir / "book.xlsx"), n_rows=3, n_sheets=2)
+
+    stats = run_processing(template_path=template_path, excel_dir=str(input_dir),
+                           output_dir=str(tmp_path / "output"), slide_mappings_file=mappings_path,
+                           max_workers=1, executor_mode="process", incremental=False)
+    assert stats.processed == 1
+    worker_debug = [record for record in caplog.records
+                    if record.name == "client_gui.services.process_worker.files"
+                    and record.levelno == logging.DEBUG]
+    assert worker_debug and "book.xlsx" in worker_debug[0].getMessage()
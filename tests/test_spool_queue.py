@@ -0,0 +1,88 @@
+# tests/test_spool_queue.py
+"""
+共享队列目录(spool_queue)的命名与租约: 任务ID稳定、工作进程ID和临时文件名跨主机唯一,
+领取互斥, 过期租约被接手后原持有者不能再写结果.
+多工作进程 + 崩溃模拟见 python -m benchmarks.bench_spool.
+"""
+
+import os
+import time
+
+import pytest
+
+from client_gui.services import spool_queue
+from client_gui.services.spool_queue import (
+    DONE_DIR, PENDING_DIR, SpoolQueue, make_job_id, make_worker_id
+)
+
+
+@pytest.fixture
+def same_host_and_pid(monkeypatch):
+    """
+    模拟两台主机上进程号相同的进程: 主机名和进程号都固定.
+    """
+    monkeypatch.setattr(spool_queue.socket, "gethostname", lambda: "node@1.example.com")
+    monkeypatch.setattr(spool_queue.os, "getpid", lambda: 4242)
+
+
+def test_job_id_is_stable_and_distinguishes_directories():
+    assert make_job_id("a/book 1.xlsx") == make_job_id("a/book 1.xlsx")
+    assert make_job_id(os.path.join("a", "book.xlsx")) == make_job_id("a/book.xlsx")
+    assert make_job_id("a/book.xlsx") != make_job_id("b/book.xlsx")
+    job_id = make_job_id("a/报表 (1)@v2.xlsx")
+    assert all(ch.isalnum() or ch in "-_" for ch in job_id)
+
+
+def test_worker_ids_are_unique_without_owner_separator(same_host_and_pid):
+    ids = {make_worker_id() for _ in range(50)}
+    assert len(ids) == 50
+    assert all(worker_id.startswith("node_1-4242-") for worker_id in ids)
+    assert not any("@" in worker_id for worker_id in ids)
+
+
+def test_temp_names_unique_for_same_host_and_pid(tmp_path, monkeypatch, same_host_and_pid):
+    temp_names = []
+    real_replace = os.replace
+
+    def recording_replace(src, dst):
+        temp_names.append(os.path.basename(src))
+        real_replace(src, dst)
+
+    monkeypatch.setattr(spool_queue.os, "replace", recording_replace)
+    target = str(tmp_path / "job.json")
+    spool_queue._write_json_atomic(target, {"n": 1})
+    spool_queue._write_json_atomic(target, {"n": 2})
+
+    assert len(set(temp_names)) == 2
+    assert all(name.startswith(".job.json.") and name.endswith(".tmp") for name in temp_names)
+    assert os.listdir(tmp_path) == ["job.json"]
+
+
+def test_failed_write_leaves_no_temp_file(tmp_path):
+    target = str(tmp_path / "job.json")
+    with pytest.raises(TypeError):
+        spool_queue._write_json_atomic(target, {"value": object()})
+    assert os.listdir(tmp_path) == []
+
+
+def test_claim_is_exclusive_and_expired_lease_is_taken_over(tmp_path):
+    queue = SpoolQueue(str(tmp_path), lease_seconds=0.2)
+    assert queue.submit("job1", {"excel_file": "book.xlsx"})
+    assert not queue.submit("job1", {"excel_file": "book.xlsx"})
+    assert os.listdir(tmp_path / PENDING_DIR) == ["job1.json"]
+
+    first = queue.claim("w1")
+    assert first is not None and first.job["attempts"] == 1
+    assert queue.claim("w2") is None
+
+    time.sleep(0.3)
+    second = queue.claim("w2")
+    assert second is not None
+    assert second.previous_owner == "w1"
+    assert second.job["attempts"] == 2
+
+    assert not first.renew()
+    assert not first.complete({"status": "done", "worker": "w1"})
+    assert second.complete({"status": "done", "worker": "w2"})
+    assert queue.counts() == {"pending": 0, "running": 0, "expired": 0, "done": 1, "failed": 0}
+    assert os.listdir(tmp_path / DONE_DIR) == ["job1.json"]
@@ -0,0 +1,85 @@
+# tests/test_table_rows.py
+"""
+行模板表格(映射类型 table_row_template): 表格按数据行数增长、续页拆分、两种引擎一致,
+以及模板行没有占位符时按列位置填充.
+"""
+
+import pytest
+from lxml import etree
+from pptx.oxml.ns import qn
+
+from benchmarks.bench_table_rows import build_rows, render, write_row_template
+from benchmarks.fixtures import column_key
+from business_logic.processor import FILL_ENGINES, TABLE_ROW_TEMPLATE, collect_data_request
+
+
+def table_rows_of(slide):
+    tbl = slide._element.find(".//" + qn("a:tbl"))
+    return tbl, list(tbl.iterchildren(qn("a:tr")))
+
+
+def row_texts(tr) -> list:
+    return ["".join(t.text or "" for t in tc.iter(qn("a:t"))) for tc in tr.iterchildren(qn("a:tc"))]
+
+
+def assert_table_filled(slide, rows: list):
+    """
+    表头 + 每个数据行一行 + 合计行; 首末数据行、合计行的内容和外框高度.
+    """
+    tbl, trs = table_rows_of(slide)
+    assert len(trs) == len(rows) + 2
+    assert row_texts(trs[1]) == [rows[0][column_key(c)] for c in range(len(rows[0]))]
+    assert row_texts(trs[-2]) == [rows[-1][column_key(c)] for c in range(len(rows[-1]))]
+    assert row_texts(trs[-1])[0] == f"合计 {rows[0][column_key(0)]}"
+    frame = tbl.getparent().getparent().getparent()
+    cy = int(frame.find(qn("p:xfrm")).find(qn("a:ext")).get("cy"))
+    assert cy == sum(int(tr.get("h")) for tr in trs)
+
+
+@pytest.fixture
+def row_template(tmp_path):
+    path = str(tmp_path / "row_template.pptx")
+    write_row_template(path)
+    return path
+
+
+@pytest.mark.parametrize("engine", FILL_ENGINES)
+@pytest.mark.parametrize("n_rows", (1, 300))
+def test_table_grows_to_fit(row_template, template_cache, engine, n_rows):
+    rows = build_rows(n_rows)
+    prs, _ = render(row_template, template_cache, rows, engine)
+    slides = list(prs.slides)
+    assert len(slides) == 1
+    assert_table_filled(slides[0], rows)
+
+
+def test_max_rows_splits_and_engines_agree(row_template, template_cache):
+    max_rows = 25
+    rows = build_rows(max_rows * 3 + 7)
+    outputs = {}
+    for engine in FILL_ENGINES:
+        prs, _ = render(row_template, template_cache, rows, engine, max_rows=max_rows)
+        slides = list(prs.slides)
+        assert len(slides) == 4
+        for page, slide in enumerate(slides):
+            assert_table_filled(slide, rows[page * max_rows:(page + 1) * max_rows])
+        outputs[engine] = [etree.tostring(slide._element) for slide in slides]
+    assert outputs["pptx"] == outputs["lxml"]
+
+
+def test_placeholder_free_row_fills_by_position(tmp_path, template_cache):
+    template_path = str(tmp_path / "positional_template.pptx")
+    write_row_template(template_path, placeholders=False)
+    prs = template_cache.get(template_path)
+    _, columns = collect_data_request(prs, {1: {"sheet": "Sheet1", "type": TABLE_ROW_TEMPLATE}},
+                                      template_cache.get_placeholder_index(template_path))
+    assert columns.get("Sheet1") == {column_key(c) for c in range(5)}
+
+    rows = build_rows(30)
+    outputs = {}
+    for engine in FILL_ENGINES:
+        prs, _ = render(template_path, template_cache, rows, engine)
+        slide = list(prs.slides)[0]
+        assert_table_filled(slide, rows)
+        outputs[engine] = etree.tostring(slide._element)
+    assert outputs["pptx"] == outputs["lxml"]